@@ -0,0 +1,217 @@
+"""
+Backends compartidos (L2) para la caché de dos niveles
+
+Un backend guarda valores serializados con expiración y ofrece pub/sub para
+difundir invalidaciones entre workers. ``RedisBackend`` habla el protocolo de
+Redis (Redis, Valkey, KeyDB...) y ``InMemoryBackend`` es un sustituto en
+proceso para tests y desarrollo local.
+
+El paquete ``redis`` es opcional: solo se importa si se configura
+``CACHE_BACKEND=redis``.
+"""
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import CACHE_BACKEND, REDIS_URL
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[bytes], None]
+
+
+class CacheBackend(ABC):
+    """Interfaz de un backend de caché compartido con pub/sub"""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[MessageHandler]] = defaultdict(list)
+        self._handlers_lock = threading.Lock()
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Obtener un valor (None si no existe o expiró)"""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Guardar un valor con tiempo de vida en segundos"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Eliminar un valor"""
+
+    @abstractmethod
+    def incr(self, key: str, ttl: float) -> int:
+        """Incrementar un contador de forma atómica (se crea con el TTL indicado)"""
+
+    def incr_window(self, key: str, previous_key: str, ttl: float) -> Tuple[int, Optional[bytes]]:
+        """
+        Incrementar ``key`` y leer ``previous_key`` (contadores de ventana del limitador)
+
+        Si falla solo la lectura el incremento ya está hecho: se devuelve None
+        como valor anterior en lugar de propagar el error.
+        """
+        value = self.incr(key, ttl)
+        try:
+            return value, self.get(previous_key)
+        except Exception as e:
+            logger.warning("Cache backend failed reading %s: %s", previous_key, e)
+            return value, None
+
+    @abstractmethod
+    def publish(self, channel: str, message: bytes) -> None:
+        """Publicar un mensaje a todos los suscriptores del canal"""
+
+    def subscribe(self, channel: str, handler: MessageHandler) -> None:
+        """Registrar un manejador para los mensajes del canal"""
+        with self._handlers_lock:
+            first = not self._handlers[channel]
+            self._handlers[channel].append(handler)
+        if first:
+            self._listen(channel)
+
+    def _listen(self, channel: str) -> None:
+        """Empezar a recibir mensajes del canal (se llama una vez por canal)"""
+
+    def _dispatch(self, channel: str, message: bytes) -> None:
+        """Entregar un mensaje a los manejadores registrados del canal"""
+        with self._handlers_lock:
+            handlers = list(self._handlers.get(channel, ()))
+        for handler in handlers:
+            try:
+                handler(message)
+            except Exception as e:
+                logger.error("Error handling cache message on %s: %s", channel, e)
+
+    def close(self) -> None:
+        """Liberar conexiones y tareas en segundo plano"""
+
+
+class InMemoryBackend(CacheBackend):
+    """
+    Backend en memoria con la semántica de Redis necesaria para la caché
+
+    Varias instancias de ``TwoLevelCache`` que compartan este backend se
+    comportan como workers distintos conectados al mismo Redis.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self._clock = clock
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (value, self._clock() + ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str, ttl: float) -> int:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[1] <= self._clock():
+                entry = (b"0", self._clock() + ttl)
+            value = int(entry[0]) + 1
+            self._data[key] = (str(value).encode(), entry[1])
+            return value
+
+    def publish(self, channel: str, message: bytes) -> None:
+        self._dispatch(channel, message)
+
+
+class RedisBackend(CacheBackend):
+    """Backend sobre un servidor compatible con el protocolo de Redis"""
+
+    def __init__(self, url: str):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requiere el paquete 'redis' (pip install redis)") from e
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = None
+        self._thread = None
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def incr(self, key: str, ttl: float) -> int:
+        pipeline = self._client.pipeline()
+        pipeline.incr(key)
+        pipeline.pexpire(key, max(1, int(ttl * 1000)), nx=True)
+        value, _ = pipeline.execute()
+        return value
+
+    def incr_window(self, key: str, previous_key: str, ttl: float) -> Tuple[int, Optional[bytes]]:
+        # Un solo round trip en MULTI/EXEC: el incremento y la lectura son atómicos
+        pipeline = self._client.pipeline(transaction=True)
+        pipeline.incr(key)
+        pipeline.pexpire(key, max(1, int(ttl * 1000)), nx=True)
+        pipeline.get(previous_key)
+        value, _, previous = pipeline.execute()
+        return value, previous
+
+    def publish(self, channel: str, message: bytes) -> None:
+        self._client.publish(channel, message)
+
+    def _listen(self, channel: str) -> None:
+        if self._pubsub is None:
+            self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{channel: lambda message: self._dispatch(channel, message['data'])})
+        if self._thread is None:
+            # Hilo daemon que recibe los mensajes y llama a los manejadores
+            self._thread = self._pubsub.run_in_thread(sleep_time=0.01, daemon=True)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+        self._client.close()
+
+
+def create_backend(name: str, url: str = REDIS_URL) -> Optional[CacheBackend]:
+    """
+    Crear el backend configurado
+
+    Args:
+        name: "none" (solo caché en proceso), "memory" o "redis"
+        url: URL de conexión para el backend redis
+    """
+    name = name.lower()
+    if name == "none":
+        return None
+    if name == "memory":
+        return InMemoryBackend()
+    if name == "redis":
+        logger.info("Using Redis cache backend")
+        return RedisBackend(url)
+    raise ValueError(f"Backend de caché no soportado: {name}")
+
+
+# Backend compartido por las cachés de los servicios
+shared_backend = create_backend(CACHE_BACKEND)
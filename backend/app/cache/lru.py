@@ -0,0 +1,69 @@
+"""
+Caché en proceso acotada con política LRU y expiración por TTL
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from app.metrics import metrics
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Caché LRU con tiempo de vida por entrada
+
+    Registra aciertos, fallos y desalojos en el registro de métricas con el
+    prefijo ``cache.<name>``.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Obtener un valor vigente (default si no existe o expiró)"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at > self._clock():
+                    self._data.move_to_end(key)
+                    metrics.increment(f"cache.{self.name}.hits")
+                    return value
+                del self._data[key]
+        metrics.increment(f"cache.{self.name}.misses")
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Guardar un valor, desalojando el menos usado si se supera el tamaño"""
+        expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+        evicted = 0
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                evicted += 1
+        if evicted:
+            metrics.increment(f"cache.{self.name}.evictions", evicted)
+
+    def delete(self, key: Hashable) -> None:
+        """Invalidar una entrada"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Invalidar todas las entradas"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -0,0 +1,193 @@
+"""
+Caché de dos niveles: L1 en proceso y L2 compartida entre workers
+
+Las lecturas consultan primero la L1 (``TTLCache``) y luego la L2
+(``CacheBackend``); solo si ambas fallan el servicio va a DynamoDB. Las
+invalidaciones eliminan la entrada de la L2 y se difunden por pub/sub para
+que cada worker descarte su copia local en milisegundos.
+
+Las llamadas a la L2 son de red y bloquean: desde código async se usan las
+variantes ``*_async``, que resuelven la L1 en línea y llevan la L2 a un hilo.
+
+Los valores se guardan en la L2 en el formato JSON de DynamoDB (el mismo del
+buffer de transacciones), de modo que ``Decimal`` y conjuntos se conservan.
+"""
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Callable, Hashable, List, Optional
+
+from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+
+from app.cache.backends import CacheBackend
+from app.cache.lru import TTLCache
+from app.config import CACHE_KEY_PREFIX, CACHE_INVALIDATION_CHANNEL
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def dumps_items(items: List[dict]) -> bytes:
+    """Serializar items de DynamoDB para la L2"""
+    return json.dumps([
+        {key: _serializer.serialize(value) for key, value in item.items()} for item in items
+    ]).encode()
+
+
+def loads_items(data: bytes) -> List[dict]:
+    """Reconstruir items de DynamoDB guardados en la L2"""
+    return [
+        {key: _deserializer.deserialize(value) for key, value in item.items()} for item in json.loads(data)
+    ]
+
+
+class TwoLevelCache:
+    """
+    Caché con L1 en proceso, L2 compartida opcional e invalidación difundida
+
+    Args:
+        name: Nombre de la caché (prefijo de claves y métricas)
+        maxsize: Número máximo de entradas en la L1
+        ttl: Tiempo de vida en segundos (L1 y L2)
+        backend: Backend L2; None para usar solo la L1
+        encode: Convertir un valor a bytes para la L2
+        decode: Reconstruir un valor desde los bytes de la L2
+    """
+
+    def __init__(
+        self,
+        name: str,
+        maxsize: int,
+        ttl: float,
+        backend: Optional[CacheBackend],
+        encode: Callable[[Any], bytes],
+        decode: Callable[[bytes], Any],
+        channel: str = CACHE_INVALIDATION_CHANNEL
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.local = TTLCache(name, maxsize, ttl)
+        self.backend = backend
+        self.channel = channel
+        self._encode = encode
+        self._decode = decode
+        self._origin = uuid.uuid4().hex
+        if backend is not None:
+            backend.subscribe(channel, self._on_message)
+
+    def _key(self, key: Hashable) -> str:
+        return f"{CACHE_KEY_PREFIX}:{self.name}:{key}"
+
+    def _l2_error(self, operation: str, error: Exception) -> None:
+        """La L2 es una optimización: un fallo se registra y se trata como fallo de caché"""
+        metrics.increment(f"cache.{self.name}.l2_errors")
+        logger.warning("Shared cache %s failed for %s: %s", operation, self.name, error)
+
+    def get(self, key: Hashable) -> Any:
+        """Obtener un valor de la L1 o, si falta, de la L2 (None si no está)"""
+        value = self.local.get(key)
+        if value is not None or self.backend is None:
+            return value
+
+        try:
+            data = self.backend.get(self._key(key))
+        except Exception as e:
+            self._l2_error("get", e)
+            return None
+
+        if data is None:
+            metrics.increment(f"cache.{self.name}.l2_misses")
+            return None
+
+        metrics.increment(f"cache.{self.name}.l2_hits")
+        value = self._decode(data)
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Guardar un valor leído de DynamoDB en ambos niveles"""
+        self.local.set(key, value)
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(self._key(key), self._encode(value), self.ttl)
+        except Exception as e:
+            self._l2_error("set", e)
+
+    def update(self, key: Hashable, value: Any) -> None:
+        """Write-through después de una escritura: guardar y avisar a los demás workers"""
+        self.set(key, value)
+        self._broadcast(key)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Eliminar una entrada de ambos niveles en todos los workers"""
+        self.local.delete(key)
+        if self.backend is None:
+            return
+        try:
+            self.backend.delete(self._key(key))
+        except Exception as e:
+            self._l2_error("delete", e)
+        self._broadcast(key)
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Eliminar una entrada de ambos niveles solo en este worker
+
+        Para invalidaciones que cada worker recibe por su cuenta (el stream de
+        cambios de la tabla), donde difundirlas sería redundante.
+        """
+        self.local.delete(key)
+        if self.backend is None:
+            return
+        try:
+            self.backend.delete(self._key(key))
+        except Exception as e:
+            self._l2_error("delete", e)
+
+    async def get_async(self, key: Hashable) -> Any:
+        """``get`` sin bloquear el event loop: un acierto en L1 no sale del hilo actual"""
+        value = self.local.get(key)
+        if value is not None or self.backend is None:
+            return value
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: Hashable, value: Any) -> None:
+        """``set`` sin bloquear el event loop"""
+        await self._run(self.set, key, value)
+
+    async def update_async(self, key: Hashable, value: Any) -> None:
+        """``update`` sin bloquear el event loop"""
+        await self._run(self.update, key, value)
+
+    async def invalidate_async(self, key: Hashable) -> None:
+        """``invalidate`` sin bloquear el event loop"""
+        await self._run(self.invalidate, key)
+
+    async def _run(self, operation: Callable, *args) -> None:
+        """Ejecutar en un hilo solo si hay L2 (sin ella la operación es en memoria)"""
+        if self.backend is None:
+            operation(*args)
+        else:
+            await asyncio.to_thread(operation, *args)
+
+    def _broadcast(self, key: Hashable) -> None:
+        if self.backend is None:
+            return
+        message = json.dumps({"cache": self.name, "key": str(key), "origin": self._origin})
+        try:
+            self.backend.publish(self.channel, message.encode())
+        except Exception as e:
+            self._l2_error("publish", e)
+
+    def _on_message(self, data: bytes) -> None:
+        """Descartar la copia local cuando otro worker invalida o actualiza una entrada"""
+        message = json.loads(data)
+        if message.get("cache") != self.name or message.get("origin") == self._origin:
+            return
+        self.local.delete(message["key"])
+        metrics.increment(f"cache.{self.name}.remote_invalidations")
@@ -4,6 +4,18 @@ from decimal import Decimal
 # Configuración de DynamoDB
 DYNAMODB_ENDPOINT = os.getenv("DYNAMODB_ENDPOINT", "http://dynamodb:8000")
 AWS_REGION = os.getenv("AWS_REGION", "us-west-2")
+# Prefijo de los nombres físicos de las tablas (ambientes o workers de test en una misma cuenta)
+DYNAMODB_TABLE_PREFIX = os.getenv("DYNAMODB_TABLE_PREFIX", "")
+
+# Backend de almacenamiento: dynamodb, memory (embebido) o sqlite (embebido y persistente)
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "dynamodb").lower()
+DATABASE_SQLITE_PATH = os.getenv("DATABASE_SQLITE_PATH", "fondos.db")
+
+# Multi-tenant: tenants atendidos ("acme,globex"; vacío = un solo tenant), cabecera
+# que indica el tenant y hosts asociados a cada tenant ("fondos.acme.com=acme,...")
+TENANTS = os.getenv("TENANTS", "")
+TENANT_HEADER = os.getenv("TENANT_HEADER", "x-tenant-id").lower()
+TENANT_HOSTS = os.getenv("TENANT_HOSTS", "")
 
 # Configuración de ambiente
 ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
@@ -12,6 +24,100 @@ ENABLE_AUTO_DB_INIT = os.getenv("ENABLE_AUTO_DB_INIT", "true").lower() == "true"
 # Configuración de negocio
 INITIAL_AMOUNT = Decimal("500000")  # COP $500,000 - Monto inicial para nuevos usuarios
 
+# Configuración de escritura diferida (write-behind) de transacciones
+TRANSACTION_WRITE_BEHIND_ENABLED = os.getenv("TRANSACTION_WRITE_BEHIND_ENABLED", "false").lower() == "true"
+TRANSACTION_WRITE_BEHIND_TYPES = {
+    t.strip() for t in os.getenv("TRANSACTION_WRITE_BEHIND_TYPES", "unsubscribe").split(",") if t.strip()
+}
+TRANSACTION_BUFFER_PATH = os.getenv("TRANSACTION_BUFFER_PATH", "transaction_buffer.db")
+TRANSACTION_FLUSH_INTERVAL_SECONDS = float(os.getenv("TRANSACTION_FLUSH_INTERVAL_SECONDS", "1.0"))
+TRANSACTION_BATCH_MAX_RETRIES = int(os.getenv("TRANSACTION_BATCH_MAX_RETRIES", "5"))
+TRANSACTION_BATCH_MAX_FAILURES = int(os.getenv("TRANSACTION_BATCH_MAX_FAILURES", "10"))
+TRANSACTION_BUFFER_SYNCHRONOUS = os.getenv("TRANSACTION_BUFFER_SYNCHRONOUS", "FULL")
+
+# Pool de conexiones HTTP del cliente de DynamoDB
+DYNAMODB_MAX_POOL_CONNECTIONS = int(os.getenv("DYNAMODB_MAX_POOL_CONNECTIONS", "50"))
+DYNAMODB_CONNECT_TIMEOUT_SECONDS = float(os.getenv("DYNAMODB_CONNECT_TIMEOUT_SECONDS", "2"))
+DYNAMODB_READ_TIMEOUT_SECONDS = float(os.getenv("DYNAMODB_READ_TIMEOUT_SECONDS", "5"))
+DYNAMODB_TCP_KEEPALIVE = os.getenv("DYNAMODB_TCP_KEEPALIVE", "true").lower() == "true"
+
+# Reintentos y limitación de tasa contra DynamoDB
+DYNAMODB_RETRY_MODE = os.getenv("DYNAMODB_RETRY_MODE", "adaptive")
+DYNAMODB_MAX_ATTEMPTS = int(os.getenv("DYNAMODB_MAX_ATTEMPTS", "8"))
+DYNAMODB_READ_RATE = float(os.getenv("DYNAMODB_READ_RATE", "0"))
+DYNAMODB_WRITE_RATE = float(os.getenv("DYNAMODB_WRITE_RATE", "0"))
+DYNAMODB_THROTTLE_MAX_WAIT_SECONDS = float(os.getenv("DYNAMODB_THROTTLE_MAX_WAIT_SECONDS", "0.5"))
+DYNAMODB_THROTTLE_RETRY_AFTER_SECONDS = int(os.getenv("DYNAMODB_THROTTLE_RETRY_AFTER_SECONDS", "1"))
+
+# Scan de tablas completas: segmentos en paralelo y páginas en el buffer del iterador
+DYNAMODB_SCAN_SEGMENTS = int(os.getenv("DYNAMODB_SCAN_SEGMENTS", "1"))
+DYNAMODB_SCAN_BUFFER_PAGES = int(os.getenv("DYNAMODB_SCAN_BUFFER_PAGES", "8"))
+
+# Libro mayor de saldos: snapshot cada N eventos e intentos ante appends concurrentes
+LEDGER_SNAPSHOT_INTERVAL = int(os.getenv("LEDGER_SNAPSHOT_INTERVAL", "50"))
+LEDGER_APPEND_MAX_ATTEMPTS = int(os.getenv("LEDGER_APPEND_MAX_ATTEMPTS", "3"))
+
+# Configuración de caché del catálogo de fondos
+FUND_CATALOG_TTL_SECONDS = float(os.getenv("FUND_CATALOG_TTL_SECONDS", "30"))
+FUND_CACHE_MAX_AGE = int(os.getenv("FUND_CACHE_MAX_AGE", "60"))
+FUND_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv("FUND_CACHE_STALE_WHILE_REVALIDATE", "300"))
+
+# Configuración de caché de usuarios
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+
+# Configuración de la caché compartida (L2) entre workers: none, memory o redis
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "none")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "fondos")
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "fondos:cache-invalidation")
+
+# Invalidación de cachés con los streams de cambios de las tablas Funds y User
+CACHE_STREAM_INVALIDATION_ENABLED = os.getenv("CACHE_STREAM_INVALIDATION_ENABLED", "false").lower() == "true"
+STREAM_POLL_INTERVAL_SECONDS = float(os.getenv("STREAM_POLL_INTERVAL_SECONDS", "1.0"))
+STREAM_LOCAL_MAX_RECORDS = int(os.getenv("STREAM_LOCAL_MAX_RECORDS", "10000"))
+
+# Coalescencia de lecturas idénticas concurrentes a DynamoDB (single-flight)
+READ_COALESCING_ENABLED = os.getenv("READ_COALESCING_ENABLED", "true").lower() == "true"
+
+# Control de admisión (load shedding) para los endpoints de escritura
+ADMISSION_CONTROL_ENABLED = os.getenv("ADMISSION_CONTROL_ENABLED", "true").lower() == "true"
+ADMISSION_ROUTES = os.getenv(
+    "ADMISSION_ROUTES",
+    "POST /api/v1/subscribe,POST /api/v1/unsubscribe,POST /api/v1/settings/notifications"
+)
+ADMISSION_INITIAL_IN_FLIGHT = int(os.getenv("ADMISSION_INITIAL_IN_FLIGHT", "32"))
+ADMISSION_MIN_IN_FLIGHT = int(os.getenv("ADMISSION_MIN_IN_FLIGHT", "4"))
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "128"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "0.5"))
+ADMISSION_TARGET_LATENCY_MS = float(os.getenv("ADMISSION_TARGET_LATENCY_MS", "100"))
+ADMISSION_ADJUST_INTERVAL_SECONDS = float(os.getenv("ADMISSION_ADJUST_INTERVAL_SECONDS", "1.0"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+# Limitación de tasa por usuario y por IP en los endpoints de suscripción
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_WINDOW_SECONDS = float(os.getenv("RATE_LIMIT_WINDOW_SECONDS", "60"))
+RATE_LIMIT_USER_REQUESTS = int(os.getenv("RATE_LIMIT_USER_REQUESTS", "20"))
+RATE_LIMIT_IP_REQUESTS = int(os.getenv("RATE_LIMIT_IP_REQUESTS", "120"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# Configuración de logging: formato json o text, escritura en segundo plano y
+# muestreo de INFO por logger ("logger=tasa,..." con tasas entre 0 y 1)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_ENABLED = os.getenv("LOG_QUEUE_ENABLED", "true").lower() == "true"
+LOG_SAMPLE_RATES = os.getenv(
+    "LOG_SAMPLE_RATES",
+    "app.services.fund_service=0.1,app.services.portfolio_service=0.1,app.routes.funds=0.1"
+)
+
+# Configuración de compresión de respuestas
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
 def should_auto_initialize_db() -> bool:
     """
     Determinar si se debe auto-inicializar la base de datos
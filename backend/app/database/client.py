@@ -1,6 +1,20 @@
 import boto3
+from boto3.dynamodb.types import TypeSerializer
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from app.config import DYNAMODB_ENDPOINT, AWS_REGION
+from typing import List
+from app.config import (
+    DATABASE_BACKEND, DATABASE_SQLITE_PATH, DYNAMODB_ENDPOINT, AWS_REGION, DYNAMODB_RETRY_MODE, DYNAMODB_MAX_ATTEMPTS,
+    DYNAMODB_THROTTLE_RETRY_AFTER_SECONDS, DYNAMODB_MAX_POOL_CONNECTIONS,
+    DYNAMODB_CONNECT_TIMEOUT_SECONDS, DYNAMODB_READ_TIMEOUT_SECONDS, DYNAMODB_TCP_KEEPALIVE
+)
+from app.database.throttle import (
+    TableRateLimiter, count_throttle_retries, is_throttle_error, THROTTLE_CANCELLATION_CODES
+)
+from app.database.latency import dynamodb_latency
+from app.database.streams import DynamoDBStreamReader
+from app.tenancy import route_table
+from app.exceptions import DatabaseThrottledException
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,35 +23,58 @@ class DynamoDBClient:
     """Cliente para conectarse a DynamoDB Local"""
     
     def __init__(self):
+        self.session = None
         self.dynamodb = None
         self.dynamodb_resource = None
+        self._serializer = TypeSerializer()
+        self._rate_limiter = TableRateLimiter()
         self._initialize_client()
     
+    @staticmethod
+    def build_config(max_pool_connections: int = DYNAMODB_MAX_POOL_CONNECTIONS) -> Config:
+        """Configuración de botocore: pool de conexiones, timeouts, keep-alive y reintentos"""
+        return Config(
+            max_pool_connections=max_pool_connections,
+            connect_timeout=DYNAMODB_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=DYNAMODB_READ_TIMEOUT_SECONDS,
+            tcp_keepalive=DYNAMODB_TCP_KEEPALIVE,
+            # Reintentos con backoff exponencial y jitter ante throttling
+            retries={'mode': DYNAMODB_RETRY_MODE, 'max_attempts': DYNAMODB_MAX_ATTEMPTS}
+        )
+    
     def _initialize_client(self):
         """Inicializar cliente y resource de DynamoDB"""
         try:
-            # Cliente para operaciones administrativas
-            self.dynamodb = boto3.client(
-                'dynamodb',
-                endpoint_url=DYNAMODB_ENDPOINT,
+            # Una sola sesión compartida: credenciales, región y modelos de servicio
+            # se cargan una vez para el cliente y el resource
+            self.session = boto3.session.Session(
                 region_name=AWS_REGION,
                 aws_access_key_id='dummy',
                 aws_secret_access_key='dummy'
             )
+            config = self.build_config()
             
-            # Resource para operaciones de datos
-            self.dynamodb_resource = boto3.resource(
-                'dynamodb',
-                endpoint_url=DYNAMODB_ENDPOINT,
-                region_name=AWS_REGION,
-                aws_access_key_id='dummy',
-                aws_secret_access_key='dummy'
-            )
+            # Cliente para operaciones administrativas y de bajo nivel (formato de la API)
+            self.dynamodb = self.session.client('dynamodb', endpoint_url=DYNAMODB_ENDPOINT, config=config)
+            
+            # Resource para operaciones de datos (serializa tipos de Python)
+            self.dynamodb_resource = self.session.resource('dynamodb', endpoint_url=DYNAMODB_ENDPOINT, config=config)
             
-            logger.info(f"DynamoDB client initialized successfully. Endpoint: {DYNAMODB_ENDPOINT}")
+            for client in (self.dynamodb, self.dynamodb_resource.meta.client):
+                # Métricas de throttling en cada intento, incluidos los reintentados
+                client.meta.events.register('needs-retry.dynamodb', count_throttle_retries)
+                # Latencia de cada llamada (con reintentos) para el control de admisión
+                client.meta.events.register('before-call.dynamodb', dynamodb_latency.on_before_call)
+                client.meta.events.register('after-call.dynamodb', dynamodb_latency.on_after_call)
+                client.meta.events.register('after-call-error.dynamodb', dynamodb_latency.on_after_call)
+            
+            logger.info(
+                "DynamoDB client initialized successfully. Endpoint: %s, max pool connections: %s",
+                DYNAMODB_ENDPOINT, DYNAMODB_MAX_POOL_CONNECTIONS
+            )
             
         except Exception as e:
-            logger.error(f"Error initializing DynamoDB client: {str(e)}")
+            logger.error("Error initializing DynamoDB client: %s", e)
             raise
     
     def get_client(self):
@@ -48,22 +85,96 @@ class DynamoDBClient:
         """Obtener resource DynamoDB"""
         return self.dynamodb_resource
     
-    def get_table(self, table_name: str):
-        """Obtener referencia a una tabla específica"""
+    def get_table(self, name: str):
+        """
+        Obtener referencia a una tabla por su nombre lógico
+        
+        La tabla física lleva DYNAMODB_TABLE_PREFIX y el prefijo del tenant; con
+        varios tenants la referencia elige la tabla del tenant en cada operación.
+        Cada tabla física tiene su propia limitación de tasa.
+        """
         try:
-            return self.dynamodb_resource.Table(table_name)
+            return route_table(name, self._open_table)
         except Exception as e:
-            logger.error(f"Error getting table {table_name}: {str(e)}")
+            logger.error("Error getting table %s: %s", name, e)
             raise
     
+    def _open_table(self, physical_name: str):
+        return self._rate_limiter.wrap(self.dynamodb_resource.Table(physical_name))
+    
+    def transact_write_items(self, actions: List[dict]) -> dict:
+        """
+        Ejecutar varias escrituras de forma atómica (TransactWriteItems)
+        
+        Toma antes un token de escritura por acción del bucket de cada tabla
+        (de lectura para ``ConditionCheck``), igual que las operaciones de tabla.
+        Es una llamada bloqueante: desde código async se ejecuta con
+        ``asyncio.to_thread``.
+        
+        Args:
+            actions: Acciones en formato de la API ({"Put": {...}}, {"Update": {...}}, ...)
+                con valores Python en Item, Key y ExpressionAttributeValues
+        
+        Raises:
+            DatabaseThrottledException: Si se supera la tasa configurada o DynamoDB limita la transacción
+        """
+        self._rate_limiter.acquire_transaction(actions)
+        
+        transact_items = []
+        for action in actions:
+            (operation, params), = action.items()
+            params = dict(params)
+            for field in ('Item', 'Key', 'ExpressionAttributeValues'):
+                if field in params:
+                    params[field] = {
+                        name: self._serializer.serialize(value) for name, value in params[field].items()
+                    }
+            transact_items.append({operation: params})
+        
+        try:
+            return self.dynamodb.transact_write_items(TransactItems=transact_items)
+        except ClientError as e:
+            if is_throttle_error(e) or THROTTLE_CANCELLATION_CODES.intersection(cancellation_codes(e)):
+                table_names = sorted({params['TableName'] for item in transact_items for params in item.values()})
+                logger.warning("DynamoDB throttled transaction on %s", ', '.join(table_names))
+                raise DatabaseThrottledException(
+                    ', '.join(table_names), DYNAMODB_THROTTLE_RETRY_AFTER_SECONDS
+                ) from e
+            raise
+    
+    def open_stream(self, table_name: str) -> DynamoDBStreamReader:
+        """
+        Lector de los cambios de una tabla (nombre físico) desde este momento
+        
+        Usa un cliente propio de DynamoDB Streams con la misma sesión, endpoint
+        y configuración que el cliente de DynamoDB.
+        """
+        streams = self.session.client('dynamodbstreams', endpoint_url=DYNAMODB_ENDPOINT, config=self.build_config())
+        return DynamoDBStreamReader(streams, self.dynamodb, table_name)
+    
     def health_check(self) -> bool:
         """Verificar conectividad con DynamoDB"""
         try:
             self.dynamodb.list_tables()
             return True
         except ClientError as e:
-            logger.error(f"DynamoDB health check failed: {str(e)}")
+            logger.error("DynamoDB health check failed: %s", e)
             return False
 
+def cancellation_codes(error: ClientError) -> List[str]:
+    """Códigos de cancelación por acción de una TransactionCanceledException"""
+    if error.response.get('Error', {}).get('Code') != 'TransactionCanceledException':
+        return []
+    return [reason.get('Code', 'None') for reason in error.response.get('CancellationReasons', [])]
+
+def create_client(backend: str = DATABASE_BACKEND):
+    """Crear el cliente del backend configurado (los embebidos tienen la misma interfaz)"""
+    if backend == "dynamodb":
+        return DynamoDBClient()
+    if backend in ("memory", "sqlite"):
+        from app.database.embedded import EmbeddedClient
+        return EmbeddedClient(DATABASE_SQLITE_PATH if backend == "sqlite" else None)
+    raise ValueError(f"DATABASE_BACKEND desconocido: {backend}")
+
 # Instancia global del cliente
-db_client = DynamoDBClient() 
\ No newline at end of file
+db_client = create_client() 
\ No newline at end of file
@@ -0,0 +1,761 @@
+"""
+Backend de almacenamiento embebido compatible con las tablas de boto3
+
+Implementa en memoria la parte de la API de DynamoDB que usa la aplicación,
+con la misma semántica: claves primarias e índices secundarios globales,
+escrituras condicionales, expresiones de actualización, query ordenado por
+clave de ordenación con paginación, scan segmentado, BatchWriteItem y
+TransactWriteItems atómico (con CancellationReasons). Los errores se lanzan
+como ``ClientError`` con los mismos códigos que DynamoDB.
+
+Con DATABASE_BACKEND=sqlite cada escritura se persiste además en SQLite (modo
+WAL) y los datos se cargan en memoria al iniciar, lo que permite un despliegue
+de un solo nodo. Los datos viven en el proceso: con varios workers o procesos
+cada uno tendría su propia copia, así que este backend es para un solo proceso.
+
+Las tablas creadas con ``StreamSpecification`` publican sus cambios en un
+``LocalStream`` (solo claves, como ``KEYS_ONLY``), que lee el consumidor de
+``app.database.streams`` igual que un stream de DynamoDB.
+
+Diferencias conocidas con DynamoDB: no hay límite de 1 MB por página (solo
+``Limit``), las lecturas siempre son consistentes y no hay índices locales.
+"""
+import bisect
+import json
+import logging
+import sqlite3
+import threading
+import zlib
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+from app.database.expressions import (
+    Evaluator, ExpressionError, build_condition, parse_condition, parse_projection, parse_update
+)
+from app.database.streams import INSERT, MODIFY, REMOVE, LocalStream, LocalStreamReader
+from app.tenancy import route_table
+
+logger = logging.getLogger(__name__)
+
+# Máximo de acciones de TransactWriteItems y de solicitudes de BatchWriteItem
+MAX_TRANSACTION_ACTIONS = 100
+MAX_BATCH_REQUESTS = 25
+
+
+def client_error(code: str, message: str, operation: str, **extra) -> ClientError:
+    """Error con el mismo formato que devuelve botocore"""
+    return ClientError({'Error': {'Code': code, 'Message': message}, **extra}, operation)
+
+
+def normalize(value):
+    """
+    Convertir un valor de Python al tipo que devuelve el resource de boto3
+
+    Los enteros pasan a Decimal y, como en boto3, los float se rechazan.
+    """
+    if isinstance(value, bool) or value is None or isinstance(value, (str, Decimal)):
+        return value
+    if isinstance(value, int):
+        return Decimal(value)
+    if isinstance(value, float):
+        raise TypeError("Float types are not supported. Use Decimal types instead.")
+    if isinstance(value, dict):
+        return {key: normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return {normalize(item) for item in value}
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    raise TypeError(f"Unsupported type {type(value)} for value {value!r}")
+
+
+def clone(value):
+    """Copia de un item para que el llamador no comparta estado con la tabla"""
+    if isinstance(value, dict):
+        return {key: clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [clone(item) for item in value]
+    if isinstance(value, set):
+        return set(value)
+    return value
+
+
+def _validate_item(item: dict, operation: str) -> None:
+    for name, value in item.items():
+        if isinstance(value, set) and not value:
+            raise client_error('ValidationException', f"An string set  may not be empty ({name})", operation)
+
+
+class _Index:
+    """Particiones de una clave (primaria o de un índice) ordenadas por la clave de ordenación"""
+
+    def __init__(self, hash_key: str, range_key: Optional[str]):
+        self.hash_key = hash_key
+        self.range_key = range_key
+        self.partitions: Dict[Any, List[tuple]] = {}
+
+    def entry(self, item: dict, key: tuple) -> Optional[tuple]:
+        if self.hash_key not in item or (self.range_key and self.range_key not in item):
+            return None  # Índice disperso: el item no tiene los atributos del índice
+        return item[self.hash_key], (item[self.range_key] if self.range_key else 0, key)
+
+    def add(self, item: dict, key: tuple) -> None:
+        entry = self.entry(item, key)
+        if entry is not None:
+            bisect.insort(self.partitions.setdefault(entry[0], []), entry[1])
+
+    def remove(self, item: dict, key: tuple) -> None:
+        entry = self.entry(item, key)
+        if entry is None:
+            return
+        partition = self.partitions[entry[0]]
+        del partition[bisect.bisect_left(partition, entry[1])]
+        if not partition:
+            del self.partitions[entry[0]]
+
+
+class TableData:
+    """Contenido y esquema de una tabla"""
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.name = config['TableName']
+        schema = {element['KeyType']: element['AttributeName'] for element in config['KeySchema']}
+        self.key_names = (schema['HASH'],) + ((schema['RANGE'],) if 'RANGE' in schema else ())
+        self.items: Dict[tuple, dict] = {}
+        # Claves en orden para reanudar un scan aunque el item del cursor ya no exista
+        self.sorted_keys: List[tuple] = []
+        self.primary = _Index(*self._pair(config['KeySchema']))
+        self.indexes = {
+            index['IndexName']: _Index(*self._pair(index['KeySchema']))
+            for index in config.get('GlobalSecondaryIndexes', [])
+        }
+        self.stream: Optional[LocalStream] = None
+        if 'StreamSpecification' in config:
+            self.enable_stream(config['StreamSpecification'])
+
+    def enable_stream(self, specification: dict) -> None:
+        self.config = {**self.config, 'StreamSpecification': specification}
+        enabled = specification.get('StreamEnabled', False)
+        if enabled and self.stream is None:
+            self.stream = LocalStream()
+        elif not enabled:
+            self.stream = None
+
+    @staticmethod
+    def _pair(key_schema: List[dict]) -> Tuple[str, Optional[str]]:
+        schema = {element['KeyType']: element['AttributeName'] for element in key_schema}
+        return schema['HASH'], schema.get('RANGE')
+
+    def key_of(self, item: dict, operation: str) -> tuple:
+        """Clave primaria de un item o de un Key, validando que esté completa"""
+        try:
+            key = tuple(item[name] for name in self.key_names)
+        except KeyError:
+            raise client_error(
+                'ValidationException', "The provided key element does not match the schema", operation
+            )
+        if any(part == "" or not isinstance(part, (str, Decimal, bytes)) for part in key):
+            raise client_error('ValidationException', "Invalid key attribute value", operation)
+        return key
+
+    def key_item(self, item: dict, index_name: Optional[str] = None) -> dict:
+        """Atributos de clave de un item (para LastEvaluatedKey)"""
+        names = list(self.key_names)
+        if index_name is not None:
+            index = self.indexes[index_name]
+            names += [name for name in (index.hash_key, index.range_key) if name and name not in names]
+        return {name: item[name] for name in names}
+
+    def store(self, key: tuple, item: Optional[dict]) -> None:
+        """Reemplazar (o eliminar con ``None``) el item de ``key`` manteniendo los índices"""
+        previous = self.items.pop(key, None)
+        if previous is not None:
+            self.primary.remove(previous, key)
+            for index in self.indexes.values():
+                index.remove(previous, key)
+            if item is None:
+                del self.sorted_keys[bisect.bisect_left(self.sorted_keys, key)]
+        if item is not None:
+            if previous is None:
+                bisect.insort(self.sorted_keys, key)
+            self.items[key] = item
+            self.primary.add(item, key)
+            for index in self.indexes.values():
+                index.add(item, key)
+
+    def describe(self) -> dict:
+        return {**self.config, 'TableStatus': 'ACTIVE', 'ItemCount': len(self.items)}
+
+
+class SQLitePersistence:
+    """Copia durable de las tablas en SQLite: una fila por item en formato JSON de DynamoDB"""
+
+    def __init__(self, path: str):
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS tables (name TEXT PRIMARY KEY, config TEXT NOT NULL)")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS items ("
+            "table_name TEXT NOT NULL, item_key TEXT NOT NULL, item TEXT NOT NULL, "
+            "PRIMARY KEY (table_name, item_key))"
+        )
+
+    def _encode(self, value: dict) -> str:
+        return json.dumps({name: self._serializer.serialize(item) for name, item in value.items()}, sort_keys=True)
+
+    def _decode(self, text: str) -> dict:
+        return {name: self._deserializer.deserialize(item) for name, item in json.loads(text).items()}
+
+    def load(self) -> Iterator[Tuple[dict, Iterator[dict]]]:
+        for name, config in self._connection.execute("SELECT name, config FROM tables").fetchall():
+            rows = self._connection.execute("SELECT item FROM items WHERE table_name = ?", (name,))
+            yield json.loads(config), (self._decode(item) for item, in rows)
+
+    def save_table(self, config: dict) -> None:
+        self._connection.execute(
+            "INSERT OR REPLACE INTO tables (name, config) VALUES (?, ?)", (config['TableName'], json.dumps(config))
+        )
+
+    def drop_table(self, name: str) -> None:
+        with self._connection:
+            self._connection.execute("DELETE FROM items WHERE table_name = ?", (name,))
+            self._connection.execute("DELETE FROM tables WHERE name = ?", (name,))
+
+    def write(self, changes: List[Tuple[TableData, dict, Optional[dict]]]) -> None:
+        """Persistir en una sola transacción de SQLite (key_item, item o None para borrar)"""
+        self._connection.execute("BEGIN")
+        try:
+            for table, key_item, item in changes:
+                if item is None:
+                    self._connection.execute(
+                        "DELETE FROM items WHERE table_name = ? AND item_key = ?", (table.name, self._encode(key_item))
+                    )
+                else:
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO items (table_name, item_key, item) VALUES (?, ?, ?)",
+                        (table.name, self._encode(key_item), self._encode(item))
+                    )
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class EmbeddedDatabase:
+    """
+    Conjunto de tablas en memoria con un único lock
+
+    Cada operación (y cada transacción completa) se ejecuta bajo el lock, así
+    que las escrituras condicionales y las transacciones son atómicas respecto
+    a las demás operaciones del proceso.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self._lock = threading.RLock()
+        self._tables: Dict[str, TableData] = {}
+        self._persistence = SQLitePersistence(path) if path else None
+        if self._persistence is not None:
+            for config, items in self._persistence.load():
+                table = self._tables[config['TableName']] = TableData(config)
+                for item in items:
+                    table.store(table.key_of(item, 'Load'), item)
+            logger.info("Loaded %s tables from %s", len(self._tables), path)
+
+    # Administración
+
+    def table_data(self, name: str, operation: str) -> TableData:
+        table = self._tables.get(name)
+        if table is None:
+            raise client_error('ResourceNotFoundException', f"Requested resource not found: Table: {name} not found", operation)
+        return table
+
+    def list_tables(self) -> List[str]:
+        with self._lock:
+            return sorted(self._tables)
+
+    def create_table(self, config: dict) -> dict:
+        with self._lock:
+            if config['TableName'] in self._tables:
+                raise client_error('ResourceInUseException', f"Table already exists: {config['TableName']}", 'CreateTable')
+            table = self._tables[config['TableName']] = TableData(config)
+            if self._persistence is not None:
+                self._persistence.save_table(config)
+            return table.describe()
+
+    def update_table(self, name: str, stream_specification: dict) -> dict:
+        """Habilitar o deshabilitar el stream de una tabla (lo único que admite UpdateTable aquí)"""
+        with self._lock:
+            table = self.table_data(name, 'UpdateTable')
+            table.enable_stream(stream_specification)
+            if self._persistence is not None:
+                self._persistence.save_table(table.config)
+            return table.describe()
+
+    def stream(self, name: str) -> LocalStream:
+        with self._lock:
+            table = self.table_data(name, 'DescribeStream')
+            if table.stream is None:
+                raise Exception(f"La tabla {name} no tiene un stream habilitado")
+            return table.stream
+
+    def delete_table(self, name: str) -> dict:
+        with self._lock:
+            table = self.table_data(name, 'DeleteTable')
+            del self._tables[name]
+            if self._persistence is not None:
+                self._persistence.drop_table(name)
+            return table.describe()
+
+    def close(self) -> None:
+        if self._persistence is not None:
+            self._persistence.close()
+
+    # Escrituras
+
+    def _commit(self, changes: List[Tuple[TableData, tuple, Optional[dict]]]) -> None:
+        if self._persistence is not None:
+            self._persistence.write([
+                (table, dict(zip(table.key_names, key)), item)
+                for table, key, item in changes
+            ])
+        for table, key, item in changes:
+            previous = table.items.get(key)
+            table.store(key, item)
+            if table.stream is not None and item != previous:
+                event_name = REMOVE if item is None else INSERT if previous is None else MODIFY
+                table.stream.publish(event_name, table.key_item(item if item is not None else previous))
+
+    @staticmethod
+    def _check(params: dict, current: Optional[dict]) -> bool:
+        condition = params.get('ConditionExpression')
+        if condition is None:
+            return True
+        text, names, values = build_condition(
+            condition, params.get('ExpressionAttributeNames'), params.get('ExpressionAttributeValues')
+        )
+        return Evaluator(names, normalize(values)).matches(current, parse_condition(text))
+
+    def _plan(self, operation: str, params: dict) -> Tuple[TableData, tuple, Optional[dict], Optional[dict], bool]:
+        """
+        Resultado de una escritura sin aplicarla
+
+        Devuelve (tabla, clave, item anterior, item nuevo, condición cumplida).
+        """
+        table = self.table_data(params['TableName'], operation)
+        try:
+            if operation in ('PutItem', 'Put'):
+                item = normalize(params['Item'])
+                _validate_item(item, operation)
+                key = table.key_of(item, operation)
+                current = table.items.get(key)
+                return table, key, current, item, self._check(params, current)
+
+            key = table.key_of(normalize(params['Key']), operation)
+            current = table.items.get(key)
+            if operation in ('DeleteItem', 'Delete'):
+                return table, key, current, None, self._check(params, current)
+            if operation == 'ConditionCheck':
+                return table, key, current, current, self._check(params, current)
+
+            passed = self._check(params, current)
+            base = current if current is not None else table.key_item(dict(zip(table.key_names, key)))
+            evaluator = Evaluator(
+                params.get('ExpressionAttributeNames'), normalize(params.get('ExpressionAttributeValues'))
+            )
+            updated = evaluator.apply_update(base, parse_update(params['UpdateExpression'])) if passed else current
+            if updated is not None:
+                if table.key_of(updated, operation) != key:
+                    raise ExpressionError("No se pueden modificar los atributos de la clave")
+                _validate_item(updated, operation)
+            return table, key, current, updated, passed
+        except ExpressionError as e:
+            raise client_error('ValidationException', str(e), operation)
+
+    def write(self, operation: str, params: dict) -> dict:
+        """PutItem, UpdateItem o DeleteItem con su ConditionExpression y ReturnValues"""
+        with self._lock:
+            table, key, current, item, passed = self._plan(operation, params)
+            if not passed:
+                raise client_error('ConditionalCheckFailedException', "The conditional request failed", operation)
+            self._commit([(table, key, item)])
+
+        response: Dict[str, Any] = {}
+        return_values = params.get('ReturnValues', 'NONE')
+        if return_values == 'ALL_OLD' and current is not None:
+            response['Attributes'] = clone(current)
+        elif return_values == 'ALL_NEW' and item is not None:
+            response['Attributes'] = clone(item)
+        elif return_values not in ('NONE', 'ALL_OLD', 'ALL_NEW'):
+            raise client_error('ValidationException', f"ReturnValues no soportado: {return_values}", operation)
+        return response
+
+    def transact_write(self, actions: List[dict]) -> dict:
+        """Aplicar todas las acciones o ninguna (TransactWriteItems)"""
+        if not actions or len(actions) > MAX_TRANSACTION_ACTIONS:
+            raise client_error(
+                'ValidationException', f"Transactions must have between 1 and {MAX_TRANSACTION_ACTIONS} actions",
+                'TransactWriteItems'
+            )
+        with self._lock:
+            plans, reasons, targets = [], [], set()
+            for action in actions:
+                (operation, params), = action.items()
+                plan = self._plan(operation, params)
+                target = (plan[0].name, plan[1])
+                if target in targets:
+                    raise client_error(
+                        'ValidationException',
+                        "Transaction request cannot include multiple operations on one item", 'TransactWriteItems'
+                    )
+                targets.add(target)
+                plans.append((operation, plan))
+                reasons.append(
+                    {'Code': 'None'} if plan[4] else
+                    {'Code': 'ConditionalCheckFailed', 'Message': "The conditional request failed"}
+                )
+
+            if any(reason['Code'] != 'None' for reason in reasons):
+                codes = ", ".join(reason['Code'] for reason in reasons)
+                raise client_error(
+                    'TransactionCanceledException',
+                    f"Transaction cancelled, please refer cancellation reasons for specific reasons [{codes}]",
+                    'TransactWriteItems',
+                    CancellationReasons=reasons
+                )
+
+            self._commit([
+                (table, key, item) for operation, (table, key, _, item, _) in plans if operation != 'ConditionCheck'
+            ])
+        return {}
+
+    def batch_write(self, request_items: Dict[str, List[dict]]) -> dict:
+        """Escrituras sin condición de BatchWriteItem, cada una aplicada de inmediato"""
+        if sum(len(requests) for requests in request_items.values()) > MAX_BATCH_REQUESTS:
+            raise client_error(
+                'ValidationException', f"Too many items requested for the BatchWriteItem call", 'BatchWriteItem'
+            )
+        with self._lock:
+            changes = []
+            for table_name, requests in request_items.items():
+                for request in requests:
+                    if 'PutRequest' in request:
+                        plan = self._plan('PutItem', {'TableName': table_name, 'Item': request['PutRequest']['Item']})
+                    else:
+                        plan = self._plan('DeleteItem', {'TableName': table_name, 'Key': request['DeleteRequest']['Key']})
+                    changes.append((plan[0], plan[1], plan[3]))
+            self._commit(changes)
+        return {'UnprocessedItems': {}}
+
+    # Lecturas
+
+    def get_item(self, params: dict) -> dict:
+        with self._lock:
+            table = self.table_data(params['TableName'], 'GetItem')
+            item = table.items.get(table.key_of(normalize(params['Key']), 'GetItem'))
+            if item is None:
+                return {}
+            return {'Item': self._project(item, params, 'GetItem')}
+
+    def _project(self, item: dict, params: dict, operation: str) -> dict:
+        projection = params.get('ProjectionExpression')
+        if projection is None:
+            return clone(item)
+        try:
+            return clone(Evaluator(params.get('ExpressionAttributeNames')).project(item, parse_projection(projection)))
+        except ExpressionError as e:
+            raise client_error('ValidationException', str(e), operation)
+
+    def _page(
+        self, table: TableData, entries, params: dict, operation: str, index_name: Optional[str], key_filter=None
+    ) -> dict:
+        """Armar la respuesta de Query/Scan a partir de los items candidatos en orden"""
+        limit = params.get('Limit')
+        select = params.get('Select', 'ALL_ATTRIBUTES')
+        filter_node, filter_evaluator = None, None
+        if params.get('FilterExpression') is not None:
+            text, names, values = build_condition(
+                params['FilterExpression'], params.get('ExpressionAttributeNames'), params.get('ExpressionAttributeValues')
+            )
+            filter_node, filter_evaluator = parse_condition(text), Evaluator(names, normalize(values))
+
+        items, scanned, last = [], 0, None
+        for item in entries:
+            if key_filter is not None and not key_filter(item):
+                continue
+            scanned += 1
+            last = item
+            if filter_node is None or filter_evaluator.matches(item, filter_node):
+                if select != 'COUNT':
+                    items.append(self._project(item, params, operation))
+                else:
+                    items.append(None)
+            if limit is not None and scanned >= limit:
+                break
+        else:
+            last = None
+
+        response: Dict[str, Any] = {'Count': len(items), 'ScannedCount': scanned}
+        if select != 'COUNT':
+            response['Items'] = items
+        if last is not None:
+            response['LastEvaluatedKey'] = table.key_item(last, index_name)
+        return response
+
+    def query(self, params: dict) -> dict:
+        with self._lock:
+            table = self.table_data(params['TableName'], 'Query')
+            index_name = params.get('IndexName')
+            if index_name is not None and index_name not in table.indexes:
+                raise client_error('ValidationException', f"The table does not have the specified index: {index_name}", 'Query')
+            index = table.indexes[index_name] if index_name else table.primary
+
+            try:
+                text, names, values = build_condition(
+                    params['KeyConditionExpression'], params.get('ExpressionAttributeNames'),
+                    params.get('ExpressionAttributeValues'), is_key_condition=True
+                )
+                node = parse_condition(text)
+                evaluator = Evaluator(names, normalize(values))
+                partition_value = self._partition_value(node, evaluator, index.hash_key)
+            except ExpressionError as e:
+                raise client_error('ValidationException', str(e), 'Query')
+
+            partition = index.partitions.get(partition_value, [])
+            forward = params.get('ScanIndexForward', True)
+            start = params.get('ExclusiveStartKey')
+            if start is not None:
+                start = normalize(start)
+                position = (start[index.range_key] if index.range_key else 0, table.key_of(start, 'Query'))
+                partition = (
+                    partition[bisect.bisect_right(partition, position):] if forward
+                    else partition[:bisect.bisect_left(partition, position)]
+                )
+            ordered = partition if forward else reversed(partition)
+            entries = (table.items[key] for _, key in ordered)
+            return self._page(table, entries, params, 'Query', index_name, lambda item: evaluator.matches(item, node))
+
+    @staticmethod
+    def _partition_value(node: tuple, evaluator: Evaluator, hash_key: str):
+        """Valor de la clave de partición en la condición (``hash = :v`` o ``hash = :v AND ...``)"""
+        conditions = [node]
+        while conditions:
+            current = conditions.pop()
+            if current[0] == "and":
+                conditions.extend(current[1:])
+            elif current[0] == "compare" and current[1] == "=" and current[2][0] == "path":
+                if evaluator.resolve_path(current[2]) == (hash_key,):
+                    return evaluator.operand({}, current[3])
+        raise ExpressionError(f"La condición de clave debe incluir {hash_key} = :valor")
+
+    def scan(self, params: dict) -> dict:
+        with self._lock:
+            table = self.table_data(params['TableName'], 'Scan')
+            index_name = params.get('IndexName')
+            if index_name is not None and index_name not in table.indexes:
+                raise client_error('ValidationException', f"The table does not have the specified index: {index_name}", 'Scan')
+            # Recorrido en orden de clave: se reanuda en la primera clave mayor que
+            # el cursor, exista o no todavía el item del cursor
+            keys = table.sorted_keys
+            position = 0
+            start = params.get('ExclusiveStartKey')
+            if start is not None:
+                position = bisect.bisect_right(keys, table.key_of(normalize(start), 'Scan'))
+            selected = (keys[offset] for offset in range(position, len(keys)))
+            segment, total = params.get('Segment'), params.get('TotalSegments')
+            if total is not None:
+                # Hash estable entre procesos (hash() de str cambia en cada proceso)
+                selected = (key for key in selected if zlib.crc32(repr(key[0]).encode()) % total == segment)
+            entries = (table.items[key] for key in selected)
+            if index_name is not None:
+                # Índice disperso: solo los items con los atributos de clave del índice
+                index = table.indexes[index_name]
+                entries = (item for item in entries if index.entry(item, ()) is not None)
+            return self._page(table, entries, params, 'Scan', index_name)
+
+
+class EmbeddedTable:
+    """
+    Referencia a una tabla con la interfaz de ``boto3`` ``Table``
+
+    Como en boto3, la referencia no verifica que la tabla exista hasta la
+    primera operación.
+    """
+
+    def __init__(self, database: EmbeddedDatabase, name: str):
+        self.database = database
+        self.name = name
+
+    def get_item(self, **params) -> dict:
+        return self.database.get_item({**params, 'TableName': self.name})
+
+    def put_item(self, **params) -> dict:
+        return self.database.write('PutItem', {**params, 'TableName': self.name})
+
+    def update_item(self, **params) -> dict:
+        return self.database.write('UpdateItem', {**params, 'TableName': self.name})
+
+    def delete_item(self, **params) -> dict:
+        return self.database.write('DeleteItem', {**params, 'TableName': self.name})
+
+    def query(self, **params) -> dict:
+        return self.database.query({**params, 'TableName': self.name})
+
+    def scan(self, **params) -> dict:
+        return self.database.scan({**params, 'TableName': self.name})
+
+    def batch_writer(self, overwrite_by_pkeys: Optional[List[str]] = None) -> "EmbeddedBatchWriter":
+        return EmbeddedBatchWriter(self, overwrite_by_pkeys)
+
+
+class EmbeddedBatchWriter:
+    """Equivalente de ``batch_writer``: agrupa de a 25 y descarta claves repetidas del grupo"""
+
+    def __init__(self, table: EmbeddedTable, overwrite_by_pkeys: Optional[List[str]] = None):
+        self.table = table
+        self.overwrite_by_pkeys = overwrite_by_pkeys
+        self._requests: List[dict] = []
+
+    def put_item(self, Item: dict) -> None:
+        self._add({'PutRequest': {'Item': Item}})
+
+    def delete_item(self, Key: dict) -> None:
+        self._add({'DeleteRequest': {'Key': Key}})
+
+    def _add(self, request: dict) -> None:
+        if self.overwrite_by_pkeys:
+            values = next(iter(request.values()))
+            key = [(values.get('Item') or values.get('Key'))[name] for name in self.overwrite_by_pkeys]
+            self._requests = [
+                pending for pending in self._requests
+                if [(next(iter(pending.values())).get('Item') or next(iter(pending.values())).get('Key'))[name]
+                    for name in self.overwrite_by_pkeys] != key
+            ]
+        self._requests.append(request)
+        if len(self._requests) >= MAX_BATCH_REQUESTS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._requests:
+            self.table.database.batch_write({self.table.name: self._requests})
+            self._requests = []
+
+    def __enter__(self) -> "EmbeddedBatchWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._flush()
+
+
+class _Waiter:
+    def wait(self, **kwargs) -> None:
+        """Las tablas embebidas están activas en cuanto se crean"""
+
+
+class EmbeddedLowLevelClient:
+    """
+    Subconjunto del cliente de bajo nivel (formato de la API, valores tipados)
+
+    Cubre lo que usan la inicialización de tablas, el buffer de escritura
+    diferida y las verificaciones de salud.
+    """
+
+    def __init__(self, database: EmbeddedDatabase):
+        self.database = database
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
+
+    def _loads(self, item: dict) -> dict:
+        return {name: self._deserializer.deserialize(value) for name, value in item.items()}
+
+    def list_tables(self, **kwargs) -> dict:
+        return {'TableNames': self.database.list_tables()}
+
+    def create_table(self, **config) -> dict:
+        return {'TableDescription': self.database.create_table(config)}
+
+    def delete_table(self, TableName: str) -> dict:
+        return {'TableDescription': self.database.delete_table(TableName)}
+
+    def update_table(self, TableName: str, StreamSpecification: dict) -> dict:
+        return {'TableDescription': self.database.update_table(TableName, StreamSpecification)}
+
+    def describe_table(self, TableName: str) -> dict:
+        with self.database._lock:
+            return {'Table': self.database.table_data(TableName, 'DescribeTable').describe()}
+
+    def get_waiter(self, name: str) -> _Waiter:
+        return _Waiter()
+
+    def batch_write_item(self, RequestItems: Dict[str, List[dict]]) -> dict:
+        return self.database.batch_write({
+            table_name: [
+                {'PutRequest': {'Item': self._loads(request['PutRequest']['Item'])}} if 'PutRequest' in request
+                else {'DeleteRequest': {'Key': self._loads(request['DeleteRequest']['Key'])}}
+                for request in requests
+            ]
+            for table_name, requests in RequestItems.items()
+        })
+
+    def transact_write_items(self, TransactItems: List[dict]) -> dict:
+        actions = []
+        for action in TransactItems:
+            (operation, params), = action.items()
+            params = dict(params)
+            for field in ('Item', 'Key', 'ExpressionAttributeValues'):
+                if field in params:
+                    params[field] = self._loads(params[field])
+            actions.append({operation: params})
+        return self.database.transact_write(actions)
+
+
+class EmbeddedResource:
+    """Subconjunto del resource de boto3: referencias a tablas"""
+
+    def __init__(self, database: EmbeddedDatabase):
+        self.database = database
+
+    def Table(self, name: str) -> EmbeddedTable:
+        return EmbeddedTable(self.database, name)
+
+
+class EmbeddedClient:
+    """Cliente con la misma interfaz que ``DynamoDBClient`` sobre la base embebida"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.database = EmbeddedDatabase(path)
+        self.session = None
+        self.dynamodb = EmbeddedLowLevelClient(self.database)
+        self.dynamodb_resource = EmbeddedResource(self.database)
+        logger.info("Embedded database initialized (%s)", f"SQLite: {path}" if path else "in memory")
+
+    def get_client(self):
+        return self.dynamodb
+
+    def get_resource(self):
+        return self.dynamodb_resource
+
+    def get_table(self, name: str) -> EmbeddedTable:
+        """Referencia a una tabla por su nombre lógico (con los prefijos de tabla y tenant, como DynamoDBClient)"""
+        return route_table(name, self.dynamodb_resource.Table)
+
+    def transact_write_items(self, actions: List[dict]) -> dict:
+        """Ejecutar varias escrituras de forma atómica, con valores Python como en DynamoDBClient"""
+        return self.database.transact_write(actions)
+
+    def open_stream(self, table_name: str) -> LocalStreamReader:
+        """Lector de los cambios de una tabla (nombre físico) desde este momento"""
+        return self.database.stream(table_name).reader()
+
+    def health_check(self) -> bool:
+        return True
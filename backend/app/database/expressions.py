@@ -0,0 +1,458 @@
+"""
+Intérprete de expresiones de DynamoDB para el backend embebido
+
+Soporta las expresiones que usan los servicios, con la semántica de DynamoDB:
+
+- condiciones (ConditionExpression, KeyConditionExpression, FilterExpression):
+  comparaciones ``= <> < <= > >=``, ``BETWEEN``, ``IN``, ``AND``/``OR``/``NOT``,
+  paréntesis y las funciones ``attribute_exists``, ``attribute_not_exists``,
+  ``attribute_type``, ``begins_with``, ``contains`` y ``size``
+- actualizaciones (UpdateExpression): ``SET`` (con ``+``/``-``,
+  ``if_not_exists`` y ``list_append``), ``REMOVE``, ``ADD`` y ``DELETE``
+- proyecciones (ProjectionExpression)
+
+Los atributos son de primer nivel o de mapas anidados (``a.b``); no se
+soportan índices de listas. Una expresión se analiza una sola vez (caché por
+texto) y los marcadores ``#nombre`` y ``:valor`` se resuelven al evaluarla.
+Las condiciones de boto3 (``Key('id').eq(...)``) se convierten a texto con el
+mismo constructor que usa boto3.
+"""
+import re
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.conditions import ConditionBase, ConditionExpressionBuilder
+
+_TOKEN = re.compile(r"\s*(?:(<>|<=|>=|[=<>(),+\-.])|([#:]?[A-Za-z0-9_]+))")
+_KEYWORDS = {"AND", "OR", "NOT", "BETWEEN", "IN", "SET", "REMOVE", "ADD", "DELETE"}
+_MISSING = object()
+
+
+class ExpressionError(ValueError):
+    """Expresión inválida (DynamoDB responde ValidationException)"""
+
+
+def _tokenize(text: str) -> List[str]:
+    tokens, position = [], 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise ExpressionError(f"Símbolo inválido en la expresión: {text[position:]!r}")
+        tokens.append(match.group(1) or match.group(2))
+        position = match.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    def peek(self, offset: int = 0) -> Optional[str]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def keyword(self, offset: int = 0) -> Optional[str]:
+        token = self.peek(offset)
+        return token.upper() if token is not None and token.upper() in _KEYWORDS else None
+
+    def take(self, expected: Optional[str] = None) -> str:
+        token = self.peek()
+        if token is None or (expected is not None and token.upper() != expected):
+            raise ExpressionError(f"Se esperaba {expected or 'un símbolo'} y se encontró {token!r}")
+        self.position += 1
+        return token
+
+    def done(self) -> None:
+        if self.peek() is not None:
+            raise ExpressionError(f"Símbolo inesperado: {self.peek()!r}")
+
+    # Operandos
+
+    def path(self) -> tuple:
+        parts = [self.name()]
+        while self.peek() == ".":
+            self.take()
+            parts.append(self.name())
+        return ("path", tuple(parts))
+
+    def name(self) -> str:
+        token = self.take()
+        if token.startswith(":") or not re.match(r"#?[A-Za-z_]", token) or token.upper() in _KEYWORDS:
+            raise ExpressionError(f"Nombre de atributo inválido: {token!r}")
+        return token
+
+    def operand(self) -> tuple:
+        token = self.peek()
+        if token is None:
+            raise ExpressionError("Expresión incompleta")
+        if token.startswith(":"):
+            self.take()
+            return ("value", token)
+        if token.lower() == "size" and self.peek(1) == "(":
+            self.take()
+            self.take("(")
+            path = self.path()
+            self.take(")")
+            return ("size", path)
+        return self.path()
+
+    # Condiciones
+
+    def condition(self) -> tuple:
+        node = self.conjunction()
+        while self.keyword() == "OR":
+            self.take()
+            node = ("or", node, self.conjunction())
+        return node
+
+    def conjunction(self) -> tuple:
+        node = self.negation()
+        while self.keyword() == "AND":
+            self.take()
+            node = ("and", node, self.negation())
+        return node
+
+    def negation(self) -> tuple:
+        if self.keyword() == "NOT":
+            self.take()
+            return ("not", self.negation())
+        return self.predicate()
+
+    def predicate(self) -> tuple:
+        token = self.peek()
+        if token == "(":
+            self.take()
+            node = self.condition()
+            self.take(")")
+            return node
+        function = (token or "").lower()
+        if self.peek(1) == "(" and function in (
+            "attribute_exists", "attribute_not_exists", "attribute_type", "begins_with", "contains"
+        ):
+            self.take()
+            self.take("(")
+            path = self.path()
+            argument = None
+            if function != "attribute_exists" and function != "attribute_not_exists":
+                self.take(",")
+                argument = self.operand()
+            self.take(")")
+            return (function, path, argument)
+
+        left = self.operand()
+        keyword = self.keyword()
+        if keyword == "BETWEEN":
+            self.take()
+            low = self.operand()
+            self.take("AND")
+            return ("between", left, low, self.operand())
+        if keyword == "IN":
+            self.take()
+            self.take("(")
+            options = [self.operand()]
+            while self.peek() == ",":
+                self.take()
+                options.append(self.operand())
+            self.take(")")
+            return ("in", left, options)
+        comparator = self.take()
+        if comparator not in ("=", "<>", "<", "<=", ">", ">="):
+            raise ExpressionError(f"Comparador inválido: {comparator!r}")
+        return ("compare", comparator, left, self.operand())
+
+    # Actualizaciones
+
+    def update(self) -> List[tuple]:
+        actions = []
+        if self.peek() is None:
+            raise ExpressionError("UpdateExpression vacía")
+        while self.peek() is not None:
+            clause = self.keyword()
+            if clause not in ("SET", "REMOVE", "ADD", "DELETE"):
+                raise ExpressionError(f"Cláusula inválida: {self.peek()!r}")
+            self.take()
+            while True:
+                path = self.path()
+                if clause == "SET":
+                    self.take("=")
+                    actions.append(("set", path, self.set_value()))
+                elif clause == "REMOVE":
+                    actions.append(("remove", path, None))
+                else:
+                    actions.append((clause.lower(), path, self.operand()))
+                if self.peek() != ",":
+                    break
+                self.take()
+        return actions
+
+    def set_value(self) -> tuple:
+        node = self.set_operand()
+        if self.peek() in ("+", "-"):
+            operator = self.take()
+            node = ("arithmetic", operator, node, self.set_operand())
+        return node
+
+    def set_operand(self) -> tuple:
+        function = (self.peek() or "").lower()
+        if self.peek(1) == "(" and function in ("if_not_exists", "list_append"):
+            self.take()
+            self.take("(")
+            first = self.path() if function == "if_not_exists" else self.set_operand()
+            self.take(",")
+            second = self.set_operand()
+            self.take(")")
+            return (function, first, second)
+        return self.operand()
+
+
+@lru_cache(maxsize=1024)
+def parse_condition(text: str) -> tuple:
+    parser = _Parser(text)
+    node = parser.condition()
+    parser.done()
+    return node
+
+
+@lru_cache(maxsize=1024)
+def parse_update(text: str) -> Tuple[tuple, ...]:
+    parser = _Parser(text)
+    actions = parser.update()
+    parser.done()
+    return tuple(actions)
+
+
+@lru_cache(maxsize=1024)
+def parse_projection(text: str) -> Tuple[tuple, ...]:
+    parser = _Parser(text)
+    paths = [parser.path()]
+    while parser.peek() == ",":
+        parser.take()
+        paths.append(parser.path())
+    parser.done()
+    return tuple(paths)
+
+
+def build_condition(condition, names: Optional[dict], values: Optional[dict], is_key_condition: bool = False):
+    """
+    Texto y marcadores de una condición (texto u objeto de boto3)
+
+    Devuelve (texto, nombres, valores) combinando los marcadores generados por
+    boto3 con los recibidos.
+    """
+    if not isinstance(condition, ConditionBase):
+        return condition, names or {}, values or {}
+    built = ConditionExpressionBuilder().build_expression(condition, is_key_condition=is_key_condition)
+    return (
+        built.condition_expression,
+        {**(names or {}), **built.attribute_name_placeholders},
+        {**(values or {}), **built.attribute_value_placeholders},
+    )
+
+
+class Evaluator:
+    """Evaluar expresiones analizadas sobre un item con los marcadores de una petición"""
+
+    def __init__(self, names: Optional[Dict[str, str]] = None, values: Optional[Dict[str, Any]] = None):
+        self.names = names or {}
+        self.values = values or {}
+
+    def resolve_path(self, node: tuple) -> Tuple[str, ...]:
+        parts = []
+        for part in node[1]:
+            if part.startswith("#"):
+                if part not in self.names:
+                    raise ExpressionError(f"Marcador de nombre sin definir: {part}")
+                part = self.names[part]
+            parts.append(part)
+        return tuple(parts)
+
+    def value(self, placeholder: str):
+        if placeholder not in self.values:
+            raise ExpressionError(f"Marcador de valor sin definir: {placeholder}")
+        return self.values[placeholder]
+
+    def read(self, item: dict, path: Tuple[str, ...]):
+        current = item
+        for part in path:
+            if not isinstance(current, dict) or part not in current:
+                return _MISSING
+            current = current[part]
+        return current
+
+    def operand(self, item: dict, node: tuple):
+        kind = node[0]
+        if kind == "value":
+            return self.value(node[1])
+        if kind == "path":
+            return self.read(item, self.resolve_path(node))
+        if kind == "size":
+            target = self.read(item, self.resolve_path(node[1]))
+            return _MISSING if target is _MISSING or isinstance(target, (Decimal, bool)) else Decimal(len(target))
+        raise ExpressionError(f"Operando inválido: {node!r}")
+
+    def matches(self, item: Optional[dict], node: tuple) -> bool:
+        item = item or {}
+        kind = node[0]
+        if kind == "and":
+            return self.matches(item, node[1]) and self.matches(item, node[2])
+        if kind == "or":
+            return self.matches(item, node[1]) or self.matches(item, node[2])
+        if kind == "not":
+            return not self.matches(item, node[1])
+        if kind == "attribute_exists":
+            return self.read(item, self.resolve_path(node[1])) is not _MISSING
+        if kind == "attribute_not_exists":
+            return self.read(item, self.resolve_path(node[1])) is _MISSING
+        if kind == "attribute_type":
+            target = self.read(item, self.resolve_path(node[1]))
+            return target is not _MISSING and _type_code(target) == self.operand(item, node[2])
+        if kind == "begins_with":
+            target, prefix = self.read(item, self.resolve_path(node[1])), self.operand(item, node[2])
+            return isinstance(target, type(prefix)) and isinstance(target, (str, bytes)) and target.startswith(prefix)
+        if kind == "contains":
+            target, member = self.read(item, self.resolve_path(node[1])), self.operand(item, node[2])
+            if isinstance(target, str):
+                return isinstance(member, str) and member in target
+            return isinstance(target, (set, list)) and member in target
+        if kind == "compare":
+            return _compare(node[1], self.operand(item, node[2]), self.operand(item, node[3]))
+        if kind == "between":
+            value = self.operand(item, node[1])
+            return _compare(">=", value, self.operand(item, node[2])) and _compare("<=", value, self.operand(item, node[3]))
+        if kind == "in":
+            value = self.operand(item, node[1])
+            return any(_compare("=", value, self.operand(item, option)) for option in node[2])
+        raise ExpressionError(f"Condición inválida: {node!r}")
+
+    def update_value(self, item: dict, node: tuple):
+        kind = node[0]
+        if kind == "arithmetic":
+            left, right = self.update_value(item, node[2]), self.update_value(item, node[3])
+            if not isinstance(left, Decimal) or not isinstance(right, Decimal) or isinstance(left, bool):
+                raise ExpressionError("Los operandos de + y - deben ser números")
+            return left + right if node[1] == "+" else left - right
+        if kind == "if_not_exists":
+            current = self.read(item, self.resolve_path(node[1]))
+            return self.update_value(item, node[2]) if current is _MISSING else current
+        if kind == "list_append":
+            first, second = self.update_value(item, node[1]), self.update_value(item, node[2])
+            if not isinstance(first, list) or not isinstance(second, list):
+                raise ExpressionError("list_append requiere dos listas")
+            return first + second
+        value = self.operand(item, node)
+        if value is _MISSING:
+            raise ExpressionError("El atributo del operando no existe en el item")
+        return value
+
+    def apply_update(self, item: dict, actions: Tuple[tuple, ...]) -> dict:
+        """Item resultante de aplicar las acciones (todas se evalúan sobre el item original)"""
+        updated = dict(item)
+        touched = set()
+        for action, path_node, argument in actions:
+            path = self.resolve_path(path_node)
+            if path in touched:
+                raise ExpressionError(f"Dos acciones sobre el mismo atributo: {'.'.join(path)}")
+            touched.add(path)
+            if action == "set":
+                _write(updated, path, self.update_value(item, argument))
+            elif action == "remove":
+                _remove(updated, path)
+            elif action == "add":
+                current, value = self.read(item, path), self.operand(item, argument)
+                if current is _MISSING:
+                    _write(updated, path, value)
+                elif isinstance(current, Decimal) and isinstance(value, Decimal):
+                    _write(updated, path, current + value)
+                elif isinstance(current, set) and isinstance(value, set):
+                    _write(updated, path, current | value)
+                else:
+                    raise ExpressionError("ADD solo aplica a números y conjuntos del mismo tipo")
+            else:
+                current, value = self.read(item, path), self.operand(item, argument)
+                if not isinstance(value, set):
+                    raise ExpressionError("DELETE solo aplica a conjuntos")
+                if current is not _MISSING:
+                    if not isinstance(current, set):
+                        raise ExpressionError("DELETE solo aplica a conjuntos")
+                    remaining = current - value
+                    if remaining:
+                        _write(updated, path, remaining)
+                    else:
+                        _remove(updated, path)
+        return updated
+
+    def project(self, item: dict, paths: Tuple[tuple, ...]) -> dict:
+        projected: dict = {}
+        for node in paths:
+            path = self.resolve_path(node)
+            value = self.read(item, path)
+            if value is not _MISSING:
+                _write(projected, path, value)
+        return projected
+
+
+def _write(item: dict, path: Tuple[str, ...], value) -> None:
+    target = item
+    for part in path[:-1]:
+        child = target.get(part)
+        if not isinstance(child, dict):
+            raise ExpressionError(f"El mapa {part} no existe en el item")
+        # Copia del mapa anidado: el item original no se modifica
+        target[part] = child = dict(child)
+        target = child
+    target[path[-1]] = value
+
+
+def _remove(item: dict, path: Tuple[str, ...]) -> None:
+    target = item
+    for part in path[:-1]:
+        child = target.get(part)
+        if not isinstance(child, dict):
+            return
+        target[part] = child = dict(child)
+        target = child
+    target.pop(path[-1], None)
+
+
+def _type_code(value) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "BOOL"
+    if isinstance(value, Decimal):
+        return "N"
+    if isinstance(value, str):
+        return "S"
+    if isinstance(value, (bytes, bytearray)):
+        return "B"
+    if isinstance(value, dict):
+        return "M"
+    if isinstance(value, list):
+        return "L"
+    if isinstance(value, set):
+        sample = next(iter(value))
+        return "NS" if isinstance(sample, Decimal) else "BS" if isinstance(sample, bytes) else "SS"
+    return "?"
+
+
+def _compare(operator: str, left, right) -> bool:
+    if left is _MISSING or right is _MISSING:
+        # Un atributo inexistente solo cumple la desigualdad
+        return operator == "<>"
+    if operator == "=":
+        return _type_code(left) == _type_code(right) and left == right
+    if operator == "<>":
+        return _type_code(left) != _type_code(right) or left != right
+    # Orden solo entre números, cadenas o binarios del mismo tipo
+    if _type_code(left) != _type_code(right) or _type_code(left) not in ("N", "S", "B"):
+        return False
+    if operator == "<":
+        return left < right
+    if operator == "<=":
+        return left <= right
+    if operator == ">":
+        return left > right
+    return left >= right
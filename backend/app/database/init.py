@@ -1,5 +1,6 @@
 from botocore.exceptions import ClientError
 from app.database.client import db_client
+from app.tenancy import all_tenants, physical_table_name, tenant_context
 from app.config import INITIAL_AMOUNT
 import logging
 from decimal import Decimal
@@ -17,6 +18,24 @@ def create_tables():
             "AttributeDefinitions": [
                 {"AttributeName": "fundId", "AttributeType": "S"}
             ],
+            "ProvisionedThroughput": {
+                "ReadCapacityUnits": 5,
+                "WriteCapacityUnits": 5
+            },
+            # Stream de cambios para invalidar las cachés (app.database.streams)
+            "StreamSpecification": {
+                "StreamEnabled": True,
+                "StreamViewType": "KEYS_ONLY"
+            }
+        },
+        {
+            "TableName": "FundStats",
+            "KeySchema": [
+                {"AttributeName": "fundId", "KeyType": "HASH"}
+            ],
+            "AttributeDefinitions": [
+                {"AttributeName": "fundId", "AttributeType": "S"}
+            ],
             "ProvisionedThroughput": {
                 "ReadCapacityUnits": 5,
                 "WriteCapacityUnits": 5
@@ -33,6 +52,11 @@ def create_tables():
             "ProvisionedThroughput": {
                 "ReadCapacityUnits": 5,
                 "WriteCapacityUnits": 5
+            },
+            # Stream de cambios para invalidar las cachés (app.database.streams)
+            "StreamSpecification": {
+                "StreamEnabled": True,
+                "StreamViewType": "KEYS_ONLY"
             }
         },
         {
@@ -43,7 +67,65 @@ def create_tables():
             ],
             "AttributeDefinitions": [
                 {"AttributeName": "userId", "AttributeType": "S"},
-                {"AttributeName": "fundId", "AttributeType": "S"}
+                {"AttributeName": "fundId", "AttributeType": "S"},
+                {"AttributeName": "subscribedAt", "AttributeType": "S"}
+            ],
+            "GlobalSecondaryIndexes": [
+                {
+                    "IndexName": "FundIdIndex",
+                    "KeySchema": [
+                        {"AttributeName": "fundId", "KeyType": "HASH"},
+                        {"AttributeName": "subscribedAt", "KeyType": "RANGE"}
+                    ],
+                    "Projection": {"ProjectionType": "ALL"},
+                    "ProvisionedThroughput": {
+                        "ReadCapacityUnits": 5,
+                        "WriteCapacityUnits": 5
+                    }
+                }
+            ],
+            "ProvisionedThroughput": {
+                "ReadCapacityUnits": 5,
+                "WriteCapacityUnits": 5
+            }
+        },
+        {
+            "TableName": "UserPortfolio",
+            "KeySchema": [
+                {"AttributeName": "userId", "KeyType": "HASH"}
+            ],
+            "AttributeDefinitions": [
+                {"AttributeName": "userId", "AttributeType": "S"}
+            ],
+            "ProvisionedThroughput": {
+                "ReadCapacityUnits": 5,
+                "WriteCapacityUnits": 5
+            }
+        },
+        {
+            "TableName": "LedgerEvents",
+            "KeySchema": [
+                {"AttributeName": "userId", "KeyType": "HASH"},
+                {"AttributeName": "sequence", "KeyType": "RANGE"}
+            ],
+            "AttributeDefinitions": [
+                {"AttributeName": "userId", "AttributeType": "S"},
+                {"AttributeName": "sequence", "AttributeType": "N"}
+            ],
+            "ProvisionedThroughput": {
+                "ReadCapacityUnits": 5,
+                "WriteCapacityUnits": 5
+            }
+        },
+        {
+            "TableName": "LedgerSnapshots",
+            "KeySchema": [
+                {"AttributeName": "userId", "KeyType": "HASH"},
+                {"AttributeName": "sequence", "KeyType": "RANGE"}
+            ],
+            "AttributeDefinitions": [
+                {"AttributeName": "userId", "AttributeType": "S"},
+                {"AttributeName": "sequence", "AttributeType": "N"}
             ],
             "ProvisionedThroughput": {
                 "ReadCapacityUnits": 5,
@@ -62,8 +144,10 @@ def create_tables():
             "GlobalSecondaryIndexes": [
                 {
                     "IndexName": "UserIdIndex",
+                    # transactionId es un UUIDv7: el rango ordena el historial por fecha
                     "KeySchema": [
-                        {"AttributeName": "userId", "KeyType": "HASH"}
+                        {"AttributeName": "userId", "KeyType": "HASH"},
+                        {"AttributeName": "transactionId", "KeyType": "RANGE"}
                     ],
                     "Projection": {"ProjectionType": "ALL"},
                     "ProvisionedThroughput": {
@@ -82,64 +166,115 @@ def create_tables():
     dynamodb = db_client.get_client()
     
     for table_config in tables_config:
-        table_name = table_config["TableName"]
+        table_name = physical_table_name(table_config["TableName"])
+        table_config = {**table_config, "TableName": table_name}
         try:
             # Verificar si la tabla ya existe
             existing_tables = dynamodb.list_tables()["TableNames"]
             
             if table_name not in existing_tables:
-                logger.info(f"Creating table {table_name}...")
+                logger.info("Creating table %s...", table_name)
                 dynamodb.create_table(**table_config)
                 
                 # Esperar a que la tabla esté activa
                 waiter = dynamodb.get_waiter('table_exists')
                 waiter.wait(TableName=table_name, WaiterConfig={'Delay': 1, 'MaxAttempts': 30})
                 
-                logger.info(f"Table {table_name} created successfully")
+                logger.info("Table %s created successfully", table_name)
             else:
-                logger.info(f"Table {table_name} already exists")
+                logger.info("Table %s already exists", table_name)
+                description = dynamodb.describe_table(TableName=table_name)["Table"]
+                verify_indexes(table_config, description)
+                enable_stream(dynamodb, table_config, description)
                 
         except ClientError as e:
-            logger.error(f"Error creating table {table_name}: {str(e)}")
+            logger.error("Error creating table %s: %s", table_name, e)
             raise
 
+def verify_indexes(table_config: dict, description: dict):
+    """
+    Verificar que una tabla existente tenga los índices secundarios de su configuración
+    
+    create_tables no modifica tablas existentes: una tabla creada con una versión
+    anterior (p. ej. UserIdIndex sin clave de rango o UserFunds sin FundIdIndex)
+    haría fallar las consultas sobre el índice o devolvería un orden arbitrario.
+    Se detiene el arranque con el cambio necesario en lugar de fallar en cada consulta.
+    """
+    existing = {
+        index["IndexName"]: index["KeySchema"] for index in description.get("GlobalSecondaryIndexes", [])
+    }
+    problems = []
+    for index in table_config.get("GlobalSecondaryIndexes", []):
+        expected = index["KeySchema"]
+        current = existing.get(index["IndexName"])
+        if current is None:
+            problems.append(f"falta el índice {index['IndexName']}")
+        elif key_pairs(current) != key_pairs(expected):
+            problems.append(
+                f"el índice {index['IndexName']} tiene la clave {key_schema_text(current)} "
+                f"y se requiere {key_schema_text(expected)}"
+            )
+    if problems:
+        raise Exception(
+            f"La tabla {table_config['TableName']} no coincide con el esquema esperado: {'; '.join(problems)}. "
+            "Recree el índice (UpdateTable: Delete y luego Create del GSI) o la tabla antes de iniciar la aplicación"
+        )
+
+def key_pairs(key_schema: list) -> set:
+    return {(element["AttributeName"], element["KeyType"]) for element in key_schema}
+
+def key_schema_text(key_schema: list) -> str:
+    """Clave de un índice para mensajes de error: ``fundId (HASH), subscribedAt (RANGE)``"""
+    return ", ".join(f"{element['AttributeName']} ({element['KeyType']})" for element in key_schema)
+
+def enable_stream(dynamodb, table_config: dict, description: dict = None):
+    """Habilitar el stream en una tabla creada antes de que su configuración lo pidiera"""
+    specification = table_config.get("StreamSpecification")
+    if specification is None:
+        return
+    if description is None:
+        description = dynamodb.describe_table(TableName=table_config["TableName"])["Table"]
+    if not description.get("StreamSpecification", {}).get("StreamEnabled"):
+        logger.info("Enabling stream on table %s...", table_config["TableName"])
+        dynamodb.update_table(TableName=table_config["TableName"], StreamSpecification=specification)
+
+# Catálogo inicial de fondos
+INITIAL_FUNDS = [
+    {
+        "fundId": "FPV_BTG_PACTUAL",
+        "name": "FPV_BTG_PACTUAL", 
+        "category": "FPV",
+        "minAmount": Decimal("75000")
+    },
+    {
+        "fundId": "FPV_RECAUDADORA",
+        "name": "FPV_RECAUDADORA",
+        "category": "FPV", 
+        "minAmount": Decimal("125000")
+    },
+    {
+        "fundId": "FIC_MANDATO",
+        "name": "FIC_MANDATO",
+        "category": "FIC",
+        "minAmount": Decimal("500000")
+    },
+    {
+        "fundId": "FPV_DEUDAPRIVADA",
+        "name": "FPV_DEUDAPRIVADA",
+        "category": "FPV",
+        "minAmount": Decimal("50000")
+    },
+    {
+        "fundId": "FIC_ACCIONES",
+        "name": "FIC_ACCIONES", 
+        "category": "FIC",
+        "minAmount": Decimal("250000")
+    }
+]
+
 def populate_initial_data():
     """Poblar las tablas con datos iniciales para testing"""
     
-    # Datos iniciales de fondos
-    funds_data = [
-        {
-            "fundId": "FPV_BTG_PACTUAL",
-            "name": "FPV_BTG_PACTUAL", 
-            "category": "FPV",
-            "minAmount": Decimal("75000")
-        },
-        {
-            "fundId": "FPV_RECAUDADORA",
-            "name": "FPV_RECAUDADORA",
-            "category": "FPV", 
-            "minAmount": Decimal("125000")
-        },
-        {
-            "fundId": "FIC_MANDATO",
-            "name": "FIC_MANDATO",
-            "category": "FIC",
-            "minAmount": Decimal("500000")
-        },
-        {
-            "fundId": "FPV_DEUDAPRIVADA",
-            "name": "FPV_DEUDAPRIVADA",
-            "category": "FPV",
-            "minAmount": Decimal("50000")
-        },
-        {
-            "fundId": "FIC_ACCIONES",
-            "name": "FIC_ACCIONES", 
-            "category": "FIC",
-            "minAmount": Decimal("250000")
-        }
-    ]
-    
     # Usuario de prueba
     test_user = {
         "userId": "user123",
@@ -150,27 +285,31 @@ def populate_initial_data():
     try:
         # Poblar tabla Funds
         funds_table = db_client.get_table("Funds")
-        for fund in funds_data:
+        for fund in INITIAL_FUNDS:
             try:
                 funds_table.put_item(Item=fund)
-                logger.info(f"Added fund: {fund['fundId']}")
+                logger.info("Added fund: %s", fund['fundId'])
             except ClientError as e:
                 if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
-                    logger.error(f"Error adding fund {fund['fundId']}: {str(e)}")
+                    logger.error("Error adding fund %s: %s", fund['fundId'], e)
         
-        # Poblar usuario de prueba
+        # Poblar usuario de prueba solo si no existe: su saldo es la proyección del
+        # libro mayor y sobrescribirlo en cada arranque la desalinearía. Sin eventos,
+        # el primer append registra este saldo como evento de apertura
         user_table = db_client.get_table("User")
         try:
-            user_table.put_item(Item=test_user)
-            logger.info(f"Added test user: {test_user['userId']}")
+            user_table.put_item(Item=test_user, ConditionExpression='attribute_not_exists(userId)')
+            logger.info("Added test user: %s", test_user['userId'])
         except ClientError as e:
-            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
-                logger.error(f"Error adding test user: {str(e)}")
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                logger.info("Test user %s already exists", test_user['userId'])
+            else:
+                logger.error("Error adding test user: %s", e)
                 
         logger.info("Initial data population completed")
         
     except Exception as e:
-        logger.error(f"Error populating initial data: {str(e)}")
+        logger.error("Error populating initial data: %s", e)
         raise
 
 def initialize_database():
@@ -178,16 +317,19 @@ def initialize_database():
     logger.info("Starting database initialization...")
     
     try:
-        # Crear tablas
-        create_tables()
-        
-        # Poblar datos iniciales
-        populate_initial_data()
+        # Tablas y datos iniciales de cada tenant (con un solo tenant, solo el por defecto)
+        for tenant in all_tenants():
+            with tenant_context(tenant):
+                # Crear tablas
+                create_tables()
+                
+                # Poblar datos iniciales
+                populate_initial_data()
         
         logger.info("Database initialization completed successfully")
         
     except Exception as e:
-        logger.error(f"Database initialization failed: {str(e)}")
+        logger.error("Database initialization failed: %s", e)
         raise
 
 if __name__ == "__main__":
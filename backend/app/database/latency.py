@@ -0,0 +1,58 @@
+"""
+Latencia observada de las llamadas a DynamoDB
+
+Los eventos ``before-call``/``after-call`` de botocore envuelven cada llamada a
+la API (incluidos sus reintentos), así que la latencia medida es la que ve la
+aplicación. Se resume en una media móvil exponencial que usa el control de
+admisión para adaptar la concurrencia permitida.
+"""
+import threading
+import time
+from typing import Optional
+
+from app.metrics import metrics
+
+_STARTED_AT = "latency_started_at"
+
+
+class LatencyTracker:
+    """Media móvil exponencial (EWMA) thread-safe de latencias en segundos"""
+
+    def __init__(self, name: str, alpha: float = 0.2):
+        self.name = name
+        self.alpha = alpha
+        self._value: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Registrar una latencia"""
+        with self._lock:
+            if self._value is None:
+                self._value = seconds
+            else:
+                self._value += self.alpha * (seconds - self._value)
+            value = self._value
+        metrics.set_gauge(f"{self.name}.latency_ewma_ms", round(value * 1000, 3))
+
+    @property
+    def value(self) -> Optional[float]:
+        """Latencia media actual (None si aún no hay observaciones)"""
+        return self._value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = None
+
+    def on_before_call(self, context=None, **kwargs) -> None:
+        """Manejador de ``before-call``: marcar el inicio de la llamada"""
+        if context is not None:
+            context[_STARTED_AT] = time.perf_counter()
+
+    def on_after_call(self, context=None, **kwargs) -> None:
+        """Manejador de ``after-call``: registrar la duración de la llamada"""
+        if context is not None and _STARTED_AT in context:
+            self.observe(time.perf_counter() - context.pop(_STARTED_AT))
+
+
+# Latencia de las llamadas del cliente global de DynamoDB
+dynamodb_latency = LatencyTracker("dynamodb")
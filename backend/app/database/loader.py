@@ -0,0 +1,377 @@
+"""
+Carga masiva de datos para ambientes de staging y pruebas de rendimiento
+
+Dos modos:
+
+- ``file``: carga usuarios, fondos, suscripciones o transacciones desde un
+  archivo CSV o NDJSON (una fila u objeto JSON por línea), leído en streaming.
+- ``synthetic``: genera con Faker un conjunto de datos coherente: usuarios con
+  su libro mayor (apertura y débitos), suscripciones, resúmenes de portafolio,
+  historial de transacciones y agregados por fondo. El saldo de cada usuario es
+  el que resulta de su libro mayor, así que la conciliación lo da por bueno.
+
+Los items se agrupan en bloques y cada bloque se escribe en un hilo del pool
+con su propio ``batch_writer`` (BatchWriteItem de 25 items, con reintento de
+los no procesados). Un semáforo limita los bloques en vuelo para que la
+lectura del archivo o la generación no se adelanten a la escritura.
+
+Uso (desde backend/):
+    python -m app.database.loader synthetic --users 1000000 --seed 42 --concurrency 16
+    python -m app.database.loader file usuarios.csv --kind users
+"""
+import argparse
+import csv
+import heapq
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from faker import Faker
+
+from app.config import DYNAMODB_MAX_POOL_CONNECTIONS, INITIAL_AMOUNT, LEDGER_SNAPSHOT_INTERVAL
+from app.database.client import db_client
+from app.database.init import INITIAL_FUNDS
+from app.models.records import (
+    FundRecord, LedgerEventRecord, LedgerSnapshotRecord, TransactionRecord, UserFundRecord, UserRecord
+)
+from app.utils.ids import uuid7, uuid7_at, uuid7_datetime
+
+logger = logging.getLogger(__name__)
+
+# Tabla de destino de cada tipo de archivo
+FILE_TABLES = {"users": "User", "funds": "Funds", "subscriptions": "UserFunds", "transactions": "Transactions"}
+
+# Claves primarias: un bloque con claves repetidas conserva solo el último item
+KEY_ATTRIBUTES = {
+    "User": ["userId"],
+    "Funds": ["fundId"],
+    "FundStats": ["fundId"],
+    "UserFunds": ["userId", "fundId"],
+    "UserPortfolio": ["userId"],
+    "LedgerEvents": ["userId", "sequence"],
+    "LedgerSnapshots": ["userId", "sequence"],
+    "Transactions": ["transactionId"],
+}
+
+
+def _decimal(value) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _datetime(value: Optional[str]) -> datetime:
+    return datetime.fromisoformat(value) if value else datetime.now(timezone.utc)
+
+
+def parse_row(kind: str, row: dict) -> dict:
+    """
+    Convertir una fila del archivo en un item de la tabla
+
+    Los valores de CSV llegan como texto: montos y saldos se convierten a
+    Decimal. Una transacción sin ``transactionId`` recibe un UUIDv7 de su
+    ``timestamp`` (o del momento de la carga).
+
+    Raises:
+        KeyError: Si falta un campo obligatorio
+        ValueError: Si un valor no tiene el formato esperado
+    """
+    if kind == "users":
+        return UserRecord(
+            row['userId'], _decimal(row.get('balance') or INITIAL_AMOUNT), row.get('notificationType') or "email"
+        ).to_item()
+    if kind == "funds":
+        return FundRecord(row['fundId'], row.get('name') or row['fundId'], row['category'], _decimal(row['minAmount'])).to_item()
+    if kind == "subscriptions":
+        amount = row.get('amount')
+        return UserFundRecord(
+            row['userId'], row['fundId'], _datetime(row.get('subscribedAt')), _decimal(amount) if amount else None
+        ).to_item()
+    if kind == "transactions":
+        transaction_id = row.get('transactionId')
+        if transaction_id:
+            timestamp = _datetime(row.get('timestamp'))
+        else:
+            transaction_id = uuid7_at(_datetime(row['timestamp'])) if row.get('timestamp') else uuid7()
+            timestamp = uuid7_datetime(transaction_id)
+        return TransactionRecord(
+            transaction_id, row['userId'], row['fundId'], row['type'], _decimal(row['amount']), timestamp
+        ).to_item()
+    raise ValueError(f"Tipo de archivo no soportado: {kind}")
+
+
+def read_rows(path: Path) -> Iterator[dict]:
+    """Filas de un archivo CSV (con encabezado) o NDJSON, una a la vez"""
+    with path.open(newline="", encoding="utf-8") as handle:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(handle)
+            return
+        for line in handle:
+            if line.strip():
+                yield json.loads(line, parse_float=Decimal)
+
+
+class Progress:
+    """Items escritos por tabla, con un reporte periódico del avance"""
+
+    def __init__(self, interval: float = 5.0, clock=time.monotonic):
+        self.interval = interval
+        self.written: Counter = Counter()
+        self._clock = clock
+        self._started = clock()
+        self._reported = self._started
+        self._lock = threading.Lock()
+
+    def add(self, table_name: str, count: int) -> None:
+        with self._lock:
+            self.written[table_name] += count
+            now = self._clock()
+            if now - self._reported < self.interval:
+                return
+            self._reported = now
+        self.report()
+
+    def total(self) -> int:
+        return sum(self.written.values())
+
+    def rate(self) -> float:
+        elapsed = self._clock() - self._started
+        return self.total() / elapsed if elapsed > 0 else 0.0
+
+    def report(self) -> None:
+        tables = ", ".join(f"{name}={count}" for name, count in sorted(self.written.items()))
+        logger.info("Loaded %s items (%.0f items/s): %s", self.total(), self.rate(), tables)
+
+
+class BulkWriter:
+    """
+    Escritura en paralelo con un ``batch_writer`` por bloque de items
+
+    ``add`` acumula items por tabla y envía cada bloque completo al pool. Si
+    ya hay ``2 * concurrency`` bloques en vuelo, espera a que termine alguno.
+    El primer error de escritura se propaga en la siguiente llamada.
+    """
+
+    def __init__(self, concurrency: int = 8, chunk_size: int = 1000, progress: Optional[Progress] = None):
+        self.chunk_size = chunk_size
+        self.progress = progress or Progress()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loader")
+        self._slots = threading.BoundedSemaphore(concurrency * 2)
+        self._chunks: Dict[str, List[dict]] = {}
+        self._futures: List[Future] = []
+        self._error: Optional[BaseException] = None
+
+    def add(self, table_name: str, item: dict) -> None:
+        if self._error is not None:
+            raise self._error
+        chunk = self._chunks.setdefault(table_name, [])
+        chunk.append(item)
+        if len(chunk) >= self.chunk_size:
+            self._submit(table_name, self._chunks.pop(table_name))
+
+    def _submit(self, table_name: str, items: List[dict]) -> None:
+        self._slots.acquire()
+        future = self._executor.submit(self._write, table_name, items)
+        future.add_done_callback(self._done)
+        self._futures = [pending for pending in self._futures if not pending.done()] + [future]
+
+    def _done(self, future: Future) -> None:
+        self._slots.release()
+        if future.exception() is not None and self._error is None:
+            self._error = future.exception()
+
+    def _write(self, table_name: str, items: List[dict]) -> None:
+        table = db_client.get_table(table_name)
+        with table.batch_writer(overwrite_by_pkeys=KEY_ATTRIBUTES.get(table_name)) as writer:
+            for item in items:
+                writer.put_item(Item=item)
+        self.progress.add(table_name, len(items))
+
+    def close(self) -> None:
+        """Escribir los bloques incompletos y esperar a que termine todo"""
+        try:
+            for table_name in list(self._chunks):
+                self._submit(table_name, self._chunks.pop(table_name))
+            for future in self._futures:
+                future.exception()
+        finally:
+            self._executor.shutdown(wait=True)
+        if self._error is not None:
+            raise self._error
+
+
+def zipf_weights(n: int, skew: float) -> List[float]:
+    """Pesos de Zipf: el elemento de rango r (desde 1) pesa 1 / r^skew; skew 0 es uniforme"""
+    return [1 / rank ** skew for rank in range(1, n + 1)]
+
+
+def weighted_sample(rand: random.Random, population: list, weights: List[float], k: int) -> list:
+    """``k`` elementos distintos con probabilidad proporcional a su peso (Efraimidis-Spirakis)"""
+    keys = ((rand.random() ** (1 / weight), index) for index, weight in enumerate(weights))
+    return [population[index] for _, index in heapq.nlargest(k, keys)]
+
+
+def generate_funds(fake: Faker, rand: random.Random, extra: int) -> List[FundRecord]:
+    """Catálogo inicial más ``extra`` fondos sintéticos"""
+    funds = [FundRecord.from_item(item) for item in INITIAL_FUNDS]
+    for i in range(extra):
+        category = rand.choice(("FPV", "FIC"))
+        name = f"{category}_{fake.word().upper()}_{i}"
+        funds.append(FundRecord(name, name, category, Decimal(rand.randint(1, 20) * 25000)))
+    return funds
+
+
+def generate_dataset(
+    users: int,
+    seed: Optional[int] = None,
+    extra_funds: int = 0,
+    max_subscriptions: int = 3,
+    cancel_rate: float = 0.2,
+    initial_amount: Decimal = INITIAL_AMOUNT,
+    snapshot_interval: int = LEDGER_SNAPSHOT_INTERVAL,
+    now: Optional[datetime] = None,
+    fund_skew: float = 0.0
+) -> Iterator[Tuple[str, dict]]:
+    """
+    Generar (tabla, item) para ``users`` usuarios sintéticos
+
+    Cada usuario abre su libro mayor con ``initial_amount`` y se suscribe a
+    fondos al azar mientras el saldo alcance; una fracción ``cancel_rate`` de
+    las suscripciones se cancela después (sin reembolso, como en la
+    aplicación). Con ``fund_skew`` > 0 la elección de fondos sigue una
+    distribución de Zipf en el orden del catálogo (los primeros son los fondos
+    más demandados). Los agregados por fondo se emiten al final. Con la misma
+    semilla y el mismo ``now`` se genera el mismo conjunto.
+    """
+    fake = Faker("es_CO")
+    fake.seed_instance(seed)
+    rand = random.Random(seed)
+    funds = generate_funds(fake, rand, extra_funds)
+    stats = {fund.fundId: [0, Decimal("0")] for fund in funds}
+    now = now or datetime.now(timezone.utc)
+    fund_weights = zipf_weights(len(funds), fund_skew)
+
+    for fund in funds:
+        yield "Funds", fund.to_item()
+
+    for i in range(users):
+        user_id = f"{fake.user_name()}_{i}"
+        moment = fake.date_time_between(now - timedelta(days=730), now - timedelta(days=30), tzinfo=timezone.utc)
+        events = [LedgerEventRecord(user_id, 1, "credit", initial_amount, "opening", moment)]
+        balance = initial_amount
+        active: Dict[str, FundRecord] = {}
+
+        count = rand.randint(0, min(max_subscriptions, len(funds)))
+        chosen = weighted_sample(rand, funds, fund_weights, count) if fund_skew else rand.sample(funds, count)
+        for fund in chosen:
+            if fund.minAmount > balance:
+                continue
+            moment += timedelta(seconds=rand.randint(60, 30 * 24 * 3600))
+            balance -= fund.minAmount
+            events.append(LedgerEventRecord(
+                user_id, len(events) + 1, "debit", fund.minAmount, "subscribe", moment, fund.fundId
+            ))
+            transaction_id = uuid7_at(moment)
+            yield "Transactions", TransactionRecord(
+                transaction_id, user_id, fund.fundId, "subscribe", fund.minAmount, uuid7_datetime(transaction_id)
+            ).to_item()
+
+            if rand.random() < cancel_rate:
+                cancelled_at = min(now, moment + timedelta(seconds=rand.randint(3600, 90 * 24 * 3600)))
+                transaction_id = uuid7_at(cancelled_at)
+                yield "Transactions", TransactionRecord(
+                    transaction_id, user_id, fund.fundId, "unsubscribe", Decimal("0"), uuid7_datetime(transaction_id)
+                ).to_item()
+            else:
+                active[fund.fundId] = fund
+                yield "UserFunds", UserFundRecord(user_id, fund.fundId, moment, fund.minAmount).to_item()
+
+        running = Decimal("0")
+        for event in events:
+            running += event.delta
+            yield "LedgerEvents", event.to_item()
+            if event.sequence % snapshot_interval == 0:
+                yield "LedgerSnapshots", LedgerSnapshotRecord(user_id, event.sequence, running).to_item()
+
+        user = UserRecord(user_id, balance, rand.choice(("email", "sms"))).to_item()
+        user['ledgerSequence'] = len(events)
+        yield "User", user
+
+        if active:
+            portfolio = {
+                'userId': user_id,
+                'activeFundIds': set(active),
+                'subscriptionCount': len(active),
+                'totalCommitted': sum(fund.minAmount for fund in active.values()),
+                'updatedAt': now.isoformat()
+            }
+            for fund in active.values():
+                portfolio[f"{fund.category}Count"] = portfolio.get(f"{fund.category}Count", 0) + 1
+                portfolio[f"{fund.category}Total"] = portfolio.get(f"{fund.category}Total", Decimal("0")) + fund.minAmount
+                stats[fund.fundId][0] += 1
+                stats[fund.fundId][1] += fund.minAmount
+            yield "UserPortfolio", portfolio
+
+    for fund_id, (subscribers, committed) in stats.items():
+        yield "FundStats", {
+            'fundId': fund_id, 'subscriberCount': subscribers, 'totalCommitted': committed, 'updatedAt': now.isoformat()
+        }
+
+
+def load(items: Iterable[Tuple[str, dict]], concurrency: int = 8, chunk_size: int = 1000) -> Progress:
+    """Escribir los items (tabla, item) y devolver el avance final"""
+    progress = Progress()
+    writer = BulkWriter(concurrency, chunk_size, progress)
+    try:
+        for table_name, item in items:
+            writer.add(table_name, item)
+    finally:
+        writer.close()
+    return progress
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8, help="Hilos de escritura en paralelo")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Items por bloque de escritura")
+    modes = parser.add_subparsers(dest="mode", required=True)
+
+    file_mode = modes.add_parser("file", help="Cargar un archivo CSV o NDJSON")
+    file_mode.add_argument("path", type=Path)
+    file_mode.add_argument("--kind", choices=sorted(FILE_TABLES), required=True, help="Contenido del archivo")
+
+    synthetic = modes.add_parser("synthetic", help="Generar datos sintéticos con Faker")
+    synthetic.add_argument("--users", type=int, required=True, help="Usuarios a generar")
+    synthetic.add_argument("--seed", type=int, default=None, help="Semilla para repetir el mismo conjunto")
+    synthetic.add_argument("--funds", type=int, default=0, help="Fondos sintéticos además del catálogo inicial")
+    synthetic.add_argument("--max-subscriptions", type=int, default=3, help="Máximo de suscripciones por usuario")
+    args = parser.parse_args(argv)
+
+    if args.concurrency > DYNAMODB_MAX_POOL_CONNECTIONS:
+        logger.warning(
+            "Concurrency %s exceeds DYNAMODB_MAX_POOL_CONNECTIONS (%s): writers will wait for connections",
+            args.concurrency, DYNAMODB_MAX_POOL_CONNECTIONS
+        )
+
+    if args.mode == "file":
+        items = ((FILE_TABLES[args.kind], parse_row(args.kind, row)) for row in read_rows(args.path))
+    else:
+        items = generate_dataset(args.users, args.seed, args.funds, args.max_subscriptions)
+
+    started = time.perf_counter()
+    progress = load(items, args.concurrency, args.chunk_size)
+    progress.report()
+    logger.info("Load completed in %.1fs", time.perf_counter() - started)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+Cursores opacos para paginación sobre LastEvaluatedKey de DynamoDB
+"""
+import base64
+import json
+from decimal import Decimal
+from typing import Optional
+
+
+def encode_cursor(last_evaluated_key: Optional[dict]) -> Optional[str]:
+    """Codificar un LastEvaluatedKey como cursor opaco (None si no hay más páginas)"""
+    if not last_evaluated_key:
+        return None
+    payload = json.dumps(last_evaluated_key, default=str, separators=(',', ':'), sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decodificar un cursor generado por encode_cursor
+    
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(cursor + padding), parse_float=Decimal)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Cursor inválido: {cursor}") from e
+    if not isinstance(key, dict):
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return key
@@ -0,0 +1,126 @@
+"""
+Scan de tablas completas con paginación y segmentos en paralelo
+
+Un ``Scan`` devuelve como máximo 1 MB por llamada: el resto se obtiene
+repitiendo la llamada desde ``LastEvaluatedKey``. Con ``segments > 1`` la tabla
+se divide en segmentos (``Segment``/``TotalSegments``) que se recorren en
+paralelo, cada uno en su propio hilo.
+
+``scan_iter`` expone el resultado como iterador asíncrono: los hilos dejan cada
+página en un buffer acotado y se bloquean cuando está lleno, así que la memoria
+no depende del tamaño de la tabla sino de lo que tarda el consumidor.
+
+Los hilos se ejecutan con una copia del contexto del llamador (tenant incluido),
+así que una tabla de varios tenants se recorre en la del tenant en curso.
+"""
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from app.config import DYNAMODB_SCAN_SEGMENTS, DYNAMODB_SCAN_BUFFER_PAGES
+from app.metrics import metrics
+
+# Marca de fin de un segmento en el buffer
+_DONE = object()
+
+
+def scan_pages(
+    table, segment: Optional[int] = None, total_segments: Optional[int] = None, **scan_params: Any
+) -> Iterator[List[dict]]:
+    """
+    Páginas de un scan completo (o de un segmento), siguiendo ``LastEvaluatedKey``
+
+    Args:
+        table: Tabla de boto3 (resource)
+        segment: Segmento a recorrer, de 0 a ``total_segments - 1``
+        total_segments: Número total de segmentos del scan
+        scan_params: Parámetros adicionales de ``Scan`` (ProjectionExpression...)
+    """
+    if total_segments is not None and total_segments > 1:
+        scan_params.update(Segment=segment, TotalSegments=total_segments)
+    while True:
+        response = table.scan(**scan_params)
+        metrics.increment("dynamodb.scan_pages")
+        yield response.get('Items', [])
+        if 'LastEvaluatedKey' not in response:
+            return
+        scan_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def scan_all(table, segments: int = DYNAMODB_SCAN_SEGMENTS, **scan_params: Any) -> List[dict]:
+    """Leer todos los items de la tabla (función síncrona, para ejecutar en un hilo)"""
+    if segments <= 1:
+        return [item for page in scan_pages(table, **scan_params) for item in page]
+
+    def read_segment(segment: int) -> List[dict]:
+        return [item for page in scan_pages(table, segment, segments, **scan_params) for item in page]
+
+    with ThreadPoolExecutor(max_workers=segments, thread_name_prefix="scan") as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, read_segment, segment) for segment in range(segments)
+        ]
+        return [item for future in futures for item in future.result()]
+
+
+async def scan_iter(
+    table,
+    segments: int = DYNAMODB_SCAN_SEGMENTS,
+    buffer_pages: int = DYNAMODB_SCAN_BUFFER_PAGES,
+    **scan_params: Any
+) -> AsyncIterator[dict]:
+    """
+    Recorrer la tabla como iterador asíncrono con un buffer acotado de páginas
+
+    Cada segmento se lee en un hilo que espera mientras el buffer tiene
+    ``buffer_pages`` páginas sin consumir. Al cerrar el iterador (``aclose`` o
+    ``contextlib.aclosing`` si se interrumpe la iteración) los hilos se
+    detienen después de la página en curso. Un error en un segmento se propaga
+    al consumidor.
+    """
+    loop = asyncio.get_running_loop()
+    buffer: asyncio.Queue = asyncio.Queue(maxsize=buffer_pages)
+    stopped = threading.Event()
+
+    def put(value) -> None:
+        # Espera en el hilo productor mientras el buffer está lleno
+        asyncio.run_coroutine_threadsafe(buffer.put(value), loop).result()
+
+    def produce(segment: int) -> None:
+        try:
+            for page in scan_pages(table, segment, segments, **scan_params):
+                if stopped.is_set():
+                    break
+                put(page)
+            put(_DONE)
+        except BaseException as e:
+            put(e)
+
+    threads = [
+        threading.Thread(
+            target=contextvars.copy_context().run, args=(produce, segment), name=f"scan-{segment}", daemon=True
+        )
+        for segment in range(max(1, segments))
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        pending = len(threads)
+        while pending:
+            page = await buffer.get()
+            if page is _DONE:
+                pending -= 1
+            elif isinstance(page, BaseException):
+                raise page
+            else:
+                for item in page:
+                    yield item
+    finally:
+        stopped.set()
+        # Liberar a los productores que esperan lugar en el buffer
+        while any(thread.is_alive() for thread in threads):
+            while not buffer.empty():
+                buffer.get_nowait()
+            await asyncio.sleep(0.001)
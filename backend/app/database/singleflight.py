@@ -0,0 +1,69 @@
+"""
+Coalescencia de lecturas idénticas concurrentes (single-flight)
+
+Cuando varias peticiones piden la misma lectura (misma tabla y clave, o el
+mismo scan) mientras una ya está en curso, todas esperan la llamada en vuelo
+en lugar de lanzar la suya. La llamada a boto3 se ejecuta en un hilo para no
+bloquear el event loop, y se protege con ``asyncio.shield`` para que la
+cancelación de una petición no cancele el resultado de las demás.
+
+Solo debe usarse para lecturas eventualmente consistentes: una lectura
+consistente iniciada después de una escritura no puede compartir el resultado
+de una lectura que empezó antes.
+"""
+import asyncio
+import logging
+from typing import Callable, Dict, Hashable, TypeVar
+
+from app.config import READ_COALESCING_ENABLED
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Agrupar llamadas concurrentes con la misma clave en una sola ejecución"""
+
+    def __init__(self, name: str, enabled: bool = READ_COALESCING_ENABLED):
+        self.name = name
+        self.enabled = enabled
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Ejecutar ``fn`` en un hilo o esperar la ejecución en vuelo con la misma clave
+
+        Args:
+            key: Identificador de la lectura, p. ej. ("Funds", "get", fund_id)
+            fn: Función síncrona que realiza la lectura
+        """
+        if not self.enabled:
+            return await asyncio.to_thread(fn)
+
+        future = self._inflight.get(key)
+        if future is not None:
+            metrics.increment(f"singleflight.{self.name}.shared")
+            return await asyncio.shield(future)
+
+        metrics.increment(f"singleflight.{self.name}.calls")
+        future = asyncio.ensure_future(asyncio.to_thread(fn))
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._forget(key, future))
+        return await asyncio.shield(future)
+
+    def _forget(self, key: Hashable, future: asyncio.Future) -> None:
+        # Solo eliminar si la entrada sigue siendo la de esta ejecución
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled() and future.exception() is not None:
+            logger.debug("Coalesced read %s failed: %s", key, future.exception())
+
+    def inflight(self) -> int:
+        """Número de lecturas en curso"""
+        return len(self._inflight)
+
+
+# Instancia global para las lecturas de DynamoDB
+read_coalescer = SingleFlight("dynamodb")
@@ -0,0 +1,256 @@
+"""
+Consumidor de cambios de tablas (DynamoDB Streams) para invalidar cachés
+
+Las tablas Funds y User tienen un stream con las claves de cada item
+modificado (``KEYS_ONLY``). Cada worker lee los streams de forma periódica y
+entrega los cambios a los servicios, que descartan las entradas afectadas de
+sus cachés. Así un cambio hecho por otro worker o por una herramienta
+administrativa se refleja en segundos aunque las cachés tengan TTL largos.
+
+Hay dos fuentes con la misma interfaz (``read()``):
+
+- ``DynamoDBStreamReader`` sigue los shards del stream de DynamoDB
+- ``LocalStream`` es un stream simulado en memoria: lo publica el backend
+  embebido y se usa en los tests
+
+Si una fuente pierde registros (el lector quedó atrás del período de retención
+o su iterador expiró) entrega un ``ChangeRecord`` ``RESET``: el servicio debe
+descartar toda su caché porque no sabe qué cambió.
+"""
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+
+from app.config import STREAM_POLL_INTERVAL_SECONDS, STREAM_LOCAL_MAX_RECORDS
+from app.metrics import metrics
+from app.tenancy import tenant_context
+
+logger = logging.getLogger(__name__)
+
+# Tipos de evento de DynamoDB Streams y el evento de pérdida de registros
+INSERT, MODIFY, REMOVE, RESET = "INSERT", "MODIFY", "REMOVE", "RESET"
+
+# Frecuencia (en lecturas) con la que se buscan shards nuevos del stream
+SHARD_REFRESH_READS = 10
+
+_deserializer = TypeDeserializer()
+
+
+@dataclass(frozen=True)
+class ChangeRecord:
+    """Cambio de un item: tipo de evento y clave primaria"""
+    event_name: str
+    keys: Dict[str, Any]
+
+
+class LocalStream:
+    """Stream simulado en memoria con retención acotada"""
+
+    def __init__(self, max_records: int = STREAM_LOCAL_MAX_RECORDS):
+        self._records: deque = deque(maxlen=max_records)
+        self._sequence = itertools.count(1)
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def publish(self, event_name: str, keys: Dict[str, Any]) -> None:
+        with self._lock:
+            self._last = next(self._sequence)
+            self._records.append((self._last, ChangeRecord(event_name, keys)))
+
+    def reader(self) -> "LocalStreamReader":
+        """Lector desde el final del stream (como un iterador LATEST)"""
+        with self._lock:
+            return LocalStreamReader(self, self._last)
+
+    def since(self, position: int) -> Tuple[List[ChangeRecord], int, bool]:
+        """Registros posteriores a ``position``, nueva posición y si se perdieron registros"""
+        with self._lock:
+            lost = bool(self._records) and self._records[0][0] > position + 1
+            records = [record for sequence, record in self._records if sequence > position]
+            return records, self._last, lost
+
+
+class LocalStreamReader:
+    def __init__(self, stream: LocalStream, position: int):
+        self.stream = stream
+        self.position = position
+
+    def read(self) -> List[ChangeRecord]:
+        records, self.position, lost = self.stream.since(self.position)
+        return [ChangeRecord(RESET, {})] + records if lost else records
+
+
+class DynamoDBStreamReader:
+    """
+    Lector de todos los shards del stream de una tabla
+
+    Empieza por el final de los shards abiertos (los cambios anteriores ya no
+    importan: la caché se llena después) y lee desde el inicio los shards que
+    aparecen después, que continúan a los que se cierran.
+    """
+
+    def __init__(self, streams_client, dynamodb_client, table_name: str):
+        self.streams = streams_client
+        self.dynamodb = dynamodb_client
+        self.table_name = table_name
+        self._stream_arn: Optional[str] = None
+        self._iterators: Dict[str, Optional[str]] = {}
+        self._finished: set = set()
+        self._reads = 0
+
+    def _discover(self) -> bool:
+        """Agregar los shards nuevos; True si el lector estaba sin iniciar"""
+        initial = self._stream_arn is None
+        if initial:
+            table = self.dynamodb.describe_table(TableName=self.table_name)['Table']
+            self._stream_arn = table.get('LatestStreamArn')
+            if self._stream_arn is None:
+                raise Exception(f"La tabla {self.table_name} no tiene un stream habilitado")
+
+        params = {'StreamArn': self._stream_arn}
+        while True:
+            description = self.streams.describe_stream(**params)['StreamDescription']
+            for shard in description.get('Shards', []):
+                shard_id = shard['ShardId']
+                if shard_id in self._iterators or shard_id in self._finished:
+                    continue
+                closed = 'EndingSequenceNumber' in shard.get('SequenceNumberRange', {})
+                if initial and closed:
+                    self._finished.add(shard_id)
+                    continue
+                self._iterators[shard_id] = self.streams.get_shard_iterator(
+                    StreamArn=self._stream_arn,
+                    ShardId=shard_id,
+                    ShardIteratorType='LATEST' if initial else 'TRIM_HORIZON'
+                )['ShardIterator']
+            if 'LastEvaluatedShardId' not in description:
+                return initial
+            params['ExclusiveStartShardId'] = description['LastEvaluatedShardId']
+
+    def read(self) -> List[ChangeRecord]:
+        if self._stream_arn is None or self._reads % SHARD_REFRESH_READS == 0:
+            self._discover()
+        self._reads += 1
+
+        # Cada shard avanza por separado: un error en un shard no descarta los
+        # registros ya leídos de los demás, y el shard que falla conserva su
+        # iterador para reintentar en la siguiente lectura
+        records: List[ChangeRecord] = []
+        for shard_id, iterator in list(self._iterators.items()):
+            try:
+                response = self.streams.get_records(ShardIterator=iterator, Limit=1000)
+            except ClientError as e:
+                if e.response['Error']['Code'] in ('ExpiredIteratorException', 'TrimmedDataAccessException'):
+                    records.append(ChangeRecord(RESET, {}))
+                    self._restart_shard(shard_id)
+                else:
+                    self._shard_error(shard_id, e)
+                continue
+            except Exception as e:
+                self._shard_error(shard_id, e)
+                continue
+
+            records.extend(
+                ChangeRecord(
+                    record['eventName'],
+                    {name: _deserializer.deserialize(value) for name, value in record['dynamodb']['Keys'].items()}
+                )
+                for record in response.get('Records', [])
+            )
+            next_iterator = response.get('NextShardIterator')
+            if next_iterator is None:
+                # Shard cerrado y leído por completo: sus hijos aparecen en el próximo descubrimiento
+                del self._iterators[shard_id]
+                self._finished.add(shard_id)
+                self._reads = 0
+            else:
+                self._iterators[shard_id] = next_iterator
+        return records
+
+    def _restart_shard(self, shard_id: str) -> None:
+        """Posición perdida: continuar el shard desde el final (el llamador emite RESET)"""
+        logger.warning("Stream position lost for %s (%s): resetting", self.table_name, shard_id)
+        try:
+            self._iterators[shard_id] = self.streams.get_shard_iterator(
+                StreamArn=self._stream_arn, ShardId=shard_id, ShardIteratorType='LATEST'
+            )['ShardIterator']
+        except Exception as e:
+            # Se reintenta con el iterador anterior, que volverá a emitir RESET
+            self._shard_error(shard_id, e)
+
+    def _shard_error(self, shard_id: str, error: Exception) -> None:
+        metrics.increment(f"streams.{self.table_name}.shard_errors")
+        logger.warning("Error reading stream shard %s of %s: %s", shard_id, self.table_name, error)
+
+
+Handler = Callable[[List[ChangeRecord]], None]
+
+
+class StreamConsumer:
+    """Leer periódicamente las fuentes suscritas y entregar los cambios a sus handlers"""
+
+    def __init__(self, poll_interval: float = STREAM_POLL_INTERVAL_SECONDS):
+        self.poll_interval = poll_interval
+        self._subscriptions: List[Tuple[str, str, Any, Handler]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, name: str, tenant: str, reader, handler: Handler) -> None:
+        """
+        Entregar a ``handler`` los cambios de ``reader``
+
+        Args:
+            name: Nombre de la suscripción (métricas y logs)
+            tenant: Tenant con el que se ejecuta el handler (sus cachés)
+            reader: Fuente con ``read()`` (DynamoDBStreamReader o LocalStreamReader)
+            handler: Función que recibe la lista de cambios
+        """
+        self._subscriptions.append((name, tenant, reader, handler))
+
+    def poll(self) -> int:
+        """Leer cada fuente una vez; devuelve el número de cambios entregados"""
+        delivered = 0
+        for name, tenant, reader, handler in self._subscriptions:
+            try:
+                records = reader.read()
+                if records:
+                    with tenant_context(tenant):
+                        handler(records)
+                    metrics.increment(f"streams.{name}.records", len(records))
+                    delivered += len(records)
+            except Exception as e:
+                metrics.increment(f"streams.{name}.errors")
+                logger.error("Error consuming stream %s: %s", name, e)
+        return delivered
+
+    async def _run(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.to_thread(self.poll)
+            await asyncio.sleep(max(0.0, self.poll_interval - (time.monotonic() - started)))
+
+    async def start(self) -> None:
+        """Iniciar la lectura periódica en segundo plano"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Detener la lectura periódica"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Instancia global del consumidor
+stream_consumer = StreamConsumer()
@@ -0,0 +1,226 @@
+"""
+Limitación de tasa del lado del cliente para las tablas de DynamoDB
+
+Cada tabla tiene un token bucket para lecturas y otro para escrituras. Una
+operación espera un token (como máximo DYNAMODB_THROTTLE_MAX_WAIT_SECONDS)
+antes de llamar a DynamoDB, de modo que una ráfaga se convierte en algo más de
+latencia en lugar de en errores de capacidad. Si aun así DynamoDB responde con
+throttling después de los reintentos adaptativos de botocore, el error se
+convierte en ``DatabaseThrottledException`` (503 con Retry-After).
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from app.config import (
+    DYNAMODB_READ_RATE, DYNAMODB_WRITE_RATE, DYNAMODB_THROTTLE_MAX_WAIT_SECONDS,
+    DYNAMODB_THROTTLE_RETRY_AFTER_SECONDS
+)
+from app.exceptions import DatabaseThrottledException
+from app.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Códigos de error de DynamoDB que indican falta de capacidad
+THROTTLE_ERROR_CODES = frozenset({
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+})
+
+# Códigos de cancelación de TransactWriteItems equivalentes
+THROTTLE_CANCELLATION_CODES = frozenset({"ThrottlingError", "ProvisionedThroughputExceeded"})
+
+READ_OPERATIONS = frozenset({"get_item", "query", "scan"})
+WRITE_OPERATIONS = frozenset({"put_item", "update_item", "delete_item"})
+
+
+def is_throttle_error(error: ClientError) -> bool:
+    """Indicar si un ClientError se debe a falta de capacidad"""
+    return error.response.get("Error", {}).get("Code") in THROTTLE_ERROR_CODES
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe
+
+    Args:
+        rate: Tokens repuestos por segundo (0 desactiva la limitación)
+        capacity: Máximo de tokens acumulables (por defecto, un segundo de tasa)
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Reservar tokens y devolver cuántos segundos hay que esperar para usarlos
+
+        Los tokens quedan descontados aunque haya que esperar, de modo que las
+        peticiones concurrentes se reparten la espera en orden de llegada.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self, tokens: float = 1.0) -> None:
+        """Devolver tokens reservados que no se usaron"""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def acquire(self, tokens: float = 1.0, max_wait: float = float("inf"), sleep=time.sleep) -> bool:
+        """Esperar hasta obtener tokens; False si la espera superaría max_wait"""
+        wait = self.reserve(tokens)
+        if wait > max_wait:
+            self.refund(tokens)
+            return False
+        if wait > 0:
+            sleep(wait)
+        return True
+
+
+class ThrottledTable:
+    """
+    Envoltura de ``Table`` de boto3 con limitación de tasa y errores de throttling tipados
+
+    Las operaciones no limitadas (``name``, ``batch_writer``, ``meta``...) se
+    delegan sin cambios en la tabla original. La espera de un token bloquea el
+    hilo que llama: desde código async las operaciones se ejecutan con
+    ``asyncio.to_thread`` para no detener el event loop.
+    """
+
+    def __init__(
+        self,
+        table,
+        read_bucket: TokenBucket,
+        write_bucket: TokenBucket,
+        max_wait: float = DYNAMODB_THROTTLE_MAX_WAIT_SECONDS,
+        retry_after: int = DYNAMODB_THROTTLE_RETRY_AFTER_SECONDS
+    ):
+        self._table = table
+        self._read_bucket = read_bucket
+        self._write_bucket = write_bucket
+        self._max_wait = max_wait
+        self._retry_after = retry_after
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._table, name)
+        if name in READ_OPERATIONS:
+            return self._wrap(attribute, self._read_bucket, "read")
+        if name in WRITE_OPERATIONS:
+            return self._wrap(attribute, self._write_bucket, "write")
+        return attribute
+
+    def _wrap(self, operation, bucket: TokenBucket, kind: str):
+        table_name = self._table.name
+
+        def call(*args, **kwargs):
+            if not bucket.acquire(max_wait=self._max_wait):
+                metrics.increment(f"dynamodb.{table_name}.{kind}_rate_limited")
+                logger.warning("Client-side rate limit exceeded for %s (%s)", table_name, kind)
+                raise DatabaseThrottledException(table_name, self._retry_after)
+            try:
+                return operation(*args, **kwargs)
+            except ClientError as e:
+                if is_throttle_error(e):
+                    metrics.increment(f"dynamodb.{table_name}.throttled")
+                    logger.warning("DynamoDB throttled %s after retries: %s", table_name, e)
+                    raise DatabaseThrottledException(table_name, self._retry_after) from e
+                raise
+
+        return call
+
+
+class TableRateLimiter:
+    """Token buckets de lectura y escritura por tabla"""
+
+    def __init__(self, read_rate: float = DYNAMODB_READ_RATE, write_rate: float = DYNAMODB_WRITE_RATE):
+        self.read_rate = read_rate
+        self.write_rate = write_rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def buckets(self, table_name: str):
+        """Obtener (o crear) los buckets de lectura y escritura de una tabla"""
+        with self._lock:
+            if table_name not in self._buckets:
+                self._buckets[table_name] = (TokenBucket(self.read_rate), TokenBucket(self.write_rate))
+            return self._buckets[table_name]
+
+    def acquire_transaction(
+        self,
+        actions: List[dict],
+        max_wait: float = DYNAMODB_THROTTLE_MAX_WAIT_SECONDS,
+        retry_after: int = DYNAMODB_THROTTLE_RETRY_AFTER_SECONDS,
+        sleep=time.sleep
+    ) -> None:
+        """
+        Tomar los tokens de una TransactWriteItems: uno por acción en el bucket de su tabla
+
+        ``ConditionCheck`` usa el bucket de lectura y las demás acciones el de
+        escritura. Las esperas de los distintos buckets se solapan (se espera la
+        mayor); si alguna supera ``max_wait`` se devuelven todos los tokens.
+
+        Raises:
+            DatabaseThrottledException: Si algún bucket no da sus tokens a tiempo
+        """
+        demand: Dict[Tuple[str, str], int] = {}
+        for action in actions:
+            (operation, params), = action.items()
+            kind = "read" if operation == "ConditionCheck" else "write"
+            demand[(params['TableName'], kind)] = demand.get((params['TableName'], kind), 0) + 1
+
+        reserved, wait = [], 0.0
+        for (table_name, kind), tokens in demand.items():
+            read_bucket, write_bucket = self.buckets(table_name)
+            bucket = read_bucket if kind == "read" else write_bucket
+            reserved.append((bucket, tokens))
+            wait = max(wait, bucket.reserve(tokens))
+            if wait > max_wait:
+                for bucket, tokens in reserved:
+                    bucket.refund(tokens)
+                metrics.increment(f"dynamodb.{table_name}.{kind}_rate_limited")
+                logger.warning("Client-side rate limit exceeded for %s (%s, transaction)", table_name, kind)
+                raise DatabaseThrottledException(table_name, retry_after)
+        if wait > 0:
+            sleep(wait)
+
+    def wrap(self, table) -> ThrottledTable:
+        """Envolver una tabla con sus buckets"""
+        read_bucket, write_bucket = self.buckets(table.name)
+        return ThrottledTable(table, read_bucket, write_bucket)
+
+
+def count_throttle_retries(response=None, operation=None, **kwargs):
+    """
+    Manejador del evento ``needs-retry`` de botocore que cuenta los throttling
+
+    No cambia la decisión de reintento (devuelve None): solo registra cada
+    respuesta de DynamoDB rechazada por capacidad, se reintente o no.
+    """
+    if not isinstance(response, tuple) or len(response) < 2 or not response[1]:
+        return None
+    if response[1].get("Error", {}).get("Code") in THROTTLE_ERROR_CODES:
+        metrics.increment("dynamodb.throttle_events")
+        logger.info("DynamoDB throttled %s", getattr(operation, 'name', 'request'))
+    return None
@@ -0,0 +1,317 @@
+"""
+Buffer de escritura diferida (write-behind) para la tabla Transactions
+
+Las transacciones se agregan a un log local durable (SQLite en modo WAL) y un
+proceso en segundo plano las envía a DynamoDB con ``BatchWriteItem`` en grupos
+de 25. Las filas solo se eliminan del log después de que DynamoDB confirma la
+escritura, por lo que al reiniciar se reenvía lo pendiente. Las escrituras son
+``PutRequest`` con el mismo ``transactionId``, así que un reenvío es idempotente.
+
+Durabilidad: con ``synchronous=FULL`` (por defecto) cada ``append`` confirmado
+sobrevive a un corte de energía. ``NORMAL`` en modo WAL es más rápido pero
+puede perder las últimas transacciones confirmadas si el sistema operativo se
+cae (un fallo del proceso no pierde datos en ninguno de los dos modos).
+
+Un lote que DynamoDB rechaza ``max_failures`` veces con un error no
+recuperable (p. ej. un item inválido) se mueve a la tabla ``dead_letter`` del
+mismo log para no bloquear los lotes siguientes; ``requeue_dead_letters`` lo
+devuelve a la cola. Los errores transitorios (throttling, errores internos o
+de conexión) no cuentan: el lote se reintenta con backoff exponencial.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from boto3.dynamodb.types import TypeSerializer, TypeDeserializer
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.config import (
+    TRANSACTION_BUFFER_PATH, TRANSACTION_FLUSH_INTERVAL_SECONDS, TRANSACTION_BATCH_MAX_RETRIES,
+    TRANSACTION_BUFFER_SYNCHRONOUS, TRANSACTION_BATCH_MAX_FAILURES
+)
+from app.database.throttle import is_throttle_error
+from app.exceptions import DatabaseThrottledException
+from app.metrics import metrics
+from app.tenancy import DEFAULT_TENANT, PerTenant, physical_table_name
+
+logger = logging.getLogger(__name__)
+
+# Máximo de elementos permitidos por DynamoDB en un BatchWriteItem
+BATCH_SIZE = 25
+
+# Espera máxima entre envíos cuando DynamoDB no acepta escrituras (segundos)
+MAX_BACKOFF_SECONDS = 30.0
+
+# Errores de DynamoDB transitorios además del throttling
+TRANSIENT_ERROR_CODES = frozenset({"InternalServerError", "ServiceUnavailable", "TransactionInProgressException"})
+
+# Modos de sincronización de SQLite aceptados para el log local
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+class TransactionWriteBuffer:
+    """Log local de transacciones pendientes con envío por lotes a DynamoDB"""
+
+    def __init__(
+        self,
+        table_name: str,
+        path: str = TRANSACTION_BUFFER_PATH,
+        flush_interval: float = TRANSACTION_FLUSH_INTERVAL_SECONDS,
+        max_retries: int = TRANSACTION_BATCH_MAX_RETRIES,
+        max_failures: int = TRANSACTION_BATCH_MAX_FAILURES,
+        synchronous: str = TRANSACTION_BUFFER_SYNCHRONOUS,
+        client=None,
+        tenant: str = DEFAULT_TENANT
+    ):
+        self.table_name = table_name
+        self.tenant = tenant
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.max_failures = max_failures
+        self.synchronous = synchronous.upper()
+        if self.synchronous not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Modo synchronous no soportado: {synchronous}")
+        self._client = client
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._serializer = TypeSerializer()
+        self._deserializer = TypeDeserializer()
+
+    def _get_client(self):
+        """Obtener el cliente de DynamoDB (inyectado o el global)"""
+        if self._client is None:
+            from app.database.client import db_client
+            self._client = db_client.get_client()
+        return self._client
+
+    def _get_connection(self) -> sqlite3.Connection:
+        """Abrir el log local de forma perezosa"""
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(f"PRAGMA synchronous={self.synchronous}")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS pending ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, item TEXT NOT NULL, "
+                "attempts INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(pending)")]
+            if 'attempts' not in columns:
+                # Log creado por una versión anterior, sin contador de envíos fallidos
+                connection.execute("ALTER TABLE pending ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS dead_letter ("
+                "seq INTEGER PRIMARY KEY, item TEXT NOT NULL, error TEXT NOT NULL, failed_at REAL NOT NULL)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def append(self, item: dict) -> None:
+        """Agregar un item de transacción al log local"""
+        serialized = {key: self._serializer.serialize(value) for key, value in item.items()}
+        with self._lock:
+            self._get_connection().execute(
+                "INSERT INTO pending (item) VALUES (?)", (json.dumps(serialized),)
+            )
+
+    def pending_count(self) -> int:
+        """Número de transacciones pendientes de enviar"""
+        with self._lock:
+            return self._get_connection().execute("SELECT COUNT(*) FROM pending").fetchone()[0]
+
+    def pending_items(self) -> List[dict]:
+        """Items pendientes, deserializados, en orden de llegada"""
+        with self._lock:
+            rows = self._get_connection().execute("SELECT item FROM pending ORDER BY seq").fetchall()
+        return [
+            {key: self._deserializer.deserialize(value) for key, value in json.loads(row[0]).items()}
+            for row in rows
+        ]
+
+    def dead_letter_count(self) -> int:
+        """Número de transacciones apartadas por fallar repetidamente"""
+        with self._lock:
+            return self._get_connection().execute("SELECT COUNT(*) FROM dead_letter").fetchone()[0]
+
+    def requeue_dead_letters(self) -> int:
+        """
+        Devolver las transacciones apartadas a la cola de envío (p. ej. tras corregir la causa)
+
+        Returns:
+            int: Número de transacciones devueltas
+        """
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute("INSERT INTO pending (item) SELECT item FROM dead_letter ORDER BY seq")
+                return connection.execute("DELETE FROM dead_letter").rowcount
+
+    def _next_batch(self) -> List[Tuple[int, dict]]:
+        with self._lock:
+            rows = self._get_connection().execute(
+                "SELECT seq, item FROM pending ORDER BY seq LIMIT ?", (BATCH_SIZE,)
+            ).fetchall()
+        return [(seq, json.loads(item)) for seq, item in rows]
+
+    def _delete(self, seqs: List[int]) -> None:
+        with self._lock:
+            self._get_connection().execute(
+                f"DELETE FROM pending WHERE seq IN ({','.join('?' * len(seqs))})", seqs
+            )
+
+    def _record_failure(self, seqs: List[int], error: Exception) -> bool:
+        """
+        Contar un envío fallido del lote y apartarlo si alcanzó ``max_failures``
+
+        Returns:
+            bool: True si el lote se movió a dead_letter
+        """
+        placeholders = ','.join('?' * len(seqs))
+        with self._lock:
+            connection = self._get_connection()
+            with connection:
+                connection.execute("BEGIN IMMEDIATE")
+                connection.execute(f"UPDATE pending SET attempts = attempts + 1 WHERE seq IN ({placeholders})", seqs)
+                attempts = connection.execute(
+                    f"SELECT MAX(attempts) FROM pending WHERE seq IN ({placeholders})", seqs
+                ).fetchone()[0]
+                if self.max_failures <= 0 or attempts < self.max_failures:
+                    return False
+                connection.execute(
+                    f"INSERT INTO dead_letter (seq, item, error, failed_at) "
+                    f"SELECT seq, item, ?, ? FROM pending WHERE seq IN ({placeholders})",
+                    [str(error), time.time(), *seqs]
+                )
+                connection.execute(f"DELETE FROM pending WHERE seq IN ({placeholders})", seqs)
+
+        metrics.increment(f"write_buffer.{self.table_name}.dead_lettered", len(seqs))
+        logger.error(
+            "Moved %s buffered transactions of %s to dead letter after %s failed flushes: %s",
+            len(seqs), self.table_name, attempts, error
+        )
+        return True
+
+    def _batch_write(self, items: List[dict]) -> None:
+        """Enviar un lote reintentando los UnprocessedItems con backoff exponencial y jitter"""
+        requests = [{'PutRequest': {'Item': item}} for item in items]
+        client = self._get_client()
+        name = physical_table_name(self.table_name, self.tenant)
+
+        for attempt in range(self.max_retries + 1):
+            response = client.batch_write_item(RequestItems={name: requests})
+            requests = response.get('UnprocessedItems', {}).get(name, [])
+            if not requests:
+                return
+            if attempt < self.max_retries:
+                time.sleep(random.uniform(0, min(2.0, 0.05 * 2 ** attempt)))
+
+        # Items sin procesar tras los reintentos: DynamoDB no tiene capacidad
+        raise DatabaseThrottledException(name, 1)
+
+    def flush(self) -> int:
+        """
+        Enviar todas las transacciones pendientes a DynamoDB
+
+        Returns:
+            int: Número de transacciones enviadas
+        """
+        flushed = 0
+        with self._flush_lock:
+            while True:
+                batch = self._next_batch()
+                if not batch:
+                    break
+                seqs = [seq for seq, _ in batch]
+                try:
+                    self._batch_write([item for _, item in batch])
+                except Exception as e:
+                    # Un error transitorio no cuenta: el lote se reintenta en el próximo envío.
+                    # Uno no recuperable bloquea la cola solo hasta agotar max_failures
+                    if is_retryable(e) or not self._record_failure(seqs, e):
+                        raise
+                    continue
+                self._delete(seqs)
+                flushed += len(batch)
+
+        if flushed:
+            logger.info("Flushed %s buffered transactions to %s", flushed, self.table_name)
+        return flushed
+
+    def retry_delay(self, failures: int) -> float:
+        """Espera antes del próximo envío tras ``failures`` envíos fallidos seguidos (backoff con jitter)"""
+        if not failures:
+            return self.flush_interval
+        return random.uniform(self.flush_interval, min(MAX_BACKOFF_SECONDS, self.flush_interval * 2 ** failures))
+
+    async def _run(self) -> None:
+        failures = 0
+        while True:
+            await asyncio.sleep(self.retry_delay(failures))
+            try:
+                await asyncio.to_thread(self.flush)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                logger.error("Error flushing transaction buffer (attempt %s): %s", failures, e)
+
+    async def start(self) -> None:
+        """Reenviar lo pendiente de una ejecución anterior e iniciar el envío periódico"""
+        recovered = await asyncio.to_thread(self.flush)
+        if recovered:
+            logger.info("Recovered %s transactions from %s", recovered, self.path)
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Detener el envío periódico y vaciar el buffer"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+    def close(self) -> None:
+        """Cerrar el log local"""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Indicar si un error de envío es transitorio (throttling, error interno o de conexión)"""
+    if isinstance(error, (DatabaseThrottledException, BotoCoreError)):
+        return True
+    if isinstance(error, ClientError):
+        return is_throttle_error(error) or error.response.get('Error', {}).get('Code') in TRANSIENT_ERROR_CODES
+    return False
+
+
+def buffer_path(tenant: str, path: str = TRANSACTION_BUFFER_PATH) -> str:
+    """Log local de un tenant: el configurado para el tenant por defecto, <nombre>.<tenant><ext> para los demás"""
+    if not tenant:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}.{tenant}{extension}"
+
+
+# Un buffer (y un log local) por tenant: se vacía en las tablas de su tenant
+transaction_buffers = PerTenant(
+    lambda tenant: TransactionWriteBuffer("Transactions", buffer_path(tenant), tenant=tenant)
+)
+
+# Instancia global del buffer del tenant por defecto
+transaction_buffer = transaction_buffers.get(DEFAULT_TENANT)
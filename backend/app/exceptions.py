@@ -56,6 +56,19 @@ class DatabaseException(Exception):
     def __init__(self, message: str):
         super().__init__(f"Error de base de datos: {message}")
 
+class DatabaseThrottledException(DatabaseException):
+    """Excepción cuando DynamoDB (o el limitador local) rechaza la operación por capacidad"""
+    def __init__(self, table_name: str, retry_after: int):
+        self.table_name = table_name
+        self.retry_after = retry_after
+        super().__init__(f"capacidad excedida en la tabla {table_name}, reintente en {retry_after}s")
+
+class LedgerConflictException(DatabaseException):
+    """Excepción cuando escrituras concurrentes impiden agregar un evento al libro mayor"""
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        super().__init__(f"escrituras concurrentes en el libro mayor del usuario {user_id}")
+
 class ValidationException(Exception):
     """Excepción para errores de validación de datos"""
     def __init__(self, message: str):
@@ -0,0 +1,200 @@
+"""
+Logging estructurado, muestreado y sin bloqueo
+
+Los registros se emiten como una línea JSON por evento (o texto, con
+LOG_FORMAT=text) e incluyen el identificador de la petición en curso
+(``request_id``) para correlacionar los eventos de una misma petición.
+
+El camino de la petición solo crea el registro y lo deja en una cola: el
+formateo y la escritura los hace un hilo en segundo plano (QueueListener). Los
+eventos INFO/DEBUG de los loggers de alta frecuencia se muestrean según
+LOG_SAMPLE_RATES antes de encolarse; WARNING o superior siempre se conservan.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Optional, TextIO
+
+from app.config import LOG_LEVEL, LOG_FORMAT, LOG_QUEUE_ENABLED, LOG_SAMPLE_RATES
+from app.metrics import metrics
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+
+# Identificador de la petición en curso (lo fija RequestIdMiddleware)
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# Atributos propios de LogRecord: el resto son campos pasados con ``extra``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id", "taskName"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Agregar el request_id del contexto actual al registro"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request_id = request_id_var.get()
+        if request_id is not None:
+            record.request_id = request_id
+        return True
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Convertir "logger=0.1,otro=0.5" en {logger: tasa}"""
+    rates = {}
+    for entry in value.split(","):
+        name, _, rate = entry.strip().partition("=")
+        if name and rate:
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Conservar solo una fracción de los eventos INFO/DEBUG de ciertos loggers
+
+    La tasa de un logger es la del prefijo configurado más específico
+    (``app.services`` aplica a ``app.services.user_service``).
+    """
+
+    def __init__(self, rates: Dict[str, float], rand: Callable[[], float] = random.random):
+        super().__init__()
+        self.rates = rates
+        self._rand = rand
+        self._resolved: Dict[str, float] = {}
+
+    def rate_for(self, name: str) -> float:
+        rate = self._resolved.get(name)
+        if rate is None:
+            rate = 1.0
+            prefix = name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition(".")[0]
+            self._resolved[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate_for(record.name)
+        if rate >= 1.0 or self._rand() < rate:
+            return True
+        metrics.increment("logging.sampled_out")
+        return False
+
+
+class JsonFormatter(logging.Formatter):
+    """Formatear cada registro como un objeto JSON en una línea"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id is not None:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler que encola el registro sin formatearlo
+
+    ``QueueHandler.prepare`` formatea el mensaje en el hilo que registra el
+    evento; aquí se difiere al hilo del listener. Los argumentos se conservan
+    por referencia, así que no deben mutarse después de registrar el evento.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def build_formatter(fmt: str = LOG_FORMAT) -> logging.Formatter:
+    if fmt == "text":
+        return logging.Formatter(TEXT_FORMAT, defaults={"request_id": "-"})
+    return JsonFormatter()
+
+
+_handler: Optional[logging.Handler] = None
+_listener: Optional[QueueListener] = None
+_output: Optional[logging.Handler] = None
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    fmt: str = LOG_FORMAT,
+    sample_rates: str = LOG_SAMPLE_RATES,
+    use_queue: bool = LOG_QUEUE_ENABLED,
+    stream: Optional[TextIO] = None
+) -> logging.Handler:
+    """
+    Configurar el logger raíz y devolver el handler instalado
+
+    Puede llamarse varias veces: reemplaza solo el handler instalado por la
+    llamada anterior y conserva los de terceros (pytest, uvicorn...).
+    """
+    global _handler, _listener, _output
+    stop_logging()
+    root = logging.getLogger()
+    for previous in (_handler, _output):
+        if previous is not None:
+            root.removeHandler(previous)
+
+    output = logging.StreamHandler(stream if stream is not None else sys.stdout)
+    output.setFormatter(build_formatter(fmt))
+
+    if use_queue:
+        handler = DeferredQueueHandler(queue.SimpleQueue())
+        _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+        _listener.start()
+    else:
+        handler = output
+
+    # Los filtros del handler se ejecutan en el hilo que registra el evento,
+    # donde está el contexto de la petición y antes de pagar el encolado
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(SamplingFilter(parse_sample_rates(sample_rates)))
+
+    root.addHandler(handler)
+    root.setLevel(level)
+    _handler, _output = handler, output
+    return handler
+
+
+def stop_logging() -> None:
+    """
+    Vaciar la cola y detener el hilo de escritura
+
+    Los eventos posteriores se escriben de forma síncrona en la salida.
+    """
+    global _handler, _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+
+    root = logging.getLogger()
+    root.removeHandler(_handler)
+    _output.filters = list(_handler.filters)
+    root.addHandler(_output)
+    _handler = _output
+
+
+atexit.register(stop_logging)
@@ -2,13 +2,25 @@ from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
-from app.routes import health, funds, subscriptions, transactions, settings
+from app.routes import health, funds, subscriptions, transactions, settings, portfolio, ledger
 from app.database.init import initialize_database
+from app.database.write_buffer import transaction_buffers
+from app.cache.backends import shared_backend
+from app.config import (
+    TRANSACTION_WRITE_BEHIND_ENABLED, COMPRESSION_ENABLED, ADMISSION_CONTROL_ENABLED, CACHE_STREAM_INVALIDATION_ENABLED
+)
+from app.database.streams import stream_consumer
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.request_id import RequestIdMiddleware
+from app.middleware.tenant import TenantMiddleware
+from app.tenancy import MULTI_TENANT, all_tenants, physical_table_name
+from app.logging_config import configure_logging, stop_logging
 from app.exceptions import *
 import logging
 
-# Configurar logging
-logging.basicConfig(level=logging.INFO)
+# Configurar logging (JSON, en segundo plano y con muestreo; ver LOG_* en config)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Cargar variables de entorno
@@ -23,6 +35,15 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Rechazar rápido el exceso de escrituras (el más interno: los 503 llevan cabeceras CORS)
+if ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(AdmissionControlMiddleware)
+
+# Tenant de la petición: tablas, cachés y límites propios de cada tenant (envuelve
+# a la admisión para que cada tenant tenga su propio límite de peticiones en curso)
+if MULTI_TENANT:
+    app.add_middleware(TenantMiddleware)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -32,17 +53,26 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Comprimir respuestas grandes (historial de transacciones, catálogo)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Identificador de petición en los logs y en X-Request-ID (el más externo)
+app.add_middleware(RequestIdMiddleware)
+
 # Incluir todas las rutas
 app.include_router(health.router, prefix="/api/v1", tags=["health"])
 app.include_router(funds.router, prefix="/api/v1/funds", tags=["funds"])
 app.include_router(subscriptions.router, prefix="/api/v1", tags=["subscriptions"])
 app.include_router(transactions.router, prefix="/api/v1/transactions", tags=["transactions"])
 app.include_router(settings.router, prefix="/api/v1/settings", tags=["settings"])
+app.include_router(portfolio.router, prefix="/api/v1/portfolio", tags=["portfolio"])
+app.include_router(ledger.router, prefix="/api/v1/ledger", tags=["ledger"])
 
 # Manejadores de errores globales
 @app.exception_handler(FundNotFoundException)
 async def fund_not_found_handler(request: Request, exc: FundNotFoundException):
-    logger.warning(f"Fund not found: {exc.fund_id}")
+    logger.warning("Fund not found: %s", exc.fund_id)
     return JSONResponse(
         status_code=404,
         content={"error": "Fund not found", "detail": str(exc), "fund_id": exc.fund_id}
@@ -50,7 +80,7 @@ async def fund_not_found_handler(request: Request, exc: FundNotFoundException):
 
 @app.exception_handler(UserNotFoundException)
 async def user_not_found_handler(request: Request, exc: UserNotFoundException):
-    logger.warning(f"User not found: {exc.user_id}")
+    logger.warning("User not found: %s", exc.user_id)
     return JSONResponse(
         status_code=404,
         content={"error": "User not found", "detail": str(exc), "user_id": exc.user_id}
@@ -58,7 +88,7 @@ async def user_not_found_handler(request: Request, exc: UserNotFoundException):
 
 @app.exception_handler(InsufficientBalanceException)
 async def insufficient_balance_handler(request: Request, exc: InsufficientBalanceException):
-    logger.warning(f"Insufficient balance: required={exc.required_amount}, current={exc.current_balance}")
+    logger.warning("Insufficient balance: required=%s, current=%s", exc.required_amount, exc.current_balance)
     return JSONResponse(
         status_code=400,
         content={
@@ -71,7 +101,7 @@ async def insufficient_balance_handler(request: Request, exc: InsufficientBalanc
 
 @app.exception_handler(AlreadySubscribedException)
 async def already_subscribed_handler(request: Request, exc: AlreadySubscribedException):
-    logger.warning(f"Already subscribed: user={exc.user_id}, fund={exc.fund_id}")
+    logger.warning("Already subscribed: user=%s, fund=%s", exc.user_id, exc.fund_id)
     return JSONResponse(
         status_code=409,
         content={
@@ -84,7 +114,7 @@ async def already_subscribed_handler(request: Request, exc: AlreadySubscribedExc
 
 @app.exception_handler(NotSubscribedException)
 async def not_subscribed_handler(request: Request, exc: NotSubscribedException):
-    logger.warning(f"Not subscribed: user={exc.user_id}, fund={exc.fund_id}")
+    logger.warning("Not subscribed: user=%s, fund=%s", exc.user_id, exc.fund_id)
     return JSONResponse(
         status_code=400,
         content={
@@ -97,7 +127,7 @@ async def not_subscribed_handler(request: Request, exc: NotSubscribedException):
 
 @app.exception_handler(InvalidNotificationTypeException)
 async def invalid_notification_type_handler(request: Request, exc: InvalidNotificationTypeException):
-    logger.warning(f"Invalid notification type: {exc.notification_type}")
+    logger.warning("Invalid notification type: %s", exc.notification_type)
     return JSONResponse(
         status_code=400,
         content={
@@ -107,9 +137,22 @@ async def invalid_notification_type_handler(request: Request, exc: InvalidNotifi
         }
     )
 
+@app.exception_handler(DatabaseThrottledException)
+async def database_throttled_handler(request: Request, exc: DatabaseThrottledException):
+    logger.warning("Database throttled: table=%s", exc.table_name)
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+        content={
+            "error": "Service temporarily unavailable",
+            "detail": str(exc),
+            "retry_after": exc.retry_after
+        }
+    )
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+    logger.error("Unhandled exception: %s", exc, exc_info=True)
     return JSONResponse(
         status_code=500,
         content={
@@ -126,18 +169,18 @@ async def startup_event():
     from app.database.client import db_client
     
     logger.info("Starting Plataforma de Fondos API...")
-    logger.info(f"Environment detected: {ENVIRONMENT}")
+    logger.info("Environment detected: %s", ENVIRONMENT)
     
     if should_auto_initialize_db():
-        logger.info(f"🔧 {ENVIRONMENT.title()} environment - Auto-initializing database...")
+        logger.info("🔧 %s environment - Auto-initializing database...", ENVIRONMENT.title())
         try:
             initialize_database()
             logger.info("✅ Database auto-initialization completed successfully")
         except Exception as e:
-            logger.error(f"❌ Database initialization failed: {str(e)}")
+            logger.error("❌ Database initialization failed: %s", e)
             raise
     else:
-        logger.info(f"🏭 Production environment detected - Database auto-initialization disabled")
+        logger.info("🏭 Production environment detected - Database auto-initialization disabled")
         logger.info("💡 Expecting database to be pre-configured via Infrastructure as Code")
         
         # Solo verificar conectividad en producción
@@ -148,13 +191,47 @@ async def startup_event():
                 logger.warning("⚠️ Database connectivity check failed")
                 raise Exception("Database connectivity verification failed")
         except Exception as e:
-            logger.error(f"❌ Database connectivity error: {str(e)}")
+            logger.error("❌ Database connectivity error: %s", e)
             raise
+    
+    if TRANSACTION_WRITE_BEHIND_ENABLED:
+        logger.info("Starting transaction write-behind buffer...")
+        for tenant in all_tenants():
+            await transaction_buffers.get(tenant).start()
+    
+    if CACHE_STREAM_INVALIDATION_ENABLED:
+        logger.info("Starting cache invalidation stream consumer...")
+        subscribe_cache_streams()
+        await stream_consumer.start()
+
+def subscribe_cache_streams():
+    """Suscribir las cachés de fondos y usuarios de cada tenant a los streams de sus tablas"""
+    from app.database.client import db_client
+    from app.services.fund_service import fund_service
+    from app.services.user_service import user_service
+    
+    for tenant in all_tenants():
+        for table, handler in (("Funds", fund_service.on_fund_changes), ("User", user_service.on_user_changes)):
+            name = physical_table_name(table, tenant)
+            stream_consumer.subscribe(name, tenant, db_client.open_stream(name), handler)
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Eventos de cierre de la aplicación"""
     logger.info("Shutting down Plataforma de Fondos API...")
+    
+    if TRANSACTION_WRITE_BEHIND_ENABLED:
+        for buffer in transaction_buffers.instances().values():
+            await buffer.stop()
+    
+    if CACHE_STREAM_INVALIDATION_ENABLED:
+        await stream_consumer.stop()
+    
+    if shared_backend is not None:
+        shared_backend.close()
+    
+    # Vaciar los logs pendientes antes de terminar
+    stop_logging()
 
 @app.get("/")
 async def root():
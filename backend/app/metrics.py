@@ -0,0 +1,57 @@
+"""
+Registro de métricas en proceso (contadores y gauges)
+
+Los contadores se exponen en GET /api/v1/metrics para diagnóstico y para que
+un agente externo los recolecte.
+"""
+import threading
+from collections import defaultdict
+
+
+class MetricsRegistry:
+    """Contadores y valores instantáneos (gauges) thread-safe identificados por nombre"""
+
+    def __init__(self):
+        self._counters = defaultdict(int)
+        self._gauges = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: int = 1) -> None:
+        """Incrementar un contador"""
+        with self._lock:
+            self._counters[name] += value
+
+    def get(self, name: str) -> int:
+        """Valor actual de un contador"""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Fijar el valor actual de un gauge"""
+        with self._lock:
+            self._gauges[name] = value
+
+    def get_gauge(self, name: str):
+        """Valor actual de un gauge (None si no existe)"""
+        with self._lock:
+            return self._gauges.get(name)
+
+    def snapshot(self) -> dict:
+        """Copia de todos los contadores"""
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def gauges(self) -> dict:
+        """Copia de todos los gauges"""
+        with self._lock:
+            return dict(sorted(self._gauges.items()))
+
+    def reset(self) -> None:
+        """Reiniciar todos los contadores y gauges"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+# Instancia global del registro
+metrics = MetricsRegistry()
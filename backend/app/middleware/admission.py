@@ -0,0 +1,187 @@
+"""
+Middleware ASGI de control de admisión para los endpoints de escritura
+
+Cada ruta protegida tiene un límite de peticiones en curso y una cola corta y
+acotada. Las peticiones que no caben en la cola, o que esperan más de
+ADMISSION_QUEUE_TIMEOUT_SECONDS, reciben de inmediato un 503 con Retry-After
+en lugar de iniciar su secuencia de llamadas a DynamoDB y expirar todas juntas.
+
+El límite se adapta con AIMD según la latencia observada de DynamoDB: si la
+media supera ADMISSION_TARGET_LATENCY_MS el límite se reduce de forma
+multiplicativa, y si la latencia es buena y hubo peticiones esperando crece de
+a una, entre ADMISSION_MIN_IN_FLIGHT y ADMISSION_MAX_IN_FLIGHT.
+
+Con varios tenants cada uno tiene sus propios controladores: un tenant
+saturado es rechazado sin ocupar los lugares de los demás.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import (
+    ADMISSION_ROUTES, ADMISSION_INITIAL_IN_FLIGHT, ADMISSION_MIN_IN_FLIGHT, ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_QUEUE, ADMISSION_QUEUE_TIMEOUT_SECONDS, ADMISSION_TARGET_LATENCY_MS,
+    ADMISSION_ADJUST_INTERVAL_SECONDS, ADMISSION_RETRY_AFTER_SECONDS
+)
+from app.database.latency import LatencyTracker, dynamodb_latency
+from app.metrics import metrics
+from app.tenancy import PerTenant, scoped_key
+
+# Factor de reducción multiplicativa del límite cuando la latencia es alta
+DECREASE_FACTOR = 0.75
+
+
+class AdmissionController:
+    """Límite adaptativo de peticiones en curso con cola acotada"""
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = ADMISSION_INITIAL_IN_FLIGHT,
+        min_limit: int = ADMISSION_MIN_IN_FLIGHT,
+        max_limit: int = ADMISSION_MAX_IN_FLIGHT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        queue_timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        target_latency: float = ADMISSION_TARGET_LATENCY_MS / 1000,
+        adjust_interval: float = ADMISSION_ADJUST_INTERVAL_SECONDS,
+        latency: LatencyTracker = dynamodb_latency,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.adjust_interval = adjust_interval
+        self.latency = latency
+        self._clock = clock
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self._saturated = False
+        self._adjusted_at = clock()
+        metrics.set_gauge(f"admission.{name}.limit", self.limit)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> bool:
+        """Obtener un lugar; False si la petición debe rechazarse"""
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            return True
+
+        self._saturated = True
+        if len(self._waiters) >= self.max_queue:
+            metrics.increment(f"admission.{self.name}.rejected")
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        metrics.increment(f"admission.{self.name}.queued")
+        try:
+            # release() incrementa in_flight al despertar al que espera
+            return await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            metrics.increment(f"admission.{self.name}.timed_out")
+            return False
+
+    def release(self) -> None:
+        """Liberar un lugar, ajustar el límite y despertar a los que esperan"""
+        self.in_flight -= 1
+        self._adjust()
+        while self._waiters and self.in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(True)
+
+    def _adjust(self) -> None:
+        """AIMD: reducir si DynamoDB está lento, crecer si hay demanda y la latencia es buena"""
+        now = self._clock()
+        latency = self.latency.value
+        if latency is None or now - self._adjusted_at < self.adjust_interval:
+            return
+        self._adjusted_at = now
+
+        if latency > self.target_latency:
+            limit = max(self.min_limit, int(self.limit * DECREASE_FACTOR))
+        elif self._saturated:
+            limit = min(self.max_limit, self.limit + 1)
+        else:
+            limit = self.limit
+        self._saturated = False
+
+        if limit != self.limit:
+            self.limit = limit
+            metrics.set_gauge(f"admission.{self.name}.limit", limit)
+
+
+def parse_routes(value: str) -> Iterable[Tuple[str, str]]:
+    """Convertir "POST /a,POST /b" en pares (método, ruta)"""
+    for entry in value.split(","):
+        method, _, path = entry.strip().partition(" ")
+        if method and path:
+            yield method.upper(), path.strip()
+
+
+class AdmissionControlMiddleware:
+    """Aplicar un ``AdmissionController`` por ruta protegida"""
+
+    def __init__(self, app: ASGIApp, routes: Optional[Iterable[Tuple[str, str]]] = None, **controller_options):
+        self.app = app
+        self.routes = list(parse_routes(ADMISSION_ROUTES) if routes is None else routes)
+        self._controllers: PerTenant[Dict[Tuple[str, str], AdmissionController]] = PerTenant(
+            lambda tenant: {
+                (method, path): AdmissionController(scoped_key(f"{method} {path}", tenant), **controller_options)
+                for method, path in self.routes
+            }
+        )
+        self.retry_after = ADMISSION_RETRY_AFTER_SECONDS
+
+    @property
+    def controllers(self) -> Dict[Tuple[str, str], AdmissionController]:
+        """Controladores por ruta del tenant actual"""
+        return self._controllers.get()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        controller = None
+        if scope["type"] == "http":
+            controller = self.controllers.get((scope["method"], scope["path"].rstrip("/") or "/"))
+        if controller is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await controller.acquire():
+            await self._reject(send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.release()
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({
+            "error": "Service overloaded",
+            "detail": "El servicio está saturado, intente nuevamente en unos segundos",
+            "retry_after": self.retry_after
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,200 @@
+"""
+Middleware ASGI de compresión de respuestas (brotli/gzip)
+
+Negocia la codificación con Accept-Encoding, solo comprime cuerpos de tipos
+textuales que superan un tamaño mínimo y soporta respuestas en streaming:
+los fragmentos se acumulan hasta alcanzar el umbral y a partir de ahí se
+comprimen y envían fragmento a fragmento (con flush), sin esperar al final.
+
+El paquete ``brotli`` está en requirements.txt; si falta (p. ej. en un entorno
+instalado a mano) solo se negocia gzip.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import (
+    COMPRESSION_MINIMUM_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY
+)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Convertir Accept-Encoding en un mapa codificación -> calidad"""
+    encodings = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        encodings[token.strip().lower()] = quality
+    return encodings
+
+
+class _Compressor:
+    """Interfaz común para compresores gzip y brotli en modo streaming"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Comprimir un fragmento y vaciar el buffer interno para enviarlo de inmediato"""
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Comprimir el último fragmento y cerrar el stream"""
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.finish()
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class CompressionMiddleware:
+    """Comprimir respuestas según Accept-Encoding con un tamaño mínimo configurable"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Elegir la mejor codificación soportada por el cliente"""
+        encodings = parse_accept_encoding(accept_encoding)
+        wildcard = encodings.get("*", 0.0)
+        candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+        best, best_quality = None, 0.0
+        for encoding in candidates:
+            quality = encodings.get(encoding, wildcard)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    """Envoltura de ``send`` que decide y aplica la compresión para una respuesta"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.pending = bytearray()
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _is_compressible(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        if self.start_message["status"] in (204, 304) or self.start_message["status"] < 200:
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def _send_uncompressed(self, more_body: bool) -> None:
+        self.passthrough = True
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": bytes(self.pending), "more_body": more_body})
+        self.pending.clear()
+
+    async def _start_compression(self, streaming: bool, body: bytes) -> None:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # El cuerpo cambia con la codificación: el ETag deja de ser byte a byte idéntico
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+        if streaming:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(body))
+        await self.send(self.start_message)
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            if not self._is_compressible(headers):
+                self.passthrough = True
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            self.pending.extend(body)
+            if len(self.pending) < self.middleware.minimum_size:
+                if not more_body:
+                    # Respuesta completa por debajo del umbral: se envía tal cual
+                    await self._send_uncompressed(more_body=False)
+                return
+
+            self.compressor = _Compressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            data = bytes(self.pending)
+            self.pending.clear()
+            if not more_body:
+                compressed = self.compressor.finish(data)
+                await self._start_compression(streaming=False, body=compressed)
+                await self.send({"type": "http.response.body", "body": compressed, "more_body": False})
+                return
+
+            await self._start_compression(streaming=True, body=b"")
+            await self.send({
+                "type": "http.response.body", "body": self.compressor.compress(data), "more_body": True
+            })
+            return
+
+        chunk = self.compressor.finish(body) if not more_body else self.compressor.compress(body)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
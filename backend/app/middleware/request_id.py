@@ -0,0 +1,56 @@
+"""
+Middleware ASGI de correlación de peticiones
+
+Toma el identificador de la cabecera X-Request-ID (si es válido) o genera uno
+nuevo, lo deja en el contexto para que cada registro de log lo incluya y lo
+devuelve en la respuesta.
+"""
+import re
+import uuid
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.logging_config import request_id_var
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# Identificadores aceptados del cliente: cortos y sin caracteres de control
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+
+def resolve_request_id(value: str) -> str:
+    """Reutilizar el identificador recibido o generar uno nuevo"""
+    if value and _VALID_REQUEST_ID.fullmatch(value):
+        return value
+    return uuid.uuid4().hex
+
+
+class RequestIdMiddleware:
+    """Fijar el request_id del contexto durante cada petición HTTP"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        received = ""
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER.encode():
+                received = value.decode("latin-1")
+                break
+        request_id = resolve_request_id(received)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,84 @@
+"""
+Middleware ASGI de resolución del tenant
+
+Toma el tenant de la cabecera TENANT_HEADER o, si no viene, del host de la
+petición (TENANT_HOSTS); sin ninguno de los dos se usa el tenant por defecto.
+Lo deja en ``tenant_var`` durante la petición, de modo que las tablas, cachés
+y límites de los servicios sean los de ese tenant. Un tenant desconocido
+recibe 400 sin llegar a los servicios.
+
+Como la respuesta depende de la cabecera (y del host si se usa TENANT_HOSTS),
+todas las respuestas llevan ``Vary`` con ellas: un CDN o proxy compartido no
+debe servir el catálogo ni el ETag de un tenant a otro.
+"""
+import json
+from typing import Dict, Iterable, Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import TENANT_HEADER
+from app.tenancy import DEFAULT_TENANT, TENANT_BY_HOST, TENANT_IDS, tenant_var
+
+
+class TenantMiddleware:
+    """Fijar el tenant del contexto durante cada petición HTTP"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        tenants: Iterable[str] = TENANT_IDS,
+        hosts: Optional[Dict[str, str]] = None,
+        header: str = TENANT_HEADER
+    ):
+        self.app = app
+        self.tenants = frozenset(tenants)
+        self.hosts = TENANT_BY_HOST if hosts is None else hosts
+        self.header = header.encode()
+        self.vary = header + (", Host" if self.hosts else "")
+
+    def resolve(self, scope: Scope) -> Optional[str]:
+        """Tenant de la petición, o None si indica uno desconocido"""
+        host = ""
+        for name, value in scope["headers"]:
+            if name == self.header:
+                tenant = value.decode("latin-1").strip().lower()
+                return tenant if tenant in self.tenants else None
+            if name == b"host":
+                host = value.decode("latin-1").rsplit(":", 1)[0].lower()
+        tenant = self.hosts.get(host, DEFAULT_TENANT)
+        return tenant if tenant == DEFAULT_TENANT or tenant in self.tenants else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        tenant = self.resolve(scope)
+        if tenant is None:
+            await self._reject(send)
+            return
+
+        async def send_with_vary(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).add_vary_header(self.vary)
+            await send(message)
+
+        token = tenant_var.set(tenant)
+        try:
+            await self.app(scope, receive, send_with_vary)
+        finally:
+            tenant_var.reset(token)
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({"error": "Unknown tenant", "detail": "El tenant indicado no existe"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 400,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"vary", self.vary.encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
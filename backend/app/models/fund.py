@@ -20,4 +20,24 @@ class Fund(BaseModel):
                 "category": "FPV",
                 "minAmount": 75000
             }
-        } 
\ No newline at end of file
+        } 
+
+class FundDetail(Fund):
+    """Modelo de detalle de fondo con agregados de suscripción"""
+    subscriberCount: int = Field(0, ge=0, description="Número de suscriptores activos")
+    totalCommitted: Decimal = Field(Decimal("0"), description="Capital total comprometido en el fondo")
+    
+    class Config:
+        json_encoders = {
+            Decimal: float
+        }
+        json_schema_extra = {
+            "example": {
+                "fundId": "FIC_MANDATO",
+                "name": "FIC_MANDATO",
+                "category": "FIC",
+                "minAmount": 500000,
+                "subscriberCount": 12,
+                "totalCommitted": 6000000
+            }
+        }
@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Literal, Optional
+from decimal import Decimal
+
+class LedgerEvent(BaseModel):
+    """Movimiento del libro mayor de saldos de un usuario"""
+    sequence: int = Field(..., ge=1, description="Número de secuencia del movimiento en el libro del usuario")
+    type: Literal["credit", "debit"] = Field(..., description="Tipo de movimiento")
+    amount: Decimal = Field(..., ge=0, description="Monto del movimiento")
+    reason: str = Field(..., description="Origen del movimiento (opening, subscribe, adjustment)")
+    reference: Optional[str] = Field(None, description="Entidad relacionada (p. ej. el fondo)")
+    createdAt: datetime = Field(..., description="Fecha y hora del movimiento")
+    
+    class Config:
+        json_encoders = {
+            Decimal: float
+        }
+
+class LedgerResponse(BaseModel):
+    """Saldo derivado del libro mayor y página de movimientos (más recientes primero)"""
+    userId: str = Field(..., description="ID del usuario")
+    balance: Decimal = Field(..., description="Saldo actual según el libro mayor")
+    sequence: int = Field(..., ge=0, description="Número de secuencia del último movimiento")
+    events: List[LedgerEvent] = Field(..., description="Movimientos de la página")
+    nextCursor: Optional[str] = Field(None, description="Cursor para la siguiente página (None si no hay más)")
+    
+    class Config:
+        json_encoders = {
+            Decimal: float
+        }
+        json_schema_extra = {
+            "example": {
+                "userId": "user123",
+                "balance": 425000,
+                "sequence": 2,
+                "events": [
+                    {
+                        "sequence": 2,
+                        "type": "debit",
+                        "amount": 75000,
+                        "reason": "subscribe",
+                        "reference": "FPV_BTG_PACTUAL",
+                        "createdAt": "2025-08-05T10:30:00+00:00"
+                    }
+                ],
+                "nextCursor": None
+            }
+        }
@@ -0,0 +1,38 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List
+from decimal import Decimal
+
+class CategorySummary(BaseModel):
+    """Totales de suscripciones activas para una categoría de fondo"""
+    count: int = Field(..., ge=0, description="Número de suscripciones activas en la categoría")
+    totalCommitted: Decimal = Field(..., description="Capital comprometido en la categoría")
+    
+    class Config:
+        json_encoders = {
+            Decimal: float
+        }
+
+class PortfolioSummary(BaseModel):
+    """Resumen materializado de las suscripciones activas de un usuario"""
+    userId: str = Field(..., description="ID del usuario")
+    activeFundIds: List[str] = Field(default_factory=list, description="Fondos con suscripción activa")
+    subscriptionCount: int = Field(0, ge=0, description="Número total de suscripciones activas")
+    totalCommitted: Decimal = Field(Decimal("0"), description="Capital total comprometido")
+    categories: Dict[str, CategorySummary] = Field(default_factory=dict, description="Totales por categoría (FPV/FIC)")
+    
+    class Config:
+        json_encoders = {
+            Decimal: float
+        }
+        json_schema_extra = {
+            "example": {
+                "userId": "user123",
+                "activeFundIds": ["FIC_ACCIONES", "FPV_BTG_PACTUAL"],
+                "subscriptionCount": 2,
+                "totalCommitted": 325000,
+                "categories": {
+                    "FIC": {"count": 1, "totalCommitted": 250000},
+                    "FPV": {"count": 1, "totalCommitted": 75000}
+                }
+            }
+        }
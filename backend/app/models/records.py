@@ -0,0 +1,305 @@
+"""
+Registros internos livianos para el intercambio de datos entre servicios
+
+Los modelos Pydantic se reservan para el borde de la API (validación de
+entrada y serialización de respuestas). Dentro de los servicios se usan estos
+registros inmutables con ``__slots__``, construidos directamente desde los
+items de DynamoDB y convertidos a Pydantic una sola vez en la ruta.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from app.models.fund import Fund, FundDetail
+from app.models.user import User
+from app.models.subscription import UserFund
+from app.models.transaction import Transaction
+from app.models.portfolio import PortfolioSummary, CategorySummary
+from app.models.ledger import LedgerEvent
+from app.utils.ids import uuid7, uuid7_datetime
+
+
+@dataclass(frozen=True, slots=True)
+class UserRecord:
+    """Registro interno de usuario"""
+    userId: str
+    balance: Decimal
+    notificationType: str
+
+    @classmethod
+    def from_item(cls, item: dict) -> "UserRecord":
+        """Construir el registro desde un item de DynamoDB"""
+        return cls(item['userId'], item['balance'], item['notificationType'])
+
+    def to_item(self) -> dict:
+        """Convertir el registro a un item de DynamoDB"""
+        return {
+            'userId': self.userId,
+            'balance': self.balance,
+            'notificationType': self.notificationType
+        }
+
+    def to_model(self) -> User:
+        """Convertir el registro al modelo Pydantic de la API"""
+        return User(userId=self.userId, balance=self.balance, notificationType=self.notificationType)
+
+
+@dataclass(frozen=True, slots=True)
+class FundRecord:
+    """Registro interno de fondo"""
+    fundId: str
+    name: str
+    category: str
+    minAmount: Decimal
+
+    @classmethod
+    def from_item(cls, item: dict) -> "FundRecord":
+        """Construir el registro desde un item de DynamoDB"""
+        return cls(item['fundId'], item['name'], item['category'], item['minAmount'])
+
+    def to_item(self) -> dict:
+        """Convertir el registro a un item de DynamoDB"""
+        return {
+            'fundId': self.fundId,
+            'name': self.name,
+            'category': self.category,
+            'minAmount': self.minAmount
+        }
+
+    def to_model(self) -> Fund:
+        """Convertir el registro al modelo Pydantic de la API"""
+        return Fund(fundId=self.fundId, name=self.name, category=self.category, minAmount=self.minAmount)
+
+
+@dataclass(frozen=True, slots=True)
+class FundStatsRecord:
+    """Registro interno de agregados de suscripción de un fondo"""
+    fundId: str
+    subscriberCount: int
+    totalCommitted: Decimal
+
+    @classmethod
+    def empty(cls, fundId: str) -> "FundStatsRecord":
+        """Agregados de un fondo sin suscriptores"""
+        return cls(fundId, 0, Decimal("0"))
+
+    @classmethod
+    def from_item(cls, item: dict) -> "FundStatsRecord":
+        """Construir el registro desde un item de DynamoDB"""
+        return cls(
+            item['fundId'],
+            int(item.get('subscriberCount', 0)),
+            item.get('totalCommitted', Decimal("0"))
+        )
+
+    def to_detail_model(self, fund: FundRecord) -> FundDetail:
+        """Combinar el fondo con sus agregados en el modelo de detalle de la API"""
+        return FundDetail(
+            fundId=fund.fundId,
+            name=fund.name,
+            category=fund.category,
+            minAmount=fund.minAmount,
+            subscriberCount=self.subscriberCount,
+            totalCommitted=self.totalCommitted
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class UserFundRecord:
+    """Registro interno de una suscripción usuario-fondo"""
+    userId: str
+    fundId: str
+    subscribedAt: datetime
+    amount: Optional[Decimal] = None  # Monto comprometido al suscribirse
+
+    @classmethod
+    def from_item(cls, item: dict) -> "UserFundRecord":
+        """Construir el registro desde un item de DynamoDB"""
+        return cls(
+            item['userId'],
+            item['fundId'],
+            datetime.fromisoformat(item['subscribedAt']),
+            item.get('amount')
+        )
+
+    def to_item(self) -> dict:
+        """Convertir el registro a un item de DynamoDB"""
+        item = {
+            'userId': self.userId,
+            'fundId': self.fundId,
+            'subscribedAt': self.subscribedAt.isoformat()
+        }
+        if self.amount is not None:
+            item['amount'] = self.amount
+        return item
+
+    def to_model(self) -> UserFund:
+        """Convertir el registro al modelo Pydantic de la API"""
+        return UserFund(userId=self.userId, fundId=self.fundId, subscribedAt=self.subscribedAt)
+
+
+@dataclass(frozen=True, slots=True)
+class TransactionRecord:
+    """Registro interno de transacción"""
+    transactionId: str
+    userId: str
+    fundId: str
+    type: str
+    amount: Decimal
+    timestamp: datetime
+
+    @classmethod
+    def new(cls, userId: str, fundId: str, type: str, amount: Decimal) -> "TransactionRecord":
+        """Crear una transacción nueva con ID ordenable por tiempo (UUIDv7) y su timestamp UTC"""
+        transaction_id = uuid7()
+        return cls(transaction_id, userId, fundId, type, amount, uuid7_datetime(transaction_id))
+
+    @classmethod
+    def from_item(cls, item: dict) -> "TransactionRecord":
+        """Construir el registro desde un item de DynamoDB"""
+        return cls(
+            item['transactionId'],
+            item['userId'],
+            item['fundId'],
+            item['type'],
+            item['amount'],
+            datetime.fromisoformat(item['timestamp'])
+        )
+
+    def to_item(self) -> dict:
+        """Convertir el registro a un item de DynamoDB"""
+        return {
+            'transactionId': self.transactionId,
+            'userId': self.userId,
+            'fundId': self.fundId,
+            'type': self.type,
+            'amount': self.amount,
+            'timestamp': self.timestamp.isoformat()
+        }
+
+    def to_model(self) -> Transaction:
+        """Convertir el registro al modelo Pydantic de la API"""
+        return Transaction(
+            transactionId=self.transactionId,
+            userId=self.userId,
+            fundId=self.fundId,
+            type=self.type,
+            amount=self.amount,
+            timestamp=self.timestamp
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class LedgerEventRecord:
+    """Evento inmutable del libro mayor de un usuario (crédito o débito)"""
+    userId: str
+    sequence: int
+    type: str  # "credit" o "debit"
+    amount: Decimal
+    reason: str  # "opening", "subscribe", "adjustment"...
+    createdAt: datetime
+    reference: Optional[str] = None  # Entidad relacionada (p. ej. el fondo)
+
+    @property
+    def delta(self) -> Decimal:
+        """Efecto del evento sobre el saldo"""
+        return self.amount if self.type == "credit" else -self.amount
+
+    @classmethod
+    def from_item(cls, item: dict) -> "LedgerEventRecord":
+        """Construir el registro desde un item de DynamoDB"""
+        return cls(
+            item['userId'],
+            int(item['sequence']),
+            item['type'],
+            item['amount'],
+            item['reason'],
+            datetime.fromisoformat(item['createdAt']),
+            item.get('reference')
+        )
+
+    def to_item(self) -> dict:
+        """Convertir el registro a un item de DynamoDB"""
+        item = {
+            'userId': self.userId,
+            'sequence': self.sequence,
+            'type': self.type,
+            'amount': self.amount,
+            'reason': self.reason,
+            'createdAt': self.createdAt.isoformat()
+        }
+        if self.reference is not None:
+            item['reference'] = self.reference
+        return item
+
+    def to_model(self) -> LedgerEvent:
+        """Convertir el registro al modelo Pydantic de la API"""
+        return LedgerEvent(
+            sequence=self.sequence,
+            type=self.type,
+            amount=self.amount,
+            reason=self.reason,
+            reference=self.reference,
+            createdAt=self.createdAt
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class LedgerSnapshotRecord:
+    """Saldo de un usuario después del evento ``sequence`` de su libro mayor"""
+    userId: str
+    sequence: int
+    balance: Decimal
+
+    @classmethod
+    def from_item(cls, item: dict) -> "LedgerSnapshotRecord":
+        """Construir el registro desde un item de DynamoDB"""
+        return cls(item['userId'], int(item['sequence']), item['balance'])
+
+    def to_item(self) -> dict:
+        """Convertir el registro a un item de DynamoDB"""
+        return {'userId': self.userId, 'sequence': self.sequence, 'balance': self.balance}
+
+
+@dataclass(frozen=True, slots=True)
+class PortfolioRecord:
+    """Registro interno del resumen materializado de suscripciones de un usuario"""
+    userId: str
+    activeFundIds: frozenset
+    subscriptionCount: int
+    totalCommitted: Decimal
+    categories: dict  # categoría -> (número de suscripciones, monto comprometido)
+
+    @classmethod
+    def empty(cls, userId: str) -> "PortfolioRecord":
+        """Resumen de un usuario sin suscripciones"""
+        return cls(userId, frozenset(), 0, Decimal("0"), {})
+
+    @classmethod
+    def from_item(cls, item: dict, categories: tuple) -> "PortfolioRecord":
+        """Construir el registro desde un item de DynamoDB"""
+        return cls(
+            item['userId'],
+            frozenset(item.get('activeFundIds', ())),
+            int(item.get('subscriptionCount', 0)),
+            item.get('totalCommitted', Decimal("0")),
+            {
+                category: (int(item.get(f"{category}Count", 0)), item.get(f"{category}Total", Decimal("0")))
+                for category in categories
+                if f"{category}Count" in item
+            }
+        )
+
+    def to_model(self) -> PortfolioSummary:
+        """Convertir el registro al modelo Pydantic de la API"""
+        return PortfolioSummary(
+            userId=self.userId,
+            activeFundIds=sorted(self.activeFundIds),
+            subscriptionCount=self.subscriptionCount,
+            totalCommitted=self.totalCommitted,
+            categories={
+                category: CategorySummary(count=count, totalCommitted=total)
+                for category, (count, total) in self.categories.items()
+            }
+        )
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from enum import Enum
 
 class SubscriptionErrorCode(Enum):
@@ -122,4 +122,27 @@ class SubscriptionResponse(BaseModel):
                     }
                 }
             ]
-        } 
\ No newline at end of file
+        } 
+
+class FundSubscribersResponse(BaseModel):
+    """Modelo de respuesta paginada con los suscriptores de un fondo"""
+    fundId: str = Field(..., description="ID del fondo")
+    subscribers: List[UserFund] = Field(..., description="Suscripciones activas de la página")
+    count: int = Field(..., description="Número de suscripciones en la página")
+    nextCursor: Optional[str] = Field(None, description="Cursor para la siguiente página (None si no hay más)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "fundId": "FPV_BTG_PACTUAL",
+                "subscribers": [
+                    {
+                        "userId": "user123",
+                        "fundId": "FPV_BTG_PACTUAL",
+                        "subscribedAt": "2025-08-05T10:30:00"
+                    }
+                ],
+                "count": 1,
+                "nextCursor": None
+            }
+        }
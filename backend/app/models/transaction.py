@@ -1,17 +1,17 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Literal, List
+from datetime import datetime, timezone
+from typing import Literal, List, Optional
 from decimal import Decimal
-import uuid
+from app.utils.ids import uuid7
 
 class Transaction(BaseModel):
     """Modelo para transacciones del sistema"""
-    transactionId: str = Field(default_factory=lambda: str(uuid.uuid4()), description="ID único de la transacción")
+    transactionId: str = Field(default_factory=uuid7, description="ID único de la transacción (UUIDv7, ordenable por tiempo)")
     userId: str = Field(..., description="ID del usuario")
     fundId: str = Field(..., description="ID del fondo")
     type: Literal["subscribe", "unsubscribe"] = Field(..., description="Tipo de transacción")
     amount: Decimal = Field(..., ge=0, description="Monto de la transacción")
-    timestamp: datetime = Field(default_factory=datetime.now, description="Fecha y hora de la transacción")
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc), description="Fecha y hora de la transacción")
     
     class Config:
         json_encoders = {
@@ -20,12 +20,12 @@ class Transaction(BaseModel):
         }
         schema_extra = {
             "example": {
-                "transactionId": "550e8400-e29b-41d4-a716-446655440000",
+                "transactionId": "019879c7-e440-7a3c-9d2e-5b1f8c3a7e41",
                 "userId": "user123",
                 "fundId": "FPV_BTG_PACTUAL",
                 "type": "subscribe",
                 "amount": 75000,
-                "timestamp": "2025-08-05T10:30:00"
+                "timestamp": "2025-08-05T10:30:00+00:00"
             }
         }
 
@@ -45,20 +45,22 @@ class TransactionResponse(BaseModel):
     """Modelo de respuesta para consulta de transacciones"""
     transactions: List[Transaction] = Field(..., description="Lista de transacciones del usuario")
     total: int = Field(..., description="Número total de transacciones")
+    nextCursor: Optional[str] = Field(None, description="Cursor para la siguiente página (None si no hay más)")
     
     class Config:
         schema_extra = {
             "example": {
                 "transactions": [
                     {
-                        "transactionId": "550e8400-e29b-41d4-a716-446655440000",
+                        "transactionId": "019879c7-e440-7a3c-9d2e-5b1f8c3a7e41",
                         "userId": "user123",
                         "fundId": "FPV_BTG_PACTUAL",
                         "type": "subscribe",
                         "amount": 75000,
-                        "timestamp": "2025-08-05T10:30:00"
+                        "timestamp": "2025-08-05T10:30:00+00:00"
                     }
                 ],
-                "total": 1
+                "total": 1,
+                "nextCursor": None
             }
         } 
\ No newline at end of file
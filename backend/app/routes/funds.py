@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from app.models.fund import Fund
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from typing import List, Optional
+from app.models.fund import Fund, FundDetail
+from app.models.subscription import FundSubscribersResponse
 from app.services.fund_service import fund_service
+from app.services.subscription_service import subscription_service
+from app.utils.http_cache import content_version, make_etag, etag_matches, cache_headers, not_modified
+from app.exceptions import DatabaseThrottledException
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,35 +13,50 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/", response_model=List[Fund])
-async def get_all_funds():
+async def get_all_funds(request: Request, response: Response):
     """
     Obtener todos los fondos disponibles
     
+    La respuesta incluye un ETag fuerte basado en la versión del catálogo y
+    Cache-Control; si el cliente envía If-None-Match con el ETag vigente se
+    responde 304 Not Modified sin cuerpo.
+    
     Returns:
         List[Fund]: Lista de todos los fondos disponibles para suscripción
     """
     try:
-        funds = await fund_service.get_all_funds()
-        logger.info(f"Retrieved {len(funds)} funds")
-        return funds
+        catalog = await fund_service.get_catalog()
+        etag = make_etag(catalog.version)
+        
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag)
+        
+        response.headers.update(cache_headers(etag))
+        logger.info("Retrieved %s funds", len(catalog.funds))
+        return [fund.to_model() for fund in catalog.funds]
         
+    except DatabaseThrottledException:
+        raise
     except Exception as e:
-        logger.error(f"Error retrieving funds: {str(e)}")
+        logger.error("Error retrieving funds: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error interno del servidor: {str(e)}"
         )
 
-@router.get("/{fund_id}", response_model=Fund)
-async def get_fund_by_id(fund_id: str):
+@router.get("/{fund_id}", response_model=FundDetail)
+async def get_fund_by_id(fund_id: str, request: Request, response: Response):
     """
     Obtener información detallada de un fondo específico
     
+    Incluye los agregados mantenidos en cada suscripción y cancelación
+    (suscriptores activos y capital comprometido), sin escanear UserFunds.
+    
     Args:
         fund_id: ID del fondo a consultar
         
     Returns:
-        Fund: Información detallada del fondo
+        FundDetail: Información detallada del fondo con sus agregados
         
     Raises:
         HTTPException: 404 si el fondo no existe
@@ -51,14 +70,83 @@ async def get_fund_by_id(fund_id: str):
                 detail=f"Fondo {fund_id} no encontrado"
             )
         
-        logger.info(f"Retrieved fund details for {fund_id}")
-        return fund
+        stats = await fund_service.get_fund_stats(fund_id)
+        etag = make_etag(content_version(
+            fund.fundId, fund.name, fund.category, fund.minAmount, stats.subscriberCount, stats.totalCommitted
+        ))
+        
+        # Los agregados cambian con cada suscripción: sin max-age, revalidación con el ETag
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return not_modified(etag, live=True)
+        
+        response.headers.update(cache_headers(etag, live=True))
+        logger.info("Retrieved fund details for %s", fund_id)
+        return stats.to_detail_model(fund)
         
     except HTTPException:
         raise
+    except DatabaseThrottledException:
+        raise
     except Exception as e:
-        logger.error(f"Error retrieving fund {fund_id}: {str(e)}")
+        logger.error("Error retrieving fund %s: %s", fund_id, e)
         raise HTTPException(
             status_code=500,
             detail=f"Error interno del servidor: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.get("/{fund_id}/subscribers", response_model=FundSubscribersResponse)
+async def get_fund_subscribers(
+    fund_id: str,
+    limit: int = Query(50, ge=1, le=500, description="Máximo de suscriptores por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la página anterior")
+):
+    """
+    Listar los suscriptores activos de un fondo de forma paginada
+    
+    Usa el índice FundIdIndex de UserFunds, por lo que el costo es proporcional
+    al número de suscriptores del fondo y no al tamaño de la tabla.
+    
+    Args:
+        fund_id: ID del fondo a consultar
+        limit: Máximo de suscriptores por página
+        cursor: Cursor de paginación (nextCursor de la respuesta anterior)
+        
+    Returns:
+        FundSubscribersResponse: Página de suscriptores y cursor siguiente
+        
+    Raises:
+        HTTPException: 404 si el fondo no existe, 400 si el cursor es inválido
+    """
+    try:
+        fund = await fund_service.get_fund_by_id(fund_id)
+        
+        if not fund:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Fondo {fund_id} no encontrado"
+            )
+        
+        subscribers, next_cursor = await subscription_service.get_fund_subscribers(fund_id, limit, cursor)
+        
+        return FundSubscribersResponse(
+            fundId=fund_id,
+            subscribers=[subscriber.to_model() for subscriber in subscribers],
+            count=len(subscribers),
+            nextCursor=next_cursor
+        )
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except DatabaseThrottledException:
+        raise
+    except Exception as e:
+        logger.error("Error retrieving subscribers for fund %s: %s", fund_id, e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
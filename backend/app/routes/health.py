@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 from datetime import datetime
 import boto3
-from app.config import DYNAMODB_ENDPOINT, AWS_REGION
+from app.config import DATABASE_BACKEND, DYNAMODB_ENDPOINT, AWS_REGION
+from app.metrics import metrics
 
 router = APIRouter()
 
@@ -12,13 +13,18 @@ async def health_check():
     """
     try:
         # Verificar conexión con DynamoDB
-        dynamodb = boto3.client(
-            'dynamodb',
-            endpoint_url=DYNAMODB_ENDPOINT,
-            region_name=AWS_REGION,
-            aws_access_key_id='dummy',
-            aws_secret_access_key='dummy'
-        )
+        if DATABASE_BACKEND == "dynamodb":
+            dynamodb = boto3.client(
+                'dynamodb',
+                endpoint_url=DYNAMODB_ENDPOINT,
+                region_name=AWS_REGION,
+                aws_access_key_id='dummy',
+                aws_secret_access_key='dummy'
+            )
+        else:
+            # Backend embebido: las tablas viven en el proceso
+            from app.database.client import db_client
+            dynamodb = db_client.get_client()
         
         # Intentar listar tablas para verificar conectividad
         response = dynamodb.list_tables()
@@ -47,4 +53,15 @@ async def health_check():
                 "endpoint": DYNAMODB_ENDPOINT,
                 "region": AWS_REGION
             }
-        } 
\ No newline at end of file
+        } 
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Endpoint con los contadores y gauges internos del servicio (caché, latencia, admisión...)
+    """
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "counters": metrics.snapshot(),
+        "gauges": metrics.gauges()
+    }
@@ -0,0 +1,70 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+from app.models.ledger import LedgerResponse
+from app.services.ledger_service import ledger_service
+from app.services.user_service import user_service
+from app.exceptions import DatabaseThrottledException
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/", response_model=LedgerResponse)
+async def get_user_ledger(
+    userId: str = Query(..., description="ID del usuario para consultar su libro mayor"),
+    limit: int = Query(50, ge=1, le=500, description="Máximo de movimientos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la página anterior")
+):
+    """
+    Obtener el saldo y los movimientos del libro mayor de un usuario
+    
+    El saldo se deriva del último snapshot más los movimientos posteriores,
+    de modo que el saldo y el historial comparten la misma fuente.
+    
+    Args:
+        userId: ID del usuario a consultar
+        limit: Máximo de movimientos por página
+        cursor: Cursor de paginación (nextCursor de la respuesta anterior)
+        
+    Returns:
+        LedgerResponse: Saldo actual y página de movimientos
+        
+    Raises:
+        HTTPException: 404 si el usuario no existe, 400 si el cursor es inválido,
+            500 para errores internos
+    """
+    try:
+        user = await user_service.get_user_by_id(userId)
+        if not user:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Usuario {userId} no encontrado"
+            )
+        
+        state = await ledger_service.get_state(userId)
+        events, next_cursor = await ledger_service.get_events(userId, limit, cursor)
+        
+        return LedgerResponse(
+            userId=userId,
+            balance=state.balance,
+            sequence=state.sequence,
+            events=[event.to_model() for event in events],
+            nextCursor=next_cursor
+        )
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except DatabaseThrottledException:
+        raise
+    except Exception as e:
+        logger.error("Error retrieving ledger for user %s: %s", userId, e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, HTTPException, Query
+from app.models.portfolio import PortfolioSummary
+from app.services.portfolio_service import portfolio_service
+from app.services.user_service import user_service
+from app.exceptions import DatabaseThrottledException
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+@router.get("/", response_model=PortfolioSummary)
+async def get_portfolio_summary(
+    userId: str = Query(..., description="ID del usuario para consultar su resumen")
+):
+    """
+    Obtener el resumen de suscripciones activas de un usuario
+    
+    Devuelve los fondos activos, el número de suscripciones y el capital
+    comprometido total y por categoría (FPV/FIC) desde el resumen materializado.
+    
+    Args:
+        userId: ID del usuario a consultar
+        
+    Returns:
+        PortfolioSummary: Resumen de suscripciones del usuario
+        
+    Raises:
+        HTTPException: 404 si el usuario no existe, 500 para errores internos
+    """
+    try:
+        portfolio = await portfolio_service.get_summary(userId)
+        
+        if portfolio is None:
+            # Sin resumen: el usuario no existe o aún no tiene uno (p. ej. con
+            # suscripciones anteriores al resumen), que se crea desde UserFunds
+            user = await user_service.get_user_by_id(userId)
+            if not user:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Usuario {userId} no encontrado"
+                )
+            portfolio = await portfolio_service.rebuild_summary(userId)
+        
+        return portfolio.to_model()
+        
+    except HTTPException:
+        raise
+    except DatabaseThrottledException:
+        raise
+    except Exception as e:
+        logger.error("Error retrieving portfolio summary for user %s: %s", userId, e)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error interno del servidor: {str(e)}"
+        )
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from app.models.settings import NotificationSettingsRequest, NotificationSettingsResponse
 from app.services.user_service import user_service
+from app.exceptions import DatabaseThrottledException
 import logging
 
 logger = logging.getLogger(__name__)
@@ -47,11 +48,13 @@ async def update_notification_settings(request: NotificationSettingsRequest):
             notificationType=updated_user.notificationType
         )
         
-        logger.info(f"Updated notification type for user {request.userId} to {request.notificationType}")
+        logger.info("Updated notification type for user %s to %s", request.userId, request.notificationType)
         return response
         
     except HTTPException:
         raise
+    except DatabaseThrottledException:
+        raise
     except Exception as e:
         # Manejar errores específicos de validación
         if "Tipo de notificación inválido" in str(e):
@@ -60,7 +63,7 @@ async def update_notification_settings(request: NotificationSettingsRequest):
                 detail=str(e)
             )
         
-        logger.error(f"Error updating notification settings for user {request.userId}: {str(e)}")
+        logger.error("Error updating notification settings for user %s: %s", request.userId, e)
         raise HTTPException(
             status_code=500,
             detail=f"Error interno del servidor: {str(e)}"
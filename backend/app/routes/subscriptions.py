@@ -1,13 +1,19 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from app.models.subscription import SubscribeRequest, UnsubscribeRequest, SubscriptionResponse
 from app.services.subscription_service import subscription_service
+from app.exceptions import DatabaseThrottledException
+from app.utils.rate_limit import enforce_subscription_rate_limit
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-@router.post("/subscribe", response_model=SubscriptionResponse)
+@router.post(
+    "/subscribe",
+    response_model=SubscriptionResponse,
+    dependencies=[Depends(enforce_subscription_rate_limit)]
+)
 async def subscribe_to_fund(request: SubscribeRequest):
     """
     Suscribir un usuario a un fondo de inversión
@@ -28,7 +34,8 @@ async def subscribe_to_fund(request: SubscribeRequest):
         SubscriptionResponse: Resultado de la operación de suscripción
         
     Raises:
-        HTTPException: 400 para errores de validación, 500 para errores internos
+        HTTPException: 400 para errores de validación, 429 si se supera el límite de tasa,
+            500 para errores internos
     """
     try:
         result = await subscription_service.subscribe_to_fund(request)
@@ -41,19 +48,25 @@ async def subscribe_to_fund(request: SubscribeRequest):
                 detail=result.message
             )
         
-        logger.info(f"Successful subscription: {request.userId} to {request.fundId}")
+        logger.info("Successful subscription: %s to %s", request.userId, request.fundId)
         return result
         
     except HTTPException:
         raise
+    except DatabaseThrottledException:
+        raise
     except Exception as e:
-        logger.error(f"Error in subscription process: {str(e)}")
+        logger.error("Error in subscription process: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error interno del servidor: {str(e)}"
         )
 
-@router.post("/unsubscribe", response_model=SubscriptionResponse)
+@router.post(
+    "/unsubscribe",
+    response_model=SubscriptionResponse,
+    dependencies=[Depends(enforce_subscription_rate_limit)]
+)
 async def unsubscribe_from_fund(request: UnsubscribeRequest):
     """
     Cancelar la suscripción de un usuario a un fondo de inversión
@@ -73,7 +86,8 @@ async def unsubscribe_from_fund(request: UnsubscribeRequest):
         SubscriptionResponse: Resultado de la operación de cancelación
         
     Raises:
-        HTTPException: 400 para errores de validación, 500 para errores internos
+        HTTPException: 400 para errores de validación, 429 si se supera el límite de tasa,
+            500 para errores internos
     """
     try:
         result = await subscription_service.unsubscribe_from_fund(request)
@@ -86,13 +100,15 @@ async def unsubscribe_from_fund(request: UnsubscribeRequest):
                 detail=result.message
             )
         
-        logger.info(f"Successful unsubscription: {request.userId} from {request.fundId}")
+        logger.info("Successful unsubscription: %s from %s", request.userId, request.fundId)
         return result
         
     except HTTPException:
         raise
+    except DatabaseThrottledException:
+        raise
     except Exception as e:
-        logger.error(f"Error in unsubscription process: {str(e)}")
+        logger.error("Error in unsubscription process: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error interno del servidor: {str(e)}"
@@ -1,6 +1,9 @@
+from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Query
 from app.models.transaction import TransactionResponse
 from app.services.transaction_service import transaction_service
+from app.exceptions import DatabaseThrottledException
 import logging
 
 logger = logging.getLogger(__name__)
@@ -9,22 +12,30 @@ router = APIRouter()
 
 @router.get("/", response_model=TransactionResponse)
 async def get_user_transactions(
-    userId: str = Query(..., description="ID del usuario para consultar transacciones")
+    userId: str = Query(..., description="ID del usuario para consultar transacciones"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="Máximo de transacciones por página"),
+    cursor: Optional[str] = Query(None, description="Cursor devuelto en la página anterior"),
+    after: Optional[datetime] = Query(None, description="Solo transacciones posteriores a esta fecha")
 ):
     """
     Obtener el historial de transacciones de un usuario
     
     Devuelve todas las transacciones (suscripciones y cancelaciones) del usuario
-    ordenadas por fecha de manera descendente (más recientes primero).
+    ordenadas por fecha de manera descendente (más recientes primero). Con
+    ``limit`` la respuesta se pagina y ``nextCursor`` indica la página siguiente.
     
     Args:
         userId: ID del usuario para consultar sus transacciones
+        limit: Máximo de transacciones por página (sin límite devuelve todas)
+        cursor: Cursor de paginación (nextCursor de la respuesta anterior)
+        after: Solo transacciones posteriores a esta fecha
         
     Returns:
         TransactionResponse: Lista de transacciones del usuario con total
         
     Raises:
-        HTTPException: 404 si el usuario no existe, 500 para errores internos
+        HTTPException: 404 si el usuario no existe, 400 si el cursor es inválido,
+            500 para errores internos
     """
     try:
         # Verificar que el usuario existe
@@ -38,21 +49,31 @@ async def get_user_transactions(
             )
         
         # Obtener transacciones del usuario
-        transactions = await transaction_service.get_transactions_by_user(userId)
+        transactions, next_cursor = await transaction_service.get_transactions_by_user(
+            userId, limit=limit, cursor=cursor, after=after
+        )
         
         # Crear respuesta
         response = TransactionResponse(
-            transactions=transactions,
-            total=len(transactions)
+            transactions=[transaction.to_model() for transaction in transactions],
+            total=len(transactions),
+            nextCursor=next_cursor
         )
         
-        logger.info(f"Retrieved {len(transactions)} transactions for user {userId}")
+        logger.info("Retrieved %s transactions for user %s", len(transactions), userId)
         return response
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    except DatabaseThrottledException:
+        raise
     except Exception as e:
-        logger.error(f"Error retrieving transactions for user {userId}: {str(e)}")
+        logger.error("Error retrieving transactions for user %s: %s", userId, e)
         raise HTTPException(
             status_code=500,
             detail=f"Error interno del servidor: {str(e)}"
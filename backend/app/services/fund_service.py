@@ -1,68 +1,178 @@
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
 from botocore.exceptions import ClientError
+from app.cache.backends import shared_backend
+from app.cache.tiered import TwoLevelCache, dumps_items, loads_items
+from app.config import FUND_CATALOG_TTL_SECONDS
 from app.database.client import db_client
-from app.models.fund import Fund
+from app.database.scan import scan_all
+from app.database.singleflight import read_coalescer
+from app.database.streams import ChangeRecord
+from app.models.records import FundRecord, FundStatsRecord
+from app.tenancy import PerTenant, scoped_key
+from app.utils.http_cache import content_version
+from datetime import datetime
+from decimal import Decimal
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+@dataclass(frozen=True, slots=True)
+class FundCatalog:
+    """Instantánea del catálogo de fondos con su versión de contenido"""
+    funds: Tuple[FundRecord, ...]
+    by_id: Dict[str, FundRecord]
+    version: str
+    loaded_at: float
+
 class FundService:
     """Servicio para gestión de fondos"""
     
-    def __init__(self):
+    CATALOG_KEY = "catalog"
+    
+    def __init__(self, catalog_ttl: float = FUND_CATALOG_TTL_SECONDS, cache_backend=shared_backend):
         self.table = db_client.get_table("Funds")
+        self.stats_table = db_client.get_table("FundStats")
+        self.catalog_ttl = catalog_ttl
+        # Un catálogo por tenant, cada uno con su propia entrada en la L2
+        self._caches = PerTenant(lambda tenant: TwoLevelCache(
+            scoped_key("funds", tenant),
+            maxsize=1,
+            ttl=catalog_ttl,
+            backend=cache_backend,
+            encode=lambda catalog: dumps_items([fund.to_item() for fund in catalog.funds]),
+            decode=lambda data: self._build_catalog(FundRecord.from_item(item) for item in loads_items(data))
+        ))
     
-    async def get_all_funds(self) -> List[Fund]:
-        """Obtener todos los fondos disponibles"""
+    @property
+    def cache(self) -> TwoLevelCache:
+        """Caché del catálogo del tenant actual"""
+        return self._caches.get()
+    
+    @staticmethod
+    def _build_catalog(funds: Iterable[FundRecord]) -> FundCatalog:
+        """Ordenar los fondos y calcular la versión de contenido del catálogo"""
+        funds = tuple(sorted(funds, key=lambda fund: fund.fundId))
+        version = content_version(*(
+            f"{fund.fundId}|{fund.name}|{fund.category}|{fund.minAmount}" for fund in funds
+        ))
+        return FundCatalog(funds, {fund.fundId: fund for fund in funds}, version, time.monotonic())
+    
+    async def get_catalog(self) -> FundCatalog:
+        """
+        Obtener el catálogo completo de fondos
+        
+        El catálogo se guarda en la caché de dos niveles durante
+        FUND_CATALOG_TTL_SECONDS, de modo que las lecturas repetidas (en este y en
+        los demás workers) no ejecutan un scan en DynamoDB. La versión se calcula a
+        partir del contenido y sirve como ETag del catálogo.
+        """
+        catalog = await self.cache.get_async(self.CATALOG_KEY)
+        if catalog is not None:
+            return catalog
+        
         try:
-            response = self.table.scan()
-            funds_data = response.get('Items', [])
-            
-            # Convertir datos de DynamoDB a modelos Pydantic
-            funds = []
-            for fund_data in funds_data:
-                fund = Fund(
-                    fundId=fund_data['fundId'],
-                    name=fund_data['name'],
-                    category=fund_data['category'],
-                    minAmount=fund_data['minAmount']
-                )
-                funds.append(fund)
-            
-            logger.info(f"Retrieved {len(funds)} funds")
-            return funds
+            # Las peticiones concurrentes con la caché vacía comparten un único scan
+            return await read_coalescer.do((self.table.name, "scan"), self._load_catalog)
             
         except ClientError as e:
-            logger.error(f"Error retrieving funds: {str(e)}")
+            logger.error("Error retrieving funds: %s", e)
             raise Exception(f"Error al obtener fondos: {str(e)}")
     
-    async def get_fund_by_id(self, fund_id: str) -> Optional[Fund]:
+    def _load_catalog(self) -> FundCatalog:
+        """Ejecutar el scan del catálogo (todas las páginas) y guardarlo en la caché"""
+        funds_data = scan_all(self.table)
+        
+        # Convertir datos de DynamoDB a registros internos
+        catalog = self._build_catalog(FundRecord.from_item(fund_data) for fund_data in funds_data)
+        self.cache.set(self.CATALOG_KEY, catalog)
+        
+        logger.info("Retrieved %s funds", len(catalog.funds))
+        return catalog
+    
+    async def invalidate_catalog(self) -> None:
+        """Descartar el catálogo en todos los workers (p. ej. después de modificar un fondo)"""
+        await self.cache.invalidate_async(self.CATALOG_KEY)
+    
+    def on_fund_changes(self, records: List[ChangeRecord]) -> None:
+        """Handler del stream de la tabla Funds: cualquier cambio descarta el catálogo de este worker"""
+        if records:
+            self.cache.discard(self.CATALOG_KEY)
+            logger.info("Fund catalog discarded after %s stream records", len(records))
+    
+    async def get_all_funds(self) -> List[FundRecord]:
+        """Obtener todos los fondos disponibles"""
+        catalog = await self.get_catalog()
+        return list(catalog.funds)
+    
+    async def get_fund_by_id(self, fund_id: str) -> Optional[FundRecord]:
         """Obtener un fondo específico por ID"""
+        catalog = await self.cache.get_async(self.CATALOG_KEY)
+        if catalog is not None and fund_id in catalog.by_id:
+            return catalog.by_id[fund_id]
+        
         try:
-            response = self.table.get_item(Key={'fundId': fund_id})
+            response = await read_coalescer.do(
+                (self.table.name, "get", fund_id),
+                lambda: self.table.get_item(Key={'fundId': fund_id})
+            )
             
             if 'Item' not in response:
                 return None
             
-            fund_data = response['Item']
-            fund = Fund(
-                fundId=fund_data['fundId'],
-                name=fund_data['name'],
-                category=fund_data['category'],
-                minAmount=fund_data['minAmount']
-            )
+            fund = FundRecord.from_item(response['Item'])
             
-            logger.info(f"Retrieved fund: {fund_id}")
+            logger.info("Retrieved fund: %s", fund_id)
             return fund
             
         except ClientError as e:
-            logger.error(f"Error retrieving fund {fund_id}: {str(e)}")
+            logger.error("Error retrieving fund %s: %s", fund_id, e)
             raise Exception(f"Error al obtener fondo {fund_id}: {str(e)}")
     
     async def fund_exists(self, fund_id: str) -> bool:
         """Verificar si un fondo existe"""
         fund = await self.get_fund_by_id(fund_id)
         return fund is not None
+    
+    def build_stats_action(self, fund: FundRecord, amount: Decimal, delta: int) -> dict:
+        """
+        Acción transaccional para actualizar los agregados del fondo
+        
+        Args:
+            fund: Fondo afectado
+            amount: Monto comprometido por la suscripción
+            delta: 1 al suscribirse, -1 al cancelar
+        """
+        return {
+            'Update': {
+                'TableName': self.stats_table.name,
+                'Key': {'fundId': fund.fundId},
+                'UpdateExpression': 'ADD subscriberCount :delta, totalCommitted :amount SET updatedAt = :now',
+                'ExpressionAttributeValues': {
+                    ':delta': delta,
+                    ':amount': amount if delta > 0 else -amount,
+                    ':now': datetime.now().isoformat()
+                }
+            }
+        }
+    
+    async def get_fund_stats(self, fund_id: str) -> FundStatsRecord:
+        """Obtener los agregados de suscripción de un fondo"""
+        try:
+            response = await read_coalescer.do(
+                (self.stats_table.name, "get", fund_id),
+                lambda: self.stats_table.get_item(Key={'fundId': fund_id})
+            )
+            
+            if 'Item' not in response:
+                return FundStatsRecord.empty(fund_id)
+            
+            return FundStatsRecord.from_item(response['Item'])
+            
+        except ClientError as e:
+            logger.error("Error retrieving stats for fund %s: %s", fund_id, e)
+            raise Exception(f"Error al obtener agregados del fondo {fund_id}: {str(e)}")
 
 # Instancia global del servicio
 fund_service = FundService() 
\ No newline at end of file
@@ -0,0 +1,247 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from app.config import LEDGER_SNAPSHOT_INTERVAL, LEDGER_APPEND_MAX_ATTEMPTS
+from app.database.client import db_client, cancellation_codes
+from app.database.pagination import encode_cursor, decode_cursor
+from app.exceptions import InsufficientBalanceException, LedgerConflictException
+from app.metrics import metrics
+from app.models.records import LedgerEventRecord, LedgerSnapshotRecord
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class LedgerState:
+    """Saldo de un usuario después de su último evento (sequence 0: libro aún sin eventos)"""
+    userId: str
+    sequence: int
+    balance: Decimal
+
+
+@dataclass(frozen=True, slots=True)
+class LedgerEntry:
+    """Movimiento a registrar en el libro mayor"""
+    type: str  # "credit" o "debit"
+    amount: Decimal
+    reason: str
+    reference: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class LedgerAppend:
+    """Acciones transaccionales de un append y estado resultante"""
+    actions: List[dict]
+    events: Tuple[LedgerEventRecord, ...]
+    state: LedgerState
+
+    def conflicted(self, codes: List[str], offset: int) -> bool:
+        """Indicar si otro append tomó alguno de los números de secuencia"""
+        return 'ConditionalCheckFailed' in codes[offset:offset + len(self.events)]
+
+
+class LedgerService:
+    """
+    Libro mayor de saldos por usuario (event sourcing)
+
+    Cada usuario tiene un flujo de eventos de solo agregado (créditos y débitos)
+    numerados con una secuencia consecutiva. El saldo se deriva del último
+    snapshot más los eventos posteriores, y cada LEDGER_SNAPSHOT_INTERVAL
+    eventos se guarda un snapshot nuevo en la misma transacción del append.
+
+    Un append es un Put condicionado a que el número de secuencia no exista:
+    si una escritura concurrente tomó el mismo número la transacción se cancela
+    y se reintenta sobre el estado nuevo, sin leer y sobrescribir un saldo.
+    El saldo de la tabla User es una proyección que se actualiza en la misma
+    transacción, para las lecturas que no necesitan consistencia.
+    """
+
+    def __init__(self, snapshot_interval: int = LEDGER_SNAPSHOT_INTERVAL):
+        self.events_table = db_client.get_table("LedgerEvents")
+        self.snapshots_table = db_client.get_table("LedgerSnapshots")
+        self.users_table = db_client.get_table("User")
+        self.snapshot_interval = snapshot_interval
+
+    async def get_state(self, user_id: str) -> LedgerState:
+        """
+        Saldo actual del usuario con lecturas consistentes
+
+        Lee el último snapshot y los eventos posteriores (menos de
+        ``snapshot_interval``). Un usuario creado antes del libro mayor aún no
+        tiene eventos: su saldo inicial es el de la tabla User y se registra
+        como evento de apertura en el primer append.
+        """
+        # Las lecturas (y la espera del limitador de tasa) corren en un hilo
+        return await asyncio.to_thread(self._read_state, user_id)
+
+    def _read_state(self, user_id: str) -> LedgerState:
+        try:
+            response = self.snapshots_table.query(
+                KeyConditionExpression=Key('userId').eq(user_id),
+                ScanIndexForward=False,
+                Limit=1,
+                ConsistentRead=True
+            )
+            snapshots = response.get('Items', [])
+            if snapshots:
+                snapshot = LedgerSnapshotRecord.from_item(snapshots[0])
+                sequence, balance = snapshot.sequence, snapshot.balance
+            else:
+                sequence, balance = 0, Decimal("0")
+
+            for event in self._events_after(user_id, sequence):
+                sequence, balance = event.sequence, balance + event.delta
+
+            if sequence == 0:
+                response = self.users_table.get_item(Key={'userId': user_id}, ConsistentRead=True)
+                balance = response.get('Item', {}).get('balance', Decimal("0"))
+
+            return LedgerState(user_id, sequence, balance)
+
+        except ClientError as e:
+            logger.error("Error reading ledger for user %s: %s", user_id, e)
+            raise Exception(f"Error al leer el libro mayor del usuario {user_id}: {str(e)}")
+
+    def _events_after(self, user_id: str, sequence: int) -> Iterator[LedgerEventRecord]:
+        """Eventos con número de secuencia mayor a ``sequence``, en orden"""
+        query_params = {
+            'KeyConditionExpression': Key('userId').eq(user_id) & Key('sequence').gt(sequence),
+            'ConsistentRead': True
+        }
+        while True:
+            response = self.events_table.query(**query_params)
+            for item in response.get('Items', []):
+                yield LedgerEventRecord.from_item(item)
+            if 'LastEvaluatedKey' not in response:
+                return
+            query_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    async def get_events(
+        self, user_id: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[LedgerEventRecord], Optional[str]]:
+        """
+        Página del historial de movimientos de un usuario (más recientes primero)
+
+        Raises:
+            ValueError: Si el cursor no es válido
+        """
+        query_params = {
+            'KeyConditionExpression': Key('userId').eq(user_id),
+            'ScanIndexForward': False,
+            'Limit': limit
+        }
+        if cursor:
+            query_params['ExclusiveStartKey'] = decode_cursor(cursor)
+
+        try:
+            response = await asyncio.to_thread(self.events_table.query, **query_params)
+            events = [LedgerEventRecord.from_item(item) for item in response.get('Items', [])]
+            return events, encode_cursor(response.get('LastEvaluatedKey'))
+        except ClientError as e:
+            logger.error("Error retrieving ledger events for user %s: %s", user_id, e)
+            raise Exception(f"Error al obtener movimientos del usuario {user_id}: {str(e)}")
+
+    def build_append(self, state: LedgerState, entries: Sequence[LedgerEntry], project: bool = True) -> LedgerAppend:
+        """
+        Acciones transaccionales para agregar movimientos al libro de un usuario
+
+        Args:
+            state: Estado sobre el que se agregan los movimientos
+            entries: Movimientos a registrar, en orden
+            project: Actualizar también el saldo proyectado en la tabla User
+
+        Raises:
+            InsufficientBalanceException: Si un débito deja el saldo en negativo
+        """
+        now = datetime.now(timezone.utc)
+        sequence, balance = state.sequence, state.balance
+        events = []
+
+        # Primer append de un usuario previo al libro mayor: registrar su saldo inicial
+        if sequence == 0 and balance:
+            sequence += 1
+            events.append(LedgerEventRecord(state.userId, sequence, "credit", balance, "opening", now))
+
+        for entry in entries:
+            delta = entry.amount if entry.type == "credit" else -entry.amount
+            if balance + delta < 0:
+                raise InsufficientBalanceException(float(entry.amount), float(balance))
+            sequence, balance = sequence + 1, balance + delta
+            events.append(LedgerEventRecord(
+                state.userId, sequence, entry.type, entry.amount, entry.reason, now, entry.reference
+            ))
+
+        actions = [
+            {
+                'Put': {
+                    'TableName': self.events_table.name,
+                    'Item': event.to_item(),
+                    'ConditionExpression': 'attribute_not_exists(userId)'
+                }
+            }
+            for event in events
+        ]
+
+        # Snapshot en la misma transacción al completar cada intervalo
+        balance_at = state.balance if state.sequence else Decimal("0")
+        for event in events:
+            balance_at += event.delta
+            if event.sequence % self.snapshot_interval == 0:
+                snapshot = LedgerSnapshotRecord(state.userId, event.sequence, balance_at)
+                actions.append({'Put': {'TableName': self.snapshots_table.name, 'Item': snapshot.to_item()}})
+
+        if project and events:
+            actions.append({
+                'Update': {
+                    'TableName': self.users_table.name,
+                    'Key': {'userId': state.userId},
+                    'UpdateExpression': 'SET balance = :balance, ledgerSequence = :sequence',
+                    'ConditionExpression': 'attribute_exists(userId)',
+                    'ExpressionAttributeValues': {':balance': balance, ':sequence': sequence}
+                }
+            })
+
+        return LedgerAppend(actions, tuple(events), LedgerState(state.userId, sequence, balance))
+
+    async def append(
+        self,
+        user_id: str,
+        build: Callable[[LedgerState], Tuple[Sequence[LedgerEntry], List[dict]]],
+        max_attempts: int = LEDGER_APPEND_MAX_ATTEMPTS
+    ) -> LedgerAppend:
+        """
+        Agregar movimientos con control de concurrencia optimista
+
+        ``build`` recibe el estado actual y devuelve los movimientos y las demás
+        acciones de la transacción, que van antes que las del libro mayor. Si
+        otra escritura tomó el número de secuencia se vuelve a leer el estado y
+        se reintenta; los demás errores de la transacción se propagan.
+
+        Raises:
+            InsufficientBalanceException: Si el saldo no alcanza para un débito
+            LedgerConflictException: Si se agotan los intentos
+        """
+        for attempt in range(max_attempts):
+            state = await self.get_state(user_id)
+            entries, actions = build(state)
+            ledger_append = self.build_append(state, entries)
+            if not ledger_append.events:
+                return ledger_append
+            try:
+                await asyncio.to_thread(db_client.transact_write_items, list(actions) + ledger_append.actions)
+                return ledger_append
+            except ClientError as e:
+                if not ledger_append.conflicted(cancellation_codes(e), len(actions)):
+                    raise
+                metrics.increment("ledger.append_conflicts")
+                logger.info("Ledger append conflict for user %s (attempt %s)", user_id, attempt + 1)
+
+        raise LedgerConflictException(user_id)
+
+# Instancia global del servicio
+ledger_service = LedgerService()
@@ -24,17 +24,17 @@ class NotificationService:
         try:
             if notification_type == "email":
                 self._send_email(recipient, message)
-                logger.info(f"[Email] Notification sent to {recipient}")
+                logger.info("[Email] Notification sent to %s", recipient)
                 return True
             elif notification_type == "sms":
                 self._send_sms(recipient, message)
-                logger.info(f"[SMS] Notification sent to {recipient}")
+                logger.info("[SMS] Notification sent to %s", recipient)
                 return True
             else:
                 raise ValueError(f"Unsupported notification type: {notification_type}")
                 
         except Exception as e:
-            logger.error(f"Error sending {notification_type} notification to {recipient}: {str(e)}")
+            logger.error("Error sending %s notification to %s: %s", notification_type, recipient, e)
             return False
     
     def _send_email(self, recipient: str, message: str) -> None:
@@ -42,18 +42,18 @@ class NotificationService:
         Simulación de envío de email
         En producción, aquí se integraría con AWS SES o similar
         """
-        print(f"[Email] Sending to {recipient}: {message}")
+        logger.info("[Email] Sending to %s: %s", recipient, message)
         # TODO: Integrar con AWS SES en producción
-        logger.debug(f"Email notification simulated for {recipient}")
+        logger.debug("Email notification simulated for %s", recipient)
     
     def _send_sms(self, recipient: str, message: str) -> None:
         """
         Simulación de envío de SMS
         En producción, aquí se integraría con AWS SNS o similar
         """
-        print(f"[SMS] Sending to {recipient}: {message}")
+        logger.info("[SMS] Sending to %s: %s", recipient, message)
         # TODO: Integrar con AWS SNS en producción
-        logger.debug(f"SMS notification simulated for {recipient}")
+        logger.debug("SMS notification simulated for %s", recipient)
     
     def send_subscription_notification(self, notification_type: str, recipient: str, fund_name: str) -> bool:
         """Enviar notificación específica de suscripción exitosa"""
@@ -0,0 +1,169 @@
+import asyncio
+from typing import Dict, List, Optional
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+from app.database.client import db_client
+from app.models.records import FundRecord, PortfolioRecord, UserFundRecord
+from app.services.fund_service import fund_service
+from datetime import datetime
+from decimal import Decimal
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Categorías de fondo con totales materializados
+FUND_CATEGORIES = ("FPV", "FIC")
+
+# Intentos de reconstrucción ante actualizaciones concurrentes del resumen
+REBUILD_MAX_ATTEMPTS = 3
+
+class PortfolioService:
+    """
+    Servicio para el resumen materializado de suscripciones por usuario
+
+    El resumen se mantiene de forma incremental dentro de la misma transacción
+    que crea o elimina la suscripción en UserFunds, por lo que su lectura es un
+    único GetItem en lugar de un query a UserFunds más un GetItem por fondo.
+
+    Las actualizaciones incrementales exigen que el resumen exista (y, al
+    cancelar, que contenga el fondo): un resumen solo se crea reconstruyéndolo
+    desde UserFunds con ``rebuild_summary``. Así los usuarios con suscripciones
+    anteriores al resumen no acumulan conteos parciales ni negativos; cuando la
+    condición falla, el servicio reconstruye el resumen y reintenta.
+    """
+
+    def __init__(self):
+        self.table = db_client.get_table("UserPortfolio")
+        self.subscriptions_table = db_client.get_table("UserFunds")
+
+    def _build_update(self, user_id: str, fund: FundRecord, amount: Decimal, delta: int) -> dict:
+        """Construir la acción de actualización incremental del resumen"""
+        counters = 'subscriptionCount :delta, totalCommitted :amount, #count :delta, #total :amount'
+        values = {
+            ':delta': delta,
+            ':amount': amount if delta > 0 else -amount,
+            ':fundIds': {fund.fundId},
+            ':now': datetime.now().isoformat()
+        }
+        if delta > 0:
+            update_expression = f'ADD {counters}, activeFundIds :fundIds SET updatedAt = :now'
+            condition = 'attribute_exists(userId)'
+        else:
+            update_expression = f'ADD {counters} DELETE activeFundIds :fundIds SET updatedAt = :now'
+            condition = 'contains(activeFundIds, :fundId)'
+            values[':fundId'] = fund.fundId
+        return {
+            'Update': {
+                'TableName': self.table.name,
+                'Key': {'userId': user_id},
+                'UpdateExpression': update_expression,
+                'ConditionExpression': condition,
+                'ExpressionAttributeNames': {
+                    '#count': f"{fund.category}Count",
+                    '#total': f"{fund.category}Total"
+                },
+                'ExpressionAttributeValues': values
+            }
+        }
+
+    @staticmethod
+    def summary_outdated(codes: List[str], index: int) -> bool:
+        """Indicar si la acción del resumen (posición ``index``) canceló la transacción"""
+        return codes[index:index + 1] == ['ConditionalCheckFailed']
+
+    def build_subscribe_action(self, user_id: str, fund: FundRecord, amount: Decimal) -> dict:
+        """Acción transaccional para registrar una suscripción en el resumen"""
+        return self._build_update(user_id, fund, amount, 1)
+
+    def build_unsubscribe_action(self, user_id: str, fund: FundRecord, amount: Decimal) -> dict:
+        """Acción transaccional para retirar una suscripción del resumen"""
+        return self._build_update(user_id, fund, amount, -1)
+
+    async def get_summary(self, user_id: str) -> Optional[PortfolioRecord]:
+        """Obtener el resumen materializado de un usuario (None si no tiene resumen)"""
+        try:
+            response = await asyncio.to_thread(self.table.get_item, Key={'userId': user_id})
+
+            if 'Item' not in response:
+                return None
+
+            portfolio = PortfolioRecord.from_item(response['Item'], FUND_CATEGORIES)
+            logger.info("Retrieved portfolio summary for user %s", user_id)
+            return portfolio
+
+        except ClientError as e:
+            logger.error("Error retrieving portfolio summary for user %s: %s", user_id, e)
+            raise Exception(f"Error al obtener resumen del usuario {user_id}: {str(e)}")
+
+    async def rebuild_summary(self, user_id: str) -> PortfolioRecord:
+        """
+        Reescribir el resumen de un usuario a partir de sus suscripciones en UserFunds
+
+        Las suscripciones sin monto registrado cuentan con el monto mínimo del
+        fondo, como al cancelarlas. La escritura se condiciona a que el resumen
+        no haya cambiado desde la lectura; si cambió, se vuelve a calcular.
+        """
+        catalog = await fund_service.get_catalog()
+        try:
+            return await asyncio.to_thread(self._rebuild, user_id, catalog.by_id)
+        except ClientError as e:
+            logger.error("Error rebuilding portfolio summary for user %s: %s", user_id, e)
+            raise Exception(f"Error al reconstruir el resumen del usuario {user_id}: {str(e)}")
+
+    def _rebuild(self, user_id: str, funds: Dict[str, FundRecord]) -> PortfolioRecord:
+        for attempt in range(REBUILD_MAX_ATTEMPTS):
+            current = self.table.get_item(Key={'userId': user_id}, ConsistentRead=True).get('Item')
+            item = self._summary_item(user_id, self._subscriptions(user_id), funds)
+            if current is None:
+                condition = {'ConditionExpression': 'attribute_not_exists(userId)'}
+            else:
+                condition = {
+                    'ConditionExpression': 'updatedAt = :seen',
+                    'ExpressionAttributeValues': {':seen': current.get('updatedAt', '')}
+                }
+            try:
+                self.table.put_item(Item=item, **condition)
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                    raise
+                logger.info("Portfolio summary for user %s changed while rebuilding (attempt %s)", user_id, attempt + 1)
+                continue
+            logger.info("Rebuilt portfolio summary for user %s", user_id)
+            return PortfolioRecord.from_item(item, FUND_CATEGORIES)
+
+        raise Exception(f"El resumen del usuario {user_id} cambió durante la reconstrucción")
+
+    def _subscriptions(self, user_id: str) -> List[UserFundRecord]:
+        query_params = {'KeyConditionExpression': Key('userId').eq(user_id), 'ConsistentRead': True}
+        subscriptions = []
+        while True:
+            response = self.subscriptions_table.query(**query_params)
+            subscriptions.extend(UserFundRecord.from_item(item) for item in response.get('Items', []))
+            if 'LastEvaluatedKey' not in response:
+                return subscriptions
+            query_params['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    @staticmethod
+    def _summary_item(user_id: str, subscriptions: List[UserFundRecord], funds: Dict[str, FundRecord]) -> dict:
+        item = {
+            'userId': user_id,
+            'subscriptionCount': len(subscriptions),
+            'totalCommitted': Decimal("0"),
+            'updatedAt': datetime.now().isoformat()
+        }
+        for subscription in subscriptions:
+            fund = funds.get(subscription.fundId)
+            amount = subscription.amount
+            if amount is None:
+                amount = fund.minAmount if fund is not None else Decimal("0")
+            item['totalCommitted'] += amount
+            if fund is not None and fund.category in FUND_CATEGORIES:
+                item[f"{fund.category}Count"] = item.get(f"{fund.category}Count", 0) + 1
+                item[f"{fund.category}Total"] = item.get(f"{fund.category}Total", Decimal("0")) + amount
+        if subscriptions:
+            # DynamoDB no admite conjuntos vacíos
+            item['activeFundIds'] = {subscription.fundId for subscription in subscriptions}
+        return item
+
+# Instancia global del servicio
+portfolio_service = PortfolioService()
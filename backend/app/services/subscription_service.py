@@ -1,15 +1,21 @@
-from typing import List, Optional
+import asyncio
+from typing import List, Optional, Tuple
 from botocore.exceptions import ClientError
-from app.database.client import db_client
+from app.database.client import db_client, cancellation_codes
+from app.database.pagination import encode_cursor, decode_cursor
 from app.models.subscription import (
-    UserFund, SubscribeRequest, UnsubscribeRequest, SubscriptionResponse,
+    SubscribeRequest, UnsubscribeRequest, SubscriptionResponse,
     SubscriptionError, SubscriptionErrorCode
 )
 from app.models.transaction import TransactionCreate
+from app.models.records import UserFundRecord
 from app.services.user_service import user_service
 from app.services.fund_service import fund_service
 from app.services.transaction_service import transaction_service
 from app.services.notification_service import notification_service
+from app.services.portfolio_service import portfolio_service
+from app.services.ledger_service import ledger_service, LedgerEntry, LedgerState
+from app.exceptions import DatabaseThrottledException, InsufficientBalanceException
 from datetime import datetime
 from decimal import Decimal
 import logging
@@ -31,7 +37,7 @@ class SubscriptionService:
         2. El fondo debe existir
         3. El usuario no debe estar ya suscrito al fondo
         4. El usuario debe tener saldo suficiente (>= monto mínimo del fondo)
-        5. Se debe debitar el monto mínimo del saldo del usuario
+        5. Se debe debitar el monto mínimo del saldo del usuario (evento en el libro mayor)
         6. Se debe registrar la transacción
         7. Se debe enviar notificación según preferencia del usuario
         """
@@ -81,7 +87,9 @@ class SubscriptionService:
                     error=error
                 )
             
-            # 4. Verificar saldo suficiente
+            # 4. Verificar saldo suficiente (el saldo en caché puede estar desactualizado)
+            if user.balance < fund.minAmount:
+                user = await user_service.get_user_by_id(request.userId, use_cache=False) or user
             if user.balance < fund.minAmount:
                 error = SubscriptionError.from_code(
                     SubscriptionErrorCode.INSUFFICIENT_BALANCE,
@@ -100,25 +108,69 @@ class SubscriptionService:
                     error=error
                 )
             
-            # 5. Crear la suscripción
-            subscription_time = datetime.now()
-            user_fund = UserFund(
-                userId=request.userId,
-                fundId=request.fundId,
-                subscribedAt=subscription_time
-            )
+            # 5. Crear la suscripción, registrar el débito en el libro mayor y actualizar
+            #    los resúmenes en una sola transacción (el libro mayor valida el saldo)
+            user_fund = UserFundRecord(request.userId, request.fundId, datetime.now(), fund.minAmount)
             
-            # Guardar en DynamoDB
-            item = {
-                'userId': user_fund.userId,
-                'fundId': user_fund.fundId,
-                'subscribedAt': user_fund.subscribedAt.isoformat()
-            }
-            self.table.put_item(Item=item)
+            def build_subscription(state: LedgerState):
+                return [LedgerEntry("debit", fund.minAmount, "subscribe", fund.fundId)], [
+                    {
+                        'Put': {
+                            'TableName': self.table.name,
+                            'Item': user_fund.to_item(),
+                            'ConditionExpression': 'attribute_not_exists(fundId)'
+                        }
+                    },
+                    portfolio_service.build_subscribe_action(request.userId, fund, fund.minAmount),
+                    fund_service.build_stats_action(fund, fund.minAmount, 1)
+                ]
+            
+            # Un usuario sin resumen (o con suscripciones anteriores a él) recibe un
+            # resumen reconstruido desde UserFunds y la suscripción se reintenta
+            for attempt in range(2):
+                try:
+                    await ledger_service.append(request.userId, build_subscription)
+                    break
+                except InsufficientBalanceException as e:
+                    # Otra operación consumió el saldo después de la validación
+                    await user_service.invalidate(request.userId)
+                    error = SubscriptionError.from_code(
+                        SubscriptionErrorCode.INSUFFICIENT_BALANCE,
+                        f"Saldo insuficiente. Se requiere un mínimo de {fund.minAmount}, saldo actual: {e.current_balance}",
+                        {
+                            "requiredAmount": float(fund.minAmount),
+                            "currentBalance": e.current_balance,
+                            "userId": request.userId,
+                            "fundId": request.fundId
+                        }
+                    )
+                    return SubscriptionResponse(
+                        success=False,
+                        message=error.message,
+                        userFund=None,
+                        error=error
+                    )
+                except ClientError as e:
+                    codes = cancellation_codes(e)
+                    # Una suscripción concurrente ganó la carrera
+                    if codes[:1] == ['ConditionalCheckFailed']:
+                        error = SubscriptionError.from_code(
+                            SubscriptionErrorCode.ALREADY_SUBSCRIBED,
+                            f"El usuario ya está suscrito al fondo {request.fundId}",
+                            {"userId": request.userId, "fundId": request.fundId}
+                        )
+                        return SubscriptionResponse(
+                            success=False,
+                            message=error.message,
+                            userFund=None,
+                            error=error
+                        )
+                    if attempt > 0 or not portfolio_service.summary_outdated(codes, 1):
+                        raise
+                    await portfolio_service.rebuild_summary(request.userId)
             
-            # 6. Debitar el monto mínimo del usuario
-            new_balance = user.balance - fund.minAmount
-            await user_service.update_user_balance(request.userId, new_balance)
+            # 6. El saldo se debitó en la transacción: descartar el usuario en caché
+            await user_service.invalidate(request.userId)
             
             # 7. Registrar la transacción
             transaction_data = TransactionCreate(
@@ -140,16 +192,18 @@ class SubscriptionService:
             if notification_sent:
                 message += f". Notificación enviada vía {user.notificationType}."
             
-            logger.info(f"User {request.userId} successfully subscribed to fund {request.fundId}")
+            logger.info("User %s successfully subscribed to fund %s", request.userId, request.fundId)
             
             return SubscriptionResponse(
                 success=True,
                 message=message,
-                userFund=user_fund
+                userFund=user_fund.to_model()
             )
             
+        except DatabaseThrottledException:
+            raise
         except Exception as e:
-            logger.error(f"Error subscribing user {request.userId} to fund {request.fundId}: {str(e)}")
+            logger.error("Error subscribing user %s to fund %s: %s", request.userId, request.fundId, e)
             error = SubscriptionError.from_code(
                 SubscriptionErrorCode.INTERNAL_ERROR,
                 f"Error interno: {str(e)}",
@@ -220,13 +274,51 @@ class SubscriptionService:
                     error=error
                 )
             
-            # 4. Eliminar la suscripción
-            self.table.delete_item(
-                Key={
-                    'userId': request.userId,
-                    'fundId': request.fundId
+            # 4. Eliminar la suscripción y actualizar los resúmenes de usuario y fondo en una sola transacción
+            committed_amount = existing_subscription.amount
+            if committed_amount is None:
+                committed_amount = fund.minAmount
+            delete_action = {
+                'Delete': {
+                    'TableName': self.table.name,
+                    'Key': {
+                        'userId': request.userId,
+                        'fundId': request.fundId
+                    },
+                    'ConditionExpression': 'attribute_exists(fundId)'
                 }
-            )
+            }
+            stats_action = fund_service.build_stats_action(fund, committed_amount, -1)
+            try:
+                try:
+                    await asyncio.to_thread(db_client.transact_write_items, [
+                        delete_action,
+                        portfolio_service.build_unsubscribe_action(request.userId, fund, committed_amount),
+                        stats_action
+                    ])
+                except ClientError as e:
+                    codes = cancellation_codes(e)
+                    if codes[:1] == ['ConditionalCheckFailed'] or not portfolio_service.summary_outdated(codes, 1):
+                        raise
+                    # El resumen no tiene esta suscripción (es anterior al resumen): cancelar
+                    # sin decrementarlo y reconstruirlo desde UserFunds
+                    await asyncio.to_thread(db_client.transact_write_items, [delete_action, stats_action])
+                    await portfolio_service.rebuild_summary(request.userId)
+            except ClientError as e:
+                # Una cancelación concurrente ganó la carrera
+                if cancellation_codes(e)[:1] == ['ConditionalCheckFailed']:
+                    error = SubscriptionError.from_code(
+                        SubscriptionErrorCode.NOT_SUBSCRIBED,
+                        f"El usuario no está suscrito al fondo {request.fundId}",
+                        {"userId": request.userId, "fundId": request.fundId}
+                    )
+                    return SubscriptionResponse(
+                        success=False,
+                        message=error.message,
+                        userFund=None,
+                        error=error
+                    )
+                raise
             
             # 5. Registrar la transacción de cancelación (monto 0)
             transaction_data = TransactionCreate(
@@ -248,7 +340,7 @@ class SubscriptionService:
             if notification_sent:
                 message += f". Notificación enviada vía {user.notificationType}."
             
-            logger.info(f"User {request.userId} successfully unsubscribed from fund {request.fundId}")
+            logger.info("User %s successfully unsubscribed from fund %s", request.userId, request.fundId)
             
             return SubscriptionResponse(
                 success=True,
@@ -256,8 +348,10 @@ class SubscriptionService:
                 userFund=None
             )
             
+        except DatabaseThrottledException:
+            raise
         except Exception as e:
-            logger.error(f"Error unsubscribing user {request.userId} from fund {request.fundId}: {str(e)}")
+            logger.error("Error unsubscribing user %s from fund %s: %s", request.userId, request.fundId, e)
             error = SubscriptionError.from_code(
                 SubscriptionErrorCode.INTERNAL_ERROR,
                 f"Error interno: {str(e)}",
@@ -270,10 +364,11 @@ class SubscriptionService:
                 error=error
             )
     
-    async def get_user_fund(self, user_id: str, fund_id: str) -> Optional[UserFund]:
+    async def get_user_fund(self, user_id: str, fund_id: str) -> Optional[UserFundRecord]:
         """Obtener una suscripción específica usuario-fondo"""
         try:
-            response = self.table.get_item(
+            response = await asyncio.to_thread(
+                self.table.get_item,
                 Key={
                     'userId': user_id,
                     'fundId': fund_id
@@ -283,47 +378,73 @@ class SubscriptionService:
             if 'Item' not in response:
                 return None
             
-            item = response['Item']
-            user_fund = UserFund(
-                userId=item['userId'],
-                fundId=item['fundId'],
-                subscribedAt=datetime.fromisoformat(item['subscribedAt'])
-            )
-            
-            return user_fund
+            return UserFundRecord.from_item(response['Item'])
             
         except ClientError as e:
-            logger.error(f"Error retrieving subscription for user {user_id} and fund {fund_id}: {str(e)}")
+            logger.error("Error retrieving subscription for user %s and fund %s: %s", user_id, fund_id, e)
             return None
     
-    async def get_user_subscriptions(self, user_id: str) -> List[UserFund]:
+    async def get_user_subscriptions(self, user_id: str) -> List[UserFundRecord]:
         """Obtener todas las suscripciones de un usuario"""
         try:
-            response = self.table.query(
+            response = await asyncio.to_thread(
+                self.table.query,
                 KeyConditionExpression='userId = :userId',
                 ExpressionAttributeValues={':userId': user_id}
             )
             
             subscriptions_data = response.get('Items', [])
             
-            subscriptions = []
-            for item in subscriptions_data:
-                user_fund = UserFund(
-                    userId=item['userId'],
-                    fundId=item['fundId'],
-                    subscribedAt=datetime.fromisoformat(item['subscribedAt'])
-                )
-                subscriptions.append(user_fund)
+            subscriptions = [UserFundRecord.from_item(item) for item in subscriptions_data]
             
             # Ordenar por fecha de suscripción (más recientes primero)
             subscriptions.sort(key=lambda x: x.subscribedAt, reverse=True)
             
-            logger.info(f"Retrieved {len(subscriptions)} subscriptions for user {user_id}")
+            logger.info("Retrieved %s subscriptions for user %s", len(subscriptions), user_id)
             return subscriptions
             
         except ClientError as e:
-            logger.error(f"Error retrieving subscriptions for user {user_id}: {str(e)}")
+            logger.error("Error retrieving subscriptions for user %s: %s", user_id, e)
             raise Exception(f"Error al obtener suscripciones del usuario {user_id}: {str(e)}")
 
+    async def get_fund_subscribers(
+        self, fund_id: str, limit: int, cursor: Optional[str] = None
+    ) -> Tuple[List[UserFundRecord], Optional[str]]:
+        """
+        Obtener una página de suscriptores de un fondo usando el índice FundIdIndex
+        
+        Args:
+            fund_id: ID del fondo
+            limit: Máximo de suscripciones por página
+            cursor: Cursor devuelto por la página anterior
+            
+        Returns:
+            Tuple[List[UserFundRecord], Optional[str]]: Suscripciones (más antiguas primero) y cursor siguiente
+            
+        Raises:
+            ValueError: Si el cursor no es válido
+        """
+        query_params = {
+            'IndexName': 'FundIdIndex',
+            'KeyConditionExpression': 'fundId = :fundId',
+            'ExpressionAttributeValues': {':fundId': fund_id},
+            'Limit': limit
+        }
+        if cursor:
+            query_params['ExclusiveStartKey'] = decode_cursor(cursor)
+        
+        try:
+            response = await asyncio.to_thread(self.table.query, **query_params)
+            
+            subscribers = [UserFundRecord.from_item(item) for item in response.get('Items', [])]
+            next_cursor = encode_cursor(response.get('LastEvaluatedKey'))
+            
+            logger.info("Retrieved %s subscribers for fund %s", len(subscribers), fund_id)
+            return subscribers, next_cursor
+            
+        except ClientError as e:
+            logger.error("Error retrieving subscribers for fund %s: %s", fund_id, e)
+            raise Exception(f"Error al obtener suscriptores del fondo {fund_id}: {str(e)}")
+
 # Instancia global del servicio
 subscription_service = SubscriptionService() 
\ No newline at end of file
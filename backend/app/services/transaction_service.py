@@ -1,8 +1,15 @@
-from typing import List
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Tuple
+from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 from app.database.client import db_client
-from app.models.transaction import Transaction, TransactionCreate
-from datetime import datetime
+from app.database.write_buffer import transaction_buffers
+from app.config import TRANSACTION_WRITE_BEHIND_ENABLED, TRANSACTION_WRITE_BEHIND_TYPES
+from app.models.transaction import TransactionCreate
+from app.models.records import TransactionRecord
+from app.database.pagination import encode_cursor, decode_cursor
+from app.utils.ids import uuid7_upper_bound
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,96 +20,103 @@ class TransactionService:
     def __init__(self):
         self.table = db_client.get_table("Transactions")
     
-    async def create_transaction(self, transaction_data: TransactionCreate) -> Transaction:
+    async def create_transaction(self, transaction_data: TransactionCreate) -> TransactionRecord:
         """Crear una nueva transacción"""
         try:
-            # Crear objeto Transaction con ID y timestamp automáticos
-            transaction = Transaction(
-                userId=transaction_data.userId,
-                fundId=transaction_data.fundId,
-                type=transaction_data.type,
-                amount=transaction_data.amount
+            # Crear registro con ID y timestamp automáticos
+            transaction = TransactionRecord.new(
+                transaction_data.userId,
+                transaction_data.fundId,
+                transaction_data.type,
+                transaction_data.amount
             )
             
-            # Convertir a diccionario para DynamoDB
-            item = {
-                'transactionId': transaction.transactionId,
-                'userId': transaction.userId,
-                'fundId': transaction.fundId,
-                'type': transaction.type,
-                'amount': transaction.amount,
-                'timestamp': transaction.timestamp.isoformat()
-            }
+            # Las transacciones no críticas van al buffer local y se envían por lotes
+            if TRANSACTION_WRITE_BEHIND_ENABLED and transaction.type in TRANSACTION_WRITE_BEHIND_TYPES:
+                # Escritura local con fsync: fuera del event loop
+                await asyncio.to_thread(transaction_buffers.get().append, transaction.to_item())
+            else:
+                await asyncio.to_thread(self.table.put_item, Item=transaction.to_item())
             
-            # Guardar en DynamoDB
-            self.table.put_item(Item=item)
-            
-            logger.info(f"Created transaction {transaction.transactionId} for user {transaction.userId}")
+            logger.info("Created transaction %s for user %s", transaction.transactionId, transaction.userId)
             return transaction
             
         except ClientError as e:
-            logger.error(f"Error creating transaction: {str(e)}")
+            logger.error("Error creating transaction: %s", e)
             raise Exception(f"Error al crear transacción: {str(e)}")
     
-    async def get_transactions_by_user(self, user_id: str) -> List[Transaction]:
-        """Obtener todas las transacciones de un usuario"""
-        try:
-            # Usar el índice secundario global para consultar por userId
-            response = self.table.query(
-                IndexName='UserIdIndex',
-                KeyConditionExpression='userId = :userId',
-                ExpressionAttributeValues={':userId': user_id},
-                ScanIndexForward=False  # Ordenar por timestamp descendente
-            )
+    async def get_transactions_by_user(
+        self, user_id: str, limit: Optional[int] = None, cursor: Optional[str] = None,
+        after: Optional[datetime] = None
+    ) -> Tuple[List[TransactionRecord], Optional[str]]:
+        """
+        Obtener las transacciones de un usuario, más recientes primero
+        
+        El índice UserIdIndex tiene transactionId (UUIDv7) como clave de rango,
+        así que DynamoDB devuelve el historial ya ordenado por fecha y el filtro
+        por fecha es una condición sobre la clave.
+        
+        Args:
+            user_id: ID del usuario
+            limit: Máximo de transacciones por página (None para todas)
+            cursor: Cursor devuelto por la página anterior
+            after: Solo transacciones posteriores a esta fecha (sin zona horaria = UTC)
             
-            transactions_data = response.get('Items', [])
+        Returns:
+            Tuple[List[TransactionRecord], Optional[str]]: Transacciones y cursor siguiente
             
-            # Convertir datos de DynamoDB a modelos Pydantic
+        Raises:
+            ValueError: Si el cursor no es válido
+        """
+        key_condition = Key('userId').eq(user_id)
+        if after is not None:
+            key_condition = key_condition & Key('transactionId').gt(uuid7_upper_bound(after))
+        
+        query_params = {
+            'IndexName': 'UserIdIndex',
+            'KeyConditionExpression': key_condition,
+            'ScanIndexForward': False  # transactionId descendente: más recientes primero
+        }
+        if limit is not None:
+            query_params['Limit'] = limit
+        if cursor:
+            query_params['ExclusiveStartKey'] = decode_cursor(cursor)
+        
+        try:
             transactions = []
-            for transaction_data in transactions_data:
-                transaction = Transaction(
-                    transactionId=transaction_data['transactionId'],
-                    userId=transaction_data['userId'],
-                    fundId=transaction_data['fundId'],
-                    type=transaction_data['type'],
-                    amount=transaction_data['amount'],
-                    timestamp=datetime.fromisoformat(transaction_data['timestamp'])
-                )
-                transactions.append(transaction)
+            while True:
+                response = await asyncio.to_thread(self.table.query, **query_params)
+                transactions.extend(TransactionRecord.from_item(item) for item in response.get('Items', []))
+                last_evaluated_key = response.get('LastEvaluatedKey')
+                # Con límite se devuelve una sola página; sin límite se recorren todas
+                if limit is not None or not last_evaluated_key:
+                    break
+                query_params['ExclusiveStartKey'] = last_evaluated_key
             
-            # Ordenar por timestamp descendente (más recientes primero)
-            transactions.sort(key=lambda x: x.timestamp, reverse=True)
+            next_cursor = encode_cursor(last_evaluated_key) if limit is not None else None
             
-            logger.info(f"Retrieved {len(transactions)} transactions for user {user_id}")
-            return transactions
+            logger.info("Retrieved %s transactions for user %s", len(transactions), user_id)
+            return transactions, next_cursor
             
         except ClientError as e:
-            logger.error(f"Error retrieving transactions for user {user_id}: {str(e)}")
+            logger.error("Error retrieving transactions for user %s: %s", user_id, e)
             raise Exception(f"Error al obtener transacciones del usuario {user_id}: {str(e)}")
     
-    async def get_transaction_by_id(self, transaction_id: str) -> Transaction:
+    async def get_transaction_by_id(self, transaction_id: str) -> TransactionRecord:
         """Obtener una transacción específica por ID"""
         try:
-            response = self.table.get_item(Key={'transactionId': transaction_id})
+            response = await asyncio.to_thread(self.table.get_item, Key={'transactionId': transaction_id})
             
             if 'Item' not in response:
                 raise Exception(f"Transacción {transaction_id} no encontrada")
             
-            transaction_data = response['Item']
-            transaction = Transaction(
-                transactionId=transaction_data['transactionId'],
-                userId=transaction_data['userId'],
-                fundId=transaction_data['fundId'],
-                type=transaction_data['type'],
-                amount=transaction_data['amount'],
-                timestamp=datetime.fromisoformat(transaction_data['timestamp'])
-            )
+            transaction = TransactionRecord.from_item(response['Item'])
             
-            logger.info(f"Retrieved transaction: {transaction_id}")
+            logger.info("Retrieved transaction: %s", transaction_id)
             return transaction
             
         except ClientError as e:
-            logger.error(f"Error retrieving transaction {transaction_id}: {str(e)}")
+            logger.error("Error retrieving transaction %s: %s", transaction_id, e)
             raise Exception(f"Error al obtener transacción {transaction_id}: {str(e)}")
 
 # Instancia global del servicio
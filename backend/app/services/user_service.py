@@ -1,128 +1,197 @@
-from typing import Optional
+import asyncio
+from typing import List, Optional
 from botocore.exceptions import ClientError
-from app.database.client import db_client
-from app.models.user import User, UserCreate
+from app.cache.backends import shared_backend
+from app.cache.tiered import TwoLevelCache, dumps_items, loads_items
+from app.config import USER_CACHE_MAX_SIZE, USER_CACHE_TTL_SECONDS
+from app.database.client import db_client, cancellation_codes
+from app.database.singleflight import read_coalescer
+from app.database.streams import RESET, ChangeRecord
+from app.services.ledger_service import ledger_service, LedgerEntry, LedgerState
+from app.models.user import UserCreate
+from app.models.records import UserRecord
+from app.tenancy import PerTenant, scoped_key
 from decimal import Decimal
 import logging
 
 logger = logging.getLogger(__name__)
 
 class UserService:
-    """Servicio para gestión de usuarios"""
+    """
+    Servicio para gestión de usuarios
     
-    def __init__(self):
+    Las lecturas pasan por una caché de dos niveles (read-through: L1 en proceso
+    y L2 compartida entre workers) y las escrituras la actualizan con el valor
+    devuelto por DynamoDB (write-through). El saldo del usuario es una
+    proyección del libro mayor (LedgerService): las reglas que dependen del
+    saldo no confían en la caché ni en la proyección, se validan sobre el libro.
+    """
+    
+    def __init__(self, cache_backend=shared_backend):
         self.table = db_client.get_table("User")
+        # Una caché por tenant: los usuarios de un tenant no desalojan a los de otro
+        self._caches = PerTenant(lambda tenant: TwoLevelCache(
+            scoped_key("users", tenant),
+            maxsize=USER_CACHE_MAX_SIZE,
+            ttl=USER_CACHE_TTL_SECONDS,
+            backend=cache_backend,
+            encode=lambda user: dumps_items([user.to_item()]),
+            decode=lambda data: UserRecord.from_item(loads_items(data)[0])
+        ))
+    
+    @property
+    def cache(self) -> TwoLevelCache:
+        """Caché de usuarios del tenant actual"""
+        return self._caches.get()
     
-    async def get_user_by_id(self, user_id: str) -> Optional[User]:
-        """Obtener un usuario por ID"""
+    async def get_user_by_id(self, user_id: str, use_cache: bool = True) -> Optional[UserRecord]:
+        """
+        Obtener un usuario por ID
+        
+        Args:
+            user_id: ID del usuario
+            use_cache: False para forzar una lectura consistente desde DynamoDB
+        """
+        if use_cache:
+            cached_user = await self.cache.get_async(user_id)
+            if cached_user is not None:
+                return cached_user
+        
         try:
-            response = self.table.get_item(Key={'userId': user_id})
+            if use_cache:
+                # Lecturas eventualmente consistentes: las concurrentes comparten un GetItem
+                response = await read_coalescer.do(
+                    (self.table.name, "get", user_id),
+                    lambda: self.table.get_item(Key={'userId': user_id})
+                )
+            else:
+                response = await asyncio.to_thread(self.table.get_item, Key={'userId': user_id}, ConsistentRead=True)
             
             if 'Item' not in response:
                 return None
             
-            user_data = response['Item']
-            user = User(
-                userId=user_data['userId'],
-                balance=user_data['balance'],
-                notificationType=user_data['notificationType']
-            )
+            user = UserRecord.from_item(response['Item'])
+            await self.cache.set_async(user_id, user)
             
-            logger.info(f"Retrieved user: {user_id}")
+            logger.info("Retrieved user: %s", user_id)
             return user
             
         except ClientError as e:
-            logger.error(f"Error retrieving user {user_id}: {str(e)}")
+            logger.error("Error retrieving user %s: %s", user_id, e)
             raise Exception(f"Error al obtener usuario {user_id}: {str(e)}")
     
-    async def create_user(self, user_data: UserCreate) -> User:
-        """Crear un nuevo usuario"""
+    async def invalidate(self, user_id: str) -> None:
+        """Descartar el usuario de la caché en todos los workers (p. ej. después de una escritura transaccional)"""
+        await self.cache.invalidate_async(user_id)
+    
+    def on_user_changes(self, records: List[ChangeRecord]) -> None:
+        """
+        Handler del stream de la tabla User: descartar los usuarios modificados
+        
+        Con un RESET (registros perdidos) se vacía la L1 completa; la L2 no se
+        puede recorrer y sus entradas expiran con USER_CACHE_TTL_SECONDS.
+        """
+        cache = self.cache
+        for record in records:
+            if record.event_name == RESET:
+                cache.local.clear()
+            else:
+                cache.discard(record.keys['userId'])
+    
+    async def create_user(self, user_data: UserCreate) -> UserRecord:
+        """Crear un nuevo usuario y abrir su libro mayor con el saldo inicial"""
         try:
-            # Verificar si el usuario ya existe
-            existing_user = await self.get_user_by_id(user_data.userId)
-            if existing_user:
-                raise Exception(f"El usuario {user_data.userId} ya existe")
-            
-            # Crear nuevo usuario
+            # Evento de apertura del libro mayor con el saldo inicial
+            opening = ledger_service.build_append(
+                LedgerState(user_data.userId, 0, user_data.balance), [], project=False
+            )
             item = {
                 'userId': user_data.userId,
                 'balance': user_data.balance,
-                'notificationType': user_data.notificationType
+                'notificationType': user_data.notificationType,
+                'ledgerSequence': opening.state.sequence
             }
             
-            self.table.put_item(Item=item)
+            # La condición evita sobrescribir un usuario existente
+            await asyncio.to_thread(db_client.transact_write_items, [
+                {
+                    'Put': {
+                        'TableName': self.table.name,
+                        'Item': item,
+                        'ConditionExpression': 'attribute_not_exists(userId)'
+                    }
+                },
+                *opening.actions
+            ])
             
             # Retornar el usuario creado
-            created_user = User(**item)
-            logger.info(f"Created user: {user_data.userId}")
+            created_user = UserRecord.from_item(item)
+            await self.cache.set_async(created_user.userId, created_user)
+            logger.info("Created user: %s", user_data.userId)
             return created_user
             
         except ClientError as e:
-            logger.error(f"Error creating user {user_data.userId}: {str(e)}")
+            if cancellation_codes(e)[:1] == ['ConditionalCheckFailed']:
+                raise Exception(f"El usuario {user_data.userId} ya existe")
+            logger.error("Error creating user %s: %s", user_data.userId, e)
             raise Exception(f"Error al crear usuario {user_data.userId}: {str(e)}")
     
-    async def update_user_balance(self, user_id: str, new_balance: Decimal) -> User:
-        """Actualizar el saldo de un usuario"""
+    async def update_user_balance(self, user_id: str, new_balance: Decimal) -> UserRecord:
+        """
+        Ajustar el saldo de un usuario
+        
+        El saldo no se sobrescribe: se registra en el libro mayor un movimiento
+        de ajuste por la diferencia con el saldo actual.
+        """
+        def build_adjustment(state: LedgerState):
+            delta = new_balance - state.balance
+            if not delta:
+                return [], []
+            entry_type = "credit" if delta > 0 else "debit"
+            return [LedgerEntry(entry_type, abs(delta), "adjustment")], []
+        
+        if await self.get_user_by_id(user_id, use_cache=False) is None:
+            raise Exception(f"Usuario {user_id} no encontrado")
+        
         try:
-            # Verificar que el usuario existe
-            user = await self.get_user_by_id(user_id)
-            if not user:
-                raise Exception(f"Usuario {user_id} no encontrado")
-            
-            # Actualizar saldo
-            response = self.table.update_item(
-                Key={'userId': user_id},
-                UpdateExpression='SET balance = :balance',
-                ExpressionAttributeValues={':balance': new_balance},
-                ReturnValues='ALL_NEW'
-            )
-            
-            updated_data = response['Attributes']
-            updated_user = User(
-                userId=updated_data['userId'],
-                balance=updated_data['balance'],
-                notificationType=updated_data['notificationType']
-            )
-            
-            logger.info(f"Updated balance for user {user_id}: {new_balance}")
-            return updated_user
-            
+            await ledger_service.append(user_id, build_adjustment)
         except ClientError as e:
-            logger.error(f"Error updating balance for user {user_id}: {str(e)}")
+            logger.error("Error updating balance for user %s: %s", user_id, e)
             raise Exception(f"Error al actualizar saldo del usuario {user_id}: {str(e)}")
+        
+        await self.invalidate(user_id)
+        updated_user = await self.get_user_by_id(user_id, use_cache=False)
+        
+        logger.info("Updated balance for user %s: %s", user_id, new_balance)
+        return updated_user
     
-    async def update_notification_type(self, user_id: str, notification_type: str) -> User:
+    async def update_notification_type(self, user_id: str, notification_type: str) -> UserRecord:
         """Actualizar el tipo de notificación de un usuario"""
         try:
-            # Verificar que el usuario existe
-            user = await self.get_user_by_id(user_id)
-            if not user:
-                raise Exception(f"Usuario {user_id} no encontrado")
-            
             # Validar tipo de notificación
             if notification_type not in ["email", "sms"]:
                 raise Exception(f"Tipo de notificación inválido: {notification_type}")
             
-            # Actualizar tipo de notificación
-            response = self.table.update_item(
+            # Actualizar tipo de notificación solo si el usuario existe
+            response = await asyncio.to_thread(
+                self.table.update_item,
                 Key={'userId': user_id},
                 UpdateExpression='SET notificationType = :notificationType',
+                ConditionExpression='attribute_exists(userId)',
                 ExpressionAttributeValues={':notificationType': notification_type},
                 ReturnValues='ALL_NEW'
             )
             
-            updated_data = response['Attributes']
-            updated_user = User(
-                userId=updated_data['userId'],
-                balance=updated_data['balance'],
-                notificationType=updated_data['notificationType']
-            )
+            updated_user = UserRecord.from_item(response['Attributes'])
+            await self.cache.update_async(user_id, updated_user)
             
-            logger.info(f"Updated notification type for user {user_id}: {notification_type}")
+            logger.info("Updated notification type for user %s: %s", user_id, notification_type)
             return updated_user
             
         except ClientError as e:
-            logger.error(f"Error updating notification type for user {user_id}: {str(e)}")
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise Exception(f"Usuario {user_id} no encontrado")
+            logger.error("Error updating notification type for user %s: %s", user_id, e)
             raise Exception(f"Error al actualizar tipo de notificación del usuario {user_id}: {str(e)}")
     
     async def user_exists(self, user_id: str) -> bool:
@@ -131,4 +200,4 @@ class UserService:
         return user is not None
 
 # Instancia global del servicio
-user_service = UserService() 
\ No newline at end of file
+user_service = UserService()
@@ -0,0 +1,146 @@
+"""
+Multi-tenant: tenant de la petición en curso y recursos separados por tenant
+
+Cada tenant (marca) usa su propio juego de tablas, con el prefijo
+``<tenant>_`` después de DYNAMODB_TABLE_PREFIX, y sus propias cachés, límites
+de tasa, buckets de capacidad de DynamoDB y controladores de admisión, para
+que la carga de un tenant no consuma la capacidad de los demás.
+
+El tenant por defecto ("") usa las tablas sin prefijo de tenant: con TENANTS
+vacío la aplicación funciona exactamente como una instalación de un solo
+tenant. ``TenantMiddleware`` fija el tenant de cada petición en ``tenant_var``;
+fuera de una petición (arranque, tareas de fondo) se usa el tenant por defecto
+o el indicado con ``tenant_context``.
+"""
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Generic, Iterator, Optional, Tuple, TypeVar
+
+from app.config import DYNAMODB_TABLE_PREFIX, TENANTS, TENANT_HOSTS
+
+T = TypeVar("T")
+
+DEFAULT_TENANT = ""
+
+# Identificadores de tenant: también forman parte de nombres de tablas y claves de caché
+_VALID_TENANT = re.compile(r"[a-z0-9][a-z0-9-]{0,31}")
+
+tenant_var: ContextVar[str] = ContextVar("tenant", default=DEFAULT_TENANT)
+
+
+def parse_tenants(value: str) -> Tuple[str, ...]:
+    """Convertir "acme,globex" en la tupla de tenants, validando cada identificador"""
+    tenants = []
+    for entry in value.split(","):
+        tenant = entry.strip().lower()
+        if not tenant:
+            continue
+        if not _VALID_TENANT.fullmatch(tenant):
+            raise ValueError(f"Identificador de tenant inválido: {entry!r}")
+        tenants.append(tenant)
+    return tuple(tenants)
+
+
+def parse_hosts(value: str) -> Dict[str, str]:
+    """Convertir "fondos.acme.com=acme,..." en {host: tenant}"""
+    hosts = {}
+    for entry in value.split(","):
+        host, _, tenant = entry.strip().partition("=")
+        if host and tenant:
+            hosts[host.strip().lower()] = tenant.strip().lower()
+    return hosts
+
+
+TENANT_IDS = parse_tenants(TENANTS)
+TENANT_BY_HOST = parse_hosts(TENANT_HOSTS)
+MULTI_TENANT = bool(TENANT_IDS)
+
+
+def all_tenants() -> Tuple[str, ...]:
+    """El tenant por defecto y los configurados"""
+    return (DEFAULT_TENANT,) + TENANT_IDS
+
+
+def current_tenant() -> str:
+    return tenant_var.get()
+
+
+@contextmanager
+def tenant_context(tenant: str) -> Iterator[None]:
+    """Ejecutar un bloque como el tenant indicado (inicialización, scripts, tests)"""
+    token = tenant_var.set(tenant)
+    try:
+        yield
+    finally:
+        tenant_var.reset(token)
+
+
+def scoped_key(key: str, tenant: Optional[str] = None) -> str:
+    """Clave o nombre propio del tenant ("funds" para el tenant por defecto, "acme:funds" para acme)"""
+    tenant = current_tenant() if tenant is None else tenant
+    return f"{tenant}:{key}" if tenant else key
+
+
+def physical_table_name(name: str, tenant: Optional[str] = None) -> str:
+    """Nombre físico de una tabla a partir de su nombre lógico ("User", "Funds"...)"""
+    tenant = current_tenant() if tenant is None else tenant
+    return f"{DYNAMODB_TABLE_PREFIX}{tenant + '_' if tenant else ''}{name}"
+
+
+class PerTenant(Generic[T]):
+    """Una instancia de un recurso por tenant, creada la primera vez que se usa"""
+
+    def __init__(self, factory: Callable[[str], T]):
+        self._factory = factory
+        self._instances: Dict[str, T] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tenant: Optional[str] = None) -> T:
+        """Instancia del tenant indicado o, por defecto, del tenant actual"""
+        tenant = current_tenant() if tenant is None else tenant
+        instance = self._instances.get(tenant)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(tenant)
+                if instance is None:
+                    instance = self._instances[tenant] = self._factory(tenant)
+        return instance
+
+    def instances(self) -> Dict[str, T]:
+        """Instancias creadas hasta ahora, por tenant"""
+        with self._lock:
+            return dict(self._instances)
+
+
+class TenantTable:
+    """
+    Referencia a una tabla lógica que opera sobre la tabla del tenant actual
+
+    Los servicios guardan la referencia al iniciar (sin tenant); cada operación
+    se resuelve con el tenant de la petición en curso.
+    """
+
+    def __init__(self, name: str, open_table: Callable[[str], Any]):
+        self.logical_name = name
+        self._tables = PerTenant(lambda tenant: open_table(physical_table_name(name, tenant)))
+
+    @property
+    def name(self) -> str:
+        return self._tables.get().name
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._tables.get(), attribute)
+
+
+def route_table(name: str, open_table: Callable[[str], Any]):
+    """
+    Referencia a la tabla lógica ``name``
+
+    Con un solo tenant devuelve directamente la tabla física; con varios, una
+    ``TenantTable`` que elige la tabla del tenant en cada operación.
+    """
+    if not MULTI_TENANT:
+        return open_table(physical_table_name(name, DEFAULT_TENANT))
+    return TenantTable(name, open_table)
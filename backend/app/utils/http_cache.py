@@ -0,0 +1,61 @@
+"""
+Utilidades de caché HTTP: ETags fuertes, Cache-Control y GET condicional
+"""
+import hashlib
+from typing import Optional
+from fastapi import Response
+from app.config import FUND_CACHE_MAX_AGE, FUND_CACHE_STALE_WHILE_REVALIDATE
+
+
+def content_version(*parts) -> str:
+    """Calcular una versión estable a partir de las partes que definen un contenido"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b"\x1f")
+    return digest.hexdigest()[:32]
+
+
+def make_etag(version: str) -> str:
+    """Construir un ETag fuerte para una versión de contenido"""
+    return f'"{version}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluar un encabezado If-None-Match contra el ETag actual
+    
+    Según RFC 9110 la comparación para If-None-Match es débil, por lo que se
+    ignora el prefijo W/ de los ETags enviados por el cliente.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def cache_headers(etag: str, live: bool = False) -> dict:
+    """
+    Encabezados de caché para respuestas de fondos
+    
+    El catálogo cambia poco y se puede reutilizar durante FUND_CACHE_MAX_AGE.
+    Las respuestas con datos en vivo (``live``, p. ej. los agregados del
+    detalle de un fondo) usan ``no-cache``: se pueden guardar pero se revalidan
+    con el ETag en cada uso, que con 304 sigue siendo barato.
+    """
+    if live:
+        return {"ETag": etag, "Cache-Control": "no-cache"}
+    return {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={FUND_CACHE_MAX_AGE}, "
+            f"stale-while-revalidate={FUND_CACHE_STALE_WHILE_REVALIDATE}"
+        )
+    }
+
+
+def not_modified(etag: str, live: bool = False) -> Response:
+    """Respuesta 304 Not Modified sin cuerpo"""
+    return Response(status_code=304, headers=cache_headers(etag, live))
@@ -0,0 +1,100 @@
+"""
+Identificadores ordenables por tiempo (UUIDv7, RFC 9562)
+
+Los primeros 48 bits son el instante de creación en milisegundos Unix, así que
+en su forma canónica (hexadecimal en minúsculas) el orden lexicográfico de los
+identificadores es el orden de creación. Sirven a la vez de identificador y de
+clave de ordenación: "transacciones posteriores a X" es una consulta por rango
+de clave y un cursor es simplemente el último identificador devuelto.
+
+Dentro de un mismo milisegundo los 12 bits ``rand_a`` actúan de contador
+(RFC 9562, método 1), de modo que los identificadores generados por el proceso
+son estrictamente crecientes aunque se creen en el mismo milisegundo.
+"""
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+_VERSION = 0x7
+_VARIANT = 0b10
+_COUNTER_MAX = 0xFFF
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def _build(unix_ms: int, rand_a: int, rand_b: int) -> uuid.UUID:
+    value = (unix_ms & 0xFFFFFFFFFFFF) << 80
+    value |= _VERSION << 76
+    value |= (rand_a & 0xFFF) << 64
+    value |= _VARIANT << 62
+    value |= rand_b & 0x3FFFFFFFFFFFFFFF
+    return uuid.UUID(int=value)
+
+
+def uuid7() -> str:
+    """Generar un UUIDv7 estrictamente creciente dentro del proceso"""
+    global _last_ms, _counter
+    random_bytes = os.urandom(10)
+    rand_b = int.from_bytes(random_bytes[:8], "big")
+    now_ms = time.time_ns() // 1_000_000
+
+    with _lock:
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Semilla aleatoria en la mitad baja: deja margen para incrementar
+            _counter = int.from_bytes(random_bytes[8:], "big") & 0x7FF
+        else:
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                # Contador agotado: tomar prestado el milisegundo siguiente
+                _last_ms += 1
+                _counter = 0
+        unix_ms, counter = _last_ms, _counter
+
+    return str(_build(unix_ms, counter, rand_b))
+
+
+def uuid7_at(moment: datetime) -> str:
+    """
+    UUIDv7 aleatorio del milisegundo de ``moment``
+
+    Para registrar a posteriori algo ocurrido en ``moment`` conservando su lugar
+    en el orden por identificador. No es monótono respecto a ``uuid7()``. Las
+    fechas sin zona horaria se interpretan como UTC.
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    unix_ms = (moment - _EPOCH) // timedelta(milliseconds=1)
+    random_bytes = os.urandom(10)
+    return str(_build(unix_ms, int.from_bytes(random_bytes[8:], "big"), int.from_bytes(random_bytes[:8], "big")))
+
+
+def uuid7_datetime(value: str) -> datetime:
+    """
+    Instante (UTC) codificado en un UUIDv7
+
+    Raises:
+        ValueError: Si el valor no es un UUIDv7
+    """
+    parsed = uuid.UUID(value)
+    if parsed.version != _VERSION:
+        raise ValueError(f"No es un UUIDv7: {value}")
+    return datetime.fromtimestamp((parsed.int >> 80) / 1000, timezone.utc)
+
+
+def uuid7_upper_bound(moment: datetime) -> str:
+    """
+    Mayor UUIDv7 posible del milisegundo de ``moment``
+
+    ``id > uuid7_upper_bound(t)`` selecciona los identificadores creados
+    después de ``t``. Las fechas sin zona horaria se interpretan como UTC.
+    """
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    unix_ms = (moment - _EPOCH) // timedelta(milliseconds=1)
+    return str(_build(unix_ms, _COUNTER_MAX, 0x3FFFFFFFFFFFFFFF))
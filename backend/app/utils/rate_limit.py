@@ -0,0 +1,197 @@
+"""
+Limitación de tasa por usuario y por IP con ventana deslizante
+
+Se usa el algoritmo de contador de ventana deslizante: se cuentan las
+peticiones de la ventana fija actual y de la anterior, y la anterior se pondera
+por la fracción que aún cae dentro de la ventana deslizante. Solo requiere dos
+contadores por clave y es preciso para límites de minutos.
+
+Los contadores viven en memoria del proceso o, si hay un backend de caché
+compartido configurado (CACHE_BACKEND), en el backend para que el límite sea
+global entre workers. El incremento y la lectura de la ventana anterior son
+una sola llamada atómica al backend, que desde la dependencia async se hace en
+un hilo para no detener el event loop. Si el backend falla se usa el contador
+local.
+
+Las peticiones rechazadas también cuentan: un cliente que insiste sigue
+bloqueado hasta que baja su tasa.
+"""
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+
+from app.cache.backends import CacheBackend, shared_backend
+from app.config import (
+    CACHE_KEY_PREFIX, RATE_LIMIT_ENABLED, RATE_LIMIT_WINDOW_SECONDS, RATE_LIMIT_USER_REQUESTS,
+    RATE_LIMIT_IP_REQUESTS, RATE_LIMIT_MAX_KEYS
+)
+from app.metrics import metrics
+from app.tenancy import scoped_key
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitResult:
+    """Resultado de registrar una petición en un limitador"""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int  # Segundos hasta que termina la ventana actual
+
+
+class SlidingWindowLimiter:
+    """
+    Limitador de ventana deslizante por clave
+
+    Args:
+        name: Nombre del limitador (prefijo de claves y métricas)
+        limit: Peticiones permitidas por ventana
+        window: Duración de la ventana en segundos
+        backend: Backend compartido opcional para los contadores
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        window: float,
+        backend: Optional[CacheBackend] = None,
+        max_keys: int = RATE_LIMIT_MAX_KEYS,
+        clock: Callable[[], float] = time.time
+    ):
+        self.name = name
+        self.limit = limit
+        self.window = window
+        self.backend = backend
+        self.max_keys = max_keys
+        self._clock = clock
+        # clave -> (índice de ventana, contador actual, contador anterior)
+        self._counters: Dict[str, Tuple[int, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str) -> RateLimitResult:
+        """Registrar una petición para la clave y evaluar el límite"""
+        now = self._clock()
+        index = int(now // self.window)
+        elapsed = now - index * self.window
+
+        current, previous = self._increment(key, index)
+        estimate = previous * (self.window - elapsed) / self.window + current
+        allowed = estimate <= self.limit
+        if not allowed:
+            metrics.increment(f"rate_limit.{self.name}.rejected")
+
+        return RateLimitResult(
+            allowed=allowed,
+            limit=self.limit,
+            remaining=max(0, math.floor(self.limit - estimate)),
+            reset=max(1, math.ceil(self.window - elapsed))
+        )
+
+    async def hit_async(self, key: str) -> RateLimitResult:
+        """``hit`` desde código async: con backend compartido la llamada de red se hace en un hilo"""
+        if self.backend is None:
+            return self.hit(key)
+        return await asyncio.to_thread(self.hit, key)
+
+    def _increment(self, key: str, index: int) -> Tuple[int, int]:
+        if self.backend is None:
+            return self._increment_local(key, index)
+
+        prefix = f"{CACHE_KEY_PREFIX}:ratelimit:{self.name}:{key}"
+        try:
+            # Si solo falla la lectura de la ventana anterior el backend devuelve
+            # None: la petición ya quedó contada y no se cuenta de nuevo en local
+            current, previous = self.backend.incr_window(f"{prefix}:{index}", f"{prefix}:{index - 1}", self.window * 2)
+        except Exception as e:
+            metrics.increment(f"rate_limit.{self.name}.backend_errors")
+            logger.warning("Shared rate limit backend failed, using local counters: %s", e)
+            return self._increment_local(key, index)
+        return current, int(previous or 0)
+
+    def _increment_local(self, key: str, index: int) -> Tuple[int, int]:
+        with self._lock:
+            entry_index, current, previous = self._counters.get(key, (index, 0, 0))
+            if entry_index == index - 1:
+                previous, current = current, 0
+            elif entry_index < index - 1:
+                previous, current = 0, 0
+            current += 1
+            self._counters[key] = (index, current, previous)
+            if len(self._counters) > self.max_keys:
+                self._prune(index)
+            return current, previous
+
+    def _prune(self, index: int) -> None:
+        """Eliminar claves sin actividad en las dos últimas ventanas"""
+        stale = [key for key, (entry_index, _, _) in self._counters.items() if entry_index < index - 1]
+        for key in stale:
+            del self._counters[key]
+
+
+def rate_limit_headers(result: RateLimitResult) -> Dict[str, str]:
+    """Cabeceras RateLimit-* (draft IETF) para un resultado"""
+    return {
+        "RateLimit-Limit": str(result.limit),
+        "RateLimit-Remaining": str(result.remaining),
+        "RateLimit-Reset": str(result.reset),
+    }
+
+
+async def request_user_id(request: Request) -> Optional[str]:
+    """userId del cuerpo JSON de la petición (ya leído y guardado por FastAPI)"""
+    try:
+        payload = json.loads(await request.body() or b"{}")
+    except ValueError:
+        return None
+    user_id = payload.get("userId") if isinstance(payload, dict) else None
+    return user_id if isinstance(user_id, str) and user_id else None
+
+
+# Limitadores de los endpoints de suscripción
+user_limiter = SlidingWindowLimiter("user", RATE_LIMIT_USER_REQUESTS, RATE_LIMIT_WINDOW_SECONDS, shared_backend)
+ip_limiter = SlidingWindowLimiter("ip", RATE_LIMIT_IP_REQUESTS, RATE_LIMIT_WINDOW_SECONDS, shared_backend)
+
+
+async def enforce_subscription_rate_limit(request: Request, response: Response) -> None:
+    """
+    Dependencia de FastAPI que limita las suscripciones por IP y por userId
+
+    Se ejecuta antes del endpoint: si se supera alguno de los límites responde
+    429 con Retry-After sin llegar a los servicios. En las respuestas aceptadas
+    agrega las cabeceras RateLimit-* del límite más cercano a agotarse.
+    """
+    if not RATE_LIMIT_ENABLED:
+        return
+
+    results = []
+    # Claves por tenant: cada tenant tiene su propio presupuesto por IP y por usuario
+    if request.client is not None:
+        results.append(await ip_limiter.hit_async(scoped_key(request.client.host)))
+    user_id = await request_user_id(request)
+    if user_id is not None:
+        results.append(await user_limiter.hit_async(scoped_key(user_id)))
+    if not results:
+        return
+
+    # El resultado más restrictivo: primero los rechazados, luego el de menos restantes
+    binding = min(results, key=lambda result: (result.allowed, result.remaining))
+    headers = rate_limit_headers(binding)
+
+    if not binding.allowed:
+        logger.warning("Rate limit exceeded on %s for user %s", request.url.path, user_id)
+        raise HTTPException(
+            status_code=429,
+            detail="Demasiadas solicitudes, intente nuevamente más tarde",
+            headers={**headers, "Retry-After": str(binding.reset)}
+        )
+
+    response.headers.update(headers)
@@ -0,0 +1 @@
+# Benchmarks de rendimiento (se ejecutan manualmente, no forman parte de la suite de tests)
@@ -0,0 +1,104 @@
+"""
+Benchmark del costo del logging en el hilo de la petición
+
+Mide cuánto tarda cada llamada a ``logger.info`` en el hilo que registra el
+evento (el que atiende la petición), escribiendo en un archivo temporal:
+
+- sync-fstring: configuración anterior (basicConfig, f-string, escritura síncrona)
+- sync-json: formato JSON perezoso con escritura síncrona
+- queued-json: formato JSON perezoso encolado para el hilo en segundo plano
+- queued-sampled: igual que queued-json conservando LOG_SAMPLE_RATES del logger
+
+El tiempo de vaciado de la cola se informa aparte: no lo paga la petición.
+
+Uso (desde backend/):
+    python -m benchmarks.logging_benchmark --calls 50000 --sample-rate 0.1
+"""
+import argparse
+import logging
+import statistics
+import tempfile
+import time
+
+from app.logging_config import configure_logging, stop_logging
+
+LOGGER_NAME = "benchmark.hot_path"
+
+
+def configure_basic(stream) -> None:
+    """Configuración equivalente a logging.basicConfig(level=INFO)"""
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    logging.getLogger().addHandler(handler)
+    logging.getLogger().setLevel(logging.INFO)
+
+
+def reset_root() -> None:
+    stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+
+def run(scenario: str, calls: int, sample_rate: float) -> dict:
+    """Registrar ``calls`` eventos INFO y medir el costo por llamada"""
+    reset_root()
+    with tempfile.TemporaryFile("w") as stream:
+        if scenario == "sync-fstring":
+            configure_basic(stream)
+        else:
+            configure_logging(
+                level="INFO",
+                fmt="json",
+                sample_rates=f"{LOGGER_NAME}={sample_rate}" if scenario == "queued-sampled" else "",
+                use_queue=scenario.startswith("queued"),
+                stream=stream
+            )
+        logger = logging.getLogger(LOGGER_NAME)
+        user = {"userId": "user_001", "balance": 500000}
+
+        latencies = []
+        for i in range(calls):
+            started = time.perf_counter()
+            if scenario == "sync-fstring":
+                logger.info(f"Retrieved user: {user['userId']} ({i})")
+            else:
+                logger.info("Retrieved user: %s (%s)", user["userId"], i)
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        reset_root()
+        drain = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "scenario": scenario,
+        "mean_us": statistics.fmean(latencies) * 1e6,
+        "p50_us": statistics.median(latencies) * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99) - 1] * 1e6,
+        "drain_ms": drain * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=50000, help="Eventos por escenario")
+    parser.add_argument("--sample-rate", type=float, default=0.1, help="Tasa de muestreo de queued-sampled")
+    args = parser.parse_args()
+
+    results = [
+        run(scenario, args.calls, args.sample_rate)
+        for scenario in ("sync-fstring", "sync-json", "queued-json", "queued-sampled")
+    ]
+
+    print(f"calls: {args.calls}  sample rate: {args.sample_rate}")
+    print(f"{'scenario':>16} {'mean us':>9} {'p50 us':>8} {'p99 us':>8} {'drain ms':>9}")
+    for result in results:
+        print(
+            f"{result['scenario']:>16} {result['mean_us']:>9.2f} {result['p50_us']:>8.2f} "
+            f"{result['p99_us']:>8.2f} {result['drain_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark de throughput según el tamaño del pool de conexiones a DynamoDB
+
+Lanza GetItem concurrentes desde un pool de hilos contra DYNAMODB_ENDPOINT con
+distintos valores de ``max_pool_connections``. Cuando la concurrencia supera el
+tamaño del pool, los hilos esperan una conexión libre y el throughput se
+estanca; el resto de la configuración (timeouts, keep-alive, reintentos) es la
+misma que usa la aplicación.
+
+Uso (desde backend/, con DynamoDB Local levantado):
+    python -m benchmarks.pool_benchmark --pool-sizes 5,10,25,50 --concurrency 50 --requests 5000
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import boto3
+from botocore.exceptions import ClientError
+
+from app.config import DYNAMODB_ENDPOINT, AWS_REGION
+from app.database.client import DynamoDBClient
+
+TABLE_NAME = "PoolBenchmark"
+ITEM_KEY = {"pk": "benchmark"}
+
+
+def create_resource(pool_size: int):
+    """Resource con la configuración de la aplicación y el tamaño de pool indicado"""
+    session = boto3.session.Session(
+        region_name=AWS_REGION, aws_access_key_id='dummy', aws_secret_access_key='dummy'
+    )
+    return session.resource(
+        'dynamodb', endpoint_url=DYNAMODB_ENDPOINT, config=DynamoDBClient.build_config(pool_size)
+    )
+
+
+def ensure_table(resource) -> None:
+    """Crear la tabla de benchmark con un item si no existe"""
+    try:
+        table = resource.create_table(
+            TableName=TABLE_NAME,
+            KeySchema=[{"AttributeName": "pk", "KeyType": "HASH"}],
+            AttributeDefinitions=[{"AttributeName": "pk", "AttributeType": "S"}],
+            BillingMode="PAY_PER_REQUEST"
+        )
+        table.wait_until_exists()
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ResourceInUseException':
+            raise
+    resource.Table(TABLE_NAME).put_item(Item={**ITEM_KEY, "payload": "x" * 512})
+
+
+def run(pool_size: int, concurrency: int, requests: int) -> dict:
+    """Ejecutar ``requests`` GetItem con ``concurrency`` hilos y un pool de ``pool_size``"""
+    table = create_resource(pool_size).Table(TABLE_NAME)
+    table.get_item(Key=ITEM_KEY)  # Calentar: resolver endpoint y abrir la primera conexión
+
+    def timed_get(_):
+        started = time.perf_counter()
+        table.get_item(Key=ITEM_KEY)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(timed_get, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "pool_size": pool_size,
+        "throughput": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pool-sizes", default="5,10,25,50", help="Tamaños de pool separados por coma")
+    parser.add_argument("--concurrency", type=int, default=50, help="Hilos concurrentes")
+    parser.add_argument("--requests", type=int, default=5000, help="GetItem por tamaño de pool")
+    args = parser.parse_args()
+
+    ensure_table(create_resource(1))
+    print(f"Endpoint: {DYNAMODB_ENDPOINT}  concurrency: {args.concurrency}  requests: {args.requests}")
+    print(f"{'pool':>6} {'req/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for pool_size in (int(size) for size in args.pool_sizes.split(",")):
+        result = run(pool_size, args.concurrency, args.requests)
+        print(f"{result['pool_size']:>6} {result['throughput']:>10.1f} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
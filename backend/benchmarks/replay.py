@@ -0,0 +1,154 @@
+"""
+Reproducción de una traza de peticiones con su ritmo original
+
+Lee la traza NDJSON de ``benchmarks.workload`` y envía cada petición en su
+instante ``t`` (dividido por ``--speed``), sin esperar a que terminen las
+anteriores: es un generador de carga de lazo abierto, como el tráfico real. La
+latencia se mide desde el instante programado, así que incluye la espera si el
+servicio o el propio generador se atrasan (sin omisión coordinada); el tiempo
+de servicio desde el envío se informa aparte.
+
+Por defecto la aplicación se ejecuta en el mismo proceso (ASGI) contra
+DYNAMODB_ENDPOINT; con ``--base-url`` se usa una API ya levantada.
+
+Uso (desde backend/, después de cargar los datos con benchmarks.workload --load):
+    python -m benchmarks.replay traces/zipf.ndjson --speed 2 --max-in-flight 512
+    python -m benchmarks.replay traces/zipf.ndjson --base-url http://localhost:8001
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional
+
+import httpx
+
+
+def read_trace(path: str, limit: Optional[int] = None) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as handle:
+        for number, line in enumerate(handle):
+            if limit is not None and number >= limit:
+                return
+            yield json.loads(line)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Recorder:
+    """Latencias y códigos de estado por endpoint"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.service: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.max_lag = 0.0
+
+    def record(self, endpoint: str, status: str, scheduled: float, sent: float, finished: float) -> None:
+        self.latencies[endpoint].append(finished - scheduled)
+        self.service[endpoint].append(finished - sent)
+        self.statuses[endpoint][status] += 1
+        self.max_lag = max(self.max_lag, sent - scheduled)
+
+    def rows(self) -> Iterator[dict]:
+        for endpoint in sorted(self.latencies):
+            latencies = sorted(self.latencies[endpoint])
+            yield {
+                "endpoint": endpoint,
+                "count": len(latencies),
+                "statuses": dict(sorted(self.statuses[endpoint].items())),
+                "p50_ms": percentile(latencies, 0.50) * 1000,
+                "p95_ms": percentile(latencies, 0.95) * 1000,
+                "p99_ms": percentile(latencies, 0.99) * 1000,
+                "service_p50_ms": statistics.median(self.service[endpoint]) * 1000,
+            }
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    entries: Iterator[dict],
+    speed: float = 1.0,
+    max_in_flight: int = 256
+) -> Recorder:
+    """
+    Enviar cada petición en su instante programado
+
+    ``max_in_flight`` acota las peticiones simultáneas para no agotar los
+    sockets del generador; si se alcanza, las siguientes salen tarde y ese
+    atraso queda en la latencia medida.
+    """
+    recorder = Recorder()
+    slots = asyncio.Semaphore(max_in_flight)
+    tasks = set()
+    started = time.perf_counter()
+
+    async def send(entry: dict, scheduled: float) -> None:
+        try:
+            sent = time.perf_counter()
+            try:
+                response = await client.request(entry["method"], entry["path"], json=entry.get("body"))
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            recorder.record(entry["endpoint"], status, scheduled, sent, time.perf_counter())
+        finally:
+            slots.release()
+
+    for entry in entries:
+        scheduled = started + entry["t"] / speed
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await slots.acquire()
+        task = asyncio.create_task(send(entry, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    return recorder
+
+
+async def run(args) -> Recorder:
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://replay", timeout=args.timeout
+        )
+    async with client:
+        return await replay(client, read_trace(args.trace, args.limit), args.speed, args.max_in_flight)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("trace", help="Traza NDJSON generada por benchmarks.workload")
+    parser.add_argument("--base-url", default=None, help="API ya levantada (por defecto, la aplicación en proceso)")
+    parser.add_argument("--speed", type=float, default=1.0, help="Factor de aceleración del ritmo de la traza")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Peticiones simultáneas como máximo")
+    parser.add_argument("--limit", type=int, default=None, help="Reproducir solo las primeras N peticiones")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Timeout por petición en segundos")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    recorder = asyncio.run(run(args))
+    elapsed = time.perf_counter() - started
+    total = sum(len(latencies) for latencies in recorder.latencies.values())
+
+    print(f"requests: {total}  elapsed: {elapsed:.1f}s  rate: {total / elapsed:.1f} req/s  max lag: {recorder.max_lag * 1000:.1f} ms")
+    print(f"{'endpoint':>12} {'count':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'svc p50':>8}  statuses")
+    for row in recorder.rows():
+        statuses = " ".join(f"{status}:{count}" for status, count in row["statuses"].items())
+        print(
+            f"{row['endpoint']:>12} {row['count']:>8} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} "
+            f"{row['p99_ms']:>8.1f} {row['service_p50_ms']:>8.1f}  {statuses}"
+        )
+
+
+if __name__ == "__main__":
+    main()
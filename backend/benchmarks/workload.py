@@ -0,0 +1,197 @@
+"""
+Generador de carga realista: conjunto de datos y traza de peticiones
+
+Genera con ``app.database.loader.generate_dataset`` el conjunto de datos (con
+``--load`` lo escribe en DYNAMODB_ENDPOINT) y, a partir del mismo estado, una
+traza NDJSON de peticiones a los endpoints de suscripción, cancelación,
+historial y configuración de notificaciones:
+
+- llegadas de Poisson con una tasa media de ``--rate`` peticiones por segundo
+- actividad por usuario con distribución de Zipf (``--user-skew``): unos pocos
+  usuarios concentran la mayoría de las peticiones
+- fondos con distribución de Zipf (``--fund-skew``), también en los datos
+
+La traza simula el estado de cada usuario (saldo y fondos activos), así que
+las suscripciones y cancelaciones son válidas cuando se reproducen en orden
+sobre el conjunto recién cargado. Con la misma semilla se generan los mismos
+usuarios y la misma traza. Cada línea es:
+
+    {"t": 12.345, "endpoint": "subscribe", "method": "POST", "path": "/api/v1/subscribe", "body": {...}}
+
+Uso (desde backend/, con DynamoDB Local levantado):
+    python -m benchmarks.workload --users 100000 --requests 500000 --rate 300 --seed 42 \\
+        --user-skew 1.1 --fund-skew 1.2 --load --trace traces/zipf.ndjson
+"""
+import argparse
+import bisect
+import itertools
+import json
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from app.database.loader import generate_dataset, load, zipf_weights
+from app.models.records import FundRecord
+
+# Proporción de cada endpoint en la traza
+DEFAULT_MIX = "subscribe=0.25,unsubscribe=0.15,history=0.45,settings=0.15"
+
+
+@dataclass
+class UserState:
+    """Saldo y fondos activos simulados de un usuario"""
+    balance: Decimal
+    active: set = field(default_factory=set)
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """Convertir "subscribe=0.25,history=0.75" en {endpoint: proporción}"""
+    mix = {}
+    for entry in value.split(","):
+        name, _, weight = entry.strip().partition("=")
+        if name not in ("subscribe", "unsubscribe", "history", "settings"):
+            raise ValueError(f"Endpoint desconocido en la mezcla: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def track_state(
+    items: Iterable[Tuple[str, dict]], users: Dict[str, UserState], funds: List[FundRecord]
+) -> Iterator[Tuple[str, dict]]:
+    """Dejar pasar los items del conjunto registrando fondos, saldos y suscripciones activas"""
+    for table_name, item in items:
+        if table_name == "Funds":
+            funds.append(FundRecord.from_item(item))
+        elif table_name == "User":
+            users.setdefault(item['userId'], UserState(item['balance'])).balance = item['balance']
+        elif table_name == "UserFunds":
+            users.setdefault(item['userId'], UserState(Decimal("0"))).active.add(item['fundId'])
+        yield table_name, item
+
+
+class ZipfSampler:
+    """Elegir elementos con probabilidad de Zipf según su rango (búsqueda binaria sobre el acumulado)"""
+
+    def __init__(self, population: list, skew: float, rand: random.Random):
+        self.population = population
+        self.cumulative = list(itertools.accumulate(zipf_weights(len(population), skew)))
+        self.rand = rand
+
+    def sample(self):
+        target = self.rand.random() * self.cumulative[-1]
+        return self.population[bisect.bisect_right(self.cumulative, target)]
+
+
+def generate_trace(
+    users: Dict[str, UserState],
+    funds: List[FundRecord],
+    requests: int,
+    rate: float,
+    mix: Dict[str, float],
+    user_skew: float = 1.1,
+    fund_skew: float = 1.2,
+    seed: Optional[int] = None
+) -> Iterator[dict]:
+    """
+    Generar ``requests`` peticiones con llegadas de Poisson a ``rate`` por segundo
+
+    Los rangos de Zipf de los usuarios se asignan con un orden aleatorio (pero
+    determinista) para que la actividad no dependa del orden de generación.
+    Una suscripción sin fondos disponibles para el saldo del usuario, o una
+    cancelación sin suscripciones activas, se reemplaza por una consulta de
+    historial.
+    """
+    rand = random.Random(seed)
+    ranked = sorted(users)
+    rand.shuffle(ranked)
+    user_sampler = ZipfSampler(ranked, user_skew, rand)
+    fund_weights = dict(zip((fund.fundId for fund in funds), zipf_weights(len(funds), fund_skew)))
+    endpoints, weights = list(mix), list(mix.values())
+
+    moment = 0.0
+    for _ in range(requests):
+        moment += rand.expovariate(rate)
+        user_id = user_sampler.sample()
+        state = users[user_id]
+        endpoint = rand.choices(endpoints, weights)[0]
+        entry = {"t": round(moment, 6), "endpoint": endpoint}
+
+        if endpoint == "subscribe":
+            candidates = [
+                fund for fund in funds if fund.fundId not in state.active and fund.minAmount <= state.balance
+            ]
+            if candidates:
+                fund = rand.choices(candidates, [fund_weights[fund.fundId] for fund in candidates])[0]
+                state.active.add(fund.fundId)
+                state.balance -= fund.minAmount
+                entry.update(method="POST", path="/api/v1/subscribe", body={"userId": user_id, "fundId": fund.fundId})
+                yield entry
+                continue
+            endpoint = "history"
+        elif endpoint == "unsubscribe":
+            if state.active:
+                fund_id = rand.choice(sorted(state.active))
+                state.active.discard(fund_id)
+                entry.update(method="POST", path="/api/v1/unsubscribe", body={"userId": user_id, "fundId": fund_id})
+                yield entry
+                continue
+            endpoint = "history"
+
+        if endpoint == "settings":
+            body = {"userId": user_id, "notificationType": rand.choice(("email", "sms"))}
+            entry.update(method="POST", path="/api/v1/settings/notifications", body=body)
+        else:
+            entry.update(endpoint="history", method="GET", path=f"/api/v1/transactions/?userId={quote(user_id)}&limit=20")
+        yield entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10000, help="Usuarios del conjunto de datos")
+    parser.add_argument("--funds", type=int, default=0, help="Fondos sintéticos además del catálogo inicial")
+    parser.add_argument("--requests", type=int, default=100000, help="Peticiones de la traza")
+    parser.add_argument("--rate", type=float, default=200.0, help="Peticiones por segundo (media)")
+    parser.add_argument("--user-skew", type=float, default=1.1, help="Exponente de Zipf de la actividad por usuario")
+    parser.add_argument("--fund-skew", type=float, default=1.2, help="Exponente de Zipf de los fondos")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Proporción de cada endpoint")
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del conjunto y de la traza")
+    parser.add_argument("--load", action="store_true", help="Escribir el conjunto de datos en DynamoDB")
+    parser.add_argument("--concurrency", type=int, default=8, help="Hilos de escritura de la carga")
+    parser.add_argument("--trace", default="trace.ndjson", help="Archivo de salida de la traza")
+    args = parser.parse_args()
+
+    users: Dict[str, UserState] = {}
+    funds: List[FundRecord] = []
+    # La fecha fija hace que el conjunto sea idéntico entre ejecuciones con la misma semilla
+    dataset = track_state(
+        generate_dataset(
+            args.users, args.seed, args.funds, fund_skew=args.fund_skew,
+            now=datetime(2026, 1, 1, tzinfo=timezone.utc)
+        ),
+        users,
+        funds
+    )
+    if args.load:
+        progress = load(dataset, args.concurrency)
+        print(f"loaded {progress.total()} items ({progress.rate():.0f} items/s)")
+    else:
+        for _ in dataset:
+            pass
+
+    counts = dict.fromkeys(parse_mix(args.mix), 0)
+    with open(args.trace, "w", encoding="utf-8") as output:
+        for entry in generate_trace(
+            users, funds, args.requests, args.rate, parse_mix(args.mix), args.user_skew, args.fund_skew, args.seed
+        ):
+            counts[entry["endpoint"]] = counts.get(entry["endpoint"], 0) + 1
+            output.write(json.dumps(entry) + "\n")
+
+    print(f"users: {len(users)}  funds: {len(funds)}  requests: {args.requests}  trace: {args.trace}")
+    print("  ".join(f"{endpoint}={count}" for endpoint, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
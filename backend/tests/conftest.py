@@ -17,9 +17,44 @@ os.environ["AWS_REGION"] = "us-east-1"
 os.environ["AWS_ACCESS_KEY_ID"] = "testing"
 os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
 
+# Cada worker de pytest-xdist ("gw0", "gw1"...) usa sus propias tablas, así que
+# los workers no comparten datos aunque apunten al mismo DynamoDB
+TEST_TABLE_PREFIX = f"test_{os.environ.get('PYTEST_XDIST_WORKER', 'main')}_"
+os.environ["DYNAMODB_TABLE_PREFIX"] = TEST_TABLE_PREFIX
+
+# Con TEST_DYNAMODB_ENDPOINT los tests usan un DynamoDB Local real en lugar de moto
+TEST_DYNAMODB_ENDPOINT = os.environ.get("TEST_DYNAMODB_ENDPOINT")
+
+# Registrar las fixtures de datos de prueba
+pytest_plugins = [
+    "tests.fixtures.user_fixtures",
+    "tests.fixtures.fund_fixtures",
+    "tests.fixtures.transaction_fixtures",
+    "tests.fixtures.service_fixtures",
+]
+
+def table_name(name: str) -> str:
+    """Nombre de la tabla de test del worker actual"""
+    return f"{TEST_TABLE_PREFIX}{name}"
+
+
+@pytest.fixture(scope="session")
+def table_prefix() -> str:
+    """Prefijo de las tablas del worker actual"""
+    return TEST_TABLE_PREFIX
+
+
 @pytest.fixture(scope="session")
 def dynamodb_mock():
     """Mock de DynamoDB para toda la sesión de testing"""
+    if TEST_DYNAMODB_ENDPOINT:
+        yield
+        # Eliminar las tablas del worker al terminar la sesión
+        client = boto3.client('dynamodb', region_name='us-east-1', endpoint_url=TEST_DYNAMODB_ENDPOINT)
+        for name in client.list_tables()['TableNames']:
+            if name.startswith(TEST_TABLE_PREFIX):
+                client.delete_table(TableName=name)
+        return
     with mock_aws():
         yield
 
@@ -30,6 +65,7 @@ def dynamodb_client(dynamodb_mock):
     client = boto3.client(
         'dynamodb',
         region_name='us-east-1',
+        endpoint_url=TEST_DYNAMODB_ENDPOINT,
         aws_access_key_id='testing',
         aws_secret_access_key='testing'
     )
@@ -45,6 +81,7 @@ def dynamodb_resource(dynamodb_mock):
     resource = boto3.resource(
         'dynamodb',
         region_name='us-east-1',
+        endpoint_url=TEST_DYNAMODB_ENDPOINT,
         aws_access_key_id='testing',
         aws_secret_access_key='testing'
     )
@@ -57,7 +94,7 @@ def create_test_tables(dynamodb_client):
     # Tabla Users
     try:
         dynamodb_client.create_table(
-            TableName='Users',
+            TableName=table_name('Users'),
             KeySchema=[
                 {'AttributeName': 'userId', 'KeyType': 'HASH'}
             ],
@@ -72,7 +109,7 @@ def create_test_tables(dynamodb_client):
     # Tabla Funds
     try:
         dynamodb_client.create_table(
-            TableName='Funds',
+            TableName=table_name('Funds'),
             KeySchema=[
                 {'AttributeName': 'fundId', 'KeyType': 'HASH'}
             ],
@@ -84,27 +121,56 @@ def create_test_tables(dynamodb_client):
     except:
         pass
     
-    # Tabla UserFunds
+    # Tabla UserFunds (con el índice de suscriptores por fondo)
     try:
         dynamodb_client.create_table(
-            TableName='UserFunds',
+            TableName=table_name('UserFunds'),
             KeySchema=[
                 {'AttributeName': 'userId', 'KeyType': 'HASH'},
                 {'AttributeName': 'fundId', 'KeyType': 'RANGE'}
             ],
             AttributeDefinitions=[
                 {'AttributeName': 'userId', 'AttributeType': 'S'},
-                {'AttributeName': 'fundId', 'AttributeType': 'S'}
+                {'AttributeName': 'fundId', 'AttributeType': 'S'},
+                {'AttributeName': 'subscribedAt', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexes=[
+                {
+                    'IndexName': 'FundIdIndex',
+                    'KeySchema': [
+                        {'AttributeName': 'fundId', 'KeyType': 'HASH'},
+                        {'AttributeName': 'subscribedAt', 'KeyType': 'RANGE'}
+                    ],
+                    'Projection': {'ProjectionType': 'ALL'}
+                }
             ],
             BillingMode='PAY_PER_REQUEST'
         )
     except:
         pass
     
+    # Tablas del libro mayor (eventos y snapshots por usuario)
+    for name in ('LedgerEvents', 'LedgerSnapshots'):
+        try:
+            dynamodb_client.create_table(
+                TableName=table_name(name),
+                KeySchema=[
+                    {'AttributeName': 'userId', 'KeyType': 'HASH'},
+                    {'AttributeName': 'sequence', 'KeyType': 'RANGE'}
+                ],
+                AttributeDefinitions=[
+                    {'AttributeName': 'userId', 'AttributeType': 'S'},
+                    {'AttributeName': 'sequence', 'AttributeType': 'N'}
+                ],
+                BillingMode='PAY_PER_REQUEST'
+            )
+        except:
+            pass
+    
     # Tabla Transactions
     try:
         dynamodb_client.create_table(
-            TableName='Transactions',
+            TableName=table_name('Transactions'),
             KeySchema=[
                 {'AttributeName': 'transactionId', 'KeyType': 'HASH'}
             ],
@@ -116,7 +182,8 @@ def create_test_tables(dynamodb_client):
                 {
                     'IndexName': 'UserIdIndex',
                     'KeySchema': [
-                        {'AttributeName': 'userId', 'KeyType': 'HASH'}
+                        {'AttributeName': 'userId', 'KeyType': 'HASH'},
+                        {'AttributeName': 'transactionId', 'KeyType': 'RANGE'}
                     ],
                     'Projection': {'ProjectionType': 'ALL'}
                 }
@@ -0,0 +1,81 @@
+"""
+Fixtures para probar los servicios contra las tablas de la aplicación en moto
+"""
+import pytest
+from contextlib import ExitStack
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.database.client import db_client
+from app.database.init import create_tables
+from app.services.fund_service import fund_service
+from app.services.ledger_service import ledger_service
+from app.services.portfolio_service import portfolio_service
+from app.services.subscription_service import subscription_service
+from app.services.transaction_service import transaction_service
+from app.services.user_service import user_service
+from tests.conftest import table_name
+
+# Claves de cada tabla, para vaciarlas entre tests
+TABLE_KEYS = {
+    "User": ("userId",),
+    "Funds": ("fundId",),
+    "FundStats": ("fundId",),
+    "UserFunds": ("userId", "fundId"),
+    "UserPortfolio": ("userId",),
+    "LedgerEvents": ("userId", "sequence"),
+    "LedgerSnapshots": ("userId", "sequence"),
+    "Transactions": ("transactionId",),
+}
+
+TEST_FUNDS = [
+    {"fundId": "FPV_BTG_PACTUAL", "name": "FPV_BTG_PACTUAL", "category": "FPV", "minAmount": Decimal("75000")},
+    {"fundId": "DEUDAPRIVADA", "name": "DEUDAPRIVADA", "category": "FIC", "minAmount": Decimal("50000")},
+]
+
+
+@pytest.fixture
+def service_tables(dynamodb_client, dynamodb_resource):
+    """
+    Servicios globales apuntando a las tablas de la aplicación en moto
+
+    Crea las tablas con ``create_tables`` (mismo esquema e índices que la
+    aplicación), las vacía, carga dos fondos y el usuario user123 con saldo
+    500000, y vacía las cachés de fondos y usuarios.
+    """
+    with patch.object(db_client, 'dynamodb', dynamodb_client):
+        create_tables()
+
+    tables = SimpleNamespace(**{
+        name: dynamodb_resource.Table(table_name(name)) for name in TABLE_KEYS
+    })
+    for name, keys in TABLE_KEYS.items():
+        table = getattr(tables, name)
+        for item in table.scan()['Items']:
+            table.delete_item(Key={key: item[key] for key in keys})
+    for fund in TEST_FUNDS:
+        tables.Funds.put_item(Item=fund)
+    tables.User.put_item(Item={'userId': 'user123', 'balance': Decimal("500000"), 'notificationType': 'email'})
+
+    with ExitStack() as stack:
+        for target, attribute, table in (
+            (user_service, 'table', tables.User),
+            (fund_service, 'table', tables.Funds),
+            (fund_service, 'stats_table', tables.FundStats),
+            (portfolio_service, 'table', tables.UserPortfolio),
+            (portfolio_service, 'subscriptions_table', tables.UserFunds),
+            (subscription_service, 'table', tables.UserFunds),
+            (transaction_service, 'table', tables.Transactions),
+            (ledger_service, 'events_table', tables.LedgerEvents),
+            (ledger_service, 'snapshots_table', tables.LedgerSnapshots),
+            (ledger_service, 'users_table', tables.User),
+        ):
+            stack.enter_context(patch.object(target, attribute, table))
+        # Las transacciones del cliente global van al DynamoDB simulado
+        stack.enter_context(patch.object(db_client, 'dynamodb', dynamodb_client))
+        fund_service.cache.local.clear()
+        user_service.cache.local.clear()
+        yield tables
+        fund_service.cache.local.clear()
+        user_service.cache.local.clear()
@@ -0,0 +1,123 @@
+"""
+Tests de integración para la caché HTTP del catálogo de fondos
+"""
+import time
+import pytest
+from decimal import Decimal
+from unittest.mock import patch, AsyncMock
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database.embedded import EmbeddedClient
+from app.main import app
+from app.middleware.tenant import TenantMiddleware
+from app.models.records import FundRecord, FundStatsRecord
+from app.routes import funds
+from app.services.fund_service import FundCatalog, FundService
+from app.tenancy import TenantTable, physical_table_name
+
+
+class TestFundCatalogCaching:
+    """Tests para ETag, Cache-Control y GET condicional en /api/v1/funds/"""
+
+    @pytest.fixture
+    def client(self):
+        """Cliente de testing para FastAPI"""
+        return TestClient(app)
+
+    @pytest.fixture
+    def catalog(self):
+        fund = FundRecord("FPV_BTG_PACTUAL", "FPV_BTG_PACTUAL", "FPV", Decimal("75000"))
+        return FundCatalog((fund,), {fund.fundId: fund}, "v1", time.monotonic())
+
+    def test_catalog_returns_etag_and_cache_control(self, client, catalog):
+        """Test que el catálogo incluye ETag fuerte y Cache-Control"""
+        with patch('app.routes.funds.fund_service.get_catalog', AsyncMock(return_value=catalog)):
+            response = client.get("/api/v1/funds/")
+
+        assert response.status_code == 200
+        assert response.headers["etag"] == '"v1"'
+        assert "max-age=" in response.headers["cache-control"]
+        assert "stale-while-revalidate=" in response.headers["cache-control"]
+        assert response.json()[0]["fundId"] == "FPV_BTG_PACTUAL"
+
+    def test_fund_detail_is_revalidated_on_every_use(self, client, catalog):
+        """Test que el detalle (agregados en vivo) usa no-cache con ETag en lugar de max-age"""
+        with patch('app.routes.funds.fund_service.get_catalog', AsyncMock(return_value=catalog)), \
+                patch('app.routes.funds.fund_service.get_fund_by_id', AsyncMock(return_value=catalog.funds[0])), \
+                patch('app.routes.funds.fund_service.get_fund_stats',
+                      AsyncMock(return_value=FundStatsRecord("FPV_BTG_PACTUAL", 2, Decimal("150000")))):
+            response = client.get("/api/v1/funds/FPV_BTG_PACTUAL")
+            revalidated = client.get("/api/v1/funds/FPV_BTG_PACTUAL", headers={"If-None-Match": response.headers["etag"]})
+
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-cache"
+        assert response.json()["subscriberCount"] == 2
+        assert revalidated.status_code == 304
+        assert revalidated.headers["cache-control"] == "no-cache"
+
+    def test_catalog_not_modified(self, client, catalog):
+        """Test 304 cuando If-None-Match coincide con el ETag vigente"""
+        with patch('app.routes.funds.fund_service.get_catalog', AsyncMock(return_value=catalog)):
+            response = client.get("/api/v1/funds/", headers={"If-None-Match": 'W/"v0", "v1"'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == '"v1"'
+
+    def test_catalog_modified(self, client, catalog):
+        """Test respuesta completa cuando el ETag del cliente está desactualizado"""
+        with patch('app.routes.funds.fund_service.get_catalog', AsyncMock(return_value=catalog)):
+            response = client.get("/api/v1/funds/", headers={"If-None-Match": '"v0"'})
+
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+
+
+class TestFundCatalogPerTenant:
+    """Tests para el catálogo de dos tenants servido en la misma URL"""
+
+    @pytest.fixture
+    def client(self):
+        embedded = EmbeddedClient()
+        for tenant, fund_id in (("acme", "FPV_ACME"), ("globex", "FIC_GLOBEX")):
+            name = physical_table_name("Funds", tenant)
+            embedded.get_client().create_table(
+                TableName=name,
+                KeySchema=[{'AttributeName': 'fundId', 'KeyType': 'HASH'}],
+                AttributeDefinitions=[{'AttributeName': 'fundId', 'AttributeType': 'S'}],
+                BillingMode='PAY_PER_REQUEST'
+            )
+            embedded.get_resource().Table(name).put_item(
+                Item={'fundId': fund_id, 'name': fund_id, 'category': 'FPV', 'minAmount': Decimal("1000")}
+            )
+        service = FundService(cache_backend=None)
+        service.table = TenantTable("Funds", embedded.get_resource().Table)
+
+        tenant_app = FastAPI()
+        tenant_app.add_middleware(TenantMiddleware, tenants=("acme", "globex"), hosts={})
+        tenant_app.include_router(funds.router, prefix="/api/v1/funds")
+        with patch('app.routes.funds.fund_service', service):
+            yield TestClient(tenant_app)
+
+    def test_tenants_get_own_catalog_and_vary_header(self, client):
+        """Test cada tenant recibe su catálogo y ETag, y la respuesta varía por la cabecera de tenant"""
+        acme = client.get("/api/v1/funds/", headers={"X-Tenant-Id": "acme"})
+        globex = client.get("/api/v1/funds/", headers={"X-Tenant-Id": "globex"})
+
+        assert [fund["fundId"] for fund in acme.json()] == ["FPV_ACME"]
+        assert [fund["fundId"] for fund in globex.json()] == ["FIC_GLOBEX"]
+        assert acme.headers["etag"] != globex.headers["etag"]
+        assert "x-tenant-id" in acme.headers["vary"].lower()
+        assert "public" in acme.headers["cache-control"]
+
+        # El ETag de un tenant no valida el catálogo de otro
+        revalidated = client.get(
+            "/api/v1/funds/", headers={"X-Tenant-Id": "globex", "If-None-Match": acme.headers["etag"]}
+        )
+        assert revalidated.status_code == 200
+        not_modified = client.get(
+            "/api/v1/funds/", headers={"X-Tenant-Id": "acme", "If-None-Match": acme.headers["etag"]}
+        )
+        assert not_modified.status_code == 304
+        assert "x-tenant-id" in not_modified.headers["vary"].lower()
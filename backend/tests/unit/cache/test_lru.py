@@ -0,0 +1,78 @@
+"""
+Tests unitarios para TTLCache
+"""
+import pytest
+
+from app.cache.lru import TTLCache
+from app.metrics import metrics
+
+
+class FakeClock:
+    """Reloj controlable para probar expiraciones"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestTTLCache:
+    """Tests para TTLCache"""
+
+    def test_get_set_records_hits_and_misses(self, clock):
+        """Test lectura con aciertos y fallos registrados en métricas"""
+        cache = TTLCache("test", maxsize=10, ttl=30, clock=clock)
+
+        assert cache.get("user123") is None
+        cache.set("user123", "value")
+
+        assert cache.get("user123") == "value"
+        assert metrics.get("cache.test.hits") == 1
+        assert metrics.get("cache.test.misses") == 1
+
+    def test_entries_expire_after_ttl(self, clock):
+        """Test expiración de entradas por TTL"""
+        cache = TTLCache("test", maxsize=10, ttl=30, clock=clock)
+        cache.set("user123", "value")
+
+        clock.now = 29.9
+        assert cache.get("user123") == "value"
+        clock.now = 30.0
+        assert cache.get("user123") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self, clock):
+        """Test desalojo de la entrada menos usada al superar el tamaño"""
+        cache = TTLCache("test", maxsize=2, ttl=30, clock=clock)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert metrics.get("cache.test.evictions") == 1
+
+    def test_delete_invalidates_entry(self, clock):
+        """Test invalidación explícita de una entrada"""
+        cache = TTLCache("test", maxsize=10, ttl=30, clock=clock)
+        cache.set("user123", "value")
+
+        cache.delete("user123")
+        cache.delete("missing")
+
+        assert cache.get("user123") is None
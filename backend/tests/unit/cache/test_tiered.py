@@ -0,0 +1,140 @@
+"""
+Tests unitarios para TwoLevelCache con el backend en memoria
+"""
+import asyncio
+import threading
+
+import pytest
+from decimal import Decimal
+
+from app.cache.backends import CacheBackend, InMemoryBackend, create_backend
+from app.cache.tiered import TwoLevelCache, dumps_items, loads_items
+from app.metrics import metrics
+from app.models.records import UserRecord
+
+
+def make_cache(backend):
+    """Caché de usuarios como la que crea cada worker"""
+    return TwoLevelCache(
+        "users",
+        maxsize=10,
+        ttl=30,
+        backend=backend,
+        encode=lambda user: dumps_items([user.to_item()]),
+        decode=lambda data: UserRecord.from_item(loads_items(data)[0])
+    )
+
+
+class FailingBackend(InMemoryBackend):
+    """Backend que simula un Redis caído"""
+
+    def get(self, key):
+        raise ConnectionError("connection refused")
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestTwoLevelCache:
+    """Tests para la caché de dos niveles"""
+
+    def test_second_worker_reads_from_shared_tier(self, user_data_dict):
+        """Test que un worker nuevo obtiene el valor de la L2 con tipos conservados"""
+        backend = InMemoryBackend()
+        worker_a, worker_b = make_cache(backend), make_cache(backend)
+        user = UserRecord.from_item(user_data_dict)
+
+        worker_a.set(user.userId, user)
+        cached = worker_b.get(user.userId)
+
+        assert cached == user
+        assert isinstance(cached.balance, Decimal)
+        assert metrics.get("cache.users.l2_hits") == 1
+
+    def test_invalidation_is_broadcast_to_other_workers(self, user_data_dict):
+        """Test que invalidar en un worker descarta la L1 de los demás"""
+        backend = InMemoryBackend()
+        worker_a, worker_b = make_cache(backend), make_cache(backend)
+        user = UserRecord.from_item(user_data_dict)
+        worker_a.set(user.userId, user)
+        worker_b.get(user.userId)
+
+        worker_a.invalidate(user.userId)
+
+        assert worker_b.local.get(user.userId) is None
+        assert worker_b.get(user.userId) is None
+        assert metrics.get("cache.users.remote_invalidations") == 1
+
+    def test_update_refreshes_other_workers(self, user_data_dict):
+        """Test que el write-through llega a los demás workers a través de la L2"""
+        backend = InMemoryBackend()
+        worker_a, worker_b = make_cache(backend), make_cache(backend)
+        user = UserRecord.from_item(user_data_dict)
+        worker_a.set(user.userId, user)
+        worker_b.get(user.userId)
+
+        updated = UserRecord(user.userId, Decimal("100000"), "sms")
+        worker_a.update(user.userId, updated)
+
+        assert worker_b.get(user.userId) == updated
+
+    def test_shared_tier_errors_fall_back_to_miss(self, user_data_dict):
+        """Test que un fallo de la L2 se trata como fallo de caché"""
+        cache = make_cache(FailingBackend())
+
+        assert cache.get("user123") is None
+        assert metrics.get("cache.users.l2_errors") == 1
+
+    def test_async_variants_use_shared_tier_off_event_loop(self, user_data_dict):
+        """Test que las llamadas a la L2 desde código async no se hacen en el hilo del event loop"""
+        threads = []
+
+        class RecordingBackend(InMemoryBackend):
+            def get(self, key):
+                threads.append(threading.current_thread())
+                return super().get(key)
+
+            def set(self, key, value, ttl):
+                threads.append(threading.current_thread())
+                super().set(key, value, ttl)
+
+            def delete(self, key):
+                threads.append(threading.current_thread())
+                super().delete(key)
+
+        backend = RecordingBackend()
+        worker_a, worker_b = make_cache(backend), make_cache(backend)
+        user = UserRecord.from_item(user_data_dict)
+
+        async def scenario():
+            await worker_a.set_async(user.userId, user)
+            assert await worker_a.get_async(user.userId) == user  # Acierto en L1: sin L2
+            assert await worker_b.get_async(user.userId) == user
+            await worker_a.invalidate_async(user.userId)
+            return threading.current_thread()
+
+        loop_thread = asyncio.run(scenario())
+
+        assert len(threads) == 3
+        assert all(thread is not loop_thread for thread in threads)
+        assert worker_b.local.get(user.userId) is None
+
+    def test_create_backend(self):
+        """Test selección del backend por configuración"""
+        assert create_backend("none") is None
+        assert isinstance(create_backend("memory"), InMemoryBackend)
+        with pytest.raises(ValueError):
+            create_backend("memcached")
+
+    def test_incomplete_backend_cannot_be_instantiated(self):
+        """Test que un backend sin todas las operaciones falla al crearlo y no en el primer uso"""
+        class GetOnlyBackend(CacheBackend):
+            def get(self, key):
+                return None
+
+        with pytest.raises(TypeError):
+            GetOnlyBackend()
@@ -0,0 +1,270 @@
+"""
+Tests unitarios para el backend embebido (mismos casos contra moto y contra el embebido)
+"""
+import pytest
+from decimal import Decimal
+
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
+
+from app.database.client import cancellation_codes
+from app.database.embedded import EmbeddedClient
+from app.database.expressions import ExpressionError, parse_condition, parse_update
+from tests.conftest import create_test_tables, table_name
+
+
+def clear(table, *key_names):
+    for item in table.scan()['Items']:
+        table.delete_item(Key={name: item[name] for name in key_names})
+
+
+@pytest.fixture(params=["moto", "embedded"])
+def backend(request):
+    """Cliente de bajo nivel y resource de cada backend, con las tablas de test vacías"""
+    if request.param == "moto":
+        client = request.getfixturevalue("dynamodb_client")
+        resource = request.getfixturevalue("dynamodb_resource")
+    else:
+        embedded = EmbeddedClient()
+        client, resource = embedded.get_client(), embedded.get_resource()
+        create_test_tables(client)
+    clear(resource.Table(table_name('Users')), 'userId')
+    clear(resource.Table(table_name('UserFunds')), 'userId', 'fundId')
+    clear(resource.Table(table_name('Transactions')), 'transactionId')
+    return client, resource
+
+
+def error_code(error: pytest.ExceptionInfo) -> str:
+    return error.value.response['Error']['Code']
+
+
+class TestEmbeddedParity:
+    """El backend embebido responde igual que DynamoDB (moto)"""
+
+    def test_conditional_put(self, backend):
+        _, resource = backend
+        users = resource.Table(table_name('Users'))
+        users.put_item(Item={'userId': 'u1', 'balance': Decimal("100")}, ConditionExpression=Attr('userId').not_exists())
+
+        with pytest.raises(ClientError) as error:
+            users.put_item(Item={'userId': 'u1', 'balance': Decimal("0")}, ConditionExpression='attribute_not_exists(userId)')
+
+        assert error_code(error) == 'ConditionalCheckFailedException'
+        assert users.get_item(Key={'userId': 'u1'})['Item'] == {'userId': 'u1', 'balance': Decimal("100")}
+
+    def test_update_expressions(self, backend):
+        _, resource = backend
+        users = resource.Table(table_name('Users'))
+        users.put_item(Item={'userId': 'u1', 'balance': Decimal("100"), 'tags': {'a', 'b'}, 'legacy': True})
+
+        response = users.update_item(
+            Key={'userId': 'u1'},
+            UpdateExpression=(
+                "SET balance = balance - :amount, #n = if_not_exists(#n, :name) "
+                "REMOVE legacy ADD visits :one DELETE tags :gone"
+            ),
+            ConditionExpression="balance >= :amount",
+            ExpressionAttributeNames={'#n': 'name'},
+            ExpressionAttributeValues={':amount': Decimal("40"), ':name': 'Ana', ':one': 1, ':gone': {'a'}},
+            ReturnValues='ALL_NEW'
+        )
+
+        assert response['Attributes'] == {
+            'userId': 'u1', 'balance': Decimal("60"), 'name': 'Ana', 'visits': Decimal("1"), 'tags': {'b'}
+        }
+        with pytest.raises(ClientError) as error:
+            users.update_item(
+                Key={'userId': 'u1'},
+                UpdateExpression="SET balance = balance - :amount",
+                ConditionExpression="balance >= :amount",
+                ExpressionAttributeValues={':amount': Decimal("100")}
+            )
+        assert error_code(error) == 'ConditionalCheckFailedException'
+
+    def test_update_creates_missing_item(self, backend):
+        _, resource = backend
+        users = resource.Table(table_name('Users'))
+
+        response = users.update_item(
+            Key={'userId': 'new'}, UpdateExpression="ADD balance :amount",
+            ExpressionAttributeValues={':amount': Decimal("5")}, ReturnValues='ALL_OLD'
+        )
+
+        assert not response.get('Attributes')
+        assert users.get_item(Key={'userId': 'new'})['Item'] == {'userId': 'new', 'balance': Decimal("5")}
+
+    def test_query_index_pagination(self, backend):
+        _, resource = backend
+        transactions = resource.Table(table_name('Transactions'))
+        for number in range(5):
+            transactions.put_item(Item={'transactionId': f"t{number}", 'userId': 'u1', 'amount': Decimal(number)})
+        transactions.put_item(Item={'transactionId': 't9', 'userId': 'u2', 'amount': Decimal("9")})
+
+        pages, start = [], None
+        while True:
+            params = {'ExclusiveStartKey': start} if start else {}
+            page = transactions.query(
+                IndexName='UserIdIndex', KeyConditionExpression=Key('userId').eq('u1'),
+                ScanIndexForward=False, Limit=2, **params
+            )
+            pages.append([item['transactionId'] for item in page['Items']])
+            start = page.get('LastEvaluatedKey')
+            if start is None:
+                break
+
+        assert [transaction for page in pages for transaction in page] == ['t4', 't3', 't2', 't1', 't0']
+        filtered = transactions.query(
+            IndexName='UserIdIndex', KeyConditionExpression=Key('userId').eq('u1') & Key('transactionId').gt('t1'),
+            FilterExpression=Attr('amount').lt(4)
+        )
+        assert [item['transactionId'] for item in filtered['Items']] == ['t2', 't3']
+        assert filtered['ScannedCount'] == 3
+
+    def test_scan_segments_cover_table(self, backend):
+        _, resource = backend
+        funds = resource.Table(table_name('UserFunds'))
+        for number in range(20):
+            funds.put_item(Item={'userId': f"u{number}", 'fundId': 'F1'})
+
+        segments = [funds.scan(Segment=segment, TotalSegments=3)['Items'] for segment in range(3)]
+
+        assert sorted(item['userId'] for segment in segments for item in segment) == sorted(f"u{n}" for n in range(20))
+
+    def test_scan_resumes_after_deleted_cursor_row(self, backend):
+        _, resource = backend
+        users = resource.Table(table_name('Users'))
+        for number in range(6):
+            users.put_item(Item={'userId': f"u{number}"})
+
+        first = users.scan(Limit=3)
+        users.delete_item(Key=first['LastEvaluatedKey'])
+        rest, start = [], first['LastEvaluatedKey']
+        while start is not None:
+            page = users.scan(Limit=3, ExclusiveStartKey=start)
+            rest += page['Items']
+            start = page.get('LastEvaluatedKey')
+
+        seen = [item['userId'] for item in first['Items'][:-1] + rest]
+        assert sorted(seen) == sorted({f"u{n}" for n in range(6)} - {first['LastEvaluatedKey']['userId']})
+
+    def test_scan_index_skips_items_without_index_keys(self, backend):
+        _, resource = backend
+        transactions = resource.Table(table_name('Transactions'))
+        transactions.put_item(Item={'transactionId': 't1', 'userId': 'u1'})
+        transactions.put_item(Item={'transactionId': 't2'})
+
+        page = transactions.scan(IndexName='UserIdIndex')
+
+        assert [item['transactionId'] for item in page['Items']] == ['t1']
+
+    def test_delete_missing_key_is_noop(self, backend):
+        client, resource = backend
+        users = resource.Table(table_name('Users'))
+
+        users.delete_item(Key={'userId': 'missing'})
+        client.batch_write_item(RequestItems={
+            table_name('Users'): [{'DeleteRequest': {'Key': {'userId': {'S': 'missing'}}}}]
+        })
+        client.transact_write_items(TransactItems=[
+            {'Delete': {'TableName': table_name('Users'), 'Key': {'userId': {'S': 'missing'}}}}
+        ])
+
+        assert 'Item' not in users.get_item(Key={'userId': 'missing'})
+
+    def test_transaction_cancellation(self, backend):
+        client, resource = backend
+        resource.Table(table_name('Users')).put_item(Item={'userId': 'u1', 'balance': Decimal("10")})
+
+        with pytest.raises(ClientError) as error:
+            client.transact_write_items(TransactItems=[
+                {'Put': {'TableName': table_name('UserFunds'), 'Item': {'userId': {'S': 'u1'}, 'fundId': {'S': 'F1'}}}},
+                {'Update': {
+                    'TableName': table_name('Users'), 'Key': {'userId': {'S': 'u1'}},
+                    'UpdateExpression': "SET balance = balance - :amount",
+                    'ConditionExpression': "balance >= :amount",
+                    'ExpressionAttributeValues': {':amount': {'N': "50"}}
+                }},
+            ])
+
+        assert cancellation_codes(error.value) == ['None', 'ConditionalCheckFailed']
+        assert 'Item' not in resource.Table(table_name('UserFunds')).get_item(Key={'userId': 'u1', 'fundId': 'F1'})
+
+    def test_missing_table(self, backend):
+        _, resource = backend
+
+        with pytest.raises(ClientError) as error:
+            resource.Table(table_name('Missing')).get_item(Key={'id': 'x'})
+
+        assert error_code(error) == 'ResourceNotFoundException'
+
+
+class TestEmbeddedClient:
+    """Tests específicos del backend embebido"""
+
+    def test_transact_write_items_with_python_values(self):
+        client = EmbeddedClient()
+        create_test_tables(client.get_client())
+
+        client.transact_write_items([
+            {'Put': {'TableName': table_name('Users'), 'Item': {'userId': 'u1', 'balance': 100}}},
+            {'Put': {'TableName': table_name('UserFunds'), 'Item': {'userId': 'u1', 'fundId': 'F1'}}},
+        ])
+
+        assert client.get_table('Users').get_item(Key={'userId': 'u1'})['Item']['balance'] == Decimal("100")
+
+    def test_sqlite_persistence(self, tmp_path):
+        path = str(tmp_path / "fondos.db")
+        client = EmbeddedClient(path)
+        create_test_tables(client.get_client())
+        with client.get_table('Transactions').batch_writer() as writer:
+            for number in range(30):
+                writer.put_item(Item={'transactionId': f"t{number}", 'userId': 'u1', 'tags': {'x'}})
+        client.get_table('Transactions').delete_item(Key={'transactionId': 't0'})
+        client.database.close()
+
+        reloaded = EmbeddedClient(path)
+        page = reloaded.get_table('Transactions').query(
+            IndexName='UserIdIndex', KeyConditionExpression=Key('userId').eq('u1'), Select='COUNT'
+        )
+
+        assert page['Count'] == 29
+        assert reloaded.get_table('Transactions').get_item(Key={'transactionId': 't5'})['Item']['tags'] == {'x'}
+
+    def test_sqlite_delete_missing_key_is_noop(self, tmp_path):
+        path = str(tmp_path / "fondos.db")
+        client = EmbeddedClient(path)
+        create_test_tables(client.get_client())
+        users = client.get_table('Users')
+        users.put_item(Item={'userId': 'u1'})
+
+        users.delete_item(Key={'userId': 'missing'})
+        with users.batch_writer() as writer:
+            writer.delete_item(Key={'userId': 'missing'})
+        client.transact_write_items([{'Delete': {'TableName': table_name('Users'), 'Key': {'userId': 'missing'}}}])
+        users.delete_item(Key={'userId': 'u1'})
+        client.database.close()
+
+        assert EmbeddedClient(path).get_table('Users').scan()['Count'] == 0
+
+    def test_rejects_floats_like_boto3(self):
+        client = EmbeddedClient()
+        create_test_tables(client.get_client())
+
+        with pytest.raises(TypeError):
+            client.get_table('Users').put_item(Item={'userId': 'u1', 'balance': 1.5})
+
+
+class TestExpressions:
+    """Tests para el intérprete de expresiones"""
+
+    def test_parse_precedence(self):
+        node = parse_condition("a = :x OR NOT b = :y AND attribute_exists(c)")
+
+        assert node[0] == "or"
+        assert node[2][0] == "and" and node[2][1][0] == "not"
+
+    def test_invalid_expressions(self):
+        with pytest.raises(ExpressionError):
+            parse_condition("a = ")
+        with pytest.raises(ExpressionError):
+            parse_update("SET a :x")
@@ -0,0 +1,91 @@
+"""
+Tests unitarios para la creación de tablas
+"""
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.database.embedded import EmbeddedClient
+from app.database.init import create_tables, populate_initial_data
+from tests.conftest import TEST_TABLE_PREFIX, table_name
+
+
+class TestCreateTables:
+    """Tests para create_tables con el prefijo de tablas"""
+
+    def test_tables_use_prefix(self):
+        client = EmbeddedClient()
+
+        with patch('app.database.init.db_client', client):
+            create_tables()
+            create_tables()  # Idempotente: las tablas existentes no se recrean
+
+        names = client.get_client().list_tables()['TableNames']
+        assert table_name('User') in names
+        assert all(name.startswith(TEST_TABLE_PREFIX) for name in names)
+        assert client.get_table('User').name == table_name('User')
+
+    def test_existing_table_with_outdated_index_fails_startup(self):
+        client = EmbeddedClient()
+        client.get_client().create_table(
+            TableName=table_name('Transactions'),
+            KeySchema=[{'AttributeName': 'transactionId', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[
+                {'AttributeName': 'transactionId', 'AttributeType': 'S'},
+                {'AttributeName': 'userId', 'AttributeType': 'S'}
+            ],
+            GlobalSecondaryIndexes=[{
+                'IndexName': 'UserIdIndex',
+                'KeySchema': [{'AttributeName': 'userId', 'KeyType': 'HASH'}],
+                'Projection': {'ProjectionType': 'ALL'}
+            }],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+        with patch('app.database.init.db_client', client), pytest.raises(Exception) as error:
+            create_tables()
+
+        assert "UserIdIndex" in str(error.value)
+        assert "transactionId (RANGE)" in str(error.value)
+
+    def test_existing_table_without_index_fails_startup(self):
+        client = EmbeddedClient()
+        client.get_client().create_table(
+            TableName=table_name('UserFunds'),
+            KeySchema=[
+                {'AttributeName': 'userId', 'KeyType': 'HASH'},
+                {'AttributeName': 'fundId', 'KeyType': 'RANGE'}
+            ],
+            AttributeDefinitions=[
+                {'AttributeName': 'userId', 'AttributeType': 'S'},
+                {'AttributeName': 'fundId', 'AttributeType': 'S'}
+            ],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+        with patch('app.database.init.db_client', client), pytest.raises(Exception) as error:
+            create_tables()
+
+        assert "falta el índice FundIdIndex" in str(error.value)
+
+
+class TestPopulateInitialData:
+    """Tests para los datos iniciales"""
+
+    def test_restart_keeps_existing_user_balance(self):
+        client = EmbeddedClient()
+
+        with patch('app.database.init.db_client', client):
+            create_tables()
+            populate_initial_data()
+            users = client.get_table('User')
+            users.update_item(
+                Key={'userId': 'user123'},
+                UpdateExpression='SET balance = :balance, ledgerSequence = :sequence',
+                ExpressionAttributeValues={':balance': Decimal("425000"), ':sequence': 2}
+            )
+            populate_initial_data()  # Nuevo arranque
+
+        user = users.get_item(Key={'userId': 'user123'})['Item']
+        assert (user['balance'], user['ledgerSequence']) == (Decimal("425000"), 2)
@@ -0,0 +1,147 @@
+"""
+Tests unitarios para la carga masiva de datos
+"""
+import pytest
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from app.database.client import db_client
+from app.database.loader import BulkWriter, Progress, generate_dataset, load, parse_row, read_rows
+from app.database.reconcile import Reconciler
+from app.services.ledger_service import LedgerService
+from app.utils.ids import uuid7_datetime
+from tests.conftest import table_name
+
+
+def clear(table, *key_names):
+    with table.batch_writer() as writer:
+        for item in table.scan()['Items']:
+            writer.delete_item(Key={name: item[name] for name in key_names})
+
+
+class TestParsing:
+    """Tests para la lectura de archivos"""
+
+    def test_reads_csv_and_ndjson(self, tmp_path):
+        csv_path = tmp_path / "users.csv"
+        csv_path.write_text("userId,balance,notificationType\nu1,1000,sms\nu2,,\n", encoding="utf-8")
+        ndjson_path = tmp_path / "users.ndjson"
+        ndjson_path.write_text('{"userId": "u3", "balance": 2500.5}\n\n{"userId": "u4"}\n', encoding="utf-8")
+
+        users = [parse_row("users", row) for path in (csv_path, ndjson_path) for row in read_rows(path)]
+
+        assert users == [
+            {'userId': 'u1', 'balance': Decimal("1000"), 'notificationType': 'sms'},
+            {'userId': 'u2', 'balance': Decimal("500000"), 'notificationType': 'email'},
+            {'userId': 'u3', 'balance': Decimal("2500.5"), 'notificationType': 'email'},
+            {'userId': 'u4', 'balance': Decimal("500000"), 'notificationType': 'email'},
+        ]
+
+    def test_transaction_without_id_gets_uuid7_of_its_timestamp(self):
+        item = parse_row("transactions", {
+            'userId': 'u1', 'fundId': 'FIC_MANDATO', 'type': 'subscribe', 'amount': '500000',
+            'timestamp': '2026-03-01T10:00:00+00:00'
+        })
+
+        assert uuid7_datetime(item['transactionId']).isoformat() == '2026-03-01T10:00:00+00:00'
+        assert item['amount'] == Decimal("500000")
+
+    def test_missing_required_field_raises(self):
+        with pytest.raises(KeyError):
+            parse_row("funds", {'fundId': 'F1', 'minAmount': '1'})
+
+
+class TestSyntheticDataset:
+    """Tests para la generación sintética"""
+
+    def test_same_seed_generates_same_dataset(self):
+        now = datetime(2026, 6, 1, tzinfo=timezone.utc)
+
+        first = list(generate_dataset(20, seed=7, now=now))
+        second = list(generate_dataset(20, seed=7, now=now))
+
+        # Los UUIDv7 tienen bits aleatorios: se compara su instante
+        for items in (first, second):
+            for table, item in items:
+                if table == "Transactions":
+                    item['transactionId'] = uuid7_datetime(item['transactionId'])
+
+        assert first == second
+
+    def test_balances_follow_ledger(self):
+        items = list(generate_dataset(50, seed=1, extra_funds=3))
+        users = {item['userId']: item for table, item in items if table == "User"}
+        events = [item for table, item in items if table == "LedgerEvents"]
+
+        assert len(users) == 50
+        assert len([item for table, item in items if table == "Funds"]) == 8
+        for user_id, user in users.items():
+            user_events = [event for event in events if event['userId'] == user_id]
+            assert user['ledgerSequence'] == len(user_events)
+            assert user['balance'] == sum(
+                event['amount'] if event['type'] == "credit" else -event['amount'] for event in user_events
+            )
+            assert user['balance'] >= 0
+
+    def test_fund_skew_concentrates_subscriptions(self):
+        items = list(generate_dataset(300, seed=5, extra_funds=15, max_subscriptions=2, fund_skew=1.5))
+        funds = [item['fundId'] for table, item in items if table == "Funds"]
+        subscriptions = Counter(item['fundId'] for table, item in items if table == "UserFunds")
+
+        # El fondo de rango 1 recibe más suscripciones que los de la cola juntos
+        assert subscriptions[funds[0]] > sum(subscriptions[fund_id] for fund_id in funds[10:])
+
+
+class TestBulkWriter:
+    """Tests para la escritura en paralelo"""
+
+    @pytest.fixture
+    def tables(self, dynamodb_client, dynamodb_resource):
+        tables = {name: dynamodb_resource.Table(table_name(name)) for name in ('Users', 'Funds', 'UserFunds', 'LedgerEvents', 'LedgerSnapshots', 'Transactions')}
+        clear(tables['Users'], 'userId')
+        clear(tables['Funds'], 'fundId')
+        clear(tables['UserFunds'], 'userId', 'fundId')
+        clear(tables['LedgerEvents'], 'userId', 'sequence')
+        clear(tables['LedgerSnapshots'], 'userId', 'sequence')
+        clear(tables['Transactions'], 'transactionId')
+        with patch.object(db_client, 'dynamodb', dynamodb_client), \
+                patch.object(db_client, 'dynamodb_resource', dynamodb_resource):
+            yield tables
+
+    def test_writes_all_chunks_and_reports_progress(self, tables):
+        items = (("Funds", {'fundId': f"F{i}", 'name': f"F{i}", 'category': 'FPV', 'minAmount': Decimal(i)}) for i in range(1050))
+
+        progress = load(items, concurrency=4, chunk_size=100)
+
+        assert progress.written["Funds"] == 1050
+        assert tables['Funds'].scan(Select='COUNT')['Count'] == 1050
+
+    def test_write_error_is_raised(self, tables):
+        writer = BulkWriter(concurrency=2, chunk_size=10, progress=Progress())
+        for i in range(10):
+            writer.add("MissingTable", {'id': str(i)})
+
+        with pytest.raises(Exception):
+            writer.close()
+
+    def test_synthetic_load_reconciles(self, tables):
+        renamed = {"User": "Users"}
+        items = (
+            (renamed.get(table, table), item) for table, item in generate_dataset(30, seed=3)
+            if table not in ("UserPortfolio", "FundStats")
+        )
+
+        load(items, concurrency=4, chunk_size=50)
+
+        ledger = LedgerService()
+        ledger.events_table = tables['LedgerEvents']
+        ledger.snapshots_table = tables['LedgerSnapshots']
+        ledger.users_table = tables['Users']
+        reconciler = Reconciler(users_table='Users', initial_amount=Decimal("500000"), ledger=ledger)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            report = reconciler.compare(reconciler.scan(executor, 2))
+        assert report.users == 30
+        assert report.consistent
@@ -0,0 +1,29 @@
+"""
+Tests unitarios para los cursores de paginación
+"""
+import pytest
+
+from app.database.pagination import encode_cursor, decode_cursor
+
+
+class TestPagination:
+    """Tests para encode_cursor y decode_cursor"""
+
+    def test_cursor_roundtrip(self):
+        """Test ida y vuelta de un LastEvaluatedKey"""
+        key = {'fundId': 'FPV_BTG_PACTUAL', 'subscribedAt': '2025-08-05T10:30:00', 'userId': 'user123'}
+
+        cursor = encode_cursor(key)
+
+        assert '=' not in cursor
+        assert decode_cursor(cursor) == key
+
+    def test_no_more_pages(self):
+        """Test que no se genera cursor cuando no hay más páginas"""
+        assert encode_cursor(None) is None
+        assert encode_cursor({}) is None
+
+    def test_invalid_cursor(self):
+        """Test cursor inválido"""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
@@ -0,0 +1,138 @@
+"""
+Tests unitarios para la conciliación de saldos
+"""
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest.mock import patch
+
+from app.database.client import db_client
+from app.database.reconcile import Reconciler
+from app.models.records import TransactionRecord
+from app.services.ledger_service import LedgerService, LedgerEntry
+from app.utils.ids import uuid7_datetime
+from tests.conftest import table_name
+
+
+def clear(table, *key_names):
+    for item in table.scan()['Items']:
+        table.delete_item(Key={name: item[name] for name in key_names})
+
+
+class TestReconciler:
+    """Tests para el trabajo de conciliación"""
+
+    @pytest.fixture
+    def tables(self, dynamodb_client, dynamodb_resource):
+        tables = {name: dynamodb_resource.Table(table_name(name)) for name in ('Users', 'LedgerEvents', 'LedgerSnapshots', 'Transactions')}
+        clear(tables['Users'], 'userId')
+        clear(tables['LedgerEvents'], 'userId', 'sequence')
+        clear(tables['LedgerSnapshots'], 'userId', 'sequence')
+        clear(tables['Transactions'], 'transactionId')
+        with patch.object(db_client, 'dynamodb', dynamodb_client), \
+                patch.object(db_client, 'dynamodb_resource', dynamodb_resource):
+            yield tables
+
+    @pytest.fixture
+    def ledger(self, tables):
+        ledger = LedgerService(snapshot_interval=50)
+        ledger.events_table = tables['LedgerEvents']
+        ledger.snapshots_table = tables['LedgerSnapshots']
+        ledger.users_table = tables['Users']
+        return ledger
+
+    @pytest.fixture
+    def reconciler(self, ledger):
+        return Reconciler(users_table='Users', initial_amount=Decimal("500000"), ledger=ledger)
+
+    @staticmethod
+    def run(reconciler, segments=4):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            return reconciler.compare(reconciler.scan(executor, segments))
+
+    @staticmethod
+    async def subscribe(ledger, tables, user_id, amount, record=True):
+        debit = lambda state: ([LedgerEntry("debit", Decimal(amount), "subscribe", "FPV_BTG_PACTUAL")], [])
+        await ledger.append(user_id, debit)
+        if record:
+            tables['Transactions'].put_item(
+                Item=TransactionRecord.new(user_id, "FPV_BTG_PACTUAL", "subscribe", Decimal(amount)).to_item()
+            )
+
+    @pytest.mark.asyncio
+    async def test_consistent_tables_report_no_drift(self, reconciler, ledger, tables):
+        tables['Users'].put_item(Item={'userId': 'user_1', 'balance': Decimal("500000")})
+        tables['Users'].put_item(Item={'userId': 'user_3', 'balance': Decimal("500000")})
+        await self.subscribe(ledger, tables, "user_1", "75000")
+        # Usuario previo al libro mayor con historial coherente
+        tables['Users'].put_item(Item={'userId': 'user_2', 'balance': Decimal("450000")})
+        tables['Transactions'].put_item(
+            Item=TransactionRecord.new("user_2", "FPV_BTG_PACTUAL", "subscribe", Decimal("50000")).to_item()
+        )
+
+        report = self.run(reconciler)
+
+        assert report.consistent
+        assert report.users == 3
+
+    @pytest.mark.asyncio
+    async def test_projection_drift_is_repaired_from_ledger(self, reconciler, ledger, tables):
+        tables['Users'].put_item(Item={'userId': 'user_1', 'balance': Decimal("500000")})
+        await self.subscribe(ledger, tables, "user_1", "75000")
+        # Un reinicio del seed sobrescribe la proyección
+        tables['Users'].put_item(Item={'userId': 'user_1', 'balance': Decimal("500000")})
+
+        report = self.run(reconciler)
+        assert report.projection_drift == [("user_1", Decimal("500000"), Decimal("425000"), 2)]
+
+        assert await reconciler.repair(report) == 1
+        user = tables['Users'].get_item(Key={'userId': 'user_1'})['Item']
+        assert user['balance'] == Decimal("425000")
+        assert user['ledgerSequence'] == 2
+        assert self.run(reconciler).consistent
+
+    @pytest.mark.asyncio
+    async def test_missing_transaction_record_is_recreated_at_debit_time(self, reconciler, ledger, tables):
+        tables['Users'].put_item(Item={'userId': 'user_1', 'balance': Decimal("500000")})
+        await self.subscribe(ledger, tables, "user_1", "75000", record=False)
+
+        report = self.run(reconciler)
+        assert report.missing_transactions == [("user_1", "FPV_BTG_PACTUAL", 1)]
+
+        assert await reconciler.repair(report) == 1
+        items = tables['Transactions'].scan()['Items']
+        assert len(items) == 1
+        debit = next(e for e in ledger._events_after("user_1", 0) if e.type == "debit")
+        assert uuid7_datetime(items[0]['transactionId']) == debit.createdAt.replace(
+            microsecond=debit.createdAt.microsecond // 1000 * 1000
+        )
+        assert self.run(reconciler).consistent
+
+    @pytest.mark.asyncio
+    async def test_legacy_balance_drift_is_corrected_through_ledger(self, reconciler, ledger, tables):
+        tables['Users'].put_item(Item={'userId': 'user_1', 'balance': Decimal("400000")})
+        tables['Transactions'].put_item(
+            Item=TransactionRecord.new("user_1", "FPV_BTG_PACTUAL", "subscribe", Decimal("75000")).to_item()
+        )
+
+        report = self.run(reconciler)
+        assert report.legacy_drift == [("user_1", Decimal("400000"), Decimal("425000"))]
+
+        assert await reconciler.repair(report) == 1
+        state = await ledger.get_state("user_1")
+        assert state.balance == Decimal("425000")
+        assert [e.reason for e in ledger._events_after("user_1", 0)] == ["opening", "adjustment"]
+        assert self.run(reconciler).consistent
+
+    def test_ledger_gap_is_reported(self, reconciler, tables):
+        tables['Users'].put_item(Item={'userId': 'user_1', 'balance': Decimal("500000"), 'ledgerSequence': 3})
+        for sequence in (1, 3):
+            tables['LedgerEvents'].put_item(Item={
+                'userId': 'user_1', 'sequence': sequence, 'type': 'credit', 'amount': Decimal("1"),
+                'reason': 'adjustment', 'createdAt': '2026-01-01T00:00:00+00:00'
+            })
+
+        report = self.run(reconciler, segments=1)
+
+        assert report.ledger_gaps == [("user_1", 2, 3)]
+        assert report.projection_drift == []
@@ -0,0 +1,115 @@
+"""
+Tests unitarios para el scan de tablas completas
+"""
+import asyncio
+import threading
+from contextlib import aclosing
+import pytest
+from decimal import Decimal
+
+from app.database.scan import scan_all, scan_iter, scan_pages
+from tests.conftest import table_name
+
+
+class PagedTable:
+    """Tabla falsa que devuelve ``page_size`` items por llamada a scan"""
+
+    def __init__(self, items, page_size=3, fail_segment=None):
+        self.items = items
+        self.page_size = page_size
+        self.fail_segment = fail_segment
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def scan(self, **params):
+        with self._lock:
+            self.calls.append(params)
+        segment, total = params.get('Segment', 0), params.get('TotalSegments', 1)
+        if segment == self.fail_segment:
+            raise RuntimeError("scan failed")
+        items = [item for i, item in enumerate(self.items) if i % total == segment]
+        start = params.get('ExclusiveStartKey', {}).get('index', 0)
+        response = {'Items': items[start:start + self.page_size]}
+        if start + self.page_size < len(items):
+            response['LastEvaluatedKey'] = {'index': start + self.page_size}
+        return response
+
+
+ITEMS = [{'id': i} for i in range(20)]
+
+
+class TestScanPages:
+    """Tests para el recorrido síncrono"""
+
+    def test_follows_last_evaluated_key(self):
+        table = PagedTable(ITEMS)
+
+        pages = list(scan_pages(table, ProjectionExpression="id"))
+
+        assert [item for page in pages for item in page] == ITEMS
+        assert len(table.calls) == 7
+        assert table.calls[1]['ExclusiveStartKey'] == {'index': 3}
+        assert all(call['ProjectionExpression'] == "id" for call in table.calls)
+
+    def test_scan_all_reads_every_segment(self):
+        table = PagedTable(ITEMS)
+
+        items = scan_all(table, segments=4)
+
+        assert sorted(item['id'] for item in items) == list(range(20))
+        assert {call['Segment'] for call in table.calls} == {0, 1, 2, 3}
+        assert all(call['TotalSegments'] == 4 for call in table.calls)
+
+    def test_scan_all_with_dynamodb(self, dynamodb_client, dynamodb_resource):
+        table = dynamodb_resource.Table(table_name('Funds'))
+        for i in range(30):
+            table.put_item(Item={'fundId': f"F{i}", 'name': "x" * 100, 'minAmount': Decimal(i)})
+
+        items = scan_all(table, segments=3, Limit=4)
+
+        assert {item['fundId'] for item in items} >= {f"F{i}" for i in range(30)}
+
+
+class TestScanIter:
+    """Tests para el iterador asíncrono"""
+
+    @pytest.mark.asyncio
+    async def test_yields_all_items_from_parallel_segments(self):
+        table = PagedTable(ITEMS)
+
+        items = [item async for item in scan_iter(table, segments=3, buffer_pages=2)]
+
+        assert sorted(item['id'] for item in items) == list(range(20))
+
+    @pytest.mark.asyncio
+    async def test_bounded_buffer_pauses_producers(self):
+        table = PagedTable([{'id': i} for i in range(100)], page_size=1)
+        iterator = scan_iter(table, segments=1, buffer_pages=2)
+
+        assert await iterator.__anext__() == {'id': 0}
+        await asyncio.sleep(0.05)
+
+        # Una página consumida, dos en el buffer y una esperando lugar
+        assert len(table.calls) <= 4
+        await iterator.aclose()
+
+    @pytest.mark.asyncio
+    async def test_early_exit_stops_producers(self):
+        table = PagedTable([{'id': i} for i in range(100)], page_size=1)
+
+        async with aclosing(scan_iter(table, segments=2, buffer_pages=1)) as items:
+            async for _ in items:
+                break
+        calls = len(table.calls)
+        await asyncio.sleep(0.05)
+
+        assert len(table.calls) == calls
+        assert calls < 10
+
+    @pytest.mark.asyncio
+    async def test_segment_error_propagates(self):
+        table = PagedTable(ITEMS, fail_segment=1)
+
+        with pytest.raises(RuntimeError, match="scan failed"):
+            async for _ in scan_iter(table, segments=2):
+                pass
@@ -0,0 +1,89 @@
+"""
+Tests unitarios para SingleFlight
+"""
+import asyncio
+import threading
+import time
+import pytest
+
+from app.database.singleflight import SingleFlight
+
+
+class SlowRead:
+    """Lectura síncrona lenta que cuenta sus ejecuciones"""
+
+    def __init__(self, result="fund", error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.05)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class TestSingleFlight:
+    """Tests para la coalescencia de lecturas"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_reads_share_one_call(self):
+        """Test que las lecturas concurrentes con la misma clave ejecutan una sola llamada"""
+        group = SingleFlight("test")
+        read = SlowRead()
+
+        results = await asyncio.gather(*(group.do(("Funds", "get", "FPV"), read) for _ in range(20)))
+
+        assert results == ["fund"] * 20
+        assert read.calls == 1
+        assert group.inflight() == 0
+
+    @pytest.mark.asyncio
+    async def test_different_keys_are_not_coalesced(self):
+        """Test que claves distintas ejecutan llamadas independientes"""
+        group = SingleFlight("test")
+        read = SlowRead()
+
+        await asyncio.gather(group.do("a", read), group.do("b", read))
+
+        assert read.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared_and_not_cached(self):
+        """Test que un error llega a todos los que esperan y no se guarda"""
+        group = SingleFlight("test")
+        failing = SlowRead(error=RuntimeError("throttled"))
+
+        results = await asyncio.gather(*(group.do("k", failing) for _ in range(5)), return_exceptions=True)
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert failing.calls == 1
+        assert await group.do("k", SlowRead(result="ok")) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test que cancelar una petición no cancela la lectura compartida"""
+        group = SingleFlight("test")
+        read = SlowRead()
+
+        first = asyncio.ensure_future(group.do("k", read))
+        second = asyncio.ensure_future(group.do("k", read))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "fund"
+        assert read.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_runs_every_call(self):
+        """Test que con la coalescencia desactivada cada lectura se ejecuta"""
+        group = SingleFlight("test", enabled=False)
+        read = SlowRead()
+
+        await asyncio.gather(group.do("k", read), group.do("k", read))
+
+        assert read.calls == 2
@@ -0,0 +1,184 @@
+"""
+Tests unitarios para los streams de cambios y la invalidación de cachés
+"""
+import asyncio
+from decimal import Decimal
+from unittest.mock import patch
+
+import boto3
+from botocore.exceptions import ClientError
+
+from app.database.embedded import EmbeddedClient
+from app.database.init import create_tables
+from app.database.streams import (
+    INSERT, MODIFY, REMOVE, RESET, ChangeRecord, DynamoDBStreamReader, LocalStream, StreamConsumer
+)
+from app.services.fund_service import FundService
+from app.services.user_service import UserService
+from tests.conftest import table_name
+
+
+def embedded_client() -> EmbeddedClient:
+    """Backend embebido con las tablas de la aplicación (Funds y User con stream)"""
+    client = EmbeddedClient()
+    with patch('app.database.init.db_client', client):
+        create_tables()
+    return client
+
+
+class TestLocalStream:
+    """Tests para el stream simulado"""
+
+    def test_reader_starts_at_latest(self):
+        stream = LocalStream()
+        stream.publish(INSERT, {'id': 'a'})
+        reader = stream.reader()
+        stream.publish(MODIFY, {'id': 'b'})
+
+        assert reader.read() == [ChangeRecord(MODIFY, {'id': 'b'})]
+        assert reader.read() == []
+
+    def test_lost_records_emit_reset(self):
+        stream = LocalStream(max_records=2)
+        reader = stream.reader()
+        for number in range(3):
+            stream.publish(MODIFY, {'id': str(number)})
+
+        assert [record.event_name for record in reader.read()] == [RESET, MODIFY, MODIFY]
+
+
+class TestEmbeddedStreams:
+    """Tests para los cambios que publica el backend embebido"""
+
+    def test_writes_publish_key_changes(self):
+        client = embedded_client()
+        reader = client.open_stream(table_name('User'))
+        users = client.get_table('User')
+
+        users.put_item(Item={'userId': 'u1', 'balance': Decimal("10")})
+        users.put_item(Item={'userId': 'u1', 'balance': Decimal("10")})  # Sin cambios: no se publica
+        users.update_item(Key={'userId': 'u1'}, UpdateExpression="SET balance = :b", ExpressionAttributeValues={':b': 5})
+        users.delete_item(Key={'userId': 'u1'})
+
+        assert reader.read() == [
+            ChangeRecord(INSERT, {'userId': 'u1'}),
+            ChangeRecord(MODIFY, {'userId': 'u1'}),
+            ChangeRecord(REMOVE, {'userId': 'u1'}),
+        ]
+
+    def test_create_tables_enables_stream_on_existing_table(self):
+        client = EmbeddedClient()
+        client.get_client().create_table(
+            TableName=table_name('Funds'),
+            KeySchema=[{'AttributeName': 'fundId', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'fundId', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST'
+        )
+
+        with patch('app.database.init.db_client', client):
+            create_tables()
+
+        description = client.get_client().describe_table(TableName=table_name('Funds'))['Table']
+        assert description['StreamSpecification']['StreamEnabled'] is True
+
+
+class TestCacheInvalidation:
+    """Tests para la invalidación de las cachés de servicios con el consumidor"""
+
+    def test_fund_change_discards_catalog(self):
+        client = embedded_client()
+        funds = client.get_table('Funds')
+        funds.put_item(Item={'fundId': 'F1', 'name': 'Fondo 1', 'category': 'FPV', 'minAmount': Decimal("1000")})
+        service = FundService(catalog_ttl=3600, cache_backend=None)
+        service.table = funds
+        consumer = StreamConsumer()
+        consumer.subscribe('funds', '', client.open_stream(table_name('Funds')), service.on_fund_changes)
+
+        assert len(asyncio.run(service.get_all_funds())) == 1
+        funds.put_item(Item={'fundId': 'F2', 'name': 'Fondo 2', 'category': 'FIC', 'minAmount': Decimal("500")})
+        assert len(asyncio.run(service.get_all_funds())) == 1  # Catálogo en caché
+
+        assert consumer.poll() == 1
+        assert len(asyncio.run(service.get_all_funds())) == 2
+
+    def test_user_changes_discard_only_changed_users(self):
+        service = UserService(cache_backend=None)
+        service.cache.set('u1', 'user 1')
+        service.cache.set('u2', 'user 2')
+
+        service.on_user_changes([ChangeRecord(MODIFY, {'userId': 'u1'})])
+        assert service.cache.get('u1') is None
+        assert service.cache.get('u2') == 'user 2'
+
+        service.on_user_changes([ChangeRecord(RESET, {})])
+        assert service.cache.get('u2') is None
+
+    def test_handler_errors_do_not_stop_other_subscriptions(self):
+        stream = LocalStream()
+        received = []
+        consumer = StreamConsumer()
+        consumer.subscribe('failing', '', stream.reader(), lambda records: 1 / 0)
+        consumer.subscribe('working', '', stream.reader(), received.extend)
+        stream.publish(INSERT, {'id': 'a'})
+
+        consumer.poll()
+
+        assert received == [ChangeRecord(INSERT, {'id': 'a'})]
+
+
+class TestDynamoDBStreamReader:
+    """Tests para el lector de DynamoDB Streams (moto)"""
+
+    def test_reads_changes_after_start(self, dynamodb_mock):
+        dynamodb = boto3.client('dynamodb', region_name='us-east-1')
+        streams = boto3.client('dynamodbstreams', region_name='us-east-1')
+        name = table_name('StreamTest')
+        dynamodb.create_table(
+            TableName=name,
+            KeySchema=[{'AttributeName': 'fundId', 'KeyType': 'HASH'}],
+            AttributeDefinitions=[{'AttributeName': 'fundId', 'AttributeType': 'S'}],
+            BillingMode='PAY_PER_REQUEST',
+            StreamSpecification={'StreamEnabled': True, 'StreamViewType': 'KEYS_ONLY'}
+        )
+        dynamodb.put_item(TableName=name, Item={'fundId': {'S': 'before'}})
+        reader = DynamoDBStreamReader(streams, dynamodb, name)
+
+        assert reader.read() == []
+        dynamodb.put_item(TableName=name, Item={'fundId': {'S': 'F1'}})
+        dynamodb.delete_item(TableName=name, Key={'fundId': {'S': 'F1'}})
+
+        assert reader.read() == [ChangeRecord(INSERT, {'fundId': 'F1'}), ChangeRecord(REMOVE, {'fundId': 'F1'})]
+        dynamodb.delete_table(TableName=name)
+
+    def test_failing_shard_does_not_drop_other_shards(self):
+        class FakeStreams:
+            """Dos shards abiertos; el segundo falla una vez con throttling"""
+            failures = 1
+
+            def describe_stream(self, **params):
+                return {'StreamDescription': {'Shards': [
+                    {'ShardId': 's1', 'SequenceNumberRange': {'StartingSequenceNumber': '1'}},
+                    {'ShardId': 's2', 'SequenceNumberRange': {'StartingSequenceNumber': '1'}},
+                ]}}
+
+            def get_shard_iterator(self, ShardId, **params):
+                return {'ShardIterator': f"{ShardId}:0"}
+
+            def get_records(self, ShardIterator, Limit):
+                shard, position = ShardIterator.split(':')
+                if shard == 's2' and self.failures:
+                    self.failures -= 1
+                    raise ClientError({'Error': {'Code': 'ThrottlingException', 'Message': 'Rate exceeded'}}, 'GetRecords')
+                records = [] if position == '1' else [
+                    {'eventName': MODIFY, 'dynamodb': {'Keys': {'userId': {'S': f"user-{shard}"}}}}
+                ]
+                return {'Records': records, 'NextShardIterator': f"{shard}:1"}
+
+        dynamodb = type('FakeDynamoDB', (), {
+            'describe_table': lambda self, TableName: {'Table': {'LatestStreamArn': 'arn:stream'}}
+        })()
+        reader = DynamoDBStreamReader(FakeStreams(), dynamodb, 'User')
+
+        assert reader.read() == [ChangeRecord(MODIFY, {'userId': 'user-s1'})]
+        # El shard que falló conserva su iterador: sus cambios llegan en la lectura siguiente
+        assert reader.read() == [ChangeRecord(MODIFY, {'userId': 'user-s2'})]
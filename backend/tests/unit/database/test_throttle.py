@@ -0,0 +1,246 @@
+"""
+Tests unitarios para la limitación de tasa y el manejo de throttling de DynamoDB
+"""
+import asyncio
+import time
+from decimal import Decimal
+
+import pytest
+from unittest.mock import Mock, patch, AsyncMock
+from botocore.exceptions import ClientError
+from fastapi.testclient import TestClient
+
+from app.database.client import DynamoDBClient
+from app.database.throttle import TokenBucket, ThrottledTable, TableRateLimiter, count_throttle_retries
+from app.exceptions import DatabaseThrottledException
+from app.main import app
+from app.metrics import metrics
+from app.services.ledger_service import LedgerEntry, LedgerState, ledger_service
+from app.services.user_service import UserService
+
+
+def throttle_error(code="ProvisionedThroughputExceededException"):
+    return ClientError({"Error": {"Code": code, "Message": "Rate exceeded"}}, "GetItem")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.fixture
+def table():
+    table = Mock()
+    table.name = "Funds"
+    return table
+
+
+class TestTokenBucket:
+    """Tests para TokenBucket"""
+
+    def test_burst_then_wait(self):
+        """Test que tras agotar la ráfaga se calcula la espera según la tasa"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=5, clock=clock)
+
+        assert [bucket.reserve() for _ in range(5)] == [0.0] * 5
+        assert bucket.reserve() == pytest.approx(0.2)
+
+        clock.now = 1.0
+        assert bucket.reserve() == 0.0
+
+    def test_acquire_refuses_waits_over_limit(self):
+        """Test que acquire no espera más de max_wait y devuelve el token"""
+        bucket = TokenBucket(rate=1, clock=FakeClock())
+        sleeps = []
+
+        assert bucket.acquire(max_wait=0.5, sleep=sleeps.append) is True
+        assert bucket.acquire(max_wait=0.5, sleep=sleeps.append) is False
+        assert bucket.acquire(max_wait=2, sleep=sleeps.append) is True
+        assert sleeps == [pytest.approx(1.0)]
+
+    def test_zero_rate_disables_limit(self):
+        """Test que una tasa 0 no limita"""
+        bucket = TokenBucket(rate=0)
+
+        assert all(bucket.reserve() == 0.0 for _ in range(1000))
+
+
+class TestThrottledTable:
+    """Tests para ThrottledTable"""
+
+    def test_delegates_operations(self, table):
+        """Test que las operaciones se delegan en la tabla original"""
+        table.get_item.return_value = {"Item": {"fundId": "FPV"}}
+        throttled = ThrottledTable(table, TokenBucket(0), TokenBucket(0))
+
+        assert throttled.get_item(Key={"fundId": "FPV"}) == {"Item": {"fundId": "FPV"}}
+        assert throttled.name == "Funds"
+
+    def test_throttle_error_becomes_typed_exception(self, table):
+        """Test que el throttling tras los reintentos se convierte en DatabaseThrottledException"""
+        table.query.side_effect = throttle_error()
+        throttled = ThrottledTable(table, TokenBucket(0), TokenBucket(0), retry_after=2)
+
+        with pytest.raises(DatabaseThrottledException) as exc_info:
+            throttled.query(KeyConditionExpression="x")
+
+        assert exc_info.value.retry_after == 2
+        assert metrics.get("dynamodb.Funds.throttled") == 1
+
+    def test_other_errors_are_not_converted(self, table):
+        """Test que los errores que no son de capacidad se propagan igual"""
+        table.put_item.side_effect = throttle_error("ConditionalCheckFailedException")
+        throttled = ThrottledTable(table, TokenBucket(0), TokenBucket(0))
+
+        with pytest.raises(ClientError):
+            throttled.put_item(Item={})
+
+    def test_client_side_limit_rejects_without_calling(self, table):
+        """Test que si el limitador no da token no se llama a DynamoDB"""
+        write_bucket = TokenBucket(rate=1, clock=FakeClock())
+        throttled = ThrottledTable(table, TokenBucket(0), write_bucket, max_wait=0)
+
+        throttled.update_item(Key={})
+        with pytest.raises(DatabaseThrottledException):
+            throttled.update_item(Key={})
+
+        assert table.update_item.call_count == 1
+        assert metrics.get("dynamodb.Funds.write_rate_limited") == 1
+
+
+class TestTransactionRateLimit:
+    """Tests para la limitación de tasa de TransactWriteItems"""
+
+    ACTIONS = [
+        {'Put': {'TableName': 'UserFunds', 'Item': {}}},
+        {'Update': {'TableName': 'User', 'Key': {}}},
+        {'ConditionCheck': {'TableName': 'Funds', 'Key': {}}},
+    ]
+
+    def test_takes_one_token_per_action_from_each_table(self):
+        """Test que cada acción descuenta del bucket de su tabla (lectura para ConditionCheck)"""
+        limiter = TableRateLimiter(read_rate=1, write_rate=1)
+
+        limiter.acquire_transaction(self.ACTIONS, max_wait=0)
+
+        with pytest.raises(DatabaseThrottledException):
+            limiter.acquire_transaction([{'Put': {'TableName': 'UserFunds', 'Item': {}}}], max_wait=0)
+        with pytest.raises(DatabaseThrottledException):
+            limiter.acquire_transaction([{'ConditionCheck': {'TableName': 'Funds', 'Key': {}}}], max_wait=0)
+        assert metrics.get("dynamodb.UserFunds.write_rate_limited") == 1
+        assert metrics.get("dynamodb.Funds.read_rate_limited") == 1
+
+    def test_rejected_transaction_refunds_tokens(self):
+        """Test que si una tabla no da tokens se devuelven los ya reservados en las demás"""
+        limiter = TableRateLimiter(read_rate=0, write_rate=1)
+        limiter.acquire_transaction([{'Put': {'TableName': 'User', 'Item': {}}}], max_wait=0)
+
+        with pytest.raises(DatabaseThrottledException):
+            limiter.acquire_transaction(
+                [{'Put': {'TableName': 'UserFunds', 'Item': {}}}, {'Update': {'TableName': 'User', 'Key': {}}}],
+                max_wait=0
+            )
+
+        limiter.acquire_transaction([{'Put': {'TableName': 'UserFunds', 'Item': {}}}], max_wait=0)
+
+    def test_client_applies_limit_before_calling_dynamodb(self):
+        """Test que DynamoDBClient.transact_write_items usa los buckets de las tablas"""
+        client = DynamoDBClient()
+        client.dynamodb = Mock()
+        client._rate_limiter = TableRateLimiter(read_rate=0, write_rate=1)
+        action = {'Put': {'TableName': 'UserFunds', 'Item': {'userId': 'u1'}}}
+
+        client.transact_write_items([action])
+        with pytest.raises(DatabaseThrottledException):
+            client.transact_write_items([action])
+
+        assert client.dynamodb.transact_write_items.call_count == 1
+
+
+def test_transaction_does_not_block_event_loop():
+    """Test que la transacción del libro mayor se ejecuta fuera del event loop"""
+    def slow_transaction(actions):
+        time.sleep(0.2)
+
+    def build(state):
+        return [LedgerEntry("credit", Decimal("10"), "adjustment")], []
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        await ledger_service.append("u1", build)
+        task.cancel()
+        return ticks
+
+    with patch.object(ledger_service, 'get_state', AsyncMock(return_value=LedgerState("u1", 0, Decimal("0")))), \
+            patch('app.services.ledger_service.db_client.transact_write_items', side_effect=slow_transaction):
+        ticks = asyncio.run(scenario())
+
+    assert ticks >= 5
+
+
+def test_waiting_for_token_does_not_block_event_loop(table):
+    """Test que la espera de un token en un servicio no detiene las demás corrutinas"""
+    table.get_item.return_value = {}
+    read_bucket = TokenBucket(rate=5, capacity=1)
+    read_bucket.reserve()  # Bucket vacío: la siguiente lectura espera ~0.2 s
+    service = UserService(cache_backend=None)
+    service.table = ThrottledTable(table, read_bucket, TokenBucket(0), max_wait=1)
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        started = time.monotonic()
+        await service.get_user_by_id("u1", use_cache=False)
+        elapsed = time.monotonic() - started
+        task.cancel()
+        return ticks, elapsed
+
+    ticks, elapsed = asyncio.run(scenario())
+
+    assert elapsed >= 0.15
+    assert ticks >= 5
+
+
+def test_count_throttle_retries():
+    """Test que el manejador de needs-retry cuenta solo respuestas de throttling"""
+    count_throttle_retries(response=(Mock(), {"Error": {"Code": "ThrottlingException"}}))
+    count_throttle_retries(response=(Mock(), {"Error": {"Code": "ValidationException"}}))
+    count_throttle_retries(response=None)
+
+    assert metrics.get("dynamodb.throttle_events") == 1
+
+
+def test_throttled_request_returns_503_with_retry_after():
+    """Test que la API responde 503 con Retry-After ante throttling"""
+    with patch('app.routes.funds.fund_service.get_catalog',
+               AsyncMock(side_effect=DatabaseThrottledException("Funds", 3))):
+        response = TestClient(app).get("/api/v1/funds/")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
@@ -0,0 +1,172 @@
+"""
+Tests unitarios para el buffer de escritura diferida de transacciones
+"""
+import sqlite3
+
+import pytest
+from decimal import Decimal
+from unittest.mock import Mock
+from botocore.exceptions import ClientError
+
+from app.database.write_buffer import TransactionWriteBuffer
+from tests.conftest import table_name
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({'Error': {'Code': code, 'Message': code}}, 'BatchWriteItem')
+
+
+def make_item(index: int) -> dict:
+    return {
+        'transactionId': f"txn_{index}",
+        'userId': 'user123',
+        'fundId': 'FPV_BTG_PACTUAL',
+        'type': 'unsubscribe',
+        'amount': Decimal("0"),
+        'timestamp': '2025-08-05T10:30:00'
+    }
+
+
+class TestTransactionWriteBuffer:
+    """Tests para TransactionWriteBuffer"""
+
+    @pytest.fixture
+    def client(self):
+        client = Mock()
+        client.batch_write_item.return_value = {'UnprocessedItems': {}}
+        return client
+
+    def test_flush_sends_batches_of_25(self, tmp_path, client):
+        """Test que el envío agrupa los items en lotes de 25"""
+        buffer = TransactionWriteBuffer("Transactions", str(tmp_path / "buffer.db"), client=client)
+        for index in range(30):
+            buffer.append(make_item(index))
+
+        flushed = buffer.flush()
+
+        assert flushed == 30
+        assert buffer.pending_count() == 0
+        sizes = [len(call.kwargs['RequestItems'][table_name('Transactions')]) for call in client.batch_write_item.call_args_list]
+        assert sizes == [25, 5]
+
+    def test_unprocessed_items_are_retried(self, tmp_path, client):
+        """Test reintento de UnprocessedItems"""
+        buffer = TransactionWriteBuffer("Transactions", str(tmp_path / "buffer.db"), client=client)
+        buffer.append(make_item(1))
+        unprocessed = {table_name('Transactions'): [{'PutRequest': {'Item': {'transactionId': {'S': 'txn_1'}}}}]}
+        client.batch_write_item.side_effect = [{'UnprocessedItems': unprocessed}, {'UnprocessedItems': {}}]
+
+        assert buffer.flush() == 1
+        assert client.batch_write_item.call_count == 2
+        assert client.batch_write_item.call_args.kwargs['RequestItems'] == unprocessed
+
+    def test_failed_batch_stays_pending(self, tmp_path, client):
+        """Test que un lote fallido permanece en el log local"""
+        buffer = TransactionWriteBuffer("Transactions", str(tmp_path / "buffer.db"), max_retries=0, client=client)
+        buffer.append(make_item(1))
+        client.batch_write_item.return_value = {
+            'UnprocessedItems': {table_name('Transactions'): [{'PutRequest': {'Item': {}}}]}
+        }
+
+        with pytest.raises(Exception):
+            buffer.flush()
+
+        assert buffer.pending_count() == 1
+
+    def test_pending_items_survive_restart(self, tmp_path, client):
+        """Test recuperación de transacciones pendientes después de un reinicio"""
+        path = str(tmp_path / "buffer.db")
+        crashed = TransactionWriteBuffer("Transactions", path, client=client)
+        crashed.append(make_item(1))
+        crashed.close()
+
+        recovered = TransactionWriteBuffer("Transactions", path, client=client)
+
+        assert recovered.pending_items() == [make_item(1)]
+        assert recovered.flush() == 1
+        sent = client.batch_write_item.call_args.kwargs['RequestItems'][table_name('Transactions')][0]['PutRequest']['Item']
+        assert sent['amount'] == {'N': '0'}
+
+    def test_repeatedly_failing_batch_moves_to_dead_letter(self, tmp_path, client):
+        """Test que tras max_failures envíos fallidos el lote se aparta y no bloquea los siguientes"""
+        buffer = TransactionWriteBuffer(
+            "Transactions", str(tmp_path / "buffer.db"), max_retries=0, max_failures=2, client=client
+        )
+        for index in range(30):
+            buffer.append(make_item(index))
+        rejected = client_error("ValidationException")
+        client.batch_write_item.side_effect = [rejected, rejected, {'UnprocessedItems': {}}]
+
+        with pytest.raises(Exception):
+            buffer.flush()
+        assert buffer.pending_count() == 30
+
+        assert buffer.flush() == 5
+        assert buffer.pending_count() == 0
+        assert buffer.dead_letter_count() == 25
+
+    def test_throttled_batch_is_never_dead_lettered(self, tmp_path, client):
+        """Test que el throttling (error o UnprocessedItems) no cuenta para max_failures"""
+        buffer = TransactionWriteBuffer(
+            "Transactions", str(tmp_path / "buffer.db"), max_retries=0, max_failures=1, client=client
+        )
+        buffer.append(make_item(1))
+        unprocessed = {'UnprocessedItems': {table_name('Transactions'): [{'PutRequest': {'Item': {}}}]}}
+        client.batch_write_item.side_effect = [
+            client_error("ProvisionedThroughputExceededException"), unprocessed, client_error("InternalServerError")
+        ]
+
+        for _ in range(3):
+            with pytest.raises(Exception):
+                buffer.flush()
+
+        assert (buffer.pending_count(), buffer.dead_letter_count()) == (1, 0)
+
+    def test_retry_delay_backs_off(self, tmp_path, client):
+        """Test que la espera entre envíos crece con los fallos seguidos y tiene un máximo"""
+        buffer = TransactionWriteBuffer("Transactions", str(tmp_path / "buffer.db"), flush_interval=1.0, client=client)
+
+        assert buffer.retry_delay(0) == 1.0
+        assert 1.0 <= buffer.retry_delay(3) <= 8.0
+        assert buffer.retry_delay(20) <= 30.0
+
+    def test_requeue_dead_letters(self, tmp_path, client):
+        """Test que las transacciones apartadas vuelven a la cola y se envían"""
+        buffer = TransactionWriteBuffer(
+            "Transactions", str(tmp_path / "buffer.db"), max_retries=0, max_failures=1, client=client
+        )
+        buffer.append(make_item(1))
+        client.batch_write_item.side_effect = [client_error("ValidationException"), {'UnprocessedItems': {}}]
+        assert buffer.flush() == 0
+
+        assert buffer.requeue_dead_letters() == 1
+        assert buffer.pending_items() == [make_item(1)]
+        assert buffer.flush() == 1
+        assert buffer.dead_letter_count() == 0
+
+    def test_synchronous_mode(self, tmp_path, client):
+        """Test que el log usa synchronous=FULL por defecto y valida el modo configurado"""
+        buffer = TransactionWriteBuffer("Transactions", str(tmp_path / "buffer.db"), client=client)
+        relaxed = TransactionWriteBuffer("Transactions", str(tmp_path / "relaxed.db"), synchronous="normal", client=client)
+
+        # PRAGMA synchronous devuelve 2 para FULL y 1 para NORMAL
+        assert buffer._get_connection().execute("PRAGMA synchronous").fetchone()[0] == 2
+        assert relaxed._get_connection().execute("PRAGMA synchronous").fetchone()[0] == 1
+        with pytest.raises(ValueError):
+            TransactionWriteBuffer("Transactions", str(tmp_path / "other.db"), synchronous="FAST")
+
+    def test_log_from_previous_version_is_migrated(self, tmp_path, client):
+        """Test que un log sin la columna attempts conserva sus pendientes"""
+        path = str(tmp_path / "buffer.db")
+        legacy = TransactionWriteBuffer("Transactions", path, client=client)
+        legacy.append(make_item(1))
+        legacy.close()
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            "CREATE TABLE old (seq INTEGER PRIMARY KEY AUTOINCREMENT, item TEXT NOT NULL);"
+            "INSERT INTO old (seq, item) SELECT seq, item FROM pending;"
+            "DROP TABLE pending; ALTER TABLE old RENAME TO pending;"
+        )
+        connection.close()
+
+        assert TransactionWriteBuffer("Transactions", path, client=client).flush() == 1
@@ -0,0 +1,118 @@
+"""
+Tests unitarios para el control de admisión
+"""
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.database.latency import LatencyTracker
+from app.middleware.admission import AdmissionController, AdmissionControlMiddleware, parse_routes
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_controller(**options):
+    defaults = dict(
+        initial_limit=2, min_limit=1, max_limit=4, max_queue=1, queue_timeout=0.05,
+        target_latency=0.1, adjust_interval=1.0, latency=LatencyTracker("test"), clock=FakeClock()
+    )
+    defaults.update(options)
+    return AdmissionController("test", **defaults)
+
+
+class TestAdmissionController:
+    """Tests para AdmissionController"""
+
+    @pytest.mark.asyncio
+    async def test_admits_up_to_limit_then_queues_then_rejects(self):
+        """Test límite en curso, cola acotada y rechazo del exceso"""
+        controller = make_controller()
+
+        assert await controller.acquire() is True
+        assert await controller.acquire() is True
+        queued = asyncio.ensure_future(controller.acquire())
+        await asyncio.sleep(0)
+
+        assert controller.queued == 1
+        assert await controller.acquire() is False
+
+        controller.release()
+        assert await queued is True
+        assert controller.in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout_rejects(self):
+        """Test que una petición en cola expira y se rechaza"""
+        controller = make_controller(initial_limit=1)
+        await controller.acquire()
+
+        assert await controller.acquire() is False
+        assert controller.queued == 0
+
+    @pytest.mark.asyncio
+    async def test_limit_decreases_when_latency_is_high(self):
+        """Test reducción multiplicativa con latencia de DynamoDB alta"""
+        latency = LatencyTracker("test")
+        clock = FakeClock()
+        controller = make_controller(initial_limit=4, latency=latency, clock=clock)
+        latency.observe(0.5)
+
+        await controller.acquire()
+        clock.now = 2.0
+        controller.release()
+
+        assert controller.limit == 3
+
+    @pytest.mark.asyncio
+    async def test_limit_grows_when_saturated_and_latency_is_low(self):
+        """Test incremento aditivo cuando hubo demanda y la latencia es buena"""
+        latency = LatencyTracker("test")
+        clock = FakeClock()
+        controller = make_controller(initial_limit=1, latency=latency, clock=clock)
+        latency.observe(0.01)
+
+        await controller.acquire()
+        assert await controller.acquire() is False
+        clock.now = 2.0
+        controller.release()
+
+        assert controller.limit == 2
+
+
+def test_parse_routes():
+    """Test lectura de la lista de rutas protegidas"""
+    assert list(parse_routes("POST /api/v1/subscribe, post /api/v1/unsubscribe,invalid")) == [
+        ("POST", "/api/v1/subscribe"), ("POST", "/api/v1/unsubscribe")
+    ]
+
+
+def test_middleware_sheds_overflow_with_503():
+    """Test que el exceso recibe 503 con Retry-After y las rutas no protegidas pasan"""
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        routes=[("POST", "/write")],
+        initial_limit=0, min_limit=0, max_queue=0, latency=LatencyTracker("test")
+    )
+
+    @app.post("/write")
+    async def write():
+        return {"ok": True}
+
+    @app.get("/read")
+    async def read():
+        return {"ok": True}
+
+    client = TestClient(app)
+    response = client.post("/write")
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert client.get("/read").status_code == 200
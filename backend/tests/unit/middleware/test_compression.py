@@ -0,0 +1,89 @@
+"""
+Tests unitarios para el middleware de compresión
+"""
+import gzip
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import compression
+from app.middleware.compression import CompressionMiddleware, parse_accept_encoding
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    async def large():
+        return JSONResponse([{"transactionId": str(i), "type": "subscribe"} for i in range(50)],
+                            headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(10):
+                yield ("x" * 50).encode()
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/binary")
+    async def binary():
+        return PlainTextResponse("x" * 500, media_type="application/octet-stream")
+
+    return app
+
+
+class TestCompressionMiddleware:
+    """Tests para CompressionMiddleware"""
+
+    @pytest.fixture
+    def client(self):
+        with patch.object(compression, "brotli", None):
+            yield TestClient(build_app())
+
+    def test_large_json_is_gzipped(self, client):
+        """Test compresión gzip de respuestas JSON por encima del umbral"""
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == 'W/"v1"'
+        assert len(response.json()) == 50
+
+    def test_small_response_is_not_compressed(self, client):
+        """Test que las respuestas por debajo del umbral se envían sin comprimir"""
+        response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"ok": True}
+
+    def test_no_accept_encoding(self, client):
+        """Test que no se comprime si el cliente no lo acepta"""
+        response = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_streaming_response_is_compressed_in_chunks(self, client):
+        """Test compresión de respuestas en streaming sin Content-Length"""
+        with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert gzip.decompress(raw) == b"x" * 500
+
+    def test_non_textual_content_is_not_compressed(self, client):
+        """Test que los tipos no textuales no se comprimen"""
+        response = client.get("/binary", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+
+    def test_parse_accept_encoding(self):
+        """Test interpretación de calidades en Accept-Encoding"""
+        assert parse_accept_encoding("gzip, br;q=0.5, *;q=0") == {"gzip": 1.0, "br": 0.5, "*": 0.0}
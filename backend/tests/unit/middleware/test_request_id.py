@@ -0,0 +1,48 @@
+"""
+Tests unitarios para el middleware de correlación de peticiones
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.logging_config import request_id_var
+from app.middleware.request_id import RequestIdMiddleware
+
+
+def build_app():
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/sync")
+    def sync_endpoint():
+        return {"request_id": request_id_var.get()}
+
+    @app.get("/async")
+    async def async_endpoint():
+        return {"request_id": request_id_var.get()}
+
+    return app
+
+
+class TestRequestIdMiddleware:
+    """Tests para RequestIdMiddleware"""
+
+    def test_reuses_valid_header(self):
+        """Test reutilizar X-Request-ID del cliente (también en endpoints síncronos)"""
+        client = TestClient(build_app())
+
+        response = client.get("/sync", headers={"X-Request-ID": "abc-123"})
+
+        assert response.headers["x-request-id"] == "abc-123"
+        assert response.json() == {"request_id": "abc-123"}
+
+    def test_generates_id_for_missing_or_invalid_header(self):
+        """Test generar un identificador si falta o no es válido"""
+        client = TestClient(build_app())
+
+        generated = client.get("/async")
+        replaced = client.get("/async", headers={"X-Request-ID": "bad id\twith spaces"})
+
+        assert len(generated.headers["x-request-id"]) == 32
+        assert generated.json()["request_id"] == generated.headers["x-request-id"]
+        assert replaced.headers["x-request-id"] != "bad id\twith spaces"
+        assert request_id_var.get() is None
@@ -0,0 +1,78 @@
+"""
+Tests unitarios para el middleware de resolución del tenant
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.tenant import TenantMiddleware
+from app.tenancy import tenant_var
+
+
+def build_app():
+    app = FastAPI()
+    app.add_middleware(TenantMiddleware, tenants=("acme", "globex"), hosts={"fondos.acme.com": "acme"})
+
+    @app.get("/tenant")
+    async def tenant_endpoint():
+        return {"tenant": tenant_var.get()}
+
+    return app
+
+
+class TestTenantMiddleware:
+    """Tests para TenantMiddleware"""
+
+    def test_header_selects_tenant(self):
+        """Test tomar el tenant de la cabecera"""
+        client = TestClient(build_app())
+
+        response = client.get("/tenant", headers={"X-Tenant-ID": "Globex"})
+
+        assert response.json() == {"tenant": "globex"}
+
+    def test_host_selects_tenant(self):
+        """Test tomar el tenant del host (sin puerto) si no hay cabecera"""
+        client = TestClient(build_app(), base_url="http://fondos.acme.com:8001")
+
+        assert client.get("/tenant").json() == {"tenant": "acme"}
+
+    def test_default_tenant_without_header_or_host(self):
+        """Test usar el tenant por defecto"""
+        client = TestClient(build_app())
+
+        assert client.get("/tenant").json() == {"tenant": ""}
+        assert tenant_var.get() == ""
+
+    def test_unknown_tenant_is_rejected(self):
+        """Test responder 400 a un tenant desconocido"""
+        client = TestClient(build_app())
+
+        response = client.get("/tenant", headers={"X-Tenant-ID": "initech"})
+
+        assert response.status_code == 400
+        assert response.json()["error"] == "Unknown tenant"
+
+    def test_responses_vary_on_tenant_header_and_host(self):
+        """Test las respuestas (incluido el 400) declaran Vary por cabecera de tenant y host"""
+        client = TestClient(build_app())
+
+        ok = client.get("/tenant", headers={"X-Tenant-ID": "acme"})
+        rejected = client.get("/tenant", headers={"X-Tenant-ID": "initech"})
+
+        assert ok.headers["vary"] == "x-tenant-id, Host"
+        assert rejected.headers["vary"] == "x-tenant-id, Host"
+
+    def test_admission_controllers_per_tenant(self):
+        """Test cada tenant tiene sus propios controladores de admisión"""
+        middleware = AdmissionControlMiddleware(app=None, routes=[("POST", "/api/v1/subscribe")])
+
+        token = tenant_var.set("acme")
+        try:
+            acme = middleware.controllers[("POST", "/api/v1/subscribe")]
+        finally:
+            tenant_var.reset(token)
+        default = middleware.controllers[("POST", "/api/v1/subscribe")]
+
+        assert acme is not default
+        assert (acme.name, default.name) == ("acme:POST /api/v1/subscribe", "POST /api/v1/subscribe")
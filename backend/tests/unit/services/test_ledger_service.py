@@ -0,0 +1,106 @@
+"""
+Tests unitarios para LedgerService
+"""
+import pytest
+from decimal import Decimal
+from unittest.mock import patch
+
+from app.database.client import db_client
+from app.exceptions import InsufficientBalanceException, LedgerConflictException
+from app.metrics import metrics
+from app.services.ledger_service import LedgerService, LedgerEntry
+from tests.conftest import table_name
+
+
+def clear(table, *key_names):
+    for item in table.scan()['Items']:
+        table.delete_item(Key={name: item[name] for name in key_names})
+
+
+class TestLedgerService:
+    """Tests para el libro mayor de saldos"""
+
+    @pytest.fixture
+    def service(self, dynamodb_client, dynamodb_resource):
+        service = LedgerService(snapshot_interval=3)
+        service.events_table = dynamodb_resource.Table(table_name('LedgerEvents'))
+        service.snapshots_table = dynamodb_resource.Table(table_name('LedgerSnapshots'))
+        service.users_table = dynamodb_resource.Table(table_name('Users'))
+        clear(service.events_table, 'userId', 'sequence')
+        clear(service.snapshots_table, 'userId', 'sequence')
+        service.users_table.put_item(Item={'userId': 'user123', 'balance': Decimal("500000"), 'notificationType': 'email'})
+        # Las transacciones del cliente global van al DynamoDB simulado
+        with patch.object(db_client, 'dynamodb', dynamodb_client):
+            yield service
+
+    @staticmethod
+    def debit(amount):
+        return lambda state: ([LedgerEntry("debit", Decimal(amount), "subscribe", "FPV_BTG_PACTUAL")], [])
+
+    @pytest.mark.asyncio
+    async def test_first_append_opens_ledger_and_updates_projection(self, service):
+        """Test apertura con el saldo previo, débito y proyección en User"""
+        result = await service.append("user123", self.debit("75000"))
+
+        assert [(e.sequence, e.reason, e.delta) for e in result.events] == [
+            (1, "opening", Decimal("500000")), (2, "subscribe", Decimal("-75000"))
+        ]
+        state = await service.get_state("user123")
+        assert (state.sequence, state.balance) == (2, Decimal("425000"))
+        user = service.users_table.get_item(Key={'userId': 'user123'})['Item']
+        assert (user['balance'], user['ledgerSequence']) == (Decimal("425000"), 2)
+
+    @pytest.mark.asyncio
+    async def test_balance_is_derived_from_snapshot_and_later_events(self, service):
+        """Test snapshot automático cada N eventos dentro de la transacción"""
+        for _ in range(3):
+            await service.append("user123", self.debit("10000"))
+
+        snapshots = service.snapshots_table.scan()['Items']
+        assert [(s['sequence'], s['balance']) for s in snapshots] == [(3, Decimal("480000"))]
+
+        # Los eventos anteriores al snapshot ya no se leen para calcular el saldo
+        for sequence in (1, 2, 3):
+            service.events_table.delete_item(Key={'userId': 'user123', 'sequence': sequence})
+        state = await service.get_state("user123")
+        assert (state.sequence, state.balance) == (4, Decimal("470000"))
+
+    @pytest.mark.asyncio
+    async def test_insufficient_balance_writes_nothing(self, service):
+        """Test débito mayor al saldo"""
+        with pytest.raises(InsufficientBalanceException):
+            await service.append("user123", self.debit("600000"))
+
+        assert service.events_table.scan()['Items'] == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_append_is_retried(self, service):
+        """Test conflicto de secuencia: se relee el estado y se reintenta"""
+        await service.append("user123", self.debit("10000"))
+        conflicts = metrics.get("ledger.append_conflicts")
+        calls = []
+
+        def build(state):
+            if not calls:
+                # Otra escritura toma el siguiente número de secuencia
+                concurrent = service.build_append(state, [LedgerEntry("debit", Decimal("5000"), "subscribe")])
+                db_client.transact_write_items(concurrent.actions)
+            calls.append(state.sequence)
+            return [LedgerEntry("debit", Decimal("20000"), "subscribe")], []
+
+        result = await service.append("user123", build)
+
+        assert calls == [2, 3]
+        assert result.state.balance == Decimal("465000")
+        assert metrics.get("ledger.append_conflicts") == conflicts + 1
+
+    @pytest.mark.asyncio
+    async def test_conflicts_exhaust_attempts(self, service):
+        """Test error cuando otra escritura gana en todos los intentos"""
+        def build(state):
+            concurrent = service.build_append(state, [LedgerEntry("credit", Decimal("1"), "adjustment")])
+            db_client.transact_write_items(concurrent.actions)
+            return [LedgerEntry("debit", Decimal("1"), "subscribe")], []
+
+        with pytest.raises(LedgerConflictException):
+            await service.append("user123", build, max_attempts=2)
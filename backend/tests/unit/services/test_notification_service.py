@@ -17,12 +17,12 @@ class TestNotificationService:
         message = "Test message"
         
         # Act
-        with patch('builtins.print') as mock_print:
+        with patch('app.services.notification_service.logger') as mock_logger:
             result = notification_service.send_notification("email", recipient, message)
         
         # Assert
         assert result is True
-        mock_print.assert_called_once_with(f"[Email] Sending to {recipient}: {message}")
+        mock_logger.info.assert_any_call("[Email] Sending to %s: %s", recipient, message)
     
     def test_send_sms_notification(self):
         """Test envío de notificación por SMS"""
@@ -31,12 +31,12 @@ class TestNotificationService:
         message = "Test SMS message"
         
         # Act
-        with patch('builtins.print') as mock_print:
+        with patch('app.services.notification_service.logger') as mock_logger:
             result = notification_service.send_notification("sms", recipient, message)
         
         # Assert
         assert result is True
-        mock_print.assert_called_once_with(f"[SMS] Sending to {recipient}: {message}")
+        mock_logger.info.assert_any_call("[SMS] Sending to %s: %s", recipient, message)
     
 
     
@@ -48,7 +48,7 @@ class TestNotificationService:
         notification_type = "email"
         
         # Act
-        with patch('builtins.print') as mock_print:
+        with patch('app.services.notification_service.logger') as mock_logger:
             result = notification_service.send_subscription_notification(
                 notification_type, recipient, fund_name
             )
@@ -56,7 +56,7 @@ class TestNotificationService:
         # Assert
         assert result is True
         expected_message = f"Te has suscrito exitosamente al fondo {fund_name}. ¡Gracias por confiar en nosotros!"
-        mock_print.assert_called_once_with(f"[Email] Sending to {recipient}: {expected_message}")
+        mock_logger.info.assert_any_call("[Email] Sending to %s: %s", recipient, expected_message)
     
     def test_send_subscription_notification_sms(self):
         """Test notificación de suscripción por SMS"""
@@ -66,7 +66,7 @@ class TestNotificationService:
         notification_type = "sms"
         
         # Act
-        with patch('builtins.print') as mock_print:
+        with patch('app.services.notification_service.logger') as mock_logger:
             result = notification_service.send_subscription_notification(
                 notification_type, recipient, fund_name
             )
@@ -74,7 +74,7 @@ class TestNotificationService:
         # Assert
         assert result is True
         expected_message = f"Te has suscrito exitosamente al fondo {fund_name}. ¡Gracias por confiar en nosotros!"
-        mock_print.assert_called_once_with(f"[SMS] Sending to {recipient}: {expected_message}")
+        mock_logger.info.assert_any_call("[SMS] Sending to %s: %s", recipient, expected_message)
     
     def test_send_unsubscription_notification(self):
         """Test notificación de cancelación de suscripción"""
@@ -84,7 +84,7 @@ class TestNotificationService:
         notification_type = "email"
         
         # Act
-        with patch('builtins.print') as mock_print:
+        with patch('app.services.notification_service.logger') as mock_logger:
             result = notification_service.send_unsubscription_notification(
                 notification_type, recipient, fund_name
             )
@@ -92,4 +92,4 @@ class TestNotificationService:
         # Assert
         assert result is True
         expected_message = f"Has cancelado tu suscripción al fondo {fund_name}. Esperamos verte pronto de nuevo."
-        mock_print.assert_called_once_with(f"[Email] Sending to {recipient}: {expected_message}")
\ No newline at end of file
+        mock_logger.info.assert_any_call("[Email] Sending to %s: %s", recipient, expected_message)
\ No newline at end of file
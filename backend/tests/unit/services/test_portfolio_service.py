@@ -0,0 +1,56 @@
+"""
+Tests unitarios para el resumen de suscripciones con suscripciones anteriores a él
+"""
+import pytest
+from decimal import Decimal
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.subscription import SubscribeRequest, UnsubscribeRequest
+from app.services.subscription_service import subscription_service
+
+
+def legacy_subscription(tables, fund_id):
+    """Suscripción creada antes del resumen: sin resumen y sin monto registrado"""
+    tables.UserFunds.put_item(Item={'userId': 'user123', 'fundId': fund_id, 'subscribedAt': '2024-01-01T00:00:00'})
+
+
+class TestPortfolioRebuild:
+    """Tests para la reconstrucción del resumen desde UserFunds"""
+
+    @pytest.mark.asyncio
+    async def test_subscribe_without_summary_rebuilds_it_first(self, service_tables):
+        """Test la primera suscripción de un usuario con suscripciones previas no deja un resumen parcial"""
+        legacy_subscription(service_tables, "DEUDAPRIVADA")
+
+        response = await subscription_service.subscribe_to_fund(SubscribeRequest(userId="user123", fundId="FPV_BTG_PACTUAL"))
+
+        assert response.success
+        summary = service_tables.UserPortfolio.get_item(Key={'userId': 'user123'})['Item']
+        assert summary['activeFundIds'] == {"DEUDAPRIVADA", "FPV_BTG_PACTUAL"}
+        assert (summary['subscriptionCount'], summary['totalCommitted']) == (2, Decimal("125000"))
+        assert (summary['FICCount'], summary['FPVCount']) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_missing_from_summary_does_not_go_negative(self, service_tables):
+        """Test cancelar una suscripción que el resumen no tiene: se cancela y el resumen se reconstruye"""
+        legacy_subscription(service_tables, "DEUDAPRIVADA")
+
+        response = await subscription_service.unsubscribe_from_fund(UnsubscribeRequest(userId="user123", fundId="DEUDAPRIVADA"))
+
+        assert response.success
+        assert 'Item' not in service_tables.UserFunds.get_item(Key={'userId': 'user123', 'fundId': 'DEUDAPRIVADA'})
+        summary = service_tables.UserPortfolio.get_item(Key={'userId': 'user123'})['Item']
+        assert (summary['subscriptionCount'], summary['totalCommitted']) == (0, Decimal("0"))
+        assert 'activeFundIds' not in summary
+
+    def test_get_portfolio_backfills_missing_summary(self, service_tables):
+        """Test la consulta del resumen lo crea desde UserFunds si no existe"""
+        legacy_subscription(service_tables, "FPV_BTG_PACTUAL")
+
+        response = TestClient(app).get("/api/v1/portfolio/", params={"userId": "user123"})
+
+        assert response.status_code == 200
+        assert response.json()["activeFundIds"] == ["FPV_BTG_PACTUAL"]
+        assert Decimal(str(response.json()["totalCommitted"])) == Decimal("75000")
+        assert 'Item' in service_tables.UserPortfolio.get_item(Key={'userId': 'user123'})
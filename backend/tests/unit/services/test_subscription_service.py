@@ -0,0 +1,176 @@
+"""
+Tests unitarios para las suscripciones transaccionales y el resumen por usuario
+"""
+import pytest
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.subscription import SubscribeRequest, UnsubscribeRequest
+from app.services.subscription_service import subscription_service
+
+
+def subscribe(fund_id):
+    return subscription_service.subscribe_to_fund(SubscribeRequest(userId="user123", fundId=fund_id))
+
+
+def unsubscribe(fund_id):
+    return subscription_service.unsubscribe_from_fund(UnsubscribeRequest(userId="user123", fundId=fund_id))
+
+
+class TestTransactionalSubscriptions:
+    """Tests para suscribir y cancelar con UserFunds, resumen y libro mayor en una transacción"""
+
+    @pytest.mark.asyncio
+    async def test_subscribe_updates_summary_and_ledger(self, service_tables):
+        """Test la suscripción crea UserFunds, suma al resumen y debita el saldo"""
+        assert (await subscribe("FPV_BTG_PACTUAL")).success
+        assert (await subscribe("DEUDAPRIVADA")).success
+
+        subscription = service_tables.UserFunds.get_item(Key={'userId': 'user123', 'fundId': 'FPV_BTG_PACTUAL'})['Item']
+        assert subscription['amount'] == Decimal("75000")
+        summary = service_tables.UserPortfolio.get_item(Key={'userId': 'user123'})['Item']
+        assert summary['activeFundIds'] == {"FPV_BTG_PACTUAL", "DEUDAPRIVADA"}
+        assert (summary['subscriptionCount'], summary['totalCommitted']) == (2, Decimal("125000"))
+        assert (summary['FPVCount'], summary['FPVTotal']) == (1, Decimal("75000"))
+        assert (summary['FICCount'], summary['FICTotal']) == (1, Decimal("50000"))
+        user = service_tables.User.get_item(Key={'userId': 'user123'})['Item']
+        assert user['balance'] == Decimal("375000")
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_decrements_summary(self, service_tables):
+        """Test la cancelación elimina UserFunds, resta del resumen y quita el fondo de activeFundIds"""
+        await subscribe("FPV_BTG_PACTUAL")
+        await subscribe("DEUDAPRIVADA")
+
+        assert (await unsubscribe("FPV_BTG_PACTUAL")).success
+
+        assert 'Item' not in service_tables.UserFunds.get_item(Key={'userId': 'user123', 'fundId': 'FPV_BTG_PACTUAL'})
+        summary = service_tables.UserPortfolio.get_item(Key={'userId': 'user123'})['Item']
+        assert summary['activeFundIds'] == {"DEUDAPRIVADA"}
+        assert (summary['subscriptionCount'], summary['totalCommitted']) == (1, Decimal("50000"))
+        assert (summary['FPVCount'], summary['FPVTotal']) == (0, Decimal("0"))
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicate_subscription_is_already_subscribed(self, service_tables):
+        """Test la condición sobre UserFunds (otra petición ganó la carrera) responde ALREADY_SUBSCRIBED"""
+        await subscribe("FPV_BTG_PACTUAL")
+
+        # La verificación previa no ve la suscripción: decide la condición de la transacción
+        with patch.object(subscription_service, 'get_user_fund', AsyncMock(return_value=None)):
+            response = await subscribe("FPV_BTG_PACTUAL")
+
+        assert response.error.code == "ALREADY_SUBSCRIBED"
+        summary = service_tables.UserPortfolio.get_item(Key={'userId': 'user123'})['Item']
+        assert (summary['subscriptionCount'], summary['totalCommitted']) == (1, Decimal("75000"))
+        user = service_tables.User.get_item(Key={'userId': 'user123'})['Item']
+        assert user['balance'] == Decimal("425000")
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicate_cancellation_is_not_subscribed(self, service_tables):
+        """Test la condición sobre UserFunds (otra cancelación ganó la carrera) responde NOT_SUBSCRIBED"""
+        await subscribe("FPV_BTG_PACTUAL")
+        existing = await subscription_service.get_user_fund("user123", "FPV_BTG_PACTUAL")
+        await unsubscribe("FPV_BTG_PACTUAL")
+
+        with patch.object(subscription_service, 'get_user_fund', AsyncMock(return_value=existing)):
+            response = await unsubscribe("FPV_BTG_PACTUAL")
+
+        assert response.error.code == "NOT_SUBSCRIBED"
+        summary = service_tables.UserPortfolio.get_item(Key={'userId': 'user123'})['Item']
+        assert (summary['subscriptionCount'], summary['totalCommitted']) == (0, Decimal("0"))
+
+
+class TestPortfolioEndpoint:
+    """Tests para GET /api/v1/portfolio/"""
+
+    @pytest.mark.asyncio
+    async def test_summary_after_subscriptions(self, service_tables):
+        """Test el resumen refleja las suscripciones activas por categoría"""
+        await subscribe("FPV_BTG_PACTUAL")
+        await subscribe("DEUDAPRIVADA")
+
+        response = TestClient(app).get("/api/v1/portfolio/", params={"userId": "user123"})
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["activeFundIds"] == ["DEUDAPRIVADA", "FPV_BTG_PACTUAL"]
+        assert body["subscriptionCount"] == 2
+        assert Decimal(str(body["totalCommitted"])) == Decimal("125000")
+        assert body["categories"]["FIC"]["count"] == 1
+
+    def test_user_without_subscriptions(self, service_tables):
+        """Test un usuario sin suscripciones recibe un resumen vacío"""
+        response = TestClient(app).get("/api/v1/portfolio/", params={"userId": "user123"})
+
+        assert response.status_code == 200
+        assert (response.json()["activeFundIds"], response.json()["subscriptionCount"]) == ([], 0)
+
+    def test_unknown_user(self, service_tables):
+        """Test 404 para un usuario inexistente"""
+        response = TestClient(app).get("/api/v1/portfolio/", params={"userId": "nobody"})
+
+        assert response.status_code == 404
+
+
+class TestFundStats:
+    """Tests para los agregados de FundStats mantenidos en suscripciones y cancelaciones"""
+
+    @pytest.mark.asyncio
+    async def test_subscribe_and_unsubscribe_update_stats_and_detail(self, service_tables):
+        """Test subscriberCount y totalCommitted en FundStats y en GET /api/v1/funds/{id}"""
+        service_tables.User.put_item(Item={'userId': 'user456', 'balance': Decimal("500000"), 'notificationType': 'sms'})
+        await subscribe("FPV_BTG_PACTUAL")
+        await subscription_service.subscribe_to_fund(SubscribeRequest(userId="user456", fundId="FPV_BTG_PACTUAL"))
+
+        stats = service_tables.FundStats.get_item(Key={'fundId': 'FPV_BTG_PACTUAL'})['Item']
+        assert (stats['subscriberCount'], stats['totalCommitted']) == (2, Decimal("150000"))
+
+        assert (await unsubscribe("FPV_BTG_PACTUAL")).success
+
+        stats = service_tables.FundStats.get_item(Key={'fundId': 'FPV_BTG_PACTUAL'})['Item']
+        assert (stats['subscriberCount'], stats['totalCommitted']) == (1, Decimal("75000"))
+        response = TestClient(app).get("/api/v1/funds/FPV_BTG_PACTUAL")
+        assert response.status_code == 200
+        assert response.json()["subscriberCount"] == 1
+        assert Decimal(str(response.json()["totalCommitted"])) == Decimal("75000")
+
+    def test_fund_without_subscribers(self, service_tables):
+        """Test un fondo sin fila en FundStats responde agregados en cero"""
+        response = TestClient(app).get("/api/v1/funds/DEUDAPRIVADA")
+
+        assert response.status_code == 200
+        assert (response.json()["subscriberCount"], response.json()["totalCommitted"]) == (0, 0)
+
+
+class TestFundSubscribersEndpoint:
+    """Tests para GET /api/v1/funds/{id}/subscribers sobre el índice FundIdIndex"""
+
+    @pytest.mark.asyncio
+    async def test_pages_with_limit_and_cursor(self, service_tables):
+        """Test dos páginas con limit y cursor cubren a todos los suscriptores una sola vez"""
+        for user_id in ("user456", "user789"):
+            service_tables.User.put_item(Item={'userId': user_id, 'balance': Decimal("500000"), 'notificationType': 'email'})
+        for user_id in ("user123", "user456", "user789"):
+            assert (await subscription_service.subscribe_to_fund(
+                SubscribeRequest(userId=user_id, fundId="FPV_BTG_PACTUAL")
+            )).success
+        await subscribe("DEUDAPRIVADA")
+        client = TestClient(app)
+
+        first = client.get("/api/v1/funds/FPV_BTG_PACTUAL/subscribers", params={"limit": 2}).json()
+        second = client.get(
+            "/api/v1/funds/FPV_BTG_PACTUAL/subscribers", params={"limit": 2, "cursor": first["nextCursor"]}
+        ).json()
+
+        assert (first["count"], second["count"]) == (2, 1)
+        assert first["nextCursor"] and second["nextCursor"] is None
+        user_ids = [subscriber["userId"] for subscriber in first["subscribers"] + second["subscribers"]]
+        assert sorted(user_ids) == ["user123", "user456", "user789"]
+
+    def test_invalid_cursor(self, service_tables):
+        """Test un cursor inválido responde 400"""
+        response = TestClient(app).get("/api/v1/funds/FPV_BTG_PACTUAL/subscribers", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
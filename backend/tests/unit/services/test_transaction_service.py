@@ -0,0 +1,81 @@
+"""
+Tests unitarios para TransactionService
+"""
+import threading
+
+import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+from app.models.records import TransactionRecord
+from app.models.transaction import TransactionCreate
+from app.services.transaction_service import TransactionService
+from tests.conftest import table_name
+
+
+class TestTransactionService:
+    """Tests para el historial de transacciones sobre UserIdIndex"""
+
+    @pytest.fixture
+    def service(self, dynamodb_client, dynamodb_resource):
+        table = dynamodb_resource.Table(table_name('Transactions'))
+        for item in table.scan()['Items']:
+            table.delete_item(Key={'transactionId': item['transactionId']})
+        service = TransactionService()
+        service.table = table
+        return service
+
+    @pytest.fixture
+    def history(self, service, monkeypatch):
+        monkeypatch.setattr('app.utils.ids._last_ms', 0)
+        start = datetime(2025, 8, 5, 10, 30, tzinfo=timezone.utc)
+        records = []
+        for minute in range(5):
+            moment = start + timedelta(minutes=minute)
+            with patch('app.utils.ids.time.time_ns', return_value=int(moment.timestamp() * 1e9)):
+                record = TransactionRecord.new("user123", "FPV_BTG_PACTUAL", "subscribe", Decimal("75000"))
+            service.table.put_item(Item=record.to_item())
+            records.append(record)
+        return records
+
+    @pytest.mark.asyncio
+    async def test_returns_newest_first_without_sorting(self, service, history):
+        """Test historial completo ordenado por la clave de rango"""
+        transactions, next_cursor = await service.get_transactions_by_user("user123")
+
+        assert [t.transactionId for t in transactions] == [r.transactionId for r in reversed(history)]
+        assert next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_paginates_with_cursor(self, service, history):
+        """Test paginación con cursor sobre LastEvaluatedKey"""
+        first, cursor = await service.get_transactions_by_user("user123", limit=3)
+        second, last_cursor = await service.get_transactions_by_user("user123", limit=3, cursor=cursor)
+
+        assert [t.transactionId for t in first + second] == [r.transactionId for r in reversed(history)]
+        assert cursor is not None
+        assert last_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_after_is_a_key_range(self, service, history):
+        """Test "posteriores a" como condición sobre transactionId"""
+        transactions, _ = await service.get_transactions_by_user("user123", after=history[2].timestamp)
+
+        assert [t.transactionId for t in transactions] == [history[4].transactionId, history[3].transactionId]
+
+    @pytest.mark.asyncio
+    async def test_write_behind_append_runs_off_event_loop(self, service):
+        """Test que el INSERT con fsync en el log local no se ejecuta en el hilo del event loop"""
+        threads = []
+        buffer = Mock()
+        buffer.append.side_effect = lambda item: threads.append(threading.current_thread())
+
+        with patch('app.services.transaction_service.TRANSACTION_WRITE_BEHIND_ENABLED', True), \
+                patch('app.services.transaction_service.transaction_buffers.get', return_value=buffer):
+            await service.create_transaction(
+                TransactionCreate(userId="user123", fundId="FPV_BTG_PACTUAL", type="unsubscribe", amount=Decimal("0"))
+            )
+
+        assert len(threads) == 1
+        assert threads[0] is not threading.current_thread()
@@ -0,0 +1,74 @@
+"""
+Tests unitarios para la caché de usuarios (read-through y write-through)
+"""
+import pytest
+from dataclasses import replace
+from decimal import Decimal
+from unittest.mock import patch
+
+from app.services.user_service import user_service
+
+
+def count_reads(tables):
+    """Espiar get_item sobre la tabla User sin cambiar su comportamiento"""
+    return patch.object(user_service, 'table', wraps=tables.User)
+
+
+class TestUserCache:
+    """Tests para la caché de usuarios"""
+
+    @pytest.mark.asyncio
+    async def test_read_through_miss_then_hit(self, service_tables):
+        """Test la primera lectura va a DynamoDB y llena la caché; la segunda no lee la tabla"""
+        with count_reads(service_tables) as table:
+            first = await user_service.get_user_by_id("user123")
+            second = await user_service.get_user_by_id("user123")
+
+        assert table.get_item.call_count == 1
+        assert first == second
+        assert user_service.cache.get("user123").balance == Decimal("500000")
+
+    @pytest.mark.asyncio
+    async def test_missing_user_is_not_cached(self, service_tables):
+        """Test un usuario inexistente devuelve None y no deja una entrada en caché"""
+        assert await user_service.get_user_by_id("nobody") is None
+        assert user_service.cache.get("nobody") is None
+
+    @pytest.mark.asyncio
+    async def test_use_cache_false_bypasses_cache(self, service_tables):
+        """Test use_cache=False lee de forma consistente aunque haya una entrada en caché"""
+        cached = await user_service.get_user_by_id("user123")
+        user_service.cache.set("user123", replace(cached, balance=Decimal("1")))
+
+        with count_reads(service_tables) as table:
+            user = await user_service.get_user_by_id("user123", use_cache=False)
+
+        assert user.balance == Decimal("500000")
+        assert table.get_item.call_args.kwargs['ConsistentRead'] is True
+        # La lectura consistente refresca la caché
+        assert user_service.cache.get("user123").balance == Decimal("500000")
+
+    @pytest.mark.asyncio
+    async def test_balance_update_invalidates_cache(self, service_tables):
+        """Test después de ajustar el saldo la caché no conserva el saldo anterior"""
+        await user_service.get_user_by_id("user123")
+
+        with patch.object(user_service.cache, 'invalidate', wraps=user_service.cache.invalidate) as invalidate:
+            updated = await user_service.update_user_balance("user123", Decimal("450000"))
+
+        invalidate.assert_called_once_with("user123")
+        assert updated.balance == Decimal("450000")
+        assert (await user_service.get_user_by_id("user123")).balance == Decimal("450000")
+
+    @pytest.mark.asyncio
+    async def test_notification_update_writes_through(self, service_tables):
+        """Test el cambio de notificación guarda en caché el valor devuelto por DynamoDB"""
+        await user_service.get_user_by_id("user123")
+
+        await user_service.update_notification_type("user123", "sms")
+
+        with count_reads(service_tables) as table:
+            user = await user_service.get_user_by_id("user123")
+
+        assert table.get_item.call_count == 0
+        assert user.notificationType == "sms"
@@ -0,0 +1,55 @@
+"""
+Tests unitarios para los identificadores UUIDv7
+"""
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from app.utils.ids import uuid7, uuid7_datetime, uuid7_upper_bound
+
+
+class TestUuid7:
+    """Tests para uuid7"""
+
+    @pytest.fixture(autouse=True)
+    def reset_clock(self, monkeypatch):
+        """Olvidar el último milisegundo emitido (los tests fijan relojes en el pasado)"""
+        monkeypatch.setattr('app.utils.ids._last_ms', 0)
+
+    def test_version_variant_and_timestamp(self):
+        """Test versión, variante y milisegundo codificado"""
+        before = datetime.now(timezone.utc) - timedelta(milliseconds=1)
+        value = uuid7()
+        after = datetime.now(timezone.utc) + timedelta(milliseconds=1)
+
+        parsed = uuid.UUID(value)
+        assert parsed.version == 7
+        assert parsed.variant == uuid.RFC_4122
+        assert before <= uuid7_datetime(value) <= after
+
+    def test_strictly_increasing_within_same_millisecond(self):
+        """Test orden estricto con el reloj detenido, incluso al agotar el contador"""
+        with patch('app.utils.ids.time.time_ns', return_value=1_754_389_800_000_000_000):
+            values = [uuid7() for _ in range(5000)]
+
+        assert values == sorted(values)
+        assert len(set(values)) == len(values)
+
+    def test_upper_bound_selects_later_ids(self):
+        """Test que la cota separa los IDs anteriores y posteriores a una fecha"""
+        moment = datetime(2025, 8, 5, 10, 30, tzinfo=timezone.utc)
+        with patch('app.utils.ids.time.time_ns', return_value=1_754_389_800_000_000_000):
+            same_ms = uuid7()
+        with patch('app.utils.ids.time.time_ns', return_value=1_754_389_800_001_000_000):
+            next_ms = uuid7()
+
+        bound = uuid7_upper_bound(moment)
+
+        assert same_ms <= bound < next_ms
+        assert uuid7_upper_bound(moment.replace(tzinfo=None)) == bound
+
+    def test_datetime_rejects_other_versions(self):
+        """Test error con UUIDs que no son v7"""
+        with pytest.raises(ValueError):
+            uuid7_datetime(str(uuid.uuid4()))
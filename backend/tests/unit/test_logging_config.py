@@ -0,0 +1,106 @@
+"""
+Tests unitarios para el logging estructurado
+"""
+import io
+import sys
+import json
+import logging
+import pytest
+
+from app.logging_config import (
+    JsonFormatter, SamplingFilter, configure_logging, parse_sample_rates, request_id_var, stop_logging
+)
+
+
+def make_record(name="app.test", level=logging.INFO, msg="Retrieved user: %s", args=("user_1",), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJsonFormatter:
+    """Tests para JsonFormatter"""
+
+    def test_formats_message_lazily_with_request_id_and_extras(self):
+        """Test mensaje con argumentos, request_id y campos extra"""
+        entry = json.loads(JsonFormatter().format(make_record(request_id="abc", fund_id="1")))
+
+        assert entry["message"] == "Retrieved user: user_1"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "app.test"
+        assert entry["request_id"] == "abc"
+        assert entry["fund_id"] == "1"
+        assert "args" not in entry
+
+    def test_includes_exception(self):
+        """Test traza de la excepción"""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord("app.test", logging.ERROR, __file__, 1, "failed", (), sys.exc_info())
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        assert "ValueError: boom" in entry["exception"]
+
+
+class TestSamplingFilter:
+    """Tests para SamplingFilter"""
+
+    def test_parse_sample_rates(self):
+        """Test lectura de LOG_SAMPLE_RATES"""
+        assert parse_sample_rates("app.services=0.1, app.routes.funds=2,,bad") == {
+            "app.services": 0.1, "app.routes.funds": 1.0
+        }
+
+    def test_uses_most_specific_prefix(self):
+        """Test tasa del prefijo más específico"""
+        sampling = SamplingFilter({"app.services": 0.5, "app.services.user_service": 0.0})
+
+        assert sampling.rate_for("app.services.user_service") == 0.0
+        assert sampling.rate_for("app.services.fund_service") == 0.5
+        assert sampling.rate_for("app.routes.funds") == 1.0
+
+    def test_samples_info_but_keeps_warnings(self):
+        """Test muestreo de INFO y conservación de WARNING"""
+        sampling = SamplingFilter({"app.services": 0.1}, rand=lambda: 0.5)
+
+        assert sampling.filter(make_record("app.services.fund_service")) is False
+        assert sampling.filter(make_record("app.services.fund_service", level=logging.WARNING)) is True
+        assert sampling.filter(make_record("app.routes.funds")) is True
+
+
+class TestConfigureLogging:
+    """Tests para configure_logging"""
+
+    @pytest.fixture(autouse=True)
+    def restore_logging(self):
+        level = logging.getLogger().level
+        yield
+        configure_logging()
+        logging.getLogger().setLevel(level)
+
+    def test_writes_json_from_background_listener(self):
+        """Test escritura en segundo plano con request_id del contexto"""
+        stream = io.StringIO()
+        configure_logging(level="INFO", fmt="json", sample_rates="", use_queue=True, stream=stream)
+
+        token = request_id_var.set("req-1")
+        try:
+            logging.getLogger("app.test").info("Created transaction %s", "t1")
+        finally:
+            request_id_var.reset(token)
+        stop_logging()
+
+        entry = json.loads(stream.getvalue().strip().splitlines()[-1])
+        assert entry["message"] == "Created transaction t1"
+        assert entry["request_id"] == "req-1"
+
+    def test_text_format_without_request(self):
+        """Test formato de texto fuera de una petición"""
+        stream = io.StringIO()
+        configure_logging(level="INFO", fmt="text", sample_rates="", use_queue=False, stream=stream)
+
+        logging.getLogger("app.test").warning("Rate limit exceeded")
+
+        assert "WARNING app.test [-] Rate limit exceeded" in stream.getvalue()
@@ -0,0 +1,154 @@
+"""
+Tests unitarios para la limitación de tasa con ventana deslizante
+"""
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import MagicMock, patch, AsyncMock
+from fastapi.testclient import TestClient
+
+from app.cache.backends import InMemoryBackend, RedisBackend
+from app.main import app
+from app.models.subscription import SubscriptionResponse
+from app.utils.rate_limit import SlidingWindowLimiter
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class BrokenBackend(InMemoryBackend):
+    def incr(self, key, ttl):
+        raise ConnectionError("connection refused")
+
+
+class FailingReadBackend(InMemoryBackend):
+    def get(self, key):
+        raise ConnectionError("connection reset")
+
+
+class TestSlidingWindowLimiter:
+    """Tests para SlidingWindowLimiter"""
+
+    def test_allows_up_to_limit_then_rejects(self):
+        """Test que se permiten `limit` peticiones por ventana"""
+        limiter = SlidingWindowLimiter("test", limit=3, window=60, clock=FakeClock(960.0))
+
+        results = [limiter.hit("user123") for _ in range(4)]
+
+        assert [result.allowed for result in results] == [True, True, True, False]
+        assert [result.remaining for result in results[:3]] == [2, 1, 0]
+        assert results[0].reset == 60
+
+    def test_previous_window_is_weighted(self):
+        """Test que la ventana anterior cuenta según su solapamiento"""
+        clock = FakeClock(960.0)
+        limiter = SlidingWindowLimiter("test", limit=4, window=60, clock=clock)
+        for _ in range(4):
+            limiter.hit("user123")
+
+        # A mitad de la ventana siguiente la anterior pesa 50%: 2 + 1 nueva
+        clock.now = 1050.0
+        assert limiter.hit("user123").allowed is True
+        assert limiter.hit("user123").allowed is True
+        assert limiter.hit("user123").allowed is False
+
+        # Dos ventanas después el historial ya no cuenta
+        clock.now = 1200.0
+        assert limiter.hit("user123").remaining == 3
+
+    def test_keys_are_independent(self):
+        """Test que cada clave tiene su propio contador"""
+        limiter = SlidingWindowLimiter("test", limit=1, window=60, clock=FakeClock())
+
+        assert limiter.hit("user123").allowed is True
+        assert limiter.hit("user456").allowed is True
+        assert limiter.hit("user123").allowed is False
+
+    def test_shared_backend_is_global_across_workers(self):
+        """Test que dos workers con el mismo backend comparten el límite"""
+        backend = InMemoryBackend()
+        worker_a = SlidingWindowLimiter("test", limit=2, window=60, backend=backend, clock=FakeClock())
+        worker_b = SlidingWindowLimiter("test", limit=2, window=60, backend=backend, clock=FakeClock())
+
+        assert worker_a.hit("user123").allowed is True
+        assert worker_b.hit("user123").allowed is True
+        assert worker_a.hit("user123").allowed is False
+
+    def test_backend_failure_falls_back_to_local(self):
+        """Test que un fallo del backend usa los contadores locales"""
+        limiter = SlidingWindowLimiter("test", limit=1, window=60, backend=BrokenBackend(), clock=FakeClock())
+
+        assert limiter.hit("user123").allowed is True
+        assert limiter.hit("user123").allowed is False
+
+    def test_failed_previous_window_read_counts_once(self):
+        """Test que si falla solo la lectura de la ventana anterior la petición no se cuenta también en local"""
+        backend = FailingReadBackend()
+        limiter = SlidingWindowLimiter("test", limit=2, window=60, backend=backend, clock=FakeClock())
+
+        results = [limiter.hit("user123") for _ in range(3)]
+
+        assert [result.allowed for result in results] == [True, True, False]
+        assert [result.remaining for result in results[:2]] == [1, 0]
+        assert limiter._counters == {}
+
+
+class TestSharedBackendCalls:
+    """Tests para las llamadas al backend compartido"""
+
+    def test_redis_increments_and_reads_in_one_transaction(self):
+        """Test que incr y get de la ventana anterior van en un solo MULTI/EXEC"""
+        with patch('redis.Redis.from_url') as from_url:
+            pipeline = from_url.return_value.pipeline.return_value
+            pipeline.execute.return_value = [3, True, b"7"]
+            backend = RedisBackend("redis://localhost")
+
+            assert backend.incr_window("k:10", "k:9", 120) == (3, b"7")
+
+        from_url.return_value.pipeline.assert_called_once_with(transaction=True)
+        pipeline.incr.assert_called_once_with("k:10")
+        pipeline.get.assert_called_once_with("k:9")
+        assert pipeline.execute.call_count == 1
+
+    def test_hit_async_calls_backend_off_event_loop(self):
+        """Test que con backend compartido la llamada de red no se hace en el hilo del event loop"""
+        backend = MagicMock()
+        threads = []
+
+        def incr_window(key, previous_key, ttl):
+            threads.append(threading.current_thread())
+            return 1, None
+
+        backend.incr_window.side_effect = incr_window
+        limiter = SlidingWindowLimiter("test", limit=2, window=60, backend=backend, clock=FakeClock())
+
+        result = asyncio.run(limiter.hit_async("user123"))
+
+        assert result.allowed is True
+        assert threads and threads[0] is not threading.main_thread()
+
+
+def test_subscribe_endpoint_returns_429_with_ratelimit_headers():
+    """Test que el endpoint rechaza el exceso antes de llamar al servicio"""
+    limiter = SlidingWindowLimiter("user", limit=1, window=60)
+    service = AsyncMock(return_value=SubscriptionResponse(success=True, message="ok"))
+    client = TestClient(app)
+    payload = {"userId": "user123", "fundId": "FPV_BTG_PACTUAL"}
+
+    with patch('app.utils.rate_limit.user_limiter', limiter), \
+         patch('app.routes.subscriptions.subscription_service.subscribe_to_fund', service):
+        first = client.post("/api/v1/subscribe", json=payload)
+        second = client.post("/api/v1/subscribe", json=payload)
+
+    assert first.status_code == 200
+    assert first.headers["ratelimit-limit"] == "1"
+    assert first.headers["ratelimit-remaining"] == "0"
+    assert second.status_code == 429
+    assert "retry-after" in second.headers
+    assert service.await_count == 1
@@ -0,0 +1,103 @@
+"""
+Tests unitarios para los registros internos de servicios
+"""
+import dataclasses
+import pytest
+from decimal import Decimal
+from datetime import datetime
+
+from app.models.fund import Fund
+from app.models.records import FundRecord, UserRecord, UserFundRecord, TransactionRecord, PortfolioRecord, FundStatsRecord
+from app.models.transaction import Transaction
+
+
+class TestRecords:
+    """Tests para los registros internos"""
+
+    def test_fund_record_from_item(self, fund_data_dict):
+        """Test construcción de FundRecord desde un item de DynamoDB"""
+        fund = FundRecord.from_item(fund_data_dict)
+
+        assert fund.fundId == "FPV_BTG_PACTUAL"
+        assert fund.minAmount == Decimal("75000")
+        assert fund.to_item() == fund_data_dict
+
+    def test_fund_record_to_model(self, fund_data_dict):
+        """Test conversión de FundRecord al modelo de la API"""
+        model = FundRecord.from_item(fund_data_dict).to_model()
+
+        assert isinstance(model, Fund)
+        assert model.category == "FPV"
+
+    def test_records_are_slotted_and_immutable(self, user_data_dict):
+        """Test que los registros no tienen __dict__ y no se pueden modificar"""
+        user = UserRecord.from_item(user_data_dict)
+
+        assert not hasattr(user, "__dict__")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            user.balance = Decimal("0")
+
+    def test_user_fund_record_roundtrip(self):
+        """Test ida y vuelta de UserFundRecord con fechas ISO"""
+        item = {'userId': 'user123', 'fundId': 'FIC_MANDATO', 'subscribedAt': '2025-08-05T10:30:00'}
+
+        user_fund = UserFundRecord.from_item(item)
+
+        assert user_fund.subscribedAt == datetime(2025, 8, 5, 10, 30)
+        assert user_fund.to_item() == item
+
+    def test_transaction_record_new(self):
+        """Test creación de TransactionRecord con ID y timestamp automáticos"""
+        transaction = TransactionRecord.new("user123", "FPV_BTG_PACTUAL", "subscribe", Decimal("75000"))
+
+        assert transaction.transactionId
+        assert isinstance(transaction.timestamp, datetime)
+        assert isinstance(transaction.to_model(), Transaction)
+
+    def test_transaction_record_from_item(self, transaction_data_dict):
+        """Test construcción de TransactionRecord desde un item de DynamoDB"""
+        transaction = TransactionRecord.from_item(transaction_data_dict)
+
+        assert transaction.type == "subscribe"
+        assert transaction.to_item() == transaction_data_dict
+
+    def test_portfolio_record_from_item(self):
+        """Test construcción del resumen materializado desde un item de DynamoDB"""
+        item = {
+            'userId': 'user123',
+            'activeFundIds': {'FPV_BTG_PACTUAL', 'FIC_ACCIONES'},
+            'subscriptionCount': Decimal("2"),
+            'totalCommitted': Decimal("325000"),
+            'FPVCount': Decimal("1"),
+            'FPVTotal': Decimal("75000"),
+            'FICCount': Decimal("1"),
+            'FICTotal': Decimal("250000")
+        }
+
+        summary = PortfolioRecord.from_item(item, ("FPV", "FIC")).to_model()
+
+        assert summary.activeFundIds == ["FIC_ACCIONES", "FPV_BTG_PACTUAL"]
+        assert summary.subscriptionCount == 2
+        assert summary.categories["FIC"].totalCommitted == Decimal("250000")
+
+    def test_portfolio_record_empty(self):
+        """Test resumen vacío para usuarios sin suscripciones"""
+        summary = PortfolioRecord.empty("user123").to_model()
+
+        assert summary.activeFundIds == []
+        assert summary.totalCommitted == Decimal("0")
+        assert summary.categories == {}
+
+    def test_fund_stats_record_to_detail_model(self, fund_data_dict):
+        """Test combinación de fondo y agregados en el modelo de detalle"""
+        fund = FundRecord.from_item(fund_data_dict)
+        stats = FundStatsRecord.from_item(
+            {'fundId': fund.fundId, 'subscriberCount': Decimal("3"), 'totalCommitted': Decimal("225000")}
+        )
+
+        detail = stats.to_detail_model(fund)
+
+        assert detail.minAmount == Decimal("75000")
+        assert detail.subscriberCount == 3
+        assert detail.totalCommitted == Decimal("225000")
+        assert FundStatsRecord.empty("FIC_MANDATO").subscriberCount == 0
@@ -0,0 +1,74 @@
+"""
+Tests unitarios para los recursos por tenant
+"""
+import pytest
+from decimal import Decimal
+
+from app.database.embedded import EmbeddedClient
+from app.services.user_service import UserService
+from app.models.records import UserRecord
+from app.tenancy import (
+    PerTenant, TenantTable, parse_hosts, parse_tenants, physical_table_name, scoped_key, tenant_context
+)
+from tests.conftest import TEST_TABLE_PREFIX
+
+
+class TestTenancy:
+    """Tests para la resolución de nombres y recursos por tenant"""
+
+    def test_parse_configuration(self):
+        assert parse_tenants(" Acme, globex ,") == ("acme", "globex")
+        assert parse_hosts("fondos.acme.com=acme, Globex.io = globex") == {
+            "fondos.acme.com": "acme", "globex.io": "globex"
+        }
+        with pytest.raises(ValueError):
+            parse_tenants("acme,bad_tenant")
+
+    def test_names_follow_current_tenant(self):
+        assert physical_table_name("Funds") == f"{TEST_TABLE_PREFIX}Funds"
+        assert scoped_key("users") == "users"
+        with tenant_context("acme"):
+            assert physical_table_name("Funds") == f"{TEST_TABLE_PREFIX}acme_Funds"
+            assert scoped_key("users") == "acme:users"
+
+    def test_per_tenant_instances(self):
+        created = []
+        resources = PerTenant(lambda tenant: created.append(tenant) or object())
+
+        with tenant_context("acme"):
+            acme = resources.get()
+
+        assert resources.get("acme") is acme
+        assert resources.get() is not acme
+        assert created == ["acme", ""]
+
+    def test_tenant_table_routes_each_operation(self):
+        client = EmbeddedClient()
+        for tenant in ("", "acme"):
+            client.get_client().create_table(
+                TableName=physical_table_name("User", tenant),
+                KeySchema=[{'AttributeName': 'userId', 'KeyType': 'HASH'}],
+                AttributeDefinitions=[{'AttributeName': 'userId', 'AttributeType': 'S'}],
+                BillingMode='PAY_PER_REQUEST'
+            )
+        table = TenantTable("User", client.get_resource().Table)
+
+        with tenant_context("acme"):
+            table.put_item(Item={'userId': 'u1', 'balance': Decimal("1")})
+            assert table.name == f"{TEST_TABLE_PREFIX}acme_User"
+
+        assert 'Item' not in table.get_item(Key={'userId': 'u1'})
+        with tenant_context("acme"):
+            assert table.get_item(Key={'userId': 'u1'})['Item']['balance'] == Decimal("1")
+
+    def test_user_cache_per_tenant(self):
+        service = UserService(cache_backend=None)
+        user = UserRecord(userId="u1", balance=Decimal("100"), notificationType="email")
+
+        with tenant_context("acme"):
+            service.cache.set("u1", user)
+            assert service.cache.name == "acme:users"
+
+        assert service.cache.get("u1") is None
+        with tenant_context("acme"):
+            assert service.cache.get("u1") is user